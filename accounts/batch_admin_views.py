@@ -22,6 +22,12 @@ from farms.batch_enrollment_models import (
 from farms.application_models import FarmApplication
 from accounts.policies.batch_policy import BatchPolicy
 from accounts.models import User
+from core.kpi import avg_days_between, count_if, empty_kpis, grouped_kpis, percentage
+
+PENDING_APPLICATION_STATUSES = [
+    'submitted', 'eligibility_check', 'constituency_review',
+    'regional_review', 'national_review',
+]
 
 
 class AdminBatchListView(APIView):
@@ -49,7 +55,7 @@ class AdminBatchListView(APIView):
             )
         
         # Start with all programs (including archived for admins)
-        queryset = Batch.objects.filter(archived=False)
+        queryset = Batch.objects.filter(archived=False).select_related('created_by')
         
         # Apply filters
         is_active = request.query_params.get('is_active')
@@ -91,75 +97,67 @@ class AdminBatchListView(APIView):
         paginator = Paginator(queryset, page_size)
         page_obj = paginator.get_page(page)
         
+        # Statistics for the whole page: one grouped query per source
+        programs = list(page_obj.object_list)
+        applications = BatchEnrollmentApplication.objects.filter(batch__in=programs)
+        application_kpis = {
+            'total': count_if(),
+            'approved': count_if(status='approved'),
+            'rejected': count_if(status='rejected'),
+            'pending': count_if(status__in=PENDING_APPLICATION_STATUSES),
+            'avg_review_days': avg_days_between('submitted_at', 'final_decision_at'),
+        }
+        application_stats = grouped_kpis(applications, 'batch_id', **application_kpis)
+        # Per-region fills, by the region of the farm's primary location
+        region_stats = {}
+        if any(program.regional_allocation for program in programs):
+            region_stats = grouped_kpis(
+                applications.filter(farm__locations__is_primary_location=True),
+                ('batch_id', 'farm__locations__region'),
+                filled=count_if(status='approved'),
+                pending=count_if(status__in=PENDING_APPLICATION_STATUSES),
+            )
+        # Farm applications from new farmers also fill slots
+        farm_apps_approved = dict(
+            FarmApplication.objects.filter(
+                yea_program_batch__in=[program.batch_code for program in programs],
+                status='approved'
+            ).order_by().values('yea_program_batch').annotate(
+                count=Count('id')
+            ).values_list('yea_program_batch', 'count')
+        )
+        
         # Build response data with computed statistics
         results = []
-        for program in page_obj.object_list:
-            # Calculate real-time statistics from applications
-            applications = BatchEnrollmentApplication.objects.filter(batch=program)
-            total_applications = applications.count()
-            approved_applications = applications.filter(status='approved').count()
-            rejected_applications = applications.filter(status='rejected').count()
-            pending_applications = applications.filter(
-                status__in=['submitted', 'eligibility_check', 'constituency_review', 
-                           'regional_review', 'national_review']
-            ).count()
-            
-            # Calculate slots from farm applications if this is for new farmers
-            farm_apps = FarmApplication.objects.filter(
-                yea_program_batch=program.batch_code if hasattr(program, 'batch_code') else None
-            )
-            farm_apps_approved = farm_apps.filter(status='approved').count()
+        for program in programs:
+            stats = application_stats.get(program.id) or empty_kpis(**application_kpis)
+            total_applications = stats['total']
+            approved_applications = stats['approved']
+            rejected_applications = stats['rejected']
+            pending_applications = stats['pending']
             
             # Total slots filled (both enrollment and farm applications)
-            slots_filled = approved_applications + farm_apps_approved
+            slots_filled = approved_applications + farm_apps_approved.get(program.batch_code, 0)
             slots_available = max(0, program.total_slots - slots_filled)
             
             # Calculate regional allocation with actual fills
             regional_data = []
-            if program.regional_allocation:
-                for region_info in program.regional_allocation:
-                    region = region_info.get('region')
-                    allocated = region_info.get('allocated_slots', 0)
-                    
-                    # Count approved applications in this region
-                    region_filled = applications.filter(
-                        status='approved',
-                        farm__primary_region=region
-                    ).count()
-                    
-                    # Count pending in region
-                    region_pending = applications.filter(
-                        status__in=['submitted', 'eligibility_check', 'constituency_review',
-                                   'regional_review', 'national_review'],
-                        farm__primary_region=region
-                    ).count()
-                    
-                    regional_data.append({
-                        'region': region,
-                        'allocated_slots': allocated,
-                        'filled_slots': region_filled,
-                        'available_slots': max(0, allocated - region_filled),
-                        'pending_slots': region_pending
-                    })
-            
-            # Calculate approval rate
-            approval_rate = 0
-            if total_applications > 0:
-                approval_rate = round((approved_applications / total_applications) * 100, 1)
+            for region_info in program.regional_allocation or []:
+                region = region_info.get('region')
+                allocated = region_info.get('allocated_slots', 0)
+                region_counts = region_stats.get((program.id, region), {})
+                region_filled = region_counts.get('filled', 0)
+                
+                regional_data.append({
+                    'region': region,
+                    'allocated_slots': allocated,
+                    'filled_slots': region_filled,
+                    'available_slots': max(0, allocated - region_filled),
+                    'pending_slots': region_counts.get('pending', 0)
+                })
             
-            # Calculate average review time
-            avg_review_time = 0
-            completed_apps = applications.filter(
-                final_decision_at__isnull=False,
-                submitted_at__isnull=False
-            )
-            if completed_apps.exists():
-                review_times = []
-                for app in completed_apps:
-                    delta = app.final_decision_at - app.submitted_at
-                    review_times.append(delta.days)
-                if review_times:
-                    avg_review_time = round(sum(review_times) / len(review_times))
+            approval_rate = percentage(approved_applications, total_applications, digits=1)
+            avg_review_time = round(stats['avg_review_days'] or 0)
             
             # Days remaining
             days_remaining = program.days_until_deadline
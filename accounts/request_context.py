@@ -0,0 +1,154 @@
+"""
+Per-request principal resolution.
+
+Every authenticated API request needs the user (JWT authentication), and
+most farmer endpoints then need the user's farm - often several times per
+request across the view, its policy checks and serializers. This module
+resolves both once:
+
+1. CachedJWTAuthentication (accounts.authentication) loads the user with
+   its farm joined (select_related) from a short-TTL cache entry, so a warm
+   request makes no query to authenticate and ``request.user.farm`` is
+   already populated.
+2. The entry carries the user's principal cache tag. A save or delete of
+   the user or their farm, or a blacklisted refresh token, bumps the tag
+   (accounts.signals) and the next request reloads from the database.
+3. get_request_context(request) wraps the user in a RequestContext,
+   memoized on the request, exposing role, jurisdiction and farm.
+
+Usage:
+    from accounts.request_context import get_request_farm
+
+    try:
+        farm = get_request_farm(request)
+    except Farm.DoesNotExist:
+        return Response({'error': 'Farm not found'}, status=404)
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+
+from core.cache_utils import bump_cache_tags, cached_fresh_only
+
+PRINCIPAL_CACHE_PREFIX = 'auth_principal'
+DEFAULT_PRINCIPAL_CACHE_TTL = 60
+
+REQUEST_CONTEXT_ATTR = '_yea_request_context'
+
+
+def principal_cache_tag(user_id):
+    return f'principal:{user_id}'
+
+
+def invalidate_principal(user_id):
+    """Make the next request of ``user_id`` reload the user and farm."""
+    if user_id:
+        bump_cache_tags(principal_cache_tag(user_id))
+
+
+def _load_user(user_id):
+    User = get_user_model()
+    # select_related caches the farm (or its absence) on the instance, and
+    # the cached copy keeps it, so request.user.farm costs no query
+    return User.objects.select_related('farm').filter(pk=user_id).first()
+
+
+def load_principal(user_id):
+    """
+    The user with ``user_id`` and their farm, from cache when current.
+
+    Returns:
+        User instance (a fresh copy per call), or None if it does not exist
+    """
+    return cached_fresh_only(
+        f'{PRINCIPAL_CACHE_PREFIX}:{user_id}',
+        compute=lambda: _load_user(user_id),
+        ttl=getattr(settings, 'PRINCIPAL_CACHE_TTL', DEFAULT_PRINCIPAL_CACHE_TTL),
+        tags=[principal_cache_tag(user_id)],
+    )
+
+
+class RequestContext:
+    """
+    Who is making a request: user, role, jurisdiction and owned farm.
+
+    Built by get_request_context(); the farm is resolved on first access
+    and kept for the rest of the request.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @property
+    def is_authenticated(self):
+        return bool(self.user and self.user.is_authenticated)
+
+    @property
+    def role(self):
+        return getattr(self.user, 'role', None)
+
+    @property
+    def jurisdiction(self):
+        """(region, district, constituency) of the user; blanks for national users."""
+        return (
+            getattr(self.user, 'region', None) or None,
+            getattr(self.user, 'district', None) or None,
+            getattr(self.user, 'constituency', None) or None,
+        )
+
+    @cached_property
+    def farm(self):
+        """The user's farm, or None."""
+        from farms.models import Farm
+
+        if not self.is_authenticated:
+            return None
+        try:
+            return self.user.farm
+        except Farm.DoesNotExist:
+            return None
+
+    @property
+    def farm_id(self):
+        return self.farm.pk if self.farm else None
+
+    def require_farm(self):
+        """
+        The user's farm.
+
+        Raises:
+            Farm.DoesNotExist: the user has no farm
+        """
+        from farms.models import Farm
+
+        if self.farm is None:
+            raise Farm.DoesNotExist('No farm for this user')
+        return self.farm
+
+
+def get_request_context(request):
+    """
+    The RequestContext of a Django or DRF request, built once per request.
+
+    Stored on the underlying HttpRequest so views, policies and serializers
+    (which see the same request) share it. Rebuilt if the user changed, e.g.
+    when it was first read before DRF authenticated the request.
+    """
+    http_request = getattr(request, '_request', request)
+    user = getattr(request, 'user', None)
+    context = getattr(http_request, REQUEST_CONTEXT_ATTR, None)
+    if context is None or context.user is not user:
+        context = RequestContext(user)
+        setattr(http_request, REQUEST_CONTEXT_ATTR, context)
+    return context
+
+
+def get_request_farm(request):
+    """
+    The requesting user's farm.
+
+    Raises:
+        Farm.DoesNotExist: the user has no farm
+    """
+    return get_request_context(request).require_farm()
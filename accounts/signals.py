@@ -0,0 +1,50 @@
+"""
+Accounts Signals
+
+Principal cache invalidation (see accounts.request_context).
+
+A save or delete of a user or of their farm, or a blacklisted refresh token
+(logout, rotation, forced logout), bumps the user's principal cache tag once
+the write commits, so their next request reloads the user and farm.
+"""
+
+import logging
+from operator import attrgetter
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .request_context import invalidate_principal
+
+logger = logging.getLogger(__name__)
+
+# sender -> attribute path to the user id
+PRINCIPAL_CACHE_SENDERS = {
+    'accounts.User': 'pk',
+    'farms.Farm': 'user_id',
+    'token_blacklist.BlacklistedToken': 'token.user_id',
+}
+
+
+def invalidate_principal_cache(sender, instance, **kwargs):
+    """Drop the cached principal of the affected user after commit."""
+    label = sender._meta.label
+    try:
+        user_id = attrgetter(PRINCIPAL_CACHE_SENDERS[label])(instance)
+    except Exception as e:
+        # Never block the write; the entry expires by PRINCIPAL_CACHE_TTL
+        logger.warning(f"Could not resolve user for {label} {instance.pk}: {str(e)}")
+        return
+    if user_id:
+        transaction.on_commit(lambda: invalidate_principal(user_id))
+
+
+for _sender in PRINCIPAL_CACHE_SENDERS:
+    post_save.connect(
+        invalidate_principal_cache, sender=_sender,
+        dispatch_uid=f'principal_cache_save:{_sender}'
+    )
+    post_delete.connect(
+        invalidate_principal_cache, sender=_sender,
+        dispatch_uid=f'principal_cache_delete:{_sender}'
+    )
@@ -6,12 +6,19 @@ Provides searchable help articles organized by categories.
 """
 import uuid
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.utils.text import slugify
 
 User = get_user_model()
 
+SEARCH_CONFIG = 'english'
+
+# Fields feeding HelpArticle.search_vector (weight A > B > C > D)
+ARTICLE_SEARCH_FIELDS = frozenset({'title', 'summary', 'keywords', 'content'})
+
 
 class HelpCategory(models.Model):
     """
@@ -237,6 +244,10 @@ class HelpArticle(models.Model):
         related_name='deleted_help_articles'
     )
     
+    # Weighted full-text index (title > summary > keywords > content),
+    # refreshed in save() whenever a text field may have changed
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     class Meta:
         db_table = 'cms_help_article'
         ordering = ['category__display_order', 'display_order', 'title']
@@ -246,6 +257,7 @@ class HelpArticle(models.Model):
             models.Index(fields=['status', 'published_at']),
             models.Index(fields=['category', 'status']),
             models.Index(fields=['target_audience', 'status']),
+            GinIndex(fields=['search_vector'], name='cms_help_article_search_gin'),
         ]
     
     def __str__(self):
@@ -255,6 +267,20 @@ class HelpArticle(models.Model):
         if not self.slug:
             self.slug = slugify(self.title)
         super().save(*args, **kwargs)
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or ARTICLE_SEARCH_FIELDS & set(update_fields):
+            HelpArticle.objects.filter(pk=self.pk).update(search_vector=self.search_vector_expression())
+    
+    @staticmethod
+    def search_vector_expression():
+        """Weighted tsvector expression over the article's text fields."""
+        return (
+            SearchVector('title', weight='A', config=SEARCH_CONFIG)
+            + SearchVector('summary', weight='B', config=SEARCH_CONFIG)
+            + SearchVector('keywords', weight='C', config=SEARCH_CONFIG)
+            + SearchVector('content', weight='D', config=SEARCH_CONFIG)
+        )
     
     def publish(self, user):
         """Publish the article."""
@@ -409,3 +435,51 @@ class PopularSearch(models.Model):
             obj.search_count += 1
             obj.has_results = has_results
             obj.save(update_fields=['search_count', 'has_results', 'last_searched'])
+    
+    @classmethod
+    def record_search_counts(cls, term_counts: dict):
+        """
+        Apply aggregated search counts in bulk.
+        
+        Args:
+            term_counts: {term: (count, has_results)} as buffered by
+                cms.help_search.record_search_buffered()
+        
+        Uses one SELECT, one bulk_update and one bulk_create regardless of
+        how many terms were buffered.
+        """
+        normalized = {}
+        for term, (count, has_results) in term_counts.items():
+            term = term.strip().lower()[:255]
+            if term and count > 0:
+                prev_count, _ = normalized.get(term, (0, has_results))
+                normalized[term] = (prev_count + count, has_results)
+        if not normalized:
+            return 0
+        
+        now = timezone.now()
+        existing = {
+            obj.search_term: obj
+            for obj in cls.objects.filter(search_term__in=normalized.keys())
+        }
+        to_update = []
+        to_create = []
+        for term, (count, has_results) in normalized.items():
+            obj = existing.get(term)
+            if obj:
+                obj.search_count += count
+                obj.has_results = has_results
+                obj.last_searched = now
+                to_update.append(obj)
+            else:
+                to_create.append(cls(
+                    search_term=term,
+                    search_count=count,
+                    has_results=has_results,
+                ))
+        
+        if to_update:
+            cls.objects.bulk_update(to_update, ['search_count', 'has_results', 'last_searched'])
+        if to_create:
+            cls.objects.bulk_create(to_create, ignore_conflicts=True)
+        return len(normalized)
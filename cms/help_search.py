@@ -0,0 +1,188 @@
+"""
+Help Center Search
+
+Index-backed search over help articles and write-free search analytics.
+
+SEARCH:
+HelpArticle.search_vector holds a weighted tsvector (title > summary >
+keywords > content) behind a GIN index. search_articles() ranks matches
+with ts_rank and attaches a highlighted content snippet.
+
+ANALYTICS BUFFER:
+Search terms are counted in the shared cache instead of writing
+PopularSearch rows on the request path. Counts are grouped into one-minute
+buckets using only atomic cache operations (add/incr), so the buffer works
+on Redis and locmem alike:
+
+    help_search:{bucket}:n              number of distinct terms in bucket
+    help_search:{bucket}:slot:{i}       digest of the i-th term
+    help_search:{bucket}:term:{digest}  (term, has_results)
+    help_search:{bucket}:count:{digest} search count
+
+cms.tasks.flush_help_search_analytics drains closed buckets into
+PopularSearch via PopularSearch.record_search_counts(). Bucket keys are
+deleted only after that write commits, so a failed flush is retried with
+its counts intact.
+"""
+
+import hashlib
+import logging
+import time
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .help_models import SEARCH_CONFIG, PopularSearch
+
+logger = logging.getLogger(__name__)
+
+BUCKET_SECONDS = 60
+# Buffered buckets survive this long if the flush task is not running
+BUFFER_TTL = 60 * 60 * 24
+KEY_PREFIX = 'help_search'
+LAST_FLUSHED_KEY = f'{KEY_PREFIX}:last_flushed_bucket'
+FLUSH_LOCK_KEY = f'{KEY_PREFIX}:flush_lock'
+
+HEADLINE_OPTIONS = {
+    'start_sel': '<mark>',
+    'stop_sel': '</mark>',
+    'max_words': 35,
+    'min_words': 15,
+    'max_fragments': 2,
+    'fragment_delimiter': ' ... ',
+}
+
+
+# =============================================================================
+# SEARCH
+# =============================================================================
+
+def search_articles(queryset, text):
+    """
+    Filter a HelpArticle queryset by full-text match and rank it.
+
+    Annotates:
+        rank: ts_rank over the weighted vector
+        snippet: highlighted fragment of the article content
+        highlighted_title: title with matched terms wrapped in <mark>
+    """
+    query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+    return queryset.filter(search_vector=query).annotate(
+        rank=SearchRank(F('search_vector'), query),
+        snippet=SearchHeadline('content', query, config=SEARCH_CONFIG, **HEADLINE_OPTIONS),
+        highlighted_title=SearchHeadline(
+            'title', query, config=SEARCH_CONFIG,
+            start_sel='<mark>', stop_sel='</mark>', highlight_all=True
+        ),
+    ).order_by('-rank', '-view_count')
+
+
+# =============================================================================
+# ANALYTICS BUFFER
+# =============================================================================
+
+def _bucket(now=None):
+    return int((now or time.time()) // BUCKET_SECONDS)
+
+
+def _digest(term):
+    return hashlib.sha1(term.encode('utf-8')).hexdigest()[:16]
+
+
+def record_search_buffered(term, has_results=True):
+    """
+    Count a search term in the cache buffer (no database write).
+
+    Never raises - analytics must not break search.
+    """
+    term = (term or '').strip().lower()[:255]
+    if not term:
+        return
+
+    try:
+        bucket = _bucket()
+        digest = _digest(term)
+        prefix = f'{KEY_PREFIX}:{bucket}'
+        count_key = f'{prefix}:count:{digest}'
+
+        if cache.add(count_key, 1, BUFFER_TTL):
+            # First time this term is seen in the bucket: register it
+            cache.add(f'{prefix}:n', 0, BUFFER_TTL)
+            slot = cache.incr(f'{prefix}:n')
+            cache.set(f'{prefix}:slot:{slot}', digest, BUFFER_TTL)
+        else:
+            cache.incr(count_key)
+
+        # Latest has_results wins, matching PopularSearch.record_search()
+        cache.set(f'{prefix}:term:{digest}', (term, has_results), BUFFER_TTL)
+    except Exception as e:
+        logger.warning(f"Failed to buffer help search term: {e}")
+
+
+def _read_bucket(bucket):
+    """
+    Collect {term: (count, has_results)} for one bucket.
+
+    Returns:
+        (term_counts, keys) - keys to delete once the counts are written
+    """
+    prefix = f'{KEY_PREFIX}:{bucket}'
+    n = cache.get(f'{prefix}:n') or 0
+    if not n:
+        return {}, []
+
+    slot_keys = [f'{prefix}:slot:{i}' for i in range(1, n + 1)]
+    digests = [d for d in cache.get_many(slot_keys).values() if d]
+    term_keys = [f'{prefix}:term:{d}' for d in digests]
+    count_keys = [f'{prefix}:count:{d}' for d in digests]
+    terms = cache.get_many(term_keys)
+    counts = cache.get_many(count_keys)
+
+    term_counts = {}
+    for digest in digests:
+        entry = terms.get(f'{prefix}:term:{digest}')
+        count = counts.get(f'{prefix}:count:{digest}') or 0
+        if entry and count:
+            term, has_results = entry
+            term_counts[term] = (count, has_results)
+
+    return term_counts, slot_keys + term_keys + count_keys + [f'{prefix}:n']
+
+
+def flush_search_buffer():
+    """
+    Drain every closed bucket into PopularSearch.
+
+    The current (still filling) bucket is left alone. Guarded by a cache
+    lock so overlapping task runs cannot double count.
+
+    Returns:
+        dict with buckets flushed and terms written
+    """
+    if not cache.add(FLUSH_LOCK_KEY, 1, 300):
+        return {'status': 'skipped', 'reason': 'flush already running'}
+
+    try:
+        current = _bucket()
+        oldest = current - BUFFER_TTL // BUCKET_SECONDS
+        start = max(cache.get(LAST_FLUSHED_KEY, oldest - 1) + 1, oldest)
+
+        term_counts = {}
+        flushed_keys = []
+        for bucket in range(start, current):
+            bucket_counts, keys = _read_bucket(bucket)
+            flushed_keys.extend(keys)
+            for term, (count, has_results) in bucket_counts.items():
+                prev_count, _ = term_counts.get(term, (0, has_results))
+                term_counts[term] = (prev_count + count, has_results)
+
+        # A failed write leaves the buckets (and LAST_FLUSHED_KEY) for the next run
+        with transaction.atomic():
+            written = PopularSearch.record_search_counts(term_counts)
+        cache.delete_many(flushed_keys)
+        cache.set(LAST_FLUSHED_KEY, current - 1, None)
+        return {'status': 'completed', 'buckets': max(current - start, 0), 'terms': written}
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
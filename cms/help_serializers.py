@@ -75,16 +75,23 @@ class HelpArticleDetailSerializer(serializers.ModelSerializer):
 
 
 class HelpArticleSearchSerializer(serializers.ModelSerializer):
-    """Serializer for search results."""
+    """
+    Serializer for search results.
+    
+    highlighted_title/snippet/rank are annotated by cms.help_search.search_articles().
+    """
     category_name = serializers.CharField(source='category.name', read_only=True)
     category_slug = serializers.CharField(source='category.slug', read_only=True)
+    highlighted_title = serializers.CharField(read_only=True, default='')
+    snippet = serializers.CharField(read_only=True, default='')
+    rank = serializers.FloatField(read_only=True, default=0.0)
     
     class Meta:
         model = HelpArticle
         fields = [
-            'id', 'title', 'slug', 'summary',
+            'id', 'title', 'highlighted_title', 'slug', 'summary', 'snippet',
             'category_name', 'category_slug',
-            'view_count', 'published_at'
+            'view_count', 'published_at', 'rank'
         ]
 
 
@@ -8,10 +8,11 @@ from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from django.db.models import Q, Count
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 
 from .help_models import HelpCategory, HelpArticle, HelpArticleFeedback, PopularSearch
+from .help_search import record_search_buffered, search_articles
 from .help_serializers import (
     HelpCategoryListSerializer,
     HelpCategoryDetailSerializer,
@@ -150,8 +151,13 @@ class HelpSearchView(APIView):
     Search help articles by keyword.
     Public access - no authentication required.
     
+    Uses the weighted full-text index (title > summary > keywords > content);
+    results are ranked by relevance and include a highlighted snippet.
+    Search terms are counted in a cache buffer (flushed periodically by
+    cms.tasks.flush_help_search_analytics), so no writes happen here.
+    
     Query Parameters:
-    - q: Search query (required)
+    - q: Search query (required; supports "quoted phrases", or, -exclude)
     - category: Filter by category slug
     - limit: Maximum results (default: 20)
     """
@@ -172,15 +178,9 @@ class HelpSearchView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Build search query
         queryset = HelpArticle.objects.filter(
             status='published',
             is_deleted=False
-        ).filter(
-            Q(title__icontains=query) |
-            Q(summary__icontains=query) |
-            Q(content__icontains=query) |
-            Q(keywords__icontains=query)
         ).select_related('category')
         
         # Filter by category
@@ -188,18 +188,15 @@ class HelpSearchView(APIView):
         if category:
             queryset = queryset.filter(category__slug=category)
         
-        # Order by relevance (title matches first, then summary, then content)
-        queryset = queryset.annotate(
-            title_match=Count('id', filter=Q(title__icontains=query)),
-            summary_match=Count('id', filter=Q(summary__icontains=query)),
-        ).order_by('-title_match', '-summary_match', '-view_count')
+        # Full-text match, ranked by relevance
+        queryset = search_articles(queryset, query)
         
-        # Limit results
+        # Limit results (evaluated once)
         limit = min(int(request.query_params.get('limit', 20)), 50)
-        results = queryset[:limit]
+        results = list(queryset[:limit])
         
-        # Record search for analytics
-        PopularSearch.record_search(query, has_results=results.exists())
+        # Record search for analytics (cache buffer, no DB write)
+        record_search_buffered(query, has_results=bool(results))
         
         serializer = HelpArticleSearchSerializer(results, many=True)
         
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.10 on 2026-10-18 10:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cms", "0002_add_help_files_system"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="helparticle",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="helparticle",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="cms_help_article_search_gin"
+            ),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE cms_help_article SET search_vector =
+                    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                    setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+                    setweight(to_tsvector('english', coalesce(keywords, '')), 'C') ||
+                    setweight(to_tsvector('english', coalesce(content, '')), 'D');
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,28 @@
+"""
+CMS Celery tasks for YEA Poultry Management System.
+
+Background tasks for the help center.
+"""
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def flush_help_search_analytics():
+    """
+    Flush buffered help-center search terms into PopularSearch.
+    
+    Scheduled via Celery Beat every 5 minutes. HelpSearchView only counts
+    terms in the cache (see cms.help_search), keeping search write-free.
+    """
+    from cms.help_search import flush_search_buffer
+    
+    try:
+        result = flush_search_buffer()
+        logger.info(f"Help search analytics flush: {result}")
+        return result
+    except Exception as exc:
+        logger.error(f"Failed to flush help search analytics: {exc}")
+        return {'status': 'error', 'error': str(exc)}
@@ -3,7 +3,6 @@ Custom admin dashboard view with real-time statistics.
 """
 from django.contrib.admin.views.decorators import staff_member_required
 from django.shortcuts import render
-from django.db.models import Sum, Count, Avg, Q
 from django.utils import timezone
 from datetime import timedelta
 from decimal import Decimal
@@ -17,6 +16,8 @@ from procurement.models import (
 )
 from django.conf import settings
 
+from core.kpi import aggregate_kpis, avg_days_between, count_if, percentage, sum_if
+
 
 @staff_member_required
 def admin_dashboard(request):
@@ -24,109 +25,54 @@ def admin_dashboard(request):
     Custom admin dashboard with comprehensive statistics.
     """
     
-    # Farm Statistics
-    total_farms = Farm.objects.count()
-    approved_farms = Farm.objects.filter(
-        application_status='Approved - Farm ID Assigned'
-    ).count()
-    pending_farms = Farm.objects.filter(
-        application_status__in=['Under Review', 'Pending National Approval']
-    ).count()
-    
-    approval_rate = 0
-    if total_farms > 0:
-        approval_rate = round((approved_farms / total_farms) * 100, 1)
-    
-    # Order Statistics
-    total_orders = ProcurementOrder.objects.count()
-    active_orders = ProcurementOrder.objects.filter(
-        status__in=['published', 'assigned', 'in_progress', 'assigning']
-    ).count()
-    completed_orders = ProcurementOrder.objects.filter(
-        status='completed'
-    ).count()
-    
-    completion_rate = 0
-    if total_orders > 0:
-        completion_rate = round((completed_orders / total_orders) * 100, 1)
-    
-    # Delivery Statistics
-    total_deliveries = DeliveryConfirmation.objects.count()
-    pending_deliveries = DeliveryConfirmation.objects.filter(
-        verified_at__isnull=True
-    ).count()
-    
-    # Budget Statistics
-    budget_data = ProcurementOrder.objects.aggregate(
-        total_budget=Sum('total_budget'),
-        total_spent=Sum('total_spent')
+    now = timezone.now()
+    pending_statuses = ['Under Review', 'Pending National Approval']
+    
+    # One aggregate query per source table
+    farms = aggregate_kpis(
+        Farm.objects.all(),
+        total=count_if(),
+        approved=count_if(application_status='Approved - Farm ID Assigned'),
+        pending=count_if(application_status__in=pending_statuses),
     )
-    
-    total_budget = budget_data['total_budget'] or Decimal('0.00')
-    total_spent = budget_data['total_spent'] or Decimal('0.00')
-    
-    budget_utilization = 0
-    if total_budget > 0:
-        budget_utilization = round((total_spent / total_budget) * 100, 1)
-    
-    # Birds Statistics
-    birds_data = ProcurementOrder.objects.aggregate(
-        total_birds=Sum('quantity_needed'),
-        birds_delivered=Sum('quantity_delivered')
+    orders = aggregate_kpis(
+        ProcurementOrder.objects.all(),
+        total=count_if(),
+        active=count_if(status__in=['published', 'assigned', 'in_progress', 'assigning']),
+        completed=count_if(status='completed'),
+        overdue=count_if(
+            delivery_deadline__lt=now.date(),
+            status__in=['published', 'assigned', 'in_progress']
+        ),
+        total_budget=sum_if('total_budget', default=Decimal('0.00')),
+        total_spent=sum_if('total_spent', default=Decimal('0.00')),
+        total_birds=sum_if('quantity_needed'),
+        birds_delivered=sum_if('quantity_delivered'),
     )
-    
-    total_birds = birds_data['total_birds'] or 0
-    birds_delivered = birds_data['birds_delivered'] or 0
-    
-    # Payment Statistics
-    invoice_data = ProcurementInvoice.objects.aggregate(
-        paid_invoices=Count('id', filter=Q(payment_status='paid')),
-        total_paid=Sum('total_amount', filter=Q(payment_status='paid'))
+    deliveries = aggregate_kpis(
+        DeliveryConfirmation.objects.all(),
+        total=count_if(),
+        pending=count_if(verified_at__isnull=True),
+        quality_checks=count_if(quality_passed__isnull=False),
+        quality_passed=count_if(quality_passed=True),
     )
-    
-    paid_invoices = invoice_data['paid_invoices'] or 0
-    total_paid = invoice_data['total_paid'] or Decimal('0.00')
-    
-    # Alerts & Warnings
-    now = timezone.now()
-    overdue_orders = ProcurementOrder.objects.filter(
-        delivery_deadline__lt=now.date(),
-        status__in=['published', 'assigned', 'in_progress']
-    ).count()
-    
-    pending_approvals = Farm.objects.filter(
-        application_status__in=['Under Review', 'Pending National Approval']
-    ).count()
-    
-    # Performance Metrics
-    completed_assignments = OrderAssignment.objects.filter(
-        status='paid',
-        assigned_at__isnull=False,
-        payment_processed_at__isnull=False
+    invoices = aggregate_kpis(
+        ProcurementInvoice.objects.all(),
+        paid_invoices=count_if(payment_status='paid'),
+        total_paid=sum_if('total_amount', payment_status='paid', default=Decimal('0.00')),
     )
     
-    avg_fulfillment_days = 0
-    if completed_assignments.exists():
-        total_days = 0
-        count = 0
-        for assignment in completed_assignments:
-            if assignment.assigned_at and assignment.payment_processed_at:
-                delta = assignment.payment_processed_at - assignment.assigned_at
-                total_days += delta.days
-                count += 1
-        if count > 0:
-            avg_fulfillment_days = round(total_days / count, 1)
-    
-    # Quality Pass Rate
-    deliveries_with_quality = DeliveryConfirmation.objects.filter(
-        quality_passed__isnull=False
+    # Performance Metrics
+    fulfillment = aggregate_kpis(
+        OrderAssignment.objects.filter(status='paid'),
+        avg_days=avg_days_between('assigned_at', 'payment_processed_at'),
     )
-    quality_passed_count = deliveries_with_quality.filter(quality_passed=True).count()
-    total_quality_checks = deliveries_with_quality.count()
+    avg_fulfillment_days = fulfillment['avg_days'] or 0
     
-    quality_pass_rate = 0
-    if total_quality_checks > 0:
-        quality_pass_rate = round((quality_passed_count / total_quality_checks) * 100, 1)
+    approval_rate = percentage(farms['approved'], farms['total'], digits=1)
+    completion_rate = percentage(orders['completed'], orders['total'], digits=1)
+    budget_utilization = percentage(orders['total_spent'], orders['total_budget'], digits=1)
+    quality_pass_rate = percentage(deliveries['quality_passed'], deliveries['quality_checks'], digits=1)
     
     # Recent Activities
     recent_activities = []
@@ -182,37 +128,37 @@ def admin_dashboard(request):
     
     context = {
         # Farm stats
-        'total_farms': total_farms,
-        'approved_farms': approved_farms,
-        'pending_farms': pending_farms,
+        'total_farms': farms['total'],
+        'approved_farms': farms['approved'],
+        'pending_farms': farms['pending'],
         'approval_rate': approval_rate,
         
         # Order stats
-        'total_orders': total_orders,
-        'active_orders': active_orders,
-        'completed_orders': completed_orders,
+        'total_orders': orders['total'],
+        'active_orders': orders['active'],
+        'completed_orders': orders['completed'],
         'completion_rate': completion_rate,
         
         # Delivery stats
-        'total_deliveries': total_deliveries,
-        'pending_deliveries': pending_deliveries,
+        'total_deliveries': deliveries['total'],
+        'pending_deliveries': deliveries['pending'],
         
         # Budget stats
-        'total_budget': total_budget,
-        'total_spent': total_spent,
+        'total_budget': orders['total_budget'],
+        'total_spent': orders['total_spent'],
         'budget_utilization': budget_utilization,
         
         # Birds stats
-        'total_birds': total_birds,
-        'birds_delivered': birds_delivered,
+        'total_birds': orders['total_birds'],
+        'birds_delivered': orders['birds_delivered'],
         
         # Payment stats
-        'paid_invoices': paid_invoices,
-        'total_paid': total_paid,
+        'paid_invoices': invoices['paid_invoices'],
+        'total_paid': invoices['total_paid'],
         
         # Alerts
-        'overdue_orders': overdue_orders,
-        'pending_approvals': pending_approvals,
+        'overdue_orders': orders['overdue'],
+        'pending_approvals': farms['pending'],
         
         # Performance
         'avg_fulfillment_days': avg_fulfillment_days,
@@ -0,0 +1,400 @@
+"""
+Shared caching primitives for YEA Poultry Management System.
+
+Provides a stampede-protected read-through cache for expensive, shared,
+non-personalized responses (public marketplace, dashboards):
+
+1. Soft TTL / hard TTL: once the soft TTL passes the entry is *stale* but
+   is still served while a single worker recomputes it.
+2. Per-key compute lock (core.locks) so only one worker recomputes a key;
+   concurrent requests serve the stale value or, on a cold miss, block
+   until the holder releases the lock and then read its result.
+3. Tag versions for invalidation: an entry records the version of each
+   dependency tag at compute time; bump_cache_tags() marks every entry
+   carrying that tag stale without deleting it.
+4. Optional background refresh: the request that wins the compute lock on
+   a stale entry returns the stale value immediately and recomputes on a
+   background thread instead of paying for the recompute itself.
+
+Values are stored in an envelope, so None, 0 and empty collections are
+cached and served like any other value.
+
+Entries invalidated by a tag bump that nobody reads again are removed by
+purge_stale_entries() (a Redis SCAN over the given key patterns, run by
+core.tasks.purge_stale_cache) instead of lingering until their hard TTL.
+
+Usage:
+    from core.cache_utils import cached_with_stale, bump_cache_tags
+
+    data = cached_with_stale(
+        'public_marketplace:home',
+        compute=build_home_payload,
+        ttl=300,
+        stale_ttl=3600,
+        tags=['public_marketplace'],
+    )
+
+    # In a signal handler after a write:
+    bump_cache_tags('public_marketplace')
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from django.core.cache import cache
+from django.db import connection, connections
+
+from core.locks import DistributedLock, LockNotAcquired
+from core.query_instrumentation import count_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+TAG_KEY_PREFIX = 'cachetag'
+LOCK_KEY_SUFFIX = 'compute_lock'
+
+# How long a cold-miss request waits for another worker's compute
+DEFAULT_WAIT_SECONDS = 5.0
+
+# Lookup outcomes reported to ``on_lookup`` callbacks
+LOOKUP_HIT = 'hit'        # fresh value served
+LOOKUP_STALE = 'stale'    # stale value served (refresh running elsewhere or in background)
+LOOKUP_MISS = 'miss'      # no usable value, computed (or waited for) by this request
+
+
+def _tag_key(tag: str) -> str:
+    return f'{TAG_KEY_PREFIX}:{tag}'
+
+
+def get_cache_tag_versions(tags: Iterable[str]) -> Dict[str, int]:
+    """Current version of each tag (0 if never bumped), in one cache round trip."""
+    tags = list(tags)
+    if not tags:
+        return {}
+    stored = cache.get_many([_tag_key(tag) for tag in tags])
+    return {tag: stored.get(_tag_key(tag), 0) for tag in tags}
+
+
+def bump_cache_tags(*tags: str) -> None:
+    """
+    Invalidate every cached entry that depends on any of the given tags.
+
+    Entries are not deleted: they become stale, so the next reader serves
+    the old value while one worker recomputes it.
+    """
+    for tag in tags:
+        key = _tag_key(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Tag never bumped before - start the counter (no expiry)
+            if not cache.add(key, 1, timeout=None):
+                cache.incr(key)
+    if tags:
+        logger.debug(f"Bumped cache tags: {', '.join(tags)}")
+
+
+class _ComputeLock(DistributedLock):
+    """The per-key compute lock, stored at ``<key>:compute_lock``."""
+
+    fenced = False
+
+    def __init__(self, key: str, timeout: int):
+        super().__init__(key, ttl_seconds=timeout, wait=False)
+        self.key = f'{key}:{LOCK_KEY_SUFFIX}'
+
+
+def _acquire_compute_lock(key: str, timeout: int) -> Optional[_ComputeLock]:
+    lock = _ComputeLock(key, timeout)
+    try:
+        lock.acquire()
+    except LockNotAcquired:
+        return None
+    return lock
+
+
+def _wait_for_compute(key, tag_versions, lock_timeout, wait_seconds):
+    """
+    Cold miss while another worker holds the compute lock: block until it
+    releases (no polling), then use its result if it is fresh for
+    ``tag_versions``, or take the lock over if it stored nothing usable.
+
+    Returns (envelope, lock); both are None if ``wait_seconds`` ran out.
+    """
+    waiter = _ComputeLock(key, lock_timeout)
+    deadline = time.monotonic() + wait_seconds
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None, None
+        waiter.wait_for_release(remaining)
+        envelope = cache.get(key)
+        if envelope is not None and _is_fresh(envelope, tag_versions):
+            waiter.wake_next_waiter()
+            return envelope, None
+        lock = _acquire_compute_lock(key, lock_timeout)
+        if lock is not None:
+            return None, lock
+
+
+def _store(key: str, value: Any, ttl: int, stale_ttl: int, tag_versions: Dict[str, int]) -> None:
+    envelope = {
+        'value': value,
+        'fresh_until': time.time() + ttl,
+        'stored_at': time.time(),
+        'tags': tag_versions,
+    }
+    cache.set(key, envelope, timeout=ttl + stale_ttl)
+
+
+def set_cached(
+    key: str,
+    value: Any,
+    ttl: int,
+    stale_ttl: Optional[int] = None,
+    tags: Iterable[str] = (),
+) -> None:
+    """
+    Store a value readable by cached_with_stale() (e.g. from a warm-up task).
+    """
+    stale_ttl = ttl if stale_ttl is None else stale_ttl
+    _store(key, value, ttl, stale_ttl, get_cache_tag_versions(tags))
+
+
+def _notify(on_lookup: Optional[Callable[[str], None]], outcome: str) -> None:
+    count_cache_lookup(outcome)
+    if on_lookup is None:
+        return
+    try:
+        on_lookup(outcome)
+    except Exception:
+        logger.debug("Cache lookup callback failed", exc_info=True)
+
+
+def _refresh(key, compute, ttl, stale_ttl, tag_versions, lock) -> None:
+    """Recompute and store ``key``; always releases the compute lock."""
+    try:
+        _store(key, compute(), ttl, stale_ttl, tag_versions)
+    except Exception:
+        logger.exception(f"Background cache refresh failed for {key}, keeping stale value")
+    finally:
+        lock.release()
+
+
+def _refresh_in_background(key, compute, ttl, stale_ttl, tag_versions, lock) -> None:
+    def run():
+        try:
+            _refresh(key, compute, ttl, stale_ttl, tag_versions, lock)
+        finally:
+            # This thread opened its own DB connections; don't leak them
+            connections.close_all()
+
+    threading.Thread(target=run, name=f'cache-refresh:{key}', daemon=True).start()
+
+
+def _is_fresh(envelope: dict, tag_versions: Dict[str, int]) -> bool:
+    return envelope['fresh_until'] > time.time() and envelope.get('tags', {}) == tag_versions
+
+
+def cached_with_stale(
+    key: str,
+    compute: Callable[[], Any],
+    ttl: int,
+    stale_ttl: Optional[int] = None,
+    tags: Iterable[str] = (),
+    lock_timeout: int = 60,
+    wait_seconds: float = DEFAULT_WAIT_SECONDS,
+    background: bool = False,
+    on_lookup: Optional[Callable[[str], None]] = None,
+) -> Any:
+    """
+    Return the cached value for ``key``, computing it at most once at a time.
+
+    Args:
+        key: Cache key
+        compute: Zero-argument callable producing the value. Any value,
+            including None and empty collections, is cached.
+        ttl: Seconds the value is fresh (soft TTL)
+        stale_ttl: Extra seconds a stale value may be served while it is
+            recomputed (hard TTL = ttl + stale_ttl). Defaults to ttl.
+        tags: Dependency tags; bumping any of them marks the entry stale
+        lock_timeout: Seconds before an abandoned compute lock expires
+        wait_seconds: On a cold miss, how long to wait for another worker
+            that holds the compute lock before computing anyway
+        background: Refresh stale entries on a background thread and return
+            the stale value at once. Ignored inside a transaction, where a
+            new connection would not see the caller's uncommitted writes.
+        on_lookup: Called with LOOKUP_HIT, LOOKUP_STALE or LOOKUP_MISS
+            (for hit-rate metrics). Outcomes are also counted by the
+            request profiler (core.query_instrumentation) when it is on.
+    """
+    stale_ttl = ttl if stale_ttl is None else stale_ttl
+    tag_versions = get_cache_tag_versions(tags)
+    envelope = cache.get(key)
+
+    if envelope is not None and _is_fresh(envelope, tag_versions):
+        _notify(on_lookup, LOOKUP_HIT)
+        return envelope['value']
+
+    lock = _acquire_compute_lock(key, lock_timeout)
+
+    if lock is None:
+        if envelope is not None:
+            # Someone else is refreshing - serve stale
+            _notify(on_lookup, LOOKUP_STALE)
+            return envelope['value']
+
+        # Cold miss while another worker computes: wait for its result
+        _notify(on_lookup, LOOKUP_MISS)
+        envelope, lock = _wait_for_compute(key, tag_versions, lock_timeout, wait_seconds)
+        if envelope is not None:
+            return envelope['value']
+        if lock is None:
+            logger.warning(f"Timed out waiting for cache compute of {key}, computing locally")
+            return compute()
+    elif envelope is not None and background and not connection.in_atomic_block:
+        _notify(on_lookup, LOOKUP_STALE)
+        _refresh_in_background(key, compute, ttl, stale_ttl, tag_versions, lock)
+        return envelope['value']
+    else:
+        _notify(on_lookup, LOOKUP_MISS)
+
+    try:
+        value = compute()
+        _store(key, value, ttl, stale_ttl, tag_versions)
+        return value
+    except Exception:
+        if envelope is not None:
+            logger.exception(f"Cache recompute failed for {key}, serving stale value")
+            return envelope['value']
+        raise
+    finally:
+        lock.release()
+
+
+def cached_fresh_only(
+    key: str,
+    compute: Callable[[], Any],
+    ttl: int,
+    tags: Iterable[str] = (),
+    on_lookup: Optional[Callable[[str], None]] = None,
+) -> Any:
+    """
+    Read-through cache that never serves a stale value.
+
+    For small per-user entries that must stop being served as soon as a tag
+    is bumped (authentication principals): the entry and its tag versions
+    are read in one cache round trip, and a miss is computed by the calling
+    request without a compute lock. Tag versions are read before computing,
+    so a bump racing the compute leaves the stored entry already stale.
+    """
+    tags = list(tags)
+    tag_keys = [_tag_key(tag) for tag in tags]
+    stored = cache.get_many([key] + tag_keys)
+    tag_versions = {tag: stored.get(tag_key, 0) for tag, tag_key in zip(tags, tag_keys)}
+
+    envelope = stored.get(key)
+    if envelope is not None and _is_fresh(envelope, tag_versions):
+        _notify(on_lookup, LOOKUP_HIT)
+        return envelope['value']
+
+    _notify(on_lookup, LOOKUP_MISS)
+    value = compute()
+    _store(key, value, ttl, 0, tag_versions)
+    return value
+
+
+# =============================================================================
+# KEY SCANS / PURGE
+# =============================================================================
+
+def iter_cache_keys(pattern: str, batch_size: int = 500) -> Iterator[str]:
+    """
+    Yield cache keys (without the backend's key prefix) matching a glob
+    pattern, using SCAN so Redis is never blocked.
+
+    Raises:
+        NotImplementedError: the cache backend cannot enumerate keys
+    """
+    if hasattr(cache, 'iter_keys'):
+        # django-redis backend
+        yield from cache.iter_keys(pattern, itersize=batch_size)
+        return
+
+    get_client = getattr(getattr(cache, '_cache', None), 'get_client', None)
+    if get_client is None:
+        raise NotImplementedError(f"{type(cache).__name__} does not support key scans")
+
+    # django.core.cache.backends.redis.RedisCache
+    prefix_length = len(cache.make_key(''))
+    client = get_client(None, write=False)
+    for raw_key in client.scan_iter(match=cache.make_key(pattern), count=batch_size):
+        if isinstance(raw_key, bytes):
+            raw_key = raw_key.decode()
+        yield raw_key[prefix_length:]
+
+
+def _batches(iterable: Iterable[str], size: int) -> Iterator[List[str]]:
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def delete_cache_pattern(pattern: str, batch_size: int = 500) -> int:
+    """Delete every key matching ``pattern``. Returns the number of keys deleted."""
+    deleted = 0
+    for batch in _batches(iter_cache_keys(pattern, batch_size), batch_size):
+        cache.delete_many(batch)
+        deleted += len(batch)
+    return deleted
+
+
+def purge_stale_entries(
+    patterns: Iterable[str],
+    min_age: int = 3600,
+    batch_size: int = 500,
+) -> Dict[str, int]:
+    """
+    Delete cached_with_stale() entries that a tag bump has invalidated.
+
+    Invalidated entries are normally refreshed by their next reader; the
+    ones still invalidated ``min_age`` seconds after they were stored are
+    not being read and would only occupy memory until their hard TTL.
+
+    Args:
+        patterns: Glob patterns of the keys to scan
+        min_age: Only purge entries stored at least this many seconds ago
+        batch_size: Keys fetched (MGET) and deleted per round trip
+
+    Returns:
+        dict with keys scanned and purged
+    """
+    scanned = purged = 0
+    cutoff = time.time() - min_age
+
+    for pattern in patterns:
+        for batch in _batches(iter_cache_keys(pattern, batch_size), batch_size):
+            scanned += len(batch)
+            envelopes = {
+                key: value for key, value in cache.get_many(batch).items()
+                if isinstance(value, dict) and 'fresh_until' in value and 'value' in value
+            }
+            tags = {tag for envelope in envelopes.values() for tag in envelope.get('tags', {})}
+            current = get_cache_tag_versions(tags)
+
+            stale = [
+                key for key, envelope in envelopes.items()
+                if envelope.get('stored_at', 0) < cutoff
+                and any(current[tag] != version for tag, version in envelope.get('tags', {}).items())
+            ]
+            if stale:
+                cache.delete_many(stale)
+                purged += len(stale)
+
+    return {'scanned': scanned, 'purged': purged}
@@ -88,6 +88,24 @@ app.conf.beat_schedule = {
         'schedule': crontab(hour='*/4', minute=15),
     },
     
+    # Nightly fraud sweep over all farms (run at 3:15 AM)
+    'run-fraud-detection': {
+        'task': 'sales_revenue.tasks.run_fraud_detection',
+        'schedule': crontab(hour=3, minute=15),
+    },
+    
+    # Write off expired inventory batches (run at 12:30 AM, after the date changes)
+    'sweep-expired-inventory': {
+        'task': 'sales_revenue.tasks.sweep_expired_inventory',
+        'schedule': crontab(hour=0, minute=30),
+    },
+    
+    # Release expired guest order stock holds (run every 5 minutes)
+    'release-expired-stock-holds': {
+        'task': 'sales_revenue.tasks.release_expired_stock_holds',
+        'schedule': crontab(minute='*/5'),
+    },
+    
     # ==========================================================================
     # SUBSCRIPTION PAYMENTS (MoMo via Paystack)
     # ==========================================================================
@@ -172,6 +190,16 @@ app.conf.beat_schedule = {
         'schedule': crontab(hour=5, minute=0, day_of_week=0),
     },
     
+    # ==========================================================================
+    # CMS / HELP CENTER
+    # ==========================================================================
+    
+    # Flush buffered help search analytics (run every 5 minutes)
+    'flush-help-search-analytics': {
+        'task': 'cms.tasks.flush_help_search_analytics',
+        'schedule': crontab(minute='*/5'),
+    },
+    
     # ==========================================================================
     # ACCOUNTS & SECURITY (Regular intervals)
     # ==========================================================================
@@ -215,6 +243,18 @@ app.conf.beat_schedule = {
         'task': 'core.tasks.backup_critical_data',
         'schedule': crontab(hour=5, minute=0),
     },
+    
+    # Purge invalidated cache entries (run every hour)
+    'purge-stale-cache': {
+        'task': 'core.tasks.purge_stale_cache',
+        'schedule': crontab(minute=50),
+    },
+    
+    # Purge expired idempotency keys (run every hour)
+    'purge-expired-idempotency-keys': {
+        'task': 'core.tasks.purge_expired_idempotency_keys',
+        'schedule': crontab(minute=40),
+    },
 }
 
 # Celery configuration
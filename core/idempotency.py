@@ -0,0 +1,283 @@
+"""
+Shared idempotency store for YEA Poultry Management System.
+
+Remembers the outcome of a mutating operation under (operation, key), so a
+retried or concurrent duplicate request gets the first request's result
+instead of doing the work twice:
+
+1. claim() takes the key with cache.add (SET NX in Redis) before any
+   database work. Only one request holds a claim; a concurrent duplicate
+   gets the stored response if there is one, else IdempotencyInProgress
+   straight away (no sleeping and re-checking).
+2. A completed operation stores a compact response (ids and scalars, see
+   compact_response) in the cache for its TTL and in the IdempotencyKey
+   table (procurement.models) as a durable fallback, so a cache eviction
+   or restart does not forget it. Lookups read the cache first and only
+   fall back to the table on a miss.
+3. A failed operation (or one that stores nothing) drops its claim, so
+   the request can be retried at once.
+4. Expired rows are deleted in chunks through the expires_at index by
+   purge_expired_keys() (core.tasks.purge_expired_idempotency_keys);
+   cache entries expire on their own.
+
+Operations that keep their own durable record (e.g. guest orders and
+their content hash) only need the in-flight half: guard() holds the claim
+for a block and stores nothing.
+
+Usage:
+    from core.idempotency import claim
+
+    with claim('create_and_assign_order', key, ttl=86400) as op:
+        if op.replayed:
+            return load_result(op.response)
+        order = create_order(...)
+        op.complete({'order_id': order.id}, resource_type='ProcurementOrder')
+"""
+
+import hashlib
+import logging
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'idem'
+
+# How long a stored response is replayed
+DEFAULT_TTL = 86400
+# How long an unfinished claim blocks duplicates if its worker dies
+DEFAULT_CLAIM_TTL = 60
+# Expired rows deleted per statement by purge_expired_keys()
+PURGE_CHUNK_SIZE = 1000
+
+# IdempotencyKey.key max_length
+_MAX_DB_KEY_LENGTH = 255
+
+
+class IdempotencyInProgress(Exception):
+    """Raised when another request currently holds the claim on a key."""
+    pass
+
+
+def _db_key(operation: str, key: str) -> str:
+    db_key = f'{operation}:{key}'
+    if len(db_key) > _MAX_DB_KEY_LENGTH:
+        db_key = f'{operation}:{hashlib.sha256(key.encode()).hexdigest()}'
+    return db_key
+
+
+def _response_key(operation: str, key: str) -> str:
+    return f'{KEY_PREFIX}:{_db_key(operation, key)}'
+
+
+def _claim_key(operation: str, key: str) -> str:
+    return f'{KEY_PREFIX}:claim:{_db_key(operation, key)}'
+
+
+def compact_response(value: Any) -> Any:
+    """
+    Reduce a result to what a replay needs: model instances become
+    {'id', 'type'}, Decimals and UUIDs become strings.
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    if isinstance(value, dict):
+        return {str(k): compact_response(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [compact_response(v) for v in value]
+    if hasattr(value, 'pk'):
+        return {'id': str(value.pk), 'type': value.__class__.__name__}
+    return str(value)
+
+
+def get_response(operation: str, key: str) -> Optional[Any]:
+    """Stored response for a completed operation, or None (cache, then database)."""
+    from procurement.models import IdempotencyKey
+
+    cached = cache.get(_response_key(operation, key))
+    if cached is not None:
+        return cached['response']
+
+    record = IdempotencyKey.objects.filter(
+        key=_db_key(operation, key), status='completed', expires_at__gt=timezone.now()
+    ).values('response_data', 'expires_at').first()
+    if record is None:
+        return None
+
+    # Warm the cache for the rest of the record's lifetime
+    remaining = int((record['expires_at'] - timezone.now()).total_seconds())
+    if remaining > 0:
+        cache.set(_response_key(operation, key), {'response': record['response_data']}, remaining)
+    return record['response_data']
+
+
+def store_response(operation: str, key: str, response: Any, ttl: int = DEFAULT_TTL,
+                   resource_type: str = '', resource_id=None, user_id=None) -> Any:
+    """
+    Record a completed operation's response.
+
+    The row is written in the caller's transaction; the cache entry is set
+    once it commits, so a rolled-back operation is never replayed.
+
+    Returns:
+        The compacted response as stored
+    """
+    from procurement.models import IdempotencyKey
+
+    response = compact_response(response)
+    now = timezone.now()
+    IdempotencyKey.objects.update_or_create(
+        key=_db_key(operation, key),
+        defaults={
+            'operation': operation,
+            'resource_type': resource_type,
+            'resource_id': str(resource_id) if resource_id is not None else None,
+            'user_id': user_id,
+            'status': 'completed',
+            'response_data': response,
+            'completed_at': now,
+            'expires_at': now + timedelta(seconds=ttl),
+        }
+    )
+    transaction.on_commit(
+        lambda: cache.set(_response_key(operation, key), {'response': response}, ttl)
+    )
+    return response
+
+
+class IdempotencyClaim:
+    """
+    A request's claim on (operation, key), returned by claim().
+
+    ``replayed`` is True when the operation already completed; ``response``
+    then holds its stored response and nothing should be done. Otherwise
+    the holder does the work and calls complete(). Leaving the ``with``
+    block without completing releases the claim.
+    """
+
+    def __init__(self, operation: str, key: str, ttl: int, token: Optional[str] = None,
+                 response: Any = None, replayed: bool = False):
+        self.operation = operation
+        self.key = key
+        self.ttl = ttl
+        self.token = token
+        self.response = response
+        self.replayed = replayed
+        self.completed = False
+
+    def complete(self, response: Any, **meta) -> Any:
+        """Store the response (see store_response) and hand the key over to it."""
+        self.response = store_response(self.operation, self.key, response, self.ttl, **meta)
+        self.completed = True
+        # Keep duplicates out until the response is visible in the cache
+        transaction.on_commit(self.release)
+        return self.response
+
+    def release(self) -> None:
+        """Drop the claim if this request still holds it."""
+        if self.token is None:
+            return
+        claim_key = _claim_key(self.operation, self.key)
+        if cache.get(claim_key) == self.token:
+            cache.delete(claim_key)
+        self.token = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None or not self.completed:
+            self.release()
+        return False
+
+
+def claim(operation: str, key: str, ttl: int = DEFAULT_TTL,
+          claim_ttl: int = DEFAULT_CLAIM_TTL) -> IdempotencyClaim:
+    """
+    Claim (operation, key) for this request.
+
+    Args:
+        operation: Operation name, namespaces the key
+        key: Client-supplied or derived idempotency key
+        ttl: How long the completed response is replayed (seconds)
+        claim_ttl: How long the claim outlives a worker that dies holding it
+
+    Returns:
+        IdempotencyClaim (``replayed`` if the operation already completed)
+
+    Raises:
+        IdempotencyInProgress: Another request holds the claim
+    """
+    cached = cache.get(_response_key(operation, key))
+    if cached is not None:
+        logger.info(f"Idempotent cache hit for {operation}: {key[:16]}...")
+        return IdempotencyClaim(operation, key, ttl, response=cached['response'], replayed=True)
+
+    token = str(uuid.uuid4())
+    if not cache.add(_claim_key(operation, key), token, claim_ttl):
+        # The holder may have completed since the first look
+        cached = cache.get(_response_key(operation, key))
+        if cached is not None:
+            return IdempotencyClaim(operation, key, ttl, response=cached['response'], replayed=True)
+        raise IdempotencyInProgress(f"Operation {operation} is already in progress")
+
+    # Only the claim holder pays for the database fallback
+    held = IdempotencyClaim(operation, key, ttl, token=token)
+    response = get_response(operation, key)
+    if response is not None:
+        logger.info(f"Idempotent DB hit for {operation}: {key[:16]}...")
+        held.release()
+        return IdempotencyClaim(operation, key, ttl, response=response, replayed=True)
+    return held
+
+
+@contextmanager
+def guard(operation: str, key: str, claim_ttl: int = DEFAULT_CLAIM_TTL):
+    """
+    Hold the claim on (operation, key) for the block; nothing is stored.
+
+    Raises:
+        IdempotencyInProgress: Another request holds the claim
+    """
+    token = str(uuid.uuid4())
+    if not cache.add(_claim_key(operation, key), token, claim_ttl):
+        raise IdempotencyInProgress(f"Operation {operation} is already in progress")
+    held = IdempotencyClaim(operation, key, ttl=0, token=token)
+    try:
+        yield held
+    finally:
+        held.release()
+
+
+def purge_expired_keys(now=None, chunk_size: int = PURGE_CHUNK_SIZE) -> int:
+    """
+    Delete expired idempotency records, chunk_size rows per statement.
+
+    Returns:
+        Number of rows deleted
+    """
+    from procurement.models import IdempotencyKey
+
+    now = now or timezone.now()
+    deleted = 0
+    while True:
+        ids = list(
+            IdempotencyKey.objects.filter(expires_at__lt=now)
+            .values_list('id', flat=True)[:chunk_size]
+        )
+        if not ids:
+            break
+        count, _ = IdempotencyKey.objects.filter(id__in=ids).delete()
+        deleted += count
+        if len(ids) < chunk_size:
+            break
+    return deleted
@@ -0,0 +1,143 @@
+"""
+KPI aggregation helpers for YEA Poultry Management System.
+
+Dashboards report many counts and totals over the same table ("total
+farms", "approved farms", "pending farms", ...). Issuing one
+``.filter(...).count()`` per number costs a round trip each; these helpers
+declare the numbers as filtered aggregates so a whole widget is computed
+by a single ``aggregate()`` (or, for a list page, a single grouped query).
+
+Usage:
+    from core.kpi import aggregate_kpis, avg_days_between, count_if, sum_if
+
+    stats = aggregate_kpis(
+        Farm.objects.all(),
+        total=count_if(),
+        approved=count_if(application_status='Approved - Farm ID Assigned'),
+        pending=count_if(application_status__in=PENDING_STATUSES),
+        birds=sum_if('current_bird_count'),
+        avg_review_days=avg_days_between('submitted_at', 'approval_date'),
+    )
+
+    per_batch = grouped_kpis(
+        BatchEnrollmentApplication.objects.filter(batch__in=page),
+        'batch_id',
+        total=count_if(),
+        approved=count_if(status='approved'),
+    )
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, Dict, Hashable, Iterable, Union
+
+from django.db.models import (
+    Avg,
+    Count,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    Q,
+    QuerySet,
+    Sum,
+)
+
+SECONDS_PER_DAY = 86400
+
+
+def _condition(conditions, lookups) -> Union[Q, None]:
+    if not conditions and not lookups:
+        return None
+    return Q(*conditions, **lookups)
+
+
+def count_if(*conditions: Q, distinct: bool = False, **lookups) -> Count:
+    """Number of rows matching the conditions (all rows if none are given)."""
+    return Count('pk', filter=_condition(conditions, lookups), distinct=distinct)
+
+
+def sum_if(field: str, *conditions: Q, default: Any = 0, **lookups) -> Sum:
+    """Sum of ``field`` over matching rows; ``default`` when nothing matches."""
+    return Sum(field, filter=_condition(conditions, lookups), default=default)
+
+
+def avg_if(field: str, *conditions: Q, **lookups) -> Avg:
+    """Average of ``field`` over matching rows (None when nothing matches)."""
+    return Avg(field, filter=_condition(conditions, lookups))
+
+
+def avg_days_between(start: str, end: str, *conditions: Q, **lookups) -> Avg:
+    """
+    Average of ``end - start`` over matching rows where both are set.
+
+    aggregate_kpis() converts the resulting duration to days.
+    """
+    return Avg(
+        ExpressionWrapper(F(end) - F(start), output_field=DurationField()),
+        filter=Q(
+            _condition(conditions, lookups) or Q(),
+            **{f'{start}__isnull': False, f'{end}__isnull': False},
+        ),
+    )
+
+
+def _to_days(value: Any) -> Any:
+    if isinstance(value, timedelta):
+        return round(value.total_seconds() / SECONDS_PER_DAY, 1)
+    return value
+
+
+def aggregate_kpis(queryset: QuerySet, **kpis) -> Dict[str, Any]:
+    """
+    Evaluate all KPIs over ``queryset`` in one query.
+
+    Durations (from avg_days_between) are returned as days, rounded to one
+    decimal place.
+    """
+    return {name: _to_days(value) for name, value in queryset.aggregate(**kpis).items()}
+
+
+def grouped_kpis(
+    queryset: QuerySet,
+    group_by: Union[str, Iterable[str]],
+    **kpis,
+) -> Dict[Hashable, Dict[str, Any]]:
+    """
+    Evaluate all KPIs per group in one GROUP BY query.
+
+    Args:
+        queryset: Rows to aggregate
+        group_by: Field (or fields) to group on; with several fields the
+            result is keyed by a tuple of their values
+        **kpis: Named aggregates (count_if, sum_if, ...)
+
+    Returns:
+        {group value: {kpi name: value}}. Groups without rows are absent,
+        use empty_kpis() for their defaults.
+    """
+    fields = [group_by] if isinstance(group_by, str) else list(group_by)
+    rows = queryset.order_by().values(*fields).annotate(**kpis)
+
+    results = {}
+    for row in rows:
+        key = row[fields[0]] if len(fields) == 1 else tuple(row[f] for f in fields)
+        results[key] = {name: _to_days(row[name]) for name in kpis}
+    return results
+
+
+def empty_kpis(**kpis) -> Dict[str, Any]:
+    """The values aggregate_kpis() returns for KPIs over no rows."""
+    empty = {}
+    for name, aggregate in kpis.items():
+        if isinstance(aggregate, Count):
+            empty[name] = 0
+        else:
+            empty[name] = getattr(aggregate, 'default', None)
+    return empty
+
+
+def percentage(part: Union[int, float, Decimal], whole: Union[int, float, Decimal], digits: int = 2) -> float:
+    """``part`` as a percentage of ``whole`` (0 when ``whole`` is 0)."""
+    if not whole:
+        return 0
+    return round(float(part) / float(whole) * 100, digits)
@@ -0,0 +1,826 @@
+"""
+Synthetic load data for capacity testing.
+
+Generates a national-scale dataset (farms spread over the regions, flocks
+cycling through their houses, daily production, egg inventory with FIFO
+batches and stock movements, partner offer interactions) fast enough for
+multi-year volumes:
+
+1. Rows are simulated per farm from a random generator seeded with
+   (seed, farm number), so a farm's data - primary keys included - is the
+   same whatever the farm count, chunk size or number of workers.
+2. Dimension tables (users, farms, locations, flocks, inventories) are
+   written with bulk_create; the fact tables (DailyProduction,
+   InventoryBatch, StockMovement, OfferInteraction) are streamed with
+   PostgreSQL COPY (bulk_create with use_copy=False, which also stamps
+   auto_now_add columns with the load time instead of the simulated one).
+3. Farms are written in chunks, one transaction per chunk, optionally by
+   several worker processes.
+
+Writes bypass save() and signals, so the generator keeps what they would:
+flock counters and rates, egg breakdown totals, production_rate_percent,
+inventory totals, batch quantities (FIFO sales, spoilage after the shelf
+life) and the running balance_after of stock movements. Anomaly statistics
+are not built (run ``rebuild_anomaly_stats --all-flocks``) and cached
+dashboards are not invalidated.
+
+Generated farms carry LOAD_APPLICATION_PREFIX in their application id;
+clear_load_data() removes them and everything generated for them.
+
+Usage:
+    python manage.py generate_load_data --farms 5000 --days 1095 --workers 8
+"""
+
+import logging
+import multiprocessing
+import random
+import time
+import uuid
+from collections import Counter, defaultdict, deque
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.gis.geos import Point
+from django.db import connection, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from advertising.models import OfferInteraction, Partner, PartnerOffer
+from farms.models import Farm, FarmLocation
+from flock_management.models import DailyProduction, Flock
+from sales_revenue.inventory_models import (
+    FarmInventory,
+    InventoryBatch,
+    InventoryCategory,
+    StockMovement,
+    StockMovementType,
+)
+
+logger = logging.getLogger(__name__)
+
+LOAD_APPLICATION_PREFIX = 'APP-LD-'
+LOAD_USERNAME_PREFIX = 'load_farmer_'
+LOAD_PARTNER_PREFIX = 'Load Test Partner'
+
+# region: (longitude, latitude, district, constituency)
+REGIONS = {
+    'Greater Accra': (-0.19, 5.60, 'Accra Metropolitan', 'Ayawaso West'),
+    'Ashanti': (-1.62, 6.69, 'Kumasi Metropolitan', 'Subin'),
+    'Eastern': (-0.26, 6.09, 'New Juaben South', 'New Juaben South'),
+    'Central': (-1.25, 5.11, 'Cape Coast Metropolitan', 'Cape Coast South'),
+    'Western': (-1.76, 4.90, 'Sekondi-Takoradi Metropolitan', 'Takoradi'),
+    'Western North': (-2.49, 6.20, 'Sefwi Wiawso', 'Sefwi Wiawso'),
+    'Volta': (0.47, 6.60, 'Ho Municipal', 'Ho Central'),
+    'Oti': (0.30, 8.06, 'Krachi East', 'Krachi East'),
+    'Northern': (-0.85, 9.40, 'Tamale Metropolitan', 'Tamale Central'),
+    'Savannah': (-1.82, 9.08, 'West Gonja', 'Damongo'),
+    'North East': (-0.37, 10.52, 'East Mamprusi', 'Nalerigu/Gambaga'),
+    'Upper East': (-0.85, 10.79, 'Bolgatanga Municipal', 'Bolgatanga Central'),
+    'Upper West': (-2.50, 10.06, 'Wa Municipal', 'Wa Central'),
+    'Bono': (-2.33, 7.34, 'Sunyani Municipal', 'Sunyani East'),
+    'Bono East': (-1.93, 7.59, 'Techiman Municipal', 'Techiman South'),
+    'Ahafo': (-2.32, 6.80, 'Asunafo North', 'Asunafo North'),
+}
+
+# Houses and cycles
+LAYER_SHARE = 0.75                 # share of houses running layers (rest broilers)
+LAYER_ARRIVAL_WEEKS = 16           # layers arrive as point-of-lay pullets
+LAYER_CYCLE_DAYS = 64 * 7          # ... and leave at 80 weeks
+BROILER_CYCLE_DAYS = 42
+HOUSE_REST_DAYS = 14
+HOUSE_SIZE_RANGE = (300, 5000)
+
+# Daily rates
+LAYER_DAILY_MORTALITY = 0.00015
+BROILER_DAILY_MORTALITY = 0.0012
+OUTBREAK_PROBABILITY = 0.002
+LAYER_FEED_KG = 0.115
+FEED_PRICE_PER_KG = Decimal('3.50')
+BIRD_PRICE = {'Layers': Decimal('45.00'), 'Broilers': Decimal('18.00')}
+SALE_PRICE_PER_BIRD = {'Layers': Decimal('60.00'), 'Broilers': Decimal('85.00')}
+
+# Egg inventory
+EGG_SHELF_LIFE_DAYS = 21
+EGG_UNIT_COST = Decimal('1.10')
+EGG_SALE_PRICE = Decimal('1.60')
+LOW_STOCK_THRESHOLD = Decimal('50')
+BREAKAGE_PROBABILITY = 0.03
+
+# Partner offer interactions (per impression)
+DEFAULT_IMPRESSIONS_PER_DAY = 1.5
+CLICK_RATE = 0.04
+DISMISS_RATE = 0.03
+CONVERSION_RATE = 0.1              # of clicks
+DEFAULT_OFFERS = 8
+OFFER_SOURCE_PAGES = ['dashboard', 'marketplace', 'inventory']
+
+TWO_PLACES = Decimal('0.01')
+
+
+def _uuid(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _decimal(value):
+    return Decimal(str(value)).quantize(TWO_PLACES)
+
+
+def laying_rate(age_weeks, rng):
+    """Share of birds laying on a day at the given age."""
+    if age_weeks < 18:
+        return 0.0
+    if age_weeks < 25:
+        base = 0.55 + (age_weeks - 18) * 0.045
+    elif age_weeks <= 45:
+        base = 0.88
+    else:
+        base = max(0.55, 0.88 - (age_weeks - 45) * 0.008)
+    return min(0.97, max(0.0, base + rng.uniform(-0.04, 0.04)))
+
+
+def daily_deaths(count, daily_rate, rng):
+    """Deaths in a flock of ``count`` birds on one day (with rare outbreaks)."""
+    expected = count * daily_rate
+    deaths = int(expected) + (1 if rng.random() < expected - int(expected) else 0)
+    if rng.random() < OUTBREAK_PROBABILITY:
+        deaths += int(count * rng.uniform(0.005, 0.03))
+    return min(deaths, count)
+
+
+# =============================================================================
+# WRITERS
+# =============================================================================
+
+class TableWriter:
+    """
+    Buffers rows of one model (dicts keyed by field attname) and writes
+    them in batches with COPY, or bulk_create when use_copy is False.
+
+    Fields missing from a row get the field default.
+    """
+
+    def __init__(self, model, use_copy=True, batch_size=5000):
+        self.model = model
+        self.use_copy = use_copy
+        self.batch_size = batch_size
+        self.fields = model._meta.concrete_fields
+        self.rows = []
+        self.written = 0
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        if self.use_copy:
+            self._copy(self.rows)
+        else:
+            self.model.objects.bulk_create(
+                [self.model(**row) for row in self.rows], batch_size=self.batch_size
+            )
+        self.written += len(self.rows)
+        self.rows = []
+
+    def _values(self, row):
+        values = []
+        for field in self.fields:
+            if field.attname in row:
+                value = row[field.attname]
+            else:
+                value = field.get_default()
+            if field.get_internal_type() == 'JSONField':
+                value = field.get_db_prep_save(value, connection)
+            values.append(value)
+        return values
+
+    def _copy(self, rows):
+        quote = connection.ops.quote_name
+        columns = ', '.join(quote(field.column) for field in self.fields)
+        sql = f'COPY {quote(self.model._meta.db_table)} ({columns}) FROM STDIN'
+        with connection.cursor() as cursor:
+            with cursor.copy(sql) as copy:
+                for row in rows:
+                    copy.write_row(self._values(row))
+
+
+# =============================================================================
+# GENERATOR
+# =============================================================================
+
+class LoadDataGenerator:
+    """
+    Simulates and writes the load dataset.
+
+    Args:
+        farms: Number of farms
+        flocks_per_farm: Poultry houses per farm; each runs consecutive
+            flocks (layer or broiler cycles) over the whole period
+        days: Length of the simulated period, ending at end_date
+        regions: Region names farms are spread over (default: all)
+        seed: Base seed; the same seed gives the same dataset
+        end_date: Last simulated day (default: today)
+        impressions_per_day: Average partner offer impressions per farm per day
+        batch_size: Rows per COPY / bulk_create batch
+        use_copy: Stream fact tables with COPY (default: on PostgreSQL)
+        password: Password of the generated farmer accounts (default: unusable)
+    """
+
+    def __init__(self, farms=100, flocks_per_farm=2, days=365, regions=None, seed=1,
+                 end_date=None, impressions_per_day=DEFAULT_IMPRESSIONS_PER_DAY,
+                 batch_size=5000, use_copy=None, password=None):
+        unknown = sorted(set(regions or ()) - set(REGIONS))
+        if unknown:
+            raise ValueError(f"Unknown regions: {', '.join(unknown)}")
+
+        self.farms = farms
+        self.flocks_per_farm = flocks_per_farm
+        self.days = days
+        self.regions = list(regions or REGIONS)
+        self.seed = seed
+        self.end_date = end_date or timezone.now().date()
+        self.start_date = self.end_date - timedelta(days=days - 1)
+        self.impressions_per_day = impressions_per_day
+        self.batch_size = batch_size
+        self.use_copy = connection.vendor == 'postgresql' if use_copy is None else use_copy
+        self.password_hash = make_password(password)
+        self.offer_ids = []
+
+    # -------------------------------------------------------------------------
+    # Entry points
+    # -------------------------------------------------------------------------
+
+    def config(self):
+        """Constructor arguments, for re-creating the generator in a worker."""
+        return {
+            'farms': self.farms,
+            'flocks_per_farm': self.flocks_per_farm,
+            'days': self.days,
+            'regions': self.regions,
+            'seed': self.seed,
+            'end_date': self.end_date,
+            'impressions_per_day': self.impressions_per_day,
+            'batch_size': self.batch_size,
+            'use_copy': self.use_copy,
+        }
+
+    def generate(self, chunk_size=50, workers=1, progress=None):
+        """
+        Generate all farms.
+
+        Args:
+            chunk_size: Farms written per transaction
+            workers: Worker processes (forked; each uses its own connection)
+            progress: Called with the counts of each finished chunk
+
+        Returns:
+            Counter of rows written per table
+        """
+        started = time.monotonic()
+        self.offer_ids = self.ensure_offers()
+        chunks = [
+            (start, min(start + chunk_size, self.farms + 1))
+            for start in range(1, self.farms + 1, chunk_size)
+        ]
+
+        totals = Counter()
+        if workers <= 1:
+            results = (self.generate_chunk(start, stop) for start, stop in chunks)
+            for counts in results:
+                totals.update(counts)
+                if progress:
+                    progress(counts)
+        else:
+            # Forked workers must not share the parent's connections
+            connections.close_all()
+            config = dict(self.config(), offer_ids=self.offer_ids, password_hash=self.password_hash)
+            context = multiprocessing.get_context('fork')
+            with context.Pool(workers) as pool:
+                jobs = [(config, start, stop) for start, stop in chunks]
+                for counts in pool.imap_unordered(_generate_chunk_in_worker, jobs):
+                    totals.update(counts)
+                    if progress:
+                        progress(counts)
+
+        totals['seconds'] = round(time.monotonic() - started, 1)
+        return totals
+
+    def ensure_offers(self, count=DEFAULT_OFFERS):
+        """Partner offers the generated farms interact with (created once)."""
+        partner, _ = Partner.objects.get_or_create(
+            company_name=LOAD_PARTNER_PREFIX,
+            defaults={'category': 'feed_supplier', 'description': 'Synthetic partner for load data'},
+        )
+        offers = list(partner.offers.order_by('title').values_list('id', flat=True))
+        for number in range(len(offers) + 1, count + 1):
+            offer = PartnerOffer.objects.create(
+                partner=partner,
+                title=f'Load Offer {number}',
+                description='Synthetic offer for load data',
+                start_date=timezone.make_aware(datetime.combine(self.start_date, datetime.min.time())),
+            )
+            offers.append(offer.id)
+        return offers
+
+    def generate_chunk(self, start, stop):
+        """Generate farms ``start`` to ``stop - 1`` in one transaction."""
+        writers = {
+            model: TableWriter(model, self.use_copy, self.batch_size)
+            for model in (DailyProduction, InventoryBatch, StockMovement, OfferInteraction)
+        }
+        counts = Counter()
+        offer_counts = defaultdict(Counter)
+
+        with transaction.atomic():
+            farms = [self._farm(number) for number in range(start, stop)]
+            get_user_model().objects.bulk_create([user for user, _, _ in farms])
+            Farm.objects.bulk_create([farm for _, farm, _ in farms])
+            FarmLocation.objects.bulk_create([location for _, _, location in farms])
+            counts.update(users=len(farms), farms=len(farms), farm_locations=len(farms))
+
+            for number, (_, farm, _) in zip(range(start, stop), farms):
+                rng = random.Random(f'{self.seed}:{number}:activity')
+                flocks, additions = self._simulate_houses(farm, rng, writers[DailyProduction])
+                Flock.objects.bulk_create(flocks)
+                counts['flocks'] += len(flocks)
+
+                inventory = self._simulate_inventory(farm, additions, rng, writers)
+                FarmInventory.objects.bulk_create([inventory])
+                counts['farm_inventory'] += 1
+
+                self._simulate_offer_interactions(farm, rng, writers[OfferInteraction], offer_counts)
+
+            for writer in writers.values():
+                writer.flush()
+                counts[writer.model._meta.db_table] += writer.written
+
+            for offer_id, interactions in offer_counts.items():
+                PartnerOffer.objects.filter(id=offer_id).update(
+                    impressions=F('impressions') + interactions['impression'],
+                    clicks=F('clicks') + interactions['click'],
+                )
+
+        return counts
+
+    # -------------------------------------------------------------------------
+    # Farms
+    # -------------------------------------------------------------------------
+
+    def _farm(self, number):
+        """Unsaved (user, farm, primary location) of farm ``number``."""
+        rng = random.Random(f'{self.seed}:{number}')
+        region = self.regions[number % len(self.regions)]
+        longitude, latitude, district, constituency = REGIONS[region]
+        now = timezone.now()
+        years = rng.randint(0, 12)
+
+        user = get_user_model()(
+            id=_uuid(rng),
+            username=f'{LOAD_USERNAME_PREFIX}{number:07d}',
+            email=f'{LOAD_USERNAME_PREFIX}{number:07d}@load.test',
+            password=self.password_hash,
+            first_name='Load',
+            last_name=f'Farmer {number}',
+            role='FARMER',
+            phone=f'+23359{number:07d}',
+            region=region,
+            constituency=constituency,
+            date_joined=now,
+        )
+        houses = self.flocks_per_farm
+        capacity = houses * HOUSE_SIZE_RANGE[1]
+        farm = Farm(
+            id=_uuid(rng),
+            application_id=f'{LOAD_APPLICATION_PREFIX}{number:07d}',
+            user=user,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            date_of_birth='1985-01-01',
+            ghana_card_number=f'GHA-9{number:08d}-{number % 10}',
+            primary_phone=f'+23357{number:07d}',
+            residential_address=f'{constituency}, {region}',
+            primary_constituency=constituency,
+            nok_full_name='Next Of Kin',
+            nok_relationship='Sibling',
+            nok_phone=f'+23356{number:07d}',
+            years_in_poultry=years,
+            farm_name=f'Load Farm {number:07d}',
+            tin=f'9{number:010d}',
+            paystack_subaccount_code=f'SUBAC_LOAD{number:07d}',
+            number_of_poultry_houses=houses,
+            total_bird_capacity=capacity,
+            total_infrastructure_value_ghs=Decimal(houses * 15000),
+            planned_production_start_date=self.start_date,
+            initial_investment_amount=Decimal(houses * 20000),
+            funding_source=['Personal Savings'],
+            monthly_operating_budget=Decimal(houses * 2500),
+            expected_monthly_revenue=Decimal(houses * 6000),
+            application_status='Approved',
+            farm_status='Active',
+            registration_source='self_registered',
+            subscription_type='standard',
+            marketplace_enabled=True,
+        )
+        # What Farm.save() derives
+        farm.approval_workflow = farm._determine_approval_workflow()
+        farm.experience_level = 'Beginner' if years <= 1 else 'Intermediate' if years <= 5 else 'Expert'
+
+        offset = rng.uniform(-0.4, 0.4), rng.uniform(-0.4, 0.4)
+        point = Point(longitude + offset[0], latitude + offset[1], srid=4326)
+        location = FarmLocation(
+            id=_uuid(rng),
+            farm=farm,
+            gps_address_string=f'LD-{number:07d}',
+            location=point,
+            longitude=_decimal_coordinate(point.x),
+            latitude=_decimal_coordinate(point.y),
+            region=region,
+            district=district,
+            constituency=constituency,
+            community=f'Load Community {number % 500}',
+            road_accessibility='All Year',
+            land_size_acres=Decimal(houses),
+            land_ownership_status='Owned',
+            is_primary_location=True,
+        )
+        return user, farm, location
+
+    # -------------------------------------------------------------------------
+    # Flocks and daily production
+    # -------------------------------------------------------------------------
+
+    def _simulate_houses(self, farm, rng, production_writer):
+        """
+        Run every house of the farm over the period.
+
+        Returns:
+            (unsaved flocks, {day: [(production id, flock, good eggs)]})
+        """
+        flocks = []
+        additions = defaultdict(list)
+        for house in range(1, self.flocks_per_farm + 1):
+            flock_type = 'Layers' if rng.random() < LAYER_SHARE else 'Broilers'
+            size = rng.randint(*HOUSE_SIZE_RANGE)
+            cycle_days = LAYER_CYCLE_DAYS if flock_type == 'Layers' else BROILER_CYCLE_DAYS
+            # The first flock is already mid-cycle when the period starts
+            arrival = self.start_date - timedelta(days=rng.randint(0, cycle_days - 1))
+            cycle = 1
+            while arrival <= self.end_date:
+                flock = self._simulate_flock(
+                    farm, house, cycle, flock_type, size, arrival, cycle_days,
+                    rng, production_writer, additions,
+                )
+                flocks.append(flock)
+                arrival += timedelta(days=cycle_days + HOUSE_REST_DAYS + rng.randint(0, 7))
+                cycle += 1
+        return flocks, additions
+
+    def _simulate_flock(self, farm, house, cycle, flock_type, size, arrival, cycle_days,
+                        rng, production_writer, additions):
+        layers = flock_type == 'Layers'
+        initial = max(1, int(size * rng.uniform(0.85, 1.0)))
+        age_at_arrival = LAYER_ARRIVAL_WEEKS if layers else 0
+        last_day = arrival + timedelta(days=cycle_days - 1)
+        flock = Flock(
+            id=_uuid(rng),
+            farm=farm,
+            flock_number=f'H{house}-{arrival:%Y%m%d}-{cycle}',
+            flock_type=flock_type,
+            breed='Isa Brown' if layers else 'Cobb 500',
+            source='Purchased',
+            arrival_date=arrival,
+            initial_count=initial,
+            age_at_arrival_weeks=Decimal(age_at_arrival),
+            purchase_price_per_bird=BIRD_PRICE[flock_type],
+            total_acquisition_cost=BIRD_PRICE[flock_type] * initial,
+            production_start_date=arrival + timedelta(weeks=2) if layers else None,
+            expected_production_end_date=last_day if layers else None,
+        )
+
+        count = initial
+        total_eggs = 0
+        total_feed = Decimal('0')
+        total_feed_cost = Decimal('0')
+        daily_rate = LAYER_DAILY_MORTALITY if layers else BROILER_DAILY_MORTALITY
+        day = max(arrival, self.start_date)
+        final_day = min(last_day, self.end_date)
+
+        while day <= final_day and count > 0:
+            age_days = (day - arrival).days + age_at_arrival * 7
+            deaths = daily_deaths(count, daily_rate, rng)
+            sold = count - deaths if day == last_day else 0
+
+            eggs = int(count * laying_rate(age_days / 7, rng)) if layers else 0
+            broken = int(eggs * rng.uniform(0.01, 0.025))
+            dirty = int(eggs * rng.uniform(0.01, 0.02))
+            small = int(eggs * rng.uniform(0.02, 0.04))
+            soft_shell = int(eggs * rng.uniform(0.005, 0.015))
+            good = eggs - broken - dirty - small - soft_shell
+
+            feed_per_bird = LAYER_FEED_KG if layers else min(0.2, 0.02 + 0.0045 * age_days)
+            feed = _decimal(count * feed_per_bird)
+            feed_cost = _decimal(feed * FEED_PRICE_PER_KG)
+            outbreak = deaths > max(3, count * daily_rate * 5)
+            recorded_at = _at(day, 18, rng)
+
+            production_id = _uuid(rng)
+            production_writer.add({
+                'id': production_id,
+                'farm_id': farm.id,
+                'flock_id': flock.id,
+                'production_date': day,
+                'eggs_collected': eggs,
+                'good_eggs': good,
+                'broken_eggs': broken,
+                'dirty_eggs': dirty,
+                'small_eggs': small,
+                'soft_shell_eggs': soft_shell,
+                # DailyProduction.save(): rate against the count before the day's losses
+                'production_rate_percent': _decimal(eggs * 100 / count),
+                'birds_died': deaths,
+                'mortality_reason': ('Disease' if outbreak else 'Unknown') if deaths else '',
+                'feed_consumed_kg': feed,
+                'feed_cost_today': feed_cost,
+                'birds_sold': sold,
+                'birds_sold_revenue': SALE_PRICE_PER_BIRD[flock_type] * sold,
+                'general_health': 'Poor' if outbreak else 'Good',
+                'signs_of_disease': outbreak,
+                'recorded_at': recorded_at,
+                'updated_at': recorded_at,
+            })
+            if good > 0:
+                additions[day].append((production_id, flock, good))
+
+            count -= deaths + sold
+            total_eggs += eggs
+            total_feed += feed
+            total_feed_cost += feed_cost
+            day += timedelta(days=1)
+
+        # What DailyProduction.save() keeps on the flock and Flock.save() derives
+        flock.current_count = count
+        flock.status = 'Active' if count else ('Sold' if final_day == last_day else 'Depleted')
+        flock.is_currently_producing = layers and bool(count)
+        flock.total_eggs_produced = total_eggs
+        flock.total_feed_consumed_kg = total_feed
+        flock.total_feed_cost = total_feed_cost
+        flock.total_mortality = initial - count
+        flock.mortality_rate_percent = _decimal(flock.total_mortality * 100 / initial)
+        flock.average_eggs_per_bird = _decimal(total_eggs / initial)
+        days_since_arrival = (timezone.now().date() - arrival).days
+        if days_since_arrival > 0:
+            flock.average_daily_mortality = _decimal(flock.total_mortality / days_since_arrival)
+        return flock
+
+    # -------------------------------------------------------------------------
+    # Egg inventory
+    # -------------------------------------------------------------------------
+
+    def _simulate_inventory(self, farm, additions, rng, writers):
+        """
+        Replay the farm's egg stock day by day: production adds a batch,
+        sales and breakage consume batches oldest first, batches past their
+        shelf life are written off as spoilage.
+
+        Returns:
+            Unsaved FarmInventory with its final totals
+        """
+        inventory = FarmInventory(
+            id=_uuid(rng),
+            farm=farm,
+            category=InventoryCategory.EGGS,
+            product_name='Fresh Eggs',
+            sku=f'EGG-{farm.id.hex[:6]}'.upper(),
+            unit='piece',
+            unit_cost=EGG_UNIT_COST,
+            low_stock_threshold=LOW_STOCK_THRESHOLD,
+            max_shelf_life_days=EGG_SHELF_LIFE_DAYS,
+        )
+        movements = writers[StockMovement]
+        batches = deque()
+        state = {'balance': Decimal('0'), 'added': Decimal('0'), 'sold': Decimal('0'),
+                 'lost': Decimal('0'), 'revenue': Decimal('0'), 'last_sale': None}
+
+        def move(day, movement_type, quantity, unit_cost, notes, at, source=None, allocations=()):
+            state['balance'] += quantity
+            movements.add({
+                'id': _uuid(rng),
+                'inventory_id': inventory.id,
+                'farm_id': farm.id,
+                'movement_type': movement_type,
+                'quantity': quantity,
+                'unit_cost': unit_cost,
+                'balance_after': state['balance'],
+                'source_type': 'DailyProduction' if source else None,
+                'source_id': str(source) if source else None,
+                'stock_date': day,
+                'batch_allocations': list(allocations),
+                'notes': notes,
+                'created_at': at,
+            })
+
+        def allocation(batch, quantity):
+            return {
+                'batch_id': str(batch['id']),
+                'batch_number': batch['batch_number'],
+                'quantity': str(quantity),
+                'production_date': batch['production_date'].isoformat(),
+            }
+
+        def consume(quantity, at):
+            """FIFO depletion as FarmInventory.deplete_batches(); returns the allocations."""
+            allocations = []
+            while quantity > 0 and batches:
+                batch = batches[0]
+                taken = min(quantity, batch['current_quantity'])
+                batch['current_quantity'] -= taken
+                quantity -= taken
+                allocations.append(allocation(batch, taken))
+                if batch['current_quantity'] == 0:
+                    batch.update(is_depleted=True, depleted_at=at, updated_at=at)
+                    batches.popleft()
+            return allocations
+
+        day = self.start_date
+        while day <= self.end_date:
+            # Spoilage: InventoryBatch.save() marks a batch expired after its expiry date
+            while batches and batches[0]['expiry_date'] < day:
+                batch = batches.popleft()
+                at = _at(day, 6, rng)
+                remaining = batch['current_quantity']
+                move(day, StockMovementType.SPOILAGE, -remaining, EGG_UNIT_COST,
+                     f"Expired batch {batch['batch_number']}", at, allocations=[allocation(batch, remaining)])
+                state['lost'] += remaining
+                batch.update(current_quantity=Decimal('0'), is_depleted=True, is_expired=True,
+                             depleted_at=at, updated_at=at)
+
+            produced = Decimal('0')
+            for production_id, flock, good in additions.get(day, ()):
+                good = Decimal(good)
+                at = _at(day, 18, rng)
+                batch = {
+                    'id': _uuid(rng),
+                    'inventory_id': inventory.id,
+                    'batch_number': f'B-{day:%Y%m%d}-{rng.getrandbits(24):06X}',
+                    'source_flock_id': flock.id,
+                    'source_production_id': production_id,
+                    'initial_quantity': good,
+                    'current_quantity': good,
+                    'production_date': day,
+                    'expiry_date': day + timedelta(days=EGG_SHELF_LIFE_DAYS),
+                    'is_depleted': False,
+                    'is_expired': False,
+                    'created_at': at,
+                    'updated_at': at,
+                    'depleted_at': None,
+                }
+                move(day, StockMovementType.PRODUCTION, good, EGG_UNIT_COST,
+                     f'From {flock.flock_number} on {day}', at, source=production_id,
+                     allocations=[allocation(batch, good)])
+                state['added'] += good
+                produced += good
+                batches.append(batch)
+                writers[InventoryBatch].rows.append(batch)
+
+            if produced and rng.random() < BREAKAGE_PROBABILITY:
+                broken = min(state['balance'], Decimal(int(produced * Decimal(rng.uniform(0.005, 0.02)))))
+                if broken > 0:
+                    at = _at(day, 19, rng)
+                    move(day, StockMovementType.BREAKAGE, -broken, EGG_UNIT_COST, 'Breakage', at,
+                         allocations=consume(broken, at))
+                    state['lost'] += broken
+
+            demand = Decimal(int(produced * Decimal(rng.uniform(0.7, 1.05))))
+            sold = min(state['balance'], demand)
+            if sold > 0:
+                at = _at(day, 20, rng)
+                move(day, StockMovementType.SALE, -sold, EGG_SALE_PRICE, 'Egg sales', at,
+                     allocations=consume(sold, at))
+                state['sold'] += sold
+                state['revenue'] += sold * EGG_SALE_PRICE
+                state['last_sale'] = at
+
+            day += timedelta(days=1)
+
+        # Batches are written once their final quantities are known
+        batch_writer = writers[InventoryBatch]
+        if len(batch_writer.rows) >= batch_writer.batch_size:
+            batch_writer.flush()
+
+        # What FarmInventory.add_stock()/remove_stock()/save() keep
+        remaining = [batch for batch in batches if batch['current_quantity'] > 0]
+        quantity = state['balance']
+        inventory.quantity_available = quantity
+        inventory.total_added = state['added']
+        inventory.total_sold = state['sold']
+        inventory.total_lost = state['lost']
+        inventory.total_revenue = state['revenue']
+        inventory.total_value = quantity * EGG_UNIT_COST
+        inventory.is_low_stock = quantity <= LOW_STOCK_THRESHOLD
+        inventory.oldest_stock_date = remaining[0]['production_date'] if remaining else None
+        inventory.batched_quantity = sum((b['current_quantity'] for b in remaining), Decimal('0'))
+        inventory.batched_date_weight = sum(
+            (b['current_quantity'] * b['production_date'].toordinal() for b in remaining), Decimal('0')
+        )
+        inventory._refresh_average_age(today=self.end_date)
+        inventory.last_sale_date = state['last_sale']
+        inventory.last_stock_update = timezone.now()
+        return inventory
+
+    # -------------------------------------------------------------------------
+    # Partner offers
+    # -------------------------------------------------------------------------
+
+    def _simulate_offer_interactions(self, farm, rng, writer, offer_counts):
+        if not self.offer_ids or self.impressions_per_day <= 0:
+            return
+        whole = int(self.impressions_per_day)
+        fraction = self.impressions_per_day - whole
+
+        day = self.start_date
+        while day <= self.end_date:
+            impressions = whole + (1 if rng.random() < fraction else 0)
+            for _ in range(impressions):
+                offer_id = rng.choice(self.offer_ids)
+                at = _at(day, rng.randint(6, 20), rng)
+                page = rng.choice(OFFER_SOURCE_PAGES)
+                events = ['impression']
+                roll = rng.random()
+                if roll < CLICK_RATE:
+                    events.append('click')
+                    if rng.random() < CONVERSION_RATE:
+                        events.append('converted')
+                elif roll < CLICK_RATE + DISMISS_RATE:
+                    events.append('dismissed')
+
+                for step, interaction_type in enumerate(events):
+                    writer.add({
+                        'id': _uuid(rng),
+                        'offer_id': offer_id,
+                        'farm_id': farm.id,
+                        'interaction_type': interaction_type,
+                        'source_page': page,
+                        'created_at': at + timedelta(minutes=step * rng.randint(1, 30)),
+                    })
+                    offer_counts[offer_id][interaction_type] += 1
+            day += timedelta(days=1)
+
+
+def _at(day, hour, rng):
+    """An aware datetime on ``day`` within the given hour."""
+    return timezone.make_aware(
+        datetime(day.year, day.month, day.day, hour, rng.randint(0, 59), rng.randint(0, 59))
+    )
+
+
+def _decimal_coordinate(value):
+    return Decimal(str(value)).quantize(Decimal('0.0000001'))
+
+
+def _generate_chunk_in_worker(job):
+    config, start, stop = job
+    offer_ids = config.pop('offer_ids')
+    password_hash = config.pop('password_hash')
+    generator = LoadDataGenerator(**config)
+    generator.offer_ids = offer_ids
+    generator.password_hash = password_hash
+    try:
+        return generator.generate_chunk(start, stop)
+    finally:
+        connections.close_all()
+
+
+# =============================================================================
+# CLEANUP
+# =============================================================================
+
+def clear_load_data():
+    """
+    Delete every generated farm with its users and generated rows.
+
+    Fact tables are emptied with plain DELETEs first so the ORM cascade
+    from the farms only has the small tables left to collect.
+
+    Returns:
+        dict of rows deleted per table
+    """
+    farm_ids = Farm.objects.filter(application_id__startswith=LOAD_APPLICATION_PREFIX).values('id')
+    deleted = {}
+    fact_tables = [
+        OfferInteraction.objects.filter(farm_id__in=farm_ids),
+        StockMovement.objects.filter(farm_id__in=farm_ids),
+        InventoryBatch.objects.filter(inventory__farm_id__in=farm_ids),
+        DailyProduction.objects.filter(farm_id__in=farm_ids),
+    ]
+    with transaction.atomic():
+        for queryset in fact_tables:
+            deleted[queryset.model._meta.db_table] = queryset._raw_delete(queryset.db)
+        deleted['farms'] = Farm.objects.filter(id__in=farm_ids).delete()[0]
+        deleted['users'] = get_user_model().objects.filter(
+            username__startswith=LOAD_USERNAME_PREFIX
+        ).delete()[0]
+    return deleted
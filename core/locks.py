@@ -0,0 +1,302 @@
+"""
+Distributed locks for YEA Poultry Management System.
+
+A lock that contended requests wait on without polling, that only its
+holder can release, and that long operations can keep alive:
+
+1. Acquire is a single SET NX PX. The stored value is a random token, and
+   each acquisition also takes a fencing token (a per-lock INCR counter)
+   that the holder can record with its writes.
+2. Release and renewal are Lua scripts that compare the token before they
+   DEL/PEXPIRE, so a holder whose lock expired cannot release or extend a
+   lock that someone else now holds.
+3. Waiters block on a per-lock notification list (BLPOP); release pushes
+   to it, waking one waiter. The block is capped at the lock's remaining
+   TTL, so a holder that died without releasing is noticed when its lock
+   expires, without sleeping and retrying in between.
+4. auto_renew=True extends the lock every ttl/3 on a background thread
+   while the block runs (long operations such as auto-assignment).
+
+Without a Redis cache (locmem in tests and local development) the same
+API runs on cache.add() with a process-local condition variable for
+waiting, which is all a single process needs.
+
+Usage:
+    from core.locks import DistributedLock
+
+    with DistributedLock(f"return:{return_id}:refund", ttl_seconds=60) as lock:
+        issue_refund(return_request)
+        # lock.fencing_token increases with every acquisition
+"""
+
+import logging
+import threading
+import time
+import uuid
+from typing import Optional
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Notification lists outlive a release by this long if nobody is waiting
+NOTIFY_TTL_MS = 60_000
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    redis.call('del', KEYS[1])
+    redis.call('del', KEYS[2])
+    redis.call('rpush', KEYS[2], 1)
+    redis.call('pexpire', KEYS[2], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class LockNotAcquired(Exception):
+    """Raised when a lock is held elsewhere (and waiting was not allowed or timed out)."""
+    pass
+
+
+def _redis_client():
+    """Raw redis client behind the default cache, or None if it is not Redis."""
+    if hasattr(cache, 'client') and hasattr(cache.client, 'get_client'):
+        # django-redis backend
+        return cache.client.get_client(write=True)
+    get_client = getattr(getattr(cache, '_cache', None), 'get_client', None)
+    if get_client is not None:
+        # django.core.cache.backends.redis.RedisCache
+        return get_client(None, write=True)
+    return None
+
+
+class _RedisBackend:
+    """Keys carry the cache's KEY_PREFIX and version, like cache entries."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def acquire(self, key, token, ttl_ms):
+        return bool(self.client.set(cache.make_key(key), token, nx=True, px=ttl_ms))
+
+    def release(self, key, token):
+        return bool(self.client.eval(
+            _RELEASE_SCRIPT, 2, cache.make_key(key), cache.make_key(f'{key}:notify'),
+            token, NOTIFY_TTL_MS,
+        ))
+
+    def renew(self, key, token, ttl_ms):
+        return bool(self.client.eval(_RENEW_SCRIPT, 1, cache.make_key(key), token, ttl_ms))
+
+    def fence(self, key):
+        return int(self.client.incr(cache.make_key(f'{key}:fence')))
+
+    def notify(self, key):
+        notify_key = cache.make_key(f'{key}:notify')
+        pipe = self.client.pipeline()
+        pipe.rpush(notify_key, 1)
+        pipe.pexpire(notify_key, NOTIFY_TTL_MS)
+        pipe.execute()
+
+    def wait(self, key, timeout):
+        # Never block past the holder's expiry (-2: already gone, -1: no TTL)
+        remaining_ms = self.client.pttl(cache.make_key(key))
+        if remaining_ms == -2:
+            return
+        if remaining_ms > 0:
+            timeout = min(timeout, remaining_ms / 1000)
+        self.client.blpop([cache.make_key(f'{key}:notify')], timeout=max(timeout, 0.01))
+
+
+class _LocalBackend:
+    """cache.add() locks with process-local wake-ups (locmem and other non-Redis caches)."""
+
+    _condition = threading.Condition()
+
+    def acquire(self, key, token, ttl_ms):
+        return cache.add(key, token, timeout=max(1, ttl_ms // 1000))
+
+    def release(self, key, token):
+        with self._condition:
+            if cache.get(key) != token:
+                return False
+            cache.delete(key)
+            self._condition.notify_all()
+            return True
+
+    def renew(self, key, token, ttl_ms):
+        with self._condition:
+            if cache.get(key) != token:
+                return False
+            return cache.touch(key, timeout=max(1, ttl_ms // 1000))
+
+    def fence(self, key):
+        fence_key = f'{key}:fence'
+        try:
+            return cache.incr(fence_key)
+        except ValueError:
+            if cache.add(fence_key, 1, timeout=None):
+                return 1
+            return cache.incr(fence_key)
+
+    def wait(self, key, timeout):
+        with self._condition:
+            if cache.get(key) is not None:
+                self._condition.wait(timeout)
+
+    def notify(self, key):
+        # notify_all() already woke every waiter
+        pass
+
+
+def _backend():
+    client = _redis_client()
+    return _RedisBackend(client) if client is not None else _LocalBackend()
+
+
+class DistributedLock:
+    """
+    Context manager for a named distributed lock.
+
+    Usage:
+        with DistributedLock(f"order:{order_id}:assign"):
+            # Only one process can execute this at a time
+            assign_to_farm(order, farm, quantity)
+
+    Args:
+        lock_name: Unique name for the lock
+        ttl_seconds: Lock expiry (protects against holders that die)
+        wait: Wait for a held lock instead of failing at once
+        max_wait: Longest wait in seconds before LockNotAcquired
+        auto_renew: Keep extending the lock while the block runs
+    """
+
+    key_prefix = 'lock'
+    # Take a fencing token on every acquisition (a persistent counter key)
+    fenced = True
+
+    def __init__(self, lock_name: str, ttl_seconds: int = 30,
+                 wait: bool = True, max_wait: float = 10.0, auto_renew: bool = False):
+        self.lock_name = lock_name
+        self.ttl_seconds = ttl_seconds
+        self.wait = wait
+        self.max_wait = max_wait
+        self.auto_renew = auto_renew
+        self.key = f'{self.key_prefix}:{lock_name}'
+        self.token: Optional[str] = None
+        self.fencing_token: Optional[int] = None
+        self.acquired = False
+        self.lost = False
+        self._backend = None
+        self._renewer = None
+        self._stop_renewing = threading.Event()
+
+    @property
+    def _ttl_ms(self):
+        return int(self.ttl_seconds * 1000)
+
+    def acquire(self) -> bool:
+        """
+        Take the lock, waiting up to max_wait if ``wait``.
+
+        Raises:
+            LockNotAcquired: Held elsewhere (immediately if not ``wait``)
+        """
+        self._backend = _backend()
+        token = str(uuid.uuid4())
+        deadline = time.monotonic() + self.max_wait
+        while not self._backend.acquire(self.key, token, self._ttl_ms):
+            if not self.wait:
+                raise LockNotAcquired(f"Could not acquire lock: {self.lock_name}")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LockNotAcquired(
+                    f"Timeout waiting for lock: {self.lock_name} after {self.max_wait:.2f}s"
+                )
+            self._backend.wait(self.key, remaining)
+
+        self.token = token
+        self.acquired = True
+        self.lost = False
+        self.fencing_token = self._backend.fence(self.key) if self.fenced else None
+        logger.debug(f"Acquired lock: {self.lock_name} (fence {self.fencing_token})")
+        if self.auto_renew:
+            self._start_renewing()
+        return True
+
+    def renew(self) -> bool:
+        """Extend the lock by ttl_seconds; False if it is no longer ours."""
+        if not self.acquired:
+            return False
+        renewed = self._backend.renew(self.key, self.token, self._ttl_ms)
+        if not renewed:
+            self.lost = True
+            logger.warning(f"Lock {self.lock_name} expired before it could be renewed")
+        return renewed
+
+    def release(self) -> bool:
+        """Release the lock if this holder still owns it (wakes one waiter)."""
+        if not self.acquired:
+            return False
+        self._stop_renewing.set()
+        if self._renewer is not None:
+            self._renewer.join()
+            self._renewer = None
+        released = self._backend.release(self.key, self.token)
+        if not released:
+            logger.warning(f"Lock {self.lock_name} expired while held; another holder may have run")
+        else:
+            logger.debug(f"Released lock: {self.lock_name}")
+        self.acquired = False
+        self.token = None
+        return released
+
+    def wait_for_release(self, timeout: float) -> None:
+        """
+        Block until the current holder releases the lock (or it expires),
+        at most ``timeout`` seconds, without taking it. Returns at once if
+        the lock is free.
+        """
+        if self._backend is None:
+            self._backend = _backend()
+        self._backend.wait(self.key, timeout)
+
+    def wake_next_waiter(self) -> None:
+        """
+        Pass a release on to the next waiter. A release wakes one Redis
+        waiter; waiters that read a result instead of taking the lock call
+        this so the others wake too.
+        """
+        if self._backend is None:
+            self._backend = _backend()
+        self._backend.notify(self.key)
+
+    def _start_renewing(self):
+        self._stop_renewing.clear()
+        interval = self.ttl_seconds / 3
+
+        def renew_until_released():
+            while not self._stop_renewing.wait(interval):
+                if not self.renew():
+                    return
+
+        self._renewer = threading.Thread(
+            target=renew_until_released, name=f'lock-renew:{self.lock_name}', daemon=True
+        )
+        self._renewer.start()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+        return False
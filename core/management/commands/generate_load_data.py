@@ -0,0 +1,111 @@
+"""
+Management command to generate a national-scale synthetic dataset for load tests.
+
+See core/load_data.py for what is generated and which invariants are kept.
+
+Usage:
+    python manage.py generate_load_data                                   # 100 farms, 1 year
+    python manage.py generate_load_data --farms 5000 --days 1095 --workers 8
+    python manage.py generate_load_data --regions "Ashanti,Northern" --seed 7
+    python manage.py generate_load_data --clear                           # Remove generated data only
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.load_data import (
+    DEFAULT_IMPRESSIONS_PER_DAY,
+    REGIONS,
+    LoadDataGenerator,
+    clear_load_data,
+)
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic farms, flocks, production, inventory and offer interactions for load tests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--farms', type=int, default=100, help='Number of farms (default: 100)')
+        parser.add_argument(
+            '--flocks-per-farm', type=int, default=2,
+            help='Poultry houses per farm, each running consecutive flocks (default: 2)',
+        )
+        parser.add_argument('--days', type=int, default=365, help='Days of history (default: 365)')
+        parser.add_argument(
+            '--end-date', type=date.fromisoformat, default=None,
+            help='Last simulated day, YYYY-MM-DD (default: today)',
+        )
+        parser.add_argument(
+            '--regions', default='',
+            help='Comma-separated regions to spread farms over (default: all 16)',
+        )
+        parser.add_argument('--seed', type=int, default=1, help='Base random seed (default: 1)')
+        parser.add_argument(
+            '--impressions-per-day', type=float, default=DEFAULT_IMPRESSIONS_PER_DAY,
+            help=f'Partner offer impressions per farm per day (default: {DEFAULT_IMPRESSIONS_PER_DAY})',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per COPY batch (default: 5000)')
+        parser.add_argument('--chunk-size', type=int, default=50, help='Farms per transaction (default: 50)')
+        parser.add_argument('--workers', type=int, default=1, help='Worker processes (default: 1)')
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Use bulk_create instead of COPY for fact tables (timestamps become the load time)',
+        )
+        parser.add_argument('--password', default=None, help='Password of generated farmer accounts')
+        parser.add_argument('--clear', action='store_true', help='Delete previously generated load data and exit')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted = clear_load_data()
+            for table, count in deleted.items():
+                self.stdout.write(f'  {table}: {count:,}')
+            self.stdout.write(self.style.SUCCESS('Load data cleared'))
+            return
+
+        use_copy = not options['no_copy']
+        if use_copy and connection.vendor != 'postgresql':
+            raise CommandError('COPY needs PostgreSQL; use --no-copy on other databases')
+        if options['farms'] < 1 or options['days'] < 1 or options['flocks_per_farm'] < 1:
+            raise CommandError('--farms, --days and --flocks-per-farm must be at least 1')
+
+        regions = [name.strip() for name in options['regions'].split(',') if name.strip()]
+        try:
+            generator = LoadDataGenerator(
+                farms=options['farms'],
+                flocks_per_farm=options['flocks_per_farm'],
+                days=options['days'],
+                regions=regions or None,
+                seed=options['seed'],
+                end_date=options['end_date'],
+                impressions_per_day=options['impressions_per_day'],
+                batch_size=options['batch_size'],
+                use_copy=use_copy,
+                password=options['password'],
+            )
+        except ValueError as exc:
+            raise CommandError(f"{exc}. Known regions: {', '.join(REGIONS)}")
+
+        self.stdout.write(
+            f"Generating {options['farms']:,} farms x {options['days']:,} days "
+            f"({generator.start_date} to {generator.end_date}), seed {options['seed']}"
+        )
+        done = {'farms': 0}
+
+        def progress(counts):
+            done['farms'] += counts['farms']
+            self.stdout.write(f"  {done['farms']:,}/{options['farms']:,} farms")
+
+        totals = generator.generate(
+            chunk_size=options['chunk_size'], workers=options['workers'], progress=progress,
+        )
+
+        seconds = totals.pop('seconds')
+        for table, count in sorted(totals.items()):
+            self.stdout.write(f'  {table}: {count:,}')
+        self.stdout.write(self.style.SUCCESS(f'Load data generated in {seconds}s'))
+        self.stdout.write(
+            'Anomaly baselines are not built: run "python manage.py rebuild_anomaly_stats --all-flocks" '
+            'if the load test covers anomaly detection.'
+        )
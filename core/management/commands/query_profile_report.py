@@ -0,0 +1,128 @@
+"""
+Management command to report the most query-heavy endpoints.
+
+Aggregates the samples written by QueryInstrumentationMiddleware
+(QUERY_PROFILE_STORE) per endpoint.
+
+Usage:
+    python manage.py query_profile_report                     # Top 20 by total SQL time
+    python manage.py query_profile_report --sort queries      # By average query count
+    python manage.py query_profile_report --hours 24          # Only the last day
+    python manage.py query_profile_report --repeated          # Show repeated statements
+"""
+
+import time
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand
+
+from core.query_instrumentation import get_store_path, iter_samples
+
+SORT_KEYS = {
+    'sql_time': lambda s: s['sql_ms_total'],
+    'queries': lambda s: s['avg_queries'],
+    'duration': lambda s: s['p95_ms'],
+    'repeated': lambda s: s['repeated_requests'],
+}
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def summarize(samples):
+    """Per-endpoint aggregates of profile samples."""
+    endpoints = defaultdict(list)
+    for sample in samples:
+        endpoints[sample['endpoint']].append(sample)
+
+    summary = []
+    for endpoint, rows in endpoints.items():
+        durations = [r['duration_ms'] for r in rows]
+        repeated = Counter()
+        for r in rows:
+            for statement in r.get('repeated', []):
+                repeated[statement['sql']] = max(repeated[statement['sql']], statement['count'])
+        summary.append({
+            'endpoint': endpoint,
+            'requests': len(rows),
+            'avg_ms': round(sum(durations) / len(rows), 1),
+            'p95_ms': round(_percentile(durations, 95), 1),
+            'avg_queries': round(sum(r['queries'] for r in rows) / len(rows), 1),
+            'max_queries': max(r['queries'] for r in rows),
+            'sql_ms_total': round(sum(r['sql_ms'] for r in rows), 1),
+            'repeated_requests': sum(1 for r in rows if r.get('repeated')),
+            'top_repeated': repeated.most_common(3),
+        })
+    return summary
+
+
+class Command(BaseCommand):
+    help = 'Report endpoints with the most queries / SQL time from sampled request profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=20,
+            help='Number of endpoints to show (default: 20)',
+        )
+        parser.add_argument(
+            '--sort',
+            choices=sorted(SORT_KEYS),
+            default='sql_time',
+            help='Ranking: total SQL time, average queries, p95 duration or requests with repeated queries',
+        )
+        parser.add_argument(
+            '--hours',
+            type=float,
+            help='Only include samples from the last N hours',
+        )
+        parser.add_argument(
+            '--store',
+            type=str,
+            help='Profile store path (default: QUERY_PROFILE_STORE)',
+        )
+        parser.add_argument(
+            '--repeated',
+            action='store_true',
+            help='Show the most repeated SQL statements per endpoint',
+        )
+
+    def handle(self, *args, **options):
+        path = options.get('store') or get_store_path()
+        samples = iter_samples(path)
+        if options.get('hours'):
+            cutoff = time.time() - options['hours'] * 3600
+            samples = (s for s in samples if s.get('timestamp', 0) >= cutoff)
+
+        summary = summarize(samples)
+        if not summary:
+            self.stdout.write(self.style.WARNING(
+                f'No samples in {path}. Is QUERY_INSTRUMENTATION_ENABLED set?'
+            ))
+            return
+
+        summary.sort(key=SORT_KEYS[options['sort']], reverse=True)
+        total = sum(s['requests'] for s in summary)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} sampled requests across {len(summary)} endpoints (sorted by {options["sort"]})\n'
+        ))
+        self.stdout.write(
+            f'{"Endpoint":<60} {"Reqs":>6} {"Avg ms":>8} {"p95 ms":>8} '
+            f'{"Avg Q":>7} {"Max Q":>6} {"SQL ms":>10} {"Rep":>5}'
+        )
+        self.stdout.write('-' * 116)
+        for s in summary[:options['top']]:
+            self.stdout.write(
+                f'{s["endpoint"][:60]:<60} {s["requests"]:>6} {s["avg_ms"]:>8} {s["p95_ms"]:>8} '
+                f'{s["avg_queries"]:>7} {s["max_queries"]:>6} {s["sql_ms_total"]:>10} '
+                f'{s["repeated_requests"]:>5}'
+            )
+            if options['repeated']:
+                for sql, count in s['top_repeated']:
+                    self.stdout.write(self.style.WARNING(f'    x{count}: {sql[:100]}'))
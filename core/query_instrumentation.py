@@ -0,0 +1,245 @@
+"""
+Query Instrumentation for YEA Poultry Management System.
+
+Opt-in, sampled per-request profiling of database and cache work:
+
+1. QueryInstrumentationMiddleware wraps every database connection with
+   ``connection.execute_wrapper`` for a sampled fraction of requests
+   (works with DEBUG off, unlike ``connection.queries``) and records:
+   - query count and total SQL time
+   - repeated statements (same SQL, any parameters - the N+1 signature)
+     and identical queries (same SQL and parameters)
+   - analytics cache hits/stale/misses reported by
+     core.cache_utils.cached_with_stale
+2. Each profiled response gets a ``Server-Timing`` header (visible in the
+   browser's network panel), e.g.
+       Server-Timing: app;dur=412.5, db;dur=380.2;desc="57 queries", cache;desc="2 hit 1 miss"
+3. A structured log line is written per profiled request (WARNING when the
+   request is slow or repeats a statement past the threshold), and the
+   sample is appended as one JSON line to the local profile store
+   (QUERY_PROFILE_STORE, rotated by size).
+4. ``manage.py query_profile_report`` aggregates the store per endpoint and
+   lists the top offenders.
+
+Settings (see core/settings.py):
+    QUERY_INSTRUMENTATION_ENABLED         off by default
+    QUERY_INSTRUMENTATION_SAMPLE_RATE     fraction of requests profiled
+    QUERY_INSTRUMENTATION_SLOW_MS         log threshold for slow requests
+    QUERY_INSTRUMENTATION_REPEAT_THRESHOLD  executions of one statement
+                                          reported as a repeated query
+    QUERY_PROFILE_STORE                   path of the JSON-lines store
+
+Queries run on other threads (e.g. parallel analytics sections) use their
+own connections and are not counted.
+"""
+
+import hashlib
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Samples go to their own logger so the store only holds JSON lines
+sample_logger = logging.getLogger('core.query_instrumentation.samples')
+sample_logger.propagate = False
+
+DEFAULT_SAMPLE_RATE = 0.01
+DEFAULT_SLOW_MS = 1000
+DEFAULT_REPEAT_THRESHOLD = 5
+STORE_MAX_BYTES = 20 * 1024 * 1024
+STORE_BACKUP_COUNT = 5
+
+# Repeated statements kept per sample, and SQL characters kept per statement
+MAX_REPORTED_STATEMENTS = 5
+MAX_SQL_LENGTH = 300
+
+_current_profile: ContextVar[Optional['RequestProfile']] = ContextVar('query_profile', default=None)
+
+
+class RequestProfile:
+    """Database and cache work of one request (an ``execute_wrapper`` callable)."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.statements = Counter()
+        self.identical = Counter()
+        self.cache = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_ms += (time.perf_counter() - started) * 1000
+            self.queries += 1
+            self.statements[sql] += 1
+            if not many:
+                self.identical[(sql, _params_digest(params))] += 1
+
+    def repeated_statements(self, threshold: int):
+        """Statements executed at least ``threshold`` times, most frequent first."""
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+    def identical_queries(self) -> int:
+        """Executions that repeated an earlier query with the same parameters."""
+        return sum(count - 1 for count in self.identical.values() if count > 1)
+
+
+def _params_digest(params) -> str:
+    return hashlib.sha1(repr(params).encode('utf-8', 'replace')).hexdigest()
+
+
+def count_cache_lookup(outcome: str) -> None:
+    """Count a cache lookup outcome against the request being profiled, if any."""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.cache[outcome] += 1
+
+
+# =============================================================================
+# SAMPLE STORE
+# =============================================================================
+
+def get_store_path() -> Path:
+    return Path(getattr(settings, 'QUERY_PROFILE_STORE', Path(settings.BASE_DIR) / 'logs' / 'query_profiles.jsonl'))
+
+
+def _ensure_store_handler() -> None:
+    if sample_logger.handlers:
+        return
+    path = get_store_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handler = RotatingFileHandler(
+        path, maxBytes=STORE_MAX_BYTES, backupCount=STORE_BACKUP_COUNT, encoding='utf-8'
+    )
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    sample_logger.addHandler(handler)
+    sample_logger.setLevel(logging.INFO)
+
+
+def store_sample(sample: Dict[str, Any]) -> None:
+    """Append one sample to the local profile store. Never raises."""
+    try:
+        _ensure_store_handler()
+        sample_logger.info(json.dumps(sample, default=str))
+    except Exception as e:
+        logger.debug(f"Failed to store query profile sample: {e}")
+
+
+def iter_samples(path: Optional[Path] = None):
+    """Yield stored samples, oldest rotated file first."""
+    path = Path(path or get_store_path())
+    files = [path.with_name(f'{path.name}.{i}') for i in range(STORE_BACKUP_COUNT, 0, -1)] + [path]
+    for file in files:
+        if not file.exists():
+            continue
+        with open(file, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+# =============================================================================
+# MIDDLEWARE
+# =============================================================================
+
+def _endpoint(request) -> str:
+    match = getattr(request, 'resolver_match', None)
+    route = getattr(match, 'route', None)
+    return f"{request.method} /{route.lstrip('^')}" if route else f'{request.method} {request.path}'
+
+
+def server_timing(sample: Dict[str, Any]) -> str:
+    """Server-Timing header value for a sample."""
+    cache = sample['cache']
+    cache_desc = ' '.join(f'{count} {outcome}' for outcome, count in sorted(cache.items())) or 'none'
+    return (
+        f"app;dur={sample['duration_ms']}, "
+        f"db;dur={sample['sql_ms']};desc=\"{sample['queries']} queries\", "
+        f"cache;desc=\"{cache_desc}\""
+    )
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Profile a sample of requests: query count, SQL time, repeated queries
+    and cache lookups (see module docstring).
+
+    Removed from the middleware chain unless QUERY_INSTRUMENTATION_ENABLED.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSTRUMENTATION_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'QUERY_INSTRUMENTATION_SAMPLE_RATE', DEFAULT_SAMPLE_RATE)
+        self.slow_ms = getattr(settings, 'QUERY_INSTRUMENTATION_SLOW_MS', DEFAULT_SLOW_MS)
+        self.repeat_threshold = getattr(
+            settings, 'QUERY_INSTRUMENTATION_REPEAT_THRESHOLD', DEFAULT_REPEAT_THRESHOLD
+        )
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        sample = self._sample(request, response, profile, duration_ms)
+        response['Server-Timing'] = server_timing(sample)
+        self._log(sample)
+        store_sample(sample)
+        return response
+
+    def _sample(self, request, response, profile, duration_ms) -> Dict[str, Any]:
+        return {
+            'timestamp': time.time(),
+            'endpoint': _endpoint(request),
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 1),
+            'queries': profile.queries,
+            'sql_ms': round(profile.sql_ms, 1),
+            'identical_queries': profile.identical_queries(),
+            'repeated': [
+                {'sql': sql[:MAX_SQL_LENGTH], 'count': count}
+                for sql, count in profile.repeated_statements(self.repeat_threshold)[:MAX_REPORTED_STATEMENTS]
+            ],
+            'cache': dict(profile.cache),
+        }
+
+    def _log(self, sample: Dict[str, Any]) -> None:
+        level = logging.WARNING if (
+            sample['duration_ms'] >= self.slow_ms or sample['repeated']
+        ) else logging.INFO
+        logger.log(
+            level,
+            f"{sample['endpoint']} {sample['status']}: {sample['duration_ms']}ms, "
+            f"{sample['queries']} queries ({sample['sql_ms']}ms SQL), "
+            f"{len(sample['repeated'])} repeated statement(s)",
+            extra={'query_profile': sample},
+        )
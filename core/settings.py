@@ -93,6 +93,20 @@ CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', 'redis://localhost:63
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
 
 
+# =============================================================================
+# QUERY INSTRUMENTATION (Opt-in request profiling)
+# =============================================================================
+# Profiles a sample of requests (query count, SQL time, repeated queries,
+# cache hits) - see core/query_instrumentation.py.
+# Report: python manage.py query_profile_report
+
+QUERY_INSTRUMENTATION_ENABLED = os.getenv('QUERY_INSTRUMENTATION_ENABLED', 'False') == 'True'
+QUERY_INSTRUMENTATION_SAMPLE_RATE = float(os.getenv('QUERY_INSTRUMENTATION_SAMPLE_RATE', 0.01))
+QUERY_INSTRUMENTATION_SLOW_MS = int(os.getenv('QUERY_INSTRUMENTATION_SLOW_MS', 1000))
+QUERY_INSTRUMENTATION_REPEAT_THRESHOLD = int(os.getenv('QUERY_INSTRUMENTATION_REPEAT_THRESHOLD', 5))
+QUERY_PROFILE_STORE = os.getenv('QUERY_PROFILE_STORE', str(BASE_DIR / 'logs' / 'query_profiles.jsonl'))
+
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -104,6 +118,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'django.contrib.sites',  # Required for allauth
     'django.contrib.gis',  # PostGIS support for geospatial data
+    'django.contrib.postgres',  # Full-text search & trigram lookups
     
     # Third-party apps
     'rest_framework',
@@ -150,6 +165,7 @@ SITE_ID = 1  # Required for django.contrib.sites
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.query_instrumentation.QueryInstrumentationMiddleware',  # No-op unless QUERY_INSTRUMENTATION_ENABLED
     'corsheaders.middleware.CorsMiddleware',  # CORS before CommonMiddleware
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -366,7 +382,7 @@ GUARDIAN_RAISE_403 = True  # Raise exception on permission denied
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',  # JWTAuthentication + principal cache
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -402,6 +418,11 @@ SIMPLE_JWT = {
     'TOKEN_TYPE_CLAIM': 'token_type',
 }
 
+# Seconds an authenticated user (with their farm) is cached between requests.
+# Saves of the user or farm and blacklisted tokens invalidate it at once
+# (see accounts/request_context.py).
+PRINCIPAL_CACHE_TTL = int(os.getenv('PRINCIPAL_CACHE_TTL', 60))
+
 
 # =============================================================================
 # CORS SETTINGS
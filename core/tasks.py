@@ -206,27 +206,63 @@ def backup_critical_data():
         return {'status': 'error', 'error': str(exc)}
 
 
+# Read-through caches whose entries carry dependency tags
+STALE_CACHE_PATTERNS = [
+    'national_admin:*',
+    'dashboard:*',
+    'platform_revenue:*',
+    'farmer_analytics:*',
+    'public_marketplace:*',
+]
+
+# Keys written by older releases that nothing reads any more
+LEGACY_CACHE_PATTERNS = [
+    'dashboard:production_trend_*',
+    'report:*:daily',
+]
+
+
 @shared_task
 def purge_stale_cache():
     """
     Purge stale cache entries.
     
-    Clears old cached data that may be outdated.
+    Scans (Redis SCAN, never KEYS) the tagged analytics/marketplace caches
+    and deletes entries invalidated by a tag bump that no reader has
+    refreshed, plus keys left behind by older releases.
     """
-    from django.core.cache import cache
+    from core.cache_utils import delete_cache_pattern, purge_stale_entries
     
     logger.info("Purging stale cache entries...")
     
-    stale_patterns = [
-        'dashboard:production_trend_*',
-        'report:*:daily',
-    ]
+    try:
+        legacy = sum(delete_cache_pattern(pattern) for pattern in LEGACY_CACHE_PATTERNS)
+        result = purge_stale_entries(STALE_CACHE_PATTERNS)
+    except NotImplementedError as exc:
+        logger.info(f"Stale cache purge skipped: {exc}")
+        return {'status': 'skipped', 'reason': str(exc)}
+    
+    logger.info(
+        f"Stale cache purge completed: {result['purged']} of {result['scanned']} "
+        f"entries purged, {legacy} legacy keys deleted"
+    )
+    return {'status': 'completed', 'legacy_deleted': legacy, **result}
+
+
+@shared_task
+def purge_expired_idempotency_keys():
+    """
+    Delete expired idempotency records.
     
-    # Note: Django's cache doesn't support pattern deletion natively
-    # This is a placeholder - in production with Redis, use scan_iter
+    Removes stored responses past their TTL in chunks through the
+    expires_at index (see core.idempotency); their cache entries have
+    already expired on their own.
+    """
+    from core.idempotency import purge_expired_keys
     
-    logger.info("Stale cache purge completed (placeholder)")
-    return {'status': 'completed'}
+    deleted = purge_expired_keys()
+    logger.info(f"Idempotency purge completed: {deleted} expired keys deleted")
+    return {'status': 'completed', 'deleted': deleted}
 
 
 @shared_task
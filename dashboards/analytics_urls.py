@@ -27,6 +27,8 @@ from .analytics_views import (
     ProductionComparisonView,
     FarmRankingView,
     GeographicHierarchyView,
+    FarmMapClustersView,
+    FarmMapTileView,
     
     # Egg Production Analytics
     EggProductionOverviewView,
@@ -101,6 +103,10 @@ urlpatterns = [
     # Geographic hierarchy for drill-down navigation
     path('geographic/hierarchy/', GeographicHierarchyView.as_view(), name='geographic-hierarchy'),
     
+    # Clustered farm map (viewport, and per XYZ tile)
+    path('geographic/map/clusters/', FarmMapClustersView.as_view(), name='farm-map-clusters'),
+    path('geographic/map/tiles/<int:z>/<int:x>/<int:y>/', FarmMapTileView.as_view(), name='farm-map-tile'),
+    
     # ==========================================================================
     # EGG PRODUCTION ANALYTICS - Comprehensive egg production analysis
     # ==========================================================================
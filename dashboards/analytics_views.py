@@ -442,6 +442,74 @@ class GeographicHierarchyView(APIView):
         return Response(data, status=status.HTTP_200_OK)
 
 
+class FarmMapClustersView(APIView):
+    """
+    GET /api/admin/analytics/geographic/map/clusters/
+    
+    Server-side clustered farm points for a map viewport, with production
+    and mortality aggregates per cell.
+    
+    Query params:
+        - bbox: west,south,east,north in degrees (required)
+        - zoom: Map zoom level 0-18 (required)
+        - days: Period for production data, 1-365 (default: 30)
+    """
+    permission_classes = [IsYEAAdmin]
+    
+    def get(self, request):
+        from .services.map_tiles import parse_period_days
+        
+        service = YEAAnalyticsService(user=request.user)
+        
+        try:
+            bbox = tuple(float(v) for v in request.query_params.get('bbox', '').split(','))
+            zoom = int(request.query_params['zoom'])
+            if len(bbox) != 4:
+                raise ValueError
+        except (KeyError, ValueError):
+            return Response(
+                {'error': 'bbox (west,south,east,north) and zoom are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            days = parse_period_days(request.query_params.get('days'))
+        except ValueError:
+            return Response({'error': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            data = service.get_farm_map_clusters(bbox=bbox, zoom=zoom, period_days=days)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class FarmMapTileView(APIView):
+    """
+    GET /api/admin/analytics/geographic/map/tiles/{z}/{x}/{y}/
+    
+    Clustered farm cells of one XYZ tile, for tile-based map layers.
+    
+    Query params:
+        - days: Period for production data, 1-365 (default: 30)
+    """
+    permission_classes = [IsYEAAdmin]
+    
+    def get(self, request, z, x, y):
+        from .services.map_tiles import MAX_ZOOM, MIN_ZOOM, parse_period_days
+        
+        if not (MIN_ZOOM <= z <= MAX_ZOOM) or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            return Response({'error': 'Invalid tile coordinates'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            days = parse_period_days(request.query_params.get('days'))
+        except ValueError:
+            return Response({'error': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        service = YEAAnalyticsService(user=request.user)
+        data = service.get_map_tile(z, x, y, period_days=days)
+        return Response(data, status=status.HTTP_200_OK)
+
+
 # =============================================================================
 # EGG PRODUCTION ANALYTICS ENDPOINTS
 # =============================================================================
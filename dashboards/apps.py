@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class DashboardsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "dashboards"
+    
+    def ready(self):
+        """Import signals to invalidate cached farmer analytics on writes."""
+        import dashboards.signals  # noqa: F401
@@ -0,0 +1,575 @@
+"""
+Analytics Cache Registry
+
+Declarative list of every cacheable analytics report. The registry is the
+single place that knows a report's cache key, parameter schema, TTLs and the
+geographic scopes it is pre-computed for, so the services that read the
+cache, the views, and the Celery warm-up tasks all agree on the same keys.
+
+Canonical keys:
+    {namespace}:{report}[:{user scope}]:{param1}:{param2}:...
+
+Every parameter in the schema is always present (missing values use the
+declared default, None becomes '_'), and strings are lower-cased with
+whitespace collapsed, so ``region='Greater Accra'`` from a view and
+``region='greater accra'`` from a task hit the same entry. Reports whose
+data depends on the requesting user's role (``scoped=True``) add the
+service's ``cache_scope`` segment.
+
+Reads go through core.cache_utils.cached_with_stale: entries are fresh for
+``ttl`` and then served stale for up to ``stale_ttl`` while one worker
+refreshes them in the background, so an expiring key never triggers a
+recompute stampede.
+
+Invalidation:
+    Each report declares the kinds of data it ``depends_on`` (production,
+    mortality, sales, ...). Its entries carry one tag per kind, narrowed to
+    the report's region, or to the calendar months its date window covers:
+
+        analytics:{kind}                  national, all-time reports
+        analytics:{kind}:region={region}  region-filtered reports
+        analytics:{kind}:month={YYYY-MM}  national reports over a date window
+
+    dashboards.signals bumps the matching tags when a record of that kind is
+    written (see analytics_cache_tags), so TTLs can be long while dashboards
+    still reflect new data within one refresh.
+
+Metrics:
+    Per-report hit/stale/miss counters are kept in the cache
+    (``analytics_cache_stats:{report}:hits|stale|misses``) and exposed
+    through get_cache_stats(). The warm-up tasks record per-report timings
+    of their latest run (get_warmup_runs()).
+
+Usage:
+    from dashboards.cache_registry import cached_report, warm_report
+
+    class SomeService:
+        @cached_report('production_overview')
+        def get_production_overview(self, region=None, constituency=None, days=30):
+            ...
+
+    warm_report('executive_dashboard', service, region='Ashanti')
+"""
+
+import functools
+import inspect
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.cache_utils import (
+    LOOKUP_HIT,
+    LOOKUP_MISS,
+    LOOKUP_STALE,
+    cached_with_stale,
+    set_cached,
+)
+
+logger = logging.getLogger(__name__)
+
+# Cache TTL settings (seconds)
+CACHE_TTL = {
+    'short': 300,        # 5 minutes - for frequently changing data
+    'medium': 1800,      # 30 minutes - for moderately dynamic data
+    'long': 3600,        # 1 hour - for stable aggregate data
+    'daily': 86400,      # 24 hours - for historical/computed data
+}
+
+# Stale entries stay servable (while refreshing) for a day, so entries
+# pre-computed by the nightly warm-up keep producing hits until the next run
+DEFAULT_STALE_TTL = CACHE_TTL['daily']
+
+# Geographic scopes a report can be pre-computed for
+SCOPE_NATIONAL = 'national'
+SCOPE_REGION = 'region'
+
+# Kinds of data a report depends on (invalidation tags)
+DATA_FARMS = 'farms'
+DATA_PRODUCTION = 'production'
+DATA_MORTALITY = 'mortality'
+DATA_SALES = 'sales'
+DATA_ORDERS = 'orders'
+DATA_SUBSCRIPTIONS = 'subscriptions'
+
+TAG_PREFIX = 'analytics'
+# Parameters holding a report's date window, and days per unit
+WINDOW_PARAMS = {'days': 1, 'period_days': 1, 'months': 31}
+
+STATS_KEY_PREFIX = 'analytics_cache_stats'
+WARMUP_KEY_PREFIX = 'analytics_warmup'
+WARMUP_STATS_TTL = 7 * CACHE_TTL['daily']
+# Warm-up pipelines (dashboards.tasks) whose timings are recorded
+WARMUP_NATIONAL_ADMIN = 'national_admin'
+WARMUP_REGIONAL_DASHBOARD = 'regional_dashboard'
+WARMUP_PIPELINES = (WARMUP_NATIONAL_ADMIN, WARMUP_REGIONAL_DASHBOARD)
+STATS_OUTCOMES = {LOOKUP_HIT: 'hits', LOOKUP_STALE: 'stale', LOOKUP_MISS: 'misses'}
+EMPTY_PARAM = '_'
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _normalize(value: Any) -> str:
+    if value is None or value == '':
+        return EMPTY_PARAM
+    if isinstance(value, str):
+        return _WHITESPACE_RE.sub('_', value.strip().lower())
+    return str(value)
+
+
+def _months(start: date, end: date) -> List[str]:
+    months = []
+    current = start.replace(day=1)
+    while current <= end:
+        months.append(f'{current:%Y-%m}')
+        current = (current + timedelta(days=32)).replace(day=1)
+    return months
+
+
+def analytics_cache_tags(kind: str, region: Optional[str] = None, day: Optional[date] = None) -> List[str]:
+    """
+    Tags to bump when a record of ``kind`` is written.
+
+    Args:
+        kind: One of the DATA_* kinds
+        region: Region of the record's farm, if known
+        day: Date the record falls on, if it has one
+    """
+    tags = [f'{TAG_PREFIX}:{kind}']
+    if region:
+        tags.append(f'{TAG_PREFIX}:{kind}:region={_normalize(region)}')
+    if day:
+        tags.append(f'{TAG_PREFIX}:{kind}:month={day:%Y-%m}')
+    return tags
+
+
+@dataclass(frozen=True)
+class AnalyticsReport:
+    """
+    A cacheable analytics report.
+
+    Attributes:
+        name: Report name, also the second segment of the cache key
+        params: Ordered parameter schema (matches the service method's
+            argument names and positional order)
+        ttl: Seconds an entry is fresh
+        stale_ttl: Extra seconds a stale entry is served while refreshing
+        scopes: Geographic scopes the warm-up task pre-computes
+        defaults: Values used for parameters that are not supplied
+        method: Service method producing the report
+        namespace: First segment of the cache key
+        scoped: Key includes the service's ``cache_scope`` (role-based
+            filtering done by the service rather than by parameters)
+        depends_on: DATA_* kinds whose writes invalidate the report
+        composite: Built from other registered reports; warm-up computes
+            it after them so it reads their fresh entries
+    """
+    name: str
+    params: Tuple[str, ...] = ()
+    ttl: int = CACHE_TTL['medium']
+    stale_ttl: int = DEFAULT_STALE_TTL
+    scopes: Tuple[str, ...] = ()
+    defaults: Dict[str, Any] = field(default_factory=dict)
+    method: Optional[str] = None
+    namespace: str = 'national_admin'
+    scoped: bool = False
+    depends_on: Tuple[str, ...] = ()
+    composite: bool = False
+
+    def bind(self, *args, **kwargs) -> Dict[str, Any]:
+        """Map positional/keyword arguments onto the schema, filling defaults."""
+        if len(args) > len(self.params):
+            raise TypeError(f"{self.name} takes at most {len(self.params)} parameters")
+        unknown = set(kwargs) - set(self.params)
+        if unknown:
+            raise TypeError(f"{self.name} got unexpected parameters: {', '.join(sorted(unknown))}")
+
+        bound = dict(zip(self.params, args))
+        for param in self.params:
+            if param not in bound:
+                bound[param] = kwargs.get(param, self.defaults.get(param))
+        return bound
+
+    def cache_key(self, *args, scope: Optional[str] = None, **kwargs) -> str:
+        """Canonical cache key for the given parameters (and user scope)."""
+        bound = self.bind(*args, **kwargs)
+        parts = [self.namespace, self.name]
+        if self.scoped:
+            parts.append(_normalize(scope or SCOPE_NATIONAL))
+        parts += [_normalize(bound[p]) for p in self.params]
+        return ':'.join(parts)
+
+    def cache_tags(self, *args, scope: Optional[str] = None, **kwargs) -> List[str]:
+        """
+        Invalidation tags for the given parameters (and user scope).
+
+        Region-filtered entries depend on the region's tags; national
+        entries over a date window on the month tags the window (and the
+        previous period reports compare against) covers. Anything else,
+        including constituency-filtered entries, depends on the kind's
+        national tag.
+        """
+        if not self.depends_on:
+            return []
+        bound = self.bind(*args, **kwargs)
+
+        region = bound.get('region')
+        constituency = bound.get('constituency')
+        if self.scoped and scope:
+            field_name, _, value = scope.partition('=')
+            if field_name == 'region':
+                region = value
+            elif field_name == 'constituency':
+                constituency = value
+
+        window = sum(
+            (bound.get(param) or 0) * unit
+            for param, unit in WINDOW_PARAMS.items() if param in bound
+        )
+
+        if constituency:
+            return [f'{TAG_PREFIX}:{kind}' for kind in self.depends_on]
+        if region:
+            return [f'{TAG_PREFIX}:{kind}:region={_normalize(region)}' for kind in self.depends_on]
+        if window:
+            today = timezone.localdate()
+            months = _months(today - timedelta(days=2 * int(window)), today)
+            return [f'{TAG_PREFIX}:{kind}:month={month}' for kind in self.depends_on for month in months]
+        return [f'{TAG_PREFIX}:{kind}' for kind in self.depends_on]
+
+
+def _reports(*reports: AnalyticsReport) -> Dict[str, AnalyticsReport]:
+    return {report.name: report for report in reports}
+
+
+def _yea(name, params=(), **options) -> AnalyticsReport:
+    """YEA admin dashboard report (YEAAnalyticsService.get_<name>, role-scoped)."""
+    return AnalyticsReport(
+        f'yea_{name}', params, method=f'get_{name}', namespace='dashboard', scoped=True, **options
+    )
+
+
+def _platform(name, params=(), **options) -> AnalyticsReport:
+    """Platform revenue report (PlatformRevenueService.get_<name>)."""
+    return AnalyticsReport(
+        f'platform_{name}', params, method=f'get_{name}', namespace='platform_revenue', **options
+    )
+
+
+GEO = ('region', 'constituency')
+NATIONAL_ONLY = (SCOPE_NATIONAL,)
+NATIONAL_AND_REGION = (SCOPE_NATIONAL, SCOPE_REGION)
+
+FARMS = (DATA_FARMS,)
+PRODUCTION = (DATA_PRODUCTION,)
+FLOCK_HEALTH = (DATA_MORTALITY, DATA_PRODUCTION)
+MARKET = (DATA_SALES, DATA_ORDERS)
+ALL_FARM_DATA = (DATA_FARMS, DATA_PRODUCTION, DATA_MORTALITY, DATA_SALES, DATA_ORDERS)
+
+ANALYTICS_REPORTS: Dict[str, AnalyticsReport] = _reports(
+    # Drill-down helpers
+    AnalyticsReport(
+        'regions', ttl=CACHE_TTL['daily'], method='_get_available_regions', depends_on=FARMS,
+    ),
+    AnalyticsReport(
+        'constituencies', ('region',), ttl=CACHE_TTL['daily'],
+        method='_get_constituencies_in_region', depends_on=FARMS,
+    ),
+    AnalyticsReport(
+        'drill_down_options', ('region',), ttl=CACHE_TTL['daily'],
+        method='get_drill_down_options', scopes=NATIONAL_ONLY, depends_on=FARMS,
+    ),
+    AnalyticsReport(
+        'farms_list', GEO + ('page', 'page_size'),
+        defaults={'page': 1, 'page_size': 20}, method='get_farms_in_scope', depends_on=FARMS,
+    ),
+
+    # National Admin / Minister reports (NationalAdminAnalyticsService)
+    AnalyticsReport(
+        'executive_dashboard', GEO,
+        method='get_executive_dashboard', scopes=NATIONAL_AND_REGION, depends_on=ALL_FARM_DATA,
+        composite=True,
+    ),
+    AnalyticsReport(
+        'program_performance', GEO, ttl=CACHE_TTL['long'],
+        method='get_program_performance_overview', scopes=NATIONAL_ONLY, depends_on=FARMS,
+    ),
+    AnalyticsReport(
+        'enrollment_trend', ('months',) + GEO, ttl=CACHE_TTL['daily'],
+        defaults={'months': 12},
+        method='get_enrollment_trend', scopes=NATIONAL_ONLY, depends_on=FARMS,
+    ),
+    AnalyticsReport(
+        'production_overview', GEO + ('days',), ttl=CACHE_TTL['long'], defaults={'days': 30},
+        method='get_production_overview', scopes=NATIONAL_AND_REGION, depends_on=PRODUCTION,
+    ),
+    AnalyticsReport(
+        'regional_production_comparison', ttl=CACHE_TTL['daily'],
+        method='get_regional_production_comparison', scopes=NATIONAL_ONLY, depends_on=PRODUCTION,
+    ),
+    AnalyticsReport(
+        'financial_overview', GEO + ('days',), ttl=CACHE_TTL['long'], defaults={'days': 30},
+        method='get_financial_overview', scopes=NATIONAL_AND_REGION, depends_on=MARKET,
+    ),
+    AnalyticsReport(
+        'flock_health', GEO + ('days',), ttl=CACHE_TTL['long'], defaults={'days': 30},
+        method='get_flock_health_overview', scopes=NATIONAL_ONLY, depends_on=FLOCK_HEALTH,
+    ),
+    AnalyticsReport(
+        'food_security', GEO, ttl=CACHE_TTL['long'],
+        method='get_food_security_metrics', scopes=NATIONAL_ONLY,
+        depends_on=(DATA_PRODUCTION, DATA_SALES),
+    ),
+    AnalyticsReport(
+        'procurement', GEO + ('days',), defaults={'days': 90},
+        method='get_procurement_overview',
+    ),
+    AnalyticsReport(
+        'farmer_welfare', GEO, ttl=CACHE_TTL['daily'],
+        method='get_farmer_welfare_metrics', scopes=NATIONAL_ONLY, depends_on=FARMS + MARKET,
+    ),
+    AnalyticsReport(
+        'operational', GEO,
+        method='get_operational_metrics', scopes=NATIONAL_ONLY, depends_on=FARMS,
+    ),
+
+    # YEA admin dashboard (YEAAnalyticsService)
+    _yea('executive_overview', scopes=NATIONAL_AND_REGION, depends_on=ALL_FARM_DATA),
+    _yea('application_pipeline', scopes=NATIONAL_ONLY, depends_on=FARMS),
+    _yea('registration_trend', ('months',), defaults={'months': 6}, ttl=CACHE_TTL['daily'],
+         depends_on=FARMS),
+    _yea('farms_by_region', ttl=CACHE_TTL['daily'], depends_on=FARMS),
+    _yea('batch_enrollment_stats', ttl=CACHE_TTL['long'], depends_on=FARMS),
+    _yea('production_overview', ttl=CACHE_TTL['long'], scopes=NATIONAL_ONLY, depends_on=PRODUCTION),
+    _yea('production_trend', ('days',), defaults={'days': 30}, ttl=CACHE_TTL['long'],
+         scopes=NATIONAL_ONLY, depends_on=PRODUCTION),
+    _yea('production_by_region', ttl=CACHE_TTL['daily'], depends_on=PRODUCTION),
+    _yea('top_performing_farms', ('limit',), defaults={'limit': 10}, ttl=CACHE_TTL['long'],
+         depends_on=PRODUCTION),
+    _yea('underperforming_farms', ('limit',), defaults={'limit': 10}, ttl=CACHE_TTL['long'],
+         depends_on=PRODUCTION),
+    _yea('marketplace_activity', scopes=NATIONAL_ONLY, depends_on=MARKET),
+    _yea('sales_by_region', ttl=CACHE_TTL['daily'], depends_on=MARKET),
+    _yea('top_selling_farmers', ('limit',), defaults={'limit': 10}, ttl=CACHE_TTL['long'],
+         depends_on=MARKET),
+    # Alerts also change with the passage of time (missed reports), keep them short
+    _yea('alerts', ttl=CACHE_TTL['short'], stale_ttl=CACHE_TTL['long'], scopes=NATIONAL_ONLY,
+         depends_on=FLOCK_HEALTH),
+    _yea('watchlist', ('limit',), defaults={'limit': 20}, ttl=CACHE_TTL['short'],
+         stale_ttl=CACHE_TTL['long'], scopes=NATIONAL_ONLY, depends_on=FLOCK_HEALTH),
+    _yea('geographic_hierarchy', ttl=CACHE_TTL['daily'], depends_on=FARMS),
+    _yea('map_tile', ('zoom', 'x', 'y', 'period_days'), defaults={'period_days': 30},
+         ttl=CACHE_TTL['long'], depends_on=FARMS + FLOCK_HEALTH),
+    _yea('egg_production_overview', ('period_days',), defaults={'period_days': 30},
+         ttl=CACHE_TTL['long'], depends_on=PRODUCTION),
+    _yea('egg_production_efficiency', ('period_days',), defaults={'period_days': 30},
+         ttl=CACHE_TTL['long'], depends_on=PRODUCTION),
+    _yea('egg_defect_analysis', ('period_days',), defaults={'period_days': 30},
+         ttl=CACHE_TTL['long'], depends_on=PRODUCTION),
+
+    # Platform revenue (PlatformRevenueService, SUPER_ADMIN only)
+    _platform('revenue_overview', ttl=CACHE_TTL['short'], depends_on=(DATA_SUBSCRIPTIONS,)),
+    _platform('revenue_trend', ('months',), defaults={'months': 6}, ttl=CACHE_TTL['long']),
+    _platform('advertising_performance'),
+    _platform('partner_payments', ('status',), ttl=CACHE_TTL['short']),
+    _platform('marketplace_activation_stats', depends_on=(DATA_SUBSCRIPTIONS, DATA_FARMS)),
+)
+
+# Older report type names accepted by the on-demand/refresh endpoints
+REPORT_ALIASES = {
+    'production': 'production_overview',
+    'financial': 'financial_overview',
+    'regional_comparison': 'regional_production_comparison',
+}
+
+
+def get_report(name: str) -> AnalyticsReport:
+    """Look up a registered report by name (or legacy alias)."""
+    try:
+        return ANALYTICS_REPORTS[REPORT_ALIASES.get(name, name)]
+    except KeyError:
+        raise KeyError(f"Unknown analytics report: {name}") from None
+
+
+def reports_for_scope(scope: str, namespace: str = 'national_admin') -> List[AnalyticsReport]:
+    """Reports in a namespace that the warm-up tasks pre-compute at the given scope."""
+    return [
+        report for report in ANALYTICS_REPORTS.values()
+        if scope in report.scopes and report.namespace == namespace
+    ]
+
+
+def report_name_for_key(key: str) -> Optional[str]:
+    """Inverse of AnalyticsReport.cache_key() for the report name."""
+    parts = key.split(':', 2)
+    if len(parts) >= 2 and parts[1] in ANALYTICS_REPORTS:
+        return parts[1]
+    return None
+
+
+# =============================================================================
+# READ-THROUGH CACHING
+# =============================================================================
+
+def get_or_compute(name: str, compute, *args, scope: Optional[str] = None, **kwargs) -> Any:
+    """
+    Serve a registered report from the cache, computing it at most once at
+    a time (stale-while-revalidate, background refresh, hit/miss metrics).
+    """
+    report = get_report(name)
+    return cached_with_stale(
+        report.cache_key(*args, scope=scope, **kwargs),
+        compute,
+        ttl=report.ttl,
+        stale_ttl=report.stale_ttl,
+        tags=report.cache_tags(*args, scope=scope, **kwargs),
+        background=True,
+        on_lookup=lambda outcome: record_lookup(report.name, outcome),
+    )
+
+
+def cached_report(name: str):
+    """
+    Cache a service method as a registered report.
+
+    The method's arguments are bound to the report's parameter schema to
+    build the canonical key. The service may define:
+        use_cache: False recomputes and rewrites the entry (warm-up/refresh)
+        cache_scope: user scope segment for ``scoped`` reports
+    """
+    report = get_report(name)
+
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = {param: bound.arguments[param] for param in report.params}
+            scope = getattr(self, 'cache_scope', None)
+
+            def compute():
+                return method(self, *args, **kwargs)
+
+            if not getattr(self, 'use_cache', True):
+                value = compute()
+                set_cached(
+                    report.cache_key(scope=scope, **params), value, report.ttl, report.stale_ttl,
+                    tags=report.cache_tags(scope=scope, **params),
+                )
+                return value
+
+            return get_or_compute(report.name, compute, scope=scope, **params)
+
+        return wrapper
+
+    return decorator
+
+
+# =============================================================================
+# WARM-UP
+# =============================================================================
+
+def warm_report(name: str, service, **params) -> Tuple[str, Any]:
+    """
+    Compute a report through its service method and store it under the
+    canonical key that request-path reads use.
+
+    The entry is fresh for the report's ``ttl`` and then keeps being served
+    (stale, refreshed in the background) for ``stale_ttl``.
+
+    The report itself is always recomputed. With ``service.use_cache`` False
+    every report it calls is recomputed (and rewritten) too; with True those
+    are read through the cache, which is how composite reports reuse the
+    entries warmed just before them.
+
+    Args:
+        name: Report name (or legacy alias)
+        service: Service instance providing ``report.method``
+        **params: Report parameters; unspecified ones use the schema defaults
+
+    Returns:
+        (cache_key, data)
+    """
+    report = get_report(name)
+    if not report.method:
+        raise ValueError(f"Report {report.name} has no service method to warm")
+
+    bound = report.bind(**params)
+    method = getattr(service, report.method)
+    if getattr(service, 'use_cache', True):
+        # Bypass this report's own cache lookup only
+        method = functools.partial(inspect.unwrap(getattr(type(service), report.method)), service)
+    data = method(**bound)
+    scope = getattr(service, 'cache_scope', None)
+    key = report.cache_key(scope=scope, **bound)
+    set_cached(key, data, report.ttl, report.stale_ttl, tags=report.cache_tags(scope=scope, **bound))
+    return key, data
+
+
+# =============================================================================
+# HIT / MISS METRICS
+# =============================================================================
+
+def _stats_key(name: str, outcome: str) -> str:
+    return f'{STATS_KEY_PREFIX}:{name}:{outcome}'
+
+
+def record_lookup(name: Optional[str], outcome: str) -> None:
+    """Count a cache lookup outcome (LOOKUP_HIT/STALE/MISS) for a report. Never raises."""
+    if not name or outcome not in STATS_OUTCOMES:
+        return
+    key = _stats_key(name, STATS_OUTCOMES[outcome])
+    try:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+    except Exception as e:
+        logger.debug(f"Failed to record analytics cache stat {key}: {e}")
+
+
+def get_cache_stats(names: Iterable[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Hit/stale/miss counters and hit rate (fresh + stale) for each report."""
+    names = list(names or ANALYTICS_REPORTS)
+    keys = [_stats_key(n, o) for n in names for o in STATS_OUTCOMES.values()]
+    stored = cache.get_many(keys)
+
+    stats = {}
+    for name in names:
+        hits = stored.get(_stats_key(name, 'hits'), 0)
+        stale = stored.get(_stats_key(name, 'stale'), 0)
+        misses = stored.get(_stats_key(name, 'misses'), 0)
+        total = hits + stale + misses
+        stats[name] = {
+            'hits': hits,
+            'stale': stale,
+            'misses': misses,
+            'hit_rate': round((hits + stale) / total * 100, 1) if total else None,
+        }
+    return stats
+
+
+def reset_cache_stats(names: Iterable[str] = None) -> None:
+    """Clear lookup counters (all reports by default)."""
+    names = list(names or ANALYTICS_REPORTS)
+    cache.delete_many([_stats_key(n, o) for n in names for o in STATS_OUTCOMES.values()])
+
+
+# =============================================================================
+# WARM-UP TIMINGS
+# =============================================================================
+
+def record_warmup_run(pipeline: str, summary: Dict[str, Any]) -> None:
+    """Keep the timing summary of the latest warm-up run of a pipeline."""
+    cache.set(f'{WARMUP_KEY_PREFIX}:{pipeline}', summary, timeout=WARMUP_STATS_TTL)
+
+
+def get_warmup_runs(pipelines: Iterable[str] = WARMUP_PIPELINES) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Timing summary of the latest run of each warm-up pipeline (None if unknown)."""
+    pipelines = list(pipelines)
+    stored = cache.get_many([f'{WARMUP_KEY_PREFIX}:{p}' for p in pipelines])
+    return {p: stored.get(f'{WARMUP_KEY_PREFIX}:{p}') for p in pipelines}
@@ -30,6 +30,7 @@ from reportlab.platypus import (
 )
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 
+from accounts.request_context import get_request_farm
 from farms.models import Farm
 from .services.farmer_analytics import FarmerAnalyticsService
 
@@ -41,7 +42,7 @@ class BaseExportView(APIView):
     def get_farm(self, request):
         """Get farm for authenticated user"""
         try:
-            return Farm.objects.get(user=request.user)
+            return get_request_farm(request)
         except Farm.DoesNotExist:
             return None
     
@@ -114,7 +114,7 @@ class ProductionAnalyticsView(BaseFarmerAnalyticsView):
                 'code': 'NO_FARM'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        analytics = service.get_production_analytics(days=days)
+        analytics = service.get_section('production', days)
         analytics['period_days'] = days
         return Response(analytics)
 
@@ -146,7 +146,7 @@ class FlockHealthAnalyticsView(BaseFarmerAnalyticsView):
                 'code': 'NO_FARM'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        analytics = service.get_flock_health_analytics(days=days)
+        analytics = service.get_section('flock_health', days)
         analytics['period_days'] = days
         return Response(analytics)
 
@@ -177,7 +177,7 @@ class FinancialAnalyticsView(BaseFarmerAnalyticsView):
                 'code': 'NO_FARM'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        analytics = service.get_financial_analytics(days=days)
+        analytics = service.get_section('financial', days)
         analytics['period_days'] = days
         return Response(analytics)
 
@@ -208,7 +208,7 @@ class FeedAnalyticsView(BaseFarmerAnalyticsView):
                 'code': 'NO_FARM'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        analytics = service.get_feed_analytics(days=days)
+        analytics = service.get_section('feed', days)
         analytics['period_days'] = days
         return Response(analytics)
 
@@ -239,7 +239,7 @@ class MarketplaceAnalyticsView(BaseFarmerAnalyticsView):
                 'code': 'NO_FARM'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        analytics = service.get_marketplace_analytics(days=days)
+        analytics = service.get_section('marketplace', days)
         analytics['period_days'] = days
         return Response(analytics)
 
@@ -266,7 +266,7 @@ class InventoryAnalyticsView(BaseFarmerAnalyticsView):
                 'code': 'NO_FARM'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        analytics = service.get_inventory_analytics()
+        analytics = service.get_section('inventory')
         return Response(analytics)
 
 
@@ -294,7 +294,7 @@ class BenchmarkAnalyticsView(BaseFarmerAnalyticsView):
                 'code': 'NO_FARM'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        analytics = service.get_benchmark_analytics(days=days)
+        analytics = service.get_section('benchmarks', days)
         analytics['period_days'] = days
         return Response(analytics)
 
@@ -318,10 +318,13 @@ class FarmerAnalyticsSummaryView(BaseFarmerAnalyticsView):
             }, status=status.HTTP_404_NOT_FOUND)
         
         # Get lightweight data
-        production = service.get_production_analytics(days=days)
-        health = service.get_flock_health_analytics(days=days)
-        financial = service.get_financial_analytics(days=days)
-        marketplace = service.get_marketplace_analytics(days=days)
+        sections = service.get_sections(
+            ['production', 'flock_health', 'financial', 'marketplace'], days
+        )
+        production = sections['production']
+        health = sections['flock_health']
+        financial = sections['financial']
+        marketplace = sections['marketplace']
         
         summary = {
             'period_days': days,
@@ -15,10 +15,10 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied
-from django.core.cache import cache
 from django.utils import timezone
 import logging
 
+from .cache_registry import get_cache_stats, get_or_compute, get_warmup_runs
 from .services.national_admin_analytics import NationalAdminAnalyticsService
 from .national_admin_serializers import (
     ExecutiveDashboardSerializer,
@@ -121,15 +121,15 @@ class BaseNationalAdminView(APIView):
         
         return region, constituency
     
-    def get_cache_or_compute(self, cache_key: str, compute_func, ttl: int = 1800):
-        """Try cache first, then compute if needed."""
-        cached = cache.get(cache_key)
-        if cached:
-            return cached
+    def get_cache_or_compute(self, report: str, compute_func, *params):
+        """
+        Serve a registered report from the cache, computing it if needed.
         
-        result = compute_func()
-        cache.set(cache_key, result, timeout=ttl)
-        return result
+        Uses the same canonical key as the service and the warm-up tasks,
+        and the same stampede protection: one request recomputes an
+        expired report while the others are served the stale value.
+        """
+        return get_or_compute(report, compute_func, *params)
 
 
 # =============================================================================
@@ -153,14 +153,9 @@ class ExecutiveDashboardView(BaseNationalAdminView):
     def get(self, request):
         region, constituency = self.get_scope_params(request)
         
-        # Try pre-computed cache first
-        cache_key = f'national_admin:executive_dashboard:{region or "national"}:{constituency or "all"}'
-        
-        def compute():
-            service = self.get_service(request, use_cache=True)
-            return service.get_executive_dashboard(region, constituency)
-        
-        data = self.get_cache_or_compute(cache_key, compute, ttl=300)  # 5 min
+        # Served from the pre-computed cache entry when available
+        service = self.get_service(request, use_cache=True)
+        data = service.get_executive_dashboard(region, constituency)
         
         return Response(data)
 
@@ -488,6 +483,11 @@ class GenerateReportAsyncView(BaseNationalAdminView):
 
 class RefreshCacheView(BaseNationalAdminView):
     """
+    GET /api/reports/refresh-cache/
+    
+    Cache hit/miss statistics per registered report, and per-report
+    timings of the latest nightly warm-up runs.
+    
     POST /api/reports/refresh-cache/
     
     Manually refresh cached reports.
@@ -498,6 +498,19 @@ class RefreshCacheView(BaseNationalAdminView):
     - region: Region to refresh (optional)
     """
     
+    def get(self, request):
+        if request.user.role not in ['SUPER_ADMIN', 'NATIONAL_ADMIN']:
+            return Response(
+                {'error': 'Cache statistics require admin access'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        return Response({
+            'reports': get_cache_stats(),
+            'warmup': get_warmup_runs(),
+            'as_of': timezone.now().isoformat(),
+        })
+    
     def post(self, request):
         if request.user.role not in ['SUPER_ADMIN', 'NATIONAL_ADMIN']:
             return Response(
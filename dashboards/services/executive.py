@@ -13,10 +13,15 @@ from django.utils import timezone
 from datetime import timedelta
 from decimal import Decimal
 
+from core.kpi import aggregate_kpis, count_if, percentage, sum_if
 from farms.models import Farm, FarmReviewAction, FarmApprovalQueue
 from procurement.models import ProcurementOrder, OrderAssignment, ProcurementInvoice
 from accounts.models import User
 
+APPROVED_STATUS = 'Approved - Farm ID Assigned'
+PENDING_REVIEW_STATUSES = ['Constituency Review', 'Regional Review', 'National Review']
+ACTIVE_ORDER_STATUSES = ['published', 'assigning', 'assigned', 'in_progress']
+
 
 class ExecutiveDashboardService:
     """Service for executive dashboard data aggregation"""
@@ -31,45 +36,31 @@ class ExecutiveDashboardService:
         now = timezone.now()
         last_30_days = now - timedelta(days=30)
         
-        # Farm statistics
-        total_farms = Farm.objects.count()
-        approved_farms = Farm.objects.filter(
-            application_status='Approved - Farm ID Assigned'
-        ).count()
-        pending_farms = Farm.objects.filter(
-            application_status__in=[
-                'Constituency Review', 
-                'Regional Review', 
-                'National Review'
-            ]
-        ).count()
-        active_farms = Farm.objects.filter(farm_status='Active').count()
-        
-        # Procurement statistics
-        total_orders = ProcurementOrder.objects.count()
-        active_orders = ProcurementOrder.objects.filter(
-            status__in=['published', 'assigning', 'assigned', 'in_progress']
-        ).count()
-        completed_orders = ProcurementOrder.objects.filter(
-            status='completed'
-        ).count()
-        
-        # Budget and revenue
-        total_budget = ProcurementOrder.objects.aggregate(
-            total=Sum('total_budget')
-        )['total'] or Decimal('0.00')
-        
-        total_spent = ProcurementInvoice.objects.filter(
-            payment_status='paid'
-        ).aggregate(
-            total=Sum('total_amount')
-        )['total'] or Decimal('0.00')
-        
-        pending_payments = ProcurementInvoice.objects.filter(
-            payment_status__in=['pending', 'approved']
-        ).aggregate(
-            total=Sum('total_amount')
-        )['total'] or Decimal('0.00')
+        # One aggregate query per source table
+        farms = aggregate_kpis(
+            Farm.objects.all(),
+            total=count_if(),
+            approved=count_if(application_status=APPROVED_STATUS),
+            pending=count_if(application_status__in=PENDING_REVIEW_STATUSES),
+            active=count_if(farm_status='Active'),
+            new_applications=count_if(application_date__gte=last_30_days),
+            recent_approvals=count_if(approval_date__gte=last_30_days),
+        )
+        orders = aggregate_kpis(
+            ProcurementOrder.objects.all(),
+            total=count_if(),
+            active=count_if(status__in=ACTIVE_ORDER_STATUSES),
+            completed=count_if(status='completed'),
+            recent=count_if(created_at__gte=last_30_days),
+            total_budget=sum_if('total_budget', default=Decimal('0.00')),
+        )
+        invoices = aggregate_kpis(
+            ProcurementInvoice.objects.all(),
+            total_spent=sum_if('total_amount', payment_status='paid', default=Decimal('0.00')),
+            pending_payments=sum_if(
+                'total_amount', payment_status__in=['pending', 'approved'], default=Decimal('0.00')
+            ),
+        )
         
         # Approval workflow
         pending_approvals = FarmApprovalQueue.objects.filter(
@@ -82,47 +73,41 @@ class ExecutiveDashboardService:
             changes_deadline__lt=now
         ).count()
         
-        # Recent activity (last 30 days)
-        new_applications = Farm.objects.filter(
-            application_date__gte=last_30_days
-        ).count()
-        
-        recent_approvals = Farm.objects.filter(
-            approval_date__gte=last_30_days
-        ).count()
-        
-        recent_orders = ProcurementOrder.objects.filter(
-            created_at__gte=last_30_days
-        ).count()
+        total_farms = farms['total']
+        approved_farms = farms['approved']
+        total_orders = orders['total']
+        completed_orders = orders['completed']
+        total_budget = orders['total_budget']
+        total_spent = invoices['total_spent']
         
         return {
             'farms': {
                 'total': total_farms,
                 'approved': approved_farms,
-                'pending': pending_farms,
-                'active': active_farms,
-                'approval_rate': round((approved_farms / total_farms * 100), 2) if total_farms > 0 else 0,
+                'pending': farms['pending'],
+                'active': farms['active'],
+                'approval_rate': percentage(approved_farms, total_farms),
             },
             'procurement': {
                 'total_orders': total_orders,
-                'active_orders': active_orders,
+                'active_orders': orders['active'],
                 'completed_orders': completed_orders,
-                'completion_rate': round((completed_orders / total_orders * 100), 2) if total_orders > 0 else 0,
+                'completion_rate': percentage(completed_orders, total_orders),
             },
             'financials': {
                 'total_budget': float(total_budget),
                 'total_spent': float(total_spent),
-                'pending_payments': float(pending_payments),
-                'budget_utilization': round((total_spent / total_budget * 100), 2) if total_budget > 0 else 0,
+                'pending_payments': float(invoices['pending_payments']),
+                'budget_utilization': percentage(total_spent, total_budget),
             },
             'approvals': {
                 'pending': pending_approvals,
                 'overdue': overdue_reviews,
             },
             'recent_activity': {
-                'new_applications': new_applications,
-                'recent_approvals': recent_approvals,
-                'recent_orders': recent_orders,
+                'new_applications': farms['new_applications'],
+                'recent_approvals': farms['recent_approvals'],
+                'recent_orders': orders['recent'],
             }
         }
     
@@ -226,11 +211,18 @@ class ExecutiveDashboardService:
         Returns:
             dict: SLA compliance statistics
         """
-        # Count approved and rejected actions (completed reviews)
-        all_reviews = FarmReviewAction.objects.filter(
-            action__in=['approved', 'rejected']
+        reviews = aggregate_kpis(
+            FarmReviewAction.objects.all(),
+            # Approved and rejected actions (completed reviews)
+            completed=count_if(action__in=['approved', 'rejected']),
+            # Change requests past their deadline
+            overdue_changes=count_if(
+                action='request_changes',
+                changes_deadline__isnull=False,
+                changes_deadline__lt=timezone.now(),
+            ),
         )
-        total_reviews = all_reviews.count()
+        total_reviews = reviews['completed']
         
         if total_reviews == 0:
             return {
@@ -241,19 +233,9 @@ class ExecutiveDashboardService:
                 'avg_processing_days': 0,
             }
         
-        # Count reviews with change requests that met deadline
-        change_requests = FarmReviewAction.objects.filter(
-            action='request_changes',
-            changes_deadline__isnull=False
-        )
-        total_change_requests = change_requests.count()
-        overdue_changes = change_requests.filter(
-            changes_deadline__lt=timezone.now()
-        ).count()
-        
         # Simplified metrics based on available data
         within_sla = total_reviews  # Assume all completed reviews are within SLA
-        overdue = overdue_changes  # Count overdue change requests
+        overdue = reviews['overdue_changes']  # Count overdue change requests
         
         compliance_rate = (within_sla / total_reviews * 100) if total_reviews > 0 else 0
         
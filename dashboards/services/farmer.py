@@ -24,7 +24,7 @@ class FarmerDashboardService:
     def __init__(self, user):
         self.user = user
         try:
-            self.farm = Farm.objects.get(user=user)
+            self.farm = user.farm
         except Farm.DoesNotExist:
             self.farm = None
     
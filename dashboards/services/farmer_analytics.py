@@ -9,16 +9,27 @@ Comprehensive analytics for individual farmers covering:
 5. Marketplace Performance - Orders, customers, conversion
 6. Inventory Status - Stock levels, movements, value
 7. Comparative Benchmarks - vs history, vs regional average
+
+PERFORMANCE:
+- Each section uses a handful of grouped queries (totals are derived from
+  the same GROUP BY that produces the trend, unrelated sums are combined
+  into one statement with scalar subqueries).
+- get_full_analytics() computes sections in parallel on a small thread
+  pool; every worker thread uses (and then closes) its own DB connection.
+- Each section is cached per farm and period with stale-while-revalidate.
+  dashboards.signals bumps the farm's cache tag on relevant writes.
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 from decimal import Decimal
 from typing import Dict, Any, Optional, List
 from collections import defaultdict
 
+from django.db import connection, connections
 from django.db.models import (
-    Sum, Count, Avg, F, Q, Min, Max, Case, When, Value,
+    Sum, Count, Avg, F, Q, Min, Max, Case, When, Value, Func, Subquery,
     DecimalField, IntegerField, FloatField
 )
 from django.db.models.functions import (
@@ -26,8 +37,11 @@ from django.db.models.functions import (
 )
 from django.utils import timezone
 
+from core.cache_utils import cached_with_stale
+
 from farms.models import Farm
-from flock_management.models import Flock, DailyProduction
+from flock_management.anomaly_detection import METRIC_EGG_PRODUCTION, METRIC_MORTALITY
+from flock_management.models import AnomalyAlert, Flock, DailyProduction
 from feed_inventory.models import FeedPurchase, FeedInventory, FeedConsumption
 from sales_revenue.models import EggSale, BirdSale
 from sales_revenue.marketplace_models import MarketplaceOrder, OrderItem, Product
@@ -38,6 +52,28 @@ from medication_management.models import VetVisit
 
 logger = logging.getLogger(__name__)
 
+SECTION_CACHE_PREFIX = 'farmer_analytics'
+SECTION_CACHE_TTL = 300  # 5 minutes fresh
+SECTION_CACHE_STALE_TTL = 1800  # served stale for up to 30 more minutes
+SECTION_WORKERS = 4
+
+
+def farm_analytics_cache_tag(farm_id) -> str:
+    """Cache tag shared by every cached analytics section of one farm."""
+    return f'{SECTION_CACHE_PREFIX}:farm:{farm_id}'
+
+
+def _sum_subquery(queryset, field: str):
+    """
+    Scalar ``(SELECT SUM(field) ...)`` subquery, 0 when nothing matches.
+
+    Lets unrelated per-table totals be fetched in a single statement.
+    """
+    total = queryset.order_by().annotate(
+        total=Func(F(field), function='SUM', output_field=DecimalField())
+    ).values('total')[:1]
+    return Coalesce(Subquery(total, output_field=DecimalField()), Decimal('0'))
+
 
 class FarmerAnalyticsService:
     """
@@ -54,8 +90,22 @@ class FarmerAnalyticsService:
         # Get specific analytics
         production = service.get_production_analytics(days=30)
         financials = service.get_financial_analytics(days=90)
+    
+    The get_*_analytics() methods always hit the database. get_section()
+    and get_full_analytics() serve the per-farm section cache.
     """
     
+    # section name -> (method name, takes a days argument)
+    SECTIONS = {
+        'production': ('get_production_analytics', True),
+        'flock_health': ('get_flock_health_analytics', True),
+        'financial': ('get_financial_analytics', True),
+        'feed': ('get_feed_analytics', True),
+        'marketplace': ('get_marketplace_analytics', True),
+        'inventory': ('get_inventory_analytics', False),
+        'benchmarks': ('get_benchmark_analytics', True),
+    }
+    
     def __init__(self, user):
         self.user = user
         self.farm = None
@@ -64,7 +114,7 @@ class FarmerAnalyticsService:
     def _load_farm(self):
         """Load farm for the user"""
         try:
-            self.farm = Farm.objects.get(user=self.user)
+            self.farm = self.user.farm
         except Farm.DoesNotExist:
             self.farm = None
     
@@ -94,29 +144,86 @@ class FarmerAnalyticsService:
                 'code': 'NO_FARM'
             }
         
+        sections = self.get_sections(list(self.SECTIONS), days)
+        
         return {
             'period_days': days,
             'generated_at': timezone.now().isoformat(),
             'farm': self._get_farm_summary(),
-            'production': self.get_production_analytics(days),
-            'flock_health': self.get_flock_health_analytics(days),
-            'financial': self.get_financial_analytics(days),
-            'feed': self.get_feed_analytics(days),
-            'marketplace': self.get_marketplace_analytics(days),
-            'inventory': self.get_inventory_analytics(),
-            'benchmarks': self.get_benchmark_analytics(days),
+            **sections,
         }
     
+    # =========================================================================
+    # SECTION CACHE & PARALLEL EXECUTION
+    # =========================================================================
+    
+    def _section_cache_key(self, name: str, days: int) -> str:
+        if not self.SECTIONS[name][1]:
+            days = 0
+        return f'{SECTION_CACHE_PREFIX}:{self.farm.id}:{name}:{days}'
+    
+    def _compute_section(self, name: str, days: int) -> Dict[str, Any]:
+        method_name, takes_days = self.SECTIONS[name]
+        method = getattr(self, method_name)
+        return method(days) if takes_days else method()
+    
+    def get_section(self, name: str, days: int = 30) -> Dict[str, Any]:
+        """
+        Get one analytics section through the per-farm section cache.
+        
+        Args:
+            name: Key of SECTIONS (e.g. 'production', 'financial')
+            days: Analytics period (ignored by 'inventory')
+        """
+        if not self.farm:
+            return {}
+        
+        return cached_with_stale(
+            self._section_cache_key(name, days),
+            compute=lambda: self._compute_section(name, days),
+            ttl=SECTION_CACHE_TTL,
+            stale_ttl=SECTION_CACHE_STALE_TTL,
+            tags=[farm_analytics_cache_tag(self.farm.id)],
+        )
+    
+    def _get_section_in_worker(self, name: str, days: int) -> Dict[str, Any]:
+        """Thread pool entry point: Django connections are per thread, close ours when done."""
+        try:
+            return self.get_section(name, days)
+        finally:
+            connections.close_all()
+    
+    def get_sections(self, names: List[str], days: int) -> Dict[str, Dict[str, Any]]:
+        """
+        Compute several sections, in parallel when it is safe to do so.
+        
+        Inside an open transaction the caller's uncommitted writes are not
+        visible to other connections, so sections then run sequentially on
+        the caller's connection.
+        """
+        if SECTION_WORKERS <= 1 or len(names) <= 1 or connection.in_atomic_block:
+            return {name: self.get_section(name, days) for name in names}
+        
+        with ThreadPoolExecutor(
+            max_workers=min(SECTION_WORKERS, len(names)),
+            thread_name_prefix='farmer-analytics',
+        ) as executor:
+            futures = {
+                name: executor.submit(self._get_section_in_worker, name, days)
+                for name in names
+            }
+            return {name: future.result() for name, future in futures.items()}
+    
     def _get_farm_summary(self) -> Dict[str, Any]:
         """Get basic farm information"""
         if not self.farm:
             return {}
         
-        active_flocks = Flock.objects.filter(farm=self.farm, status='Active')
-        
-        total_birds = active_flocks.aggregate(
-            total=Coalesce(Sum('current_count'), 0)
-        )['total']
+        flock_totals = Flock.objects.filter(farm=self.farm, status='Active').aggregate(
+            total=Coalesce(Sum('current_count'), 0),
+            active_flocks=Count('id'),
+        )
+        total_birds = flock_totals['total']
         
         return {
             'farm_id': str(self.farm.id),
@@ -129,7 +236,7 @@ class FarmerAnalyticsService:
             'capacity_utilization': round(
                 (total_birds / self.farm.total_bird_capacity * 100), 1
             ) if self.farm.total_bird_capacity > 0 else 0,
-            'active_flocks': active_flocks.count(),
+            'active_flocks': flock_totals['active_flocks'],
             'marketplace_enabled': self.farm.marketplace_enabled,
             'subscription_type': self.farm.subscription_type,
         }
@@ -284,15 +391,17 @@ class FarmerAnalyticsService:
         
         start_date, end_date = self._get_date_range(days)
         
-        # Get all active flocks
-        flocks = Flock.objects.filter(farm=self.farm, status='Active')
-        
-        flock_summary = flocks.aggregate(
-            total_birds=Coalesce(Sum('current_count'), 0),
-            initial_birds=Coalesce(Sum('initial_count'), 0),
-            total_mortality=Coalesce(Sum('total_mortality'), 0),
+        # Get all active flocks (one query feeds both totals and flock details)
+        flocks = list(
+            Flock.objects.filter(farm=self.farm, status='Active').select_related('housed_in')
         )
         
+        flock_summary = {
+            'total_birds': sum(flock.current_count or 0 for flock in flocks),
+            'initial_birds': sum(flock.initial_count or 0 for flock in flocks),
+            'total_mortality': sum(flock.total_mortality or 0 for flock in flocks),
+        }
+        
         # Get mortality from daily productions
         productions = DailyProduction.objects.filter(
             farm=self.farm,
@@ -366,7 +475,7 @@ class FarmerAnalyticsService:
         
         # Flock-level details
         flock_details = []
-        for flock in flocks.select_related('housed_in'):
+        for flock in flocks:
             flock_mortality_rate = 0
             if flock.initial_count > 0:
                 flock_mortality_rate = round(
@@ -391,16 +500,38 @@ class FarmerAnalyticsService:
         alerts = []
         avg_daily_mortality = total_deaths / days if days > 0 else 0
         
-        # Check for mortality spikes (> 2x average)
-        high_mortality_days = productions.filter(
-            birds_died__gt=avg_daily_mortality * 2
-        ).count()
-        
-        if high_mortality_days > 0:
+        # Mortality spikes and production drops flagged as records arrived
+        # (see flock_management.anomaly_detection)
+        anomalies = list(AnomalyAlert.objects.filter(
+            farm=self.farm,
+            observed_on__gte=start_date,
+            observed_on__lte=end_date,
+        ).values(
+            'metric', 'observed_on', 'value', 'expected', 'z_score', 'severity',
+            'flock__flock_number',
+        ).order_by('-observed_on'))
+        
+        for metric, alert_type, label in (
+            (METRIC_MORTALITY, 'mortality_spike', 'abnormal mortality'),
+            (METRIC_EGG_PRODUCTION, 'production_drop', 'abnormal egg production drops'),
+        ):
+            flagged = [a for a in anomalies if a['metric'] == metric]
+            if not flagged:
+                continue
             alerts.append({
-                'type': 'mortality_spike',
-                'severity': 'warning',
-                'message': f'{high_mortality_days} days with above-average mortality in period',
+                'type': alert_type,
+                'severity': 'critical' if any(a['severity'] == 'critical' for a in flagged) else 'warning',
+                'message': f'{len(flagged)} days with {label} in period',
+                'occurrences': [
+                    {
+                        'date': a['observed_on'],
+                        'flock_number': a['flock__flock_number'],
+                        'value': a['value'],
+                        'expected': round(a['expected'], 1),
+                        'z_score': a['z_score'],
+                    }
+                    for a in flagged
+                ],
             })
         
         # Check for high overall mortality rate
@@ -447,16 +578,18 @@ class FarmerAnalyticsService:
         start_date, end_date = self._get_date_range(days)
         
         # === REVENUE ===
+        # One GROUP BY month per revenue source yields both the period totals
+        # and the monthly trend.
         
         # Egg sales revenue
-        egg_sales = EggSale.objects.filter(
-            farm=self.farm,
-            status='completed',
-            sale_date__gte=start_date,
-            sale_date__lte=end_date
-        )
-        
-        egg_revenue = egg_sales.aggregate(
+        egg_revenue, egg_monthly = self._monthly_totals(
+            EggSale.objects.filter(
+                farm=self.farm,
+                status='completed',
+                sale_date__gte=start_date,
+                sale_date__lte=end_date
+            ),
+            'sale_date',
             total=Coalesce(Sum('subtotal'), Decimal('0')),
             count=Count('id'),
             commissions=Coalesce(Sum('platform_commission'), Decimal('0')),
@@ -464,14 +597,14 @@ class FarmerAnalyticsService:
         )
         
         # Bird sales revenue
-        bird_sales = BirdSale.objects.filter(
-            farm=self.farm,
-            status='completed',
-            sale_date__gte=start_date,
-            sale_date__lte=end_date
-        )
-        
-        bird_revenue = bird_sales.aggregate(
+        bird_revenue, bird_monthly = self._monthly_totals(
+            BirdSale.objects.filter(
+                farm=self.farm,
+                status='completed',
+                sale_date__gte=start_date,
+                sale_date__lte=end_date
+            ),
+            'sale_date',
             total=Coalesce(Sum('subtotal'), Decimal('0')),
             count=Count('id'),
             birds_sold=Coalesce(Sum('quantity'), 0),
@@ -479,27 +612,27 @@ class FarmerAnalyticsService:
         )
         
         # Marketplace orders revenue
-        marketplace_orders = MarketplaceOrder.objects.filter(
-            farm=self.farm,
-            status='completed',
-            created_at__date__gte=start_date,
-            created_at__date__lte=end_date
-        )
-        
-        marketplace_revenue = marketplace_orders.aggregate(
+        marketplace_revenue, marketplace_monthly = self._monthly_totals(
+            MarketplaceOrder.objects.filter(
+                farm=self.farm,
+                status='completed',
+                created_at__date__gte=start_date,
+                created_at__date__lte=end_date
+            ),
+            'created_at',
             total=Coalesce(Sum('total_amount'), Decimal('0')),
             count=Count('id'),
         )
         
         # Government procurement revenue
-        procurement_invoices = ProcurementInvoice.objects.filter(
-            farm=self.farm,
-            payment_status='paid',
-            payment_date__gte=start_date,
-            payment_date__lte=end_date
-        )
-        
-        procurement_revenue = procurement_invoices.aggregate(
+        procurement_revenue, procurement_monthly = self._monthly_totals(
+            ProcurementInvoice.objects.filter(
+                farm=self.farm,
+                payment_status='paid',
+                payment_date__gte=start_date,
+                payment_date__lte=end_date
+            ),
+            'payment_date',
             gross=Coalesce(Sum('subtotal'), Decimal('0')),
             net=Coalesce(Sum('total_amount'), Decimal('0')),
             deductions=Coalesce(
@@ -519,29 +652,50 @@ class FarmerAnalyticsService:
         # === EXPENSES ===
         # Now properly includes ALL expense categories from the Expense model
         
-        # Feed costs (from FeedPurchase - more accurate than Expense model for feed)
-        feed_purchases = FeedPurchase.objects.filter(
-            farm=self.farm,
-            purchase_date__gte=start_date,
-            purchase_date__lte=end_date
-        )
+        # Feed purchases, medication, vaccination and vet visit costs live in
+        # separate tables; fetch all four sums in one statement. Medication and
+        # vaccination come from actual records (not flock accumulated totals)
+        # so we get the ACTUAL costs in the period, not lifetime accumulations.
+        from medication_management.models import MedicationRecord, VaccinationRecord
         
-        feed_cost = feed_purchases.aggregate(
-            total=Coalesce(Sum('total_cost'), Decimal('0'))
-        )['total']
+        other_costs = Farm.objects.filter(pk=self.farm.pk).annotate(
+            feed=_sum_subquery(FeedPurchase.objects.filter(
+                farm=self.farm,
+                purchase_date__gte=start_date,
+                purchase_date__lte=end_date
+            ), 'total_cost'),
+            medication=_sum_subquery(MedicationRecord.objects.filter(
+                flock__farm=self.farm,
+                administered_date__gte=start_date,
+                administered_date__lte=end_date
+            ), 'total_cost'),
+            vaccination=_sum_subquery(VaccinationRecord.objects.filter(
+                flock__farm=self.farm,
+                vaccination_date__gte=start_date,
+                vaccination_date__lte=end_date
+            ), 'total_cost'),
+            vet_visits=_sum_subquery(VetVisit.objects.filter(
+                flock__farm=self.farm,
+                visit_date__gte=start_date,
+                visit_date__lte=end_date,
+                status='COMPLETED'
+            ), 'visit_fee'),
+        ).values('feed', 'medication', 'vaccination', 'vet_visits').get()
+        feed_cost = other_costs['feed'] or Decimal('0')
+        medication_cost = other_costs['medication'] or Decimal('0')
+        vaccination_cost = other_costs['vaccination'] or Decimal('0')
+        vet_visit_cost = other_costs['vet_visits'] or Decimal('0')
         
         # Get ALL expenses from the Expense model by category
         # This includes: LABOR, UTILITIES, BEDDING, TRANSPORT, MAINTENANCE, 
         # OVERHEAD, MORTALITY_LOSS, MISCELLANEOUS
-        expenses = Expense.objects.filter(
+        expense_by_category = Expense.objects.filter(
             farm=self.farm,
             expense_date__gte=start_date,
             expense_date__lte=end_date
-        )
-        
-        expense_by_category = expenses.values('category').annotate(
+        ).values('category').annotate(
             total=Coalesce(Sum('total_amount'), Decimal('0'))
-        )
+        ).order_by()
         
         # Build expense breakdown dictionary
         expense_breakdown = {
@@ -560,39 +714,6 @@ class FarmerAnalyticsService:
             category = exp['category'].lower()
             expense_breakdown[category] = exp['total']
         
-        # Get medication and vaccination from actual records (not flock accumulated totals)
-        # This gives us the ACTUAL costs in the period, not lifetime accumulations
-        from medication_management.models import MedicationRecord, VaccinationRecord
-        
-        medication_records = MedicationRecord.objects.filter(
-            flock__farm=self.farm,
-            administered_date__gte=start_date,
-            administered_date__lte=end_date
-        )
-        medication_cost = medication_records.aggregate(
-            total=Coalesce(Sum('total_cost'), Decimal('0'))
-        )['total']
-        
-        vaccination_records = VaccinationRecord.objects.filter(
-            flock__farm=self.farm,
-            vaccination_date__gte=start_date,
-            vaccination_date__lte=end_date
-        )
-        vaccination_cost = vaccination_records.aggregate(
-            total=Coalesce(Sum('total_cost'), Decimal('0'))
-        )['total']
-        
-        # Get vet visit costs (NEW - from unified data architecture)
-        vet_visits = VetVisit.objects.filter(
-            flock__farm=self.farm,
-            visit_date__gte=start_date,
-            visit_date__lte=end_date,
-            status='COMPLETED'
-        )
-        vet_visit_cost = vet_visits.aggregate(
-            total=Coalesce(Sum('visit_fee'), Decimal('0'))
-        )['total']
-        
         # Add medication/vaccination/vet to breakdown
         expense_breakdown['medication'] = float(medication_cost)
         expense_breakdown['vaccination'] = float(vaccination_cost)
@@ -626,55 +747,17 @@ class FarmerAnalyticsService:
         # === TRENDS ===
         
         # Revenue by month
-        monthly_revenue = []
-        
-        # Egg sales by month
-        egg_monthly = egg_sales.annotate(
-            month=TruncMonth('sale_date')
-        ).values('month').annotate(
-            amount=Sum('subtotal')
-        ).order_by('month')
-        
         monthly_data = defaultdict(lambda: {'eggs': 0, 'birds': 0, 'marketplace': 0, 'procurement': 0})
-        for item in egg_monthly:
-            if item['month']:
-                key = item['month'].strftime('%Y-%m')
-                monthly_data[key]['eggs'] = float(item['amount'] or 0)
-        
-        bird_monthly = bird_sales.annotate(
-            month=TruncMonth('sale_date')
-        ).values('month').annotate(
-            amount=Sum('subtotal')
-        ).order_by('month')
-        
-        for item in bird_monthly:
-            if item['month']:
-                key = item['month'].strftime('%Y-%m')
-                monthly_data[key]['birds'] = float(item['amount'] or 0)
-        
-        marketplace_monthly = marketplace_orders.annotate(
-            month=TruncMonth('created_at')
-        ).values('month').annotate(
-            amount=Sum('total_amount')
-        ).order_by('month')
-        
-        for item in marketplace_monthly:
-            if item['month']:
-                key = item['month'].strftime('%Y-%m')
-                monthly_data[key]['marketplace'] = float(item['amount'] or 0)
-        
-        # Procurement revenue by month
-        procurement_monthly = procurement_invoices.annotate(
-            month=TruncMonth('payment_date')
-        ).values('month').annotate(
-            amount=Sum('total_amount')
-        ).order_by('month')
-        
-        for item in procurement_monthly:
-            if item['month']:
-                key = item['month'].strftime('%Y-%m')
-                monthly_data[key]['procurement'] = float(item['amount'] or 0)
+        for source, monthly, amount_key in (
+            ('eggs', egg_monthly, 'total'),
+            ('birds', bird_monthly, 'total'),
+            ('marketplace', marketplace_monthly, 'total'),
+            ('procurement', procurement_monthly, 'net'),
+        ):
+            for month_key, row in monthly.items():
+                monthly_data[month_key][source] = float(row[amount_key] or 0)
         
+        monthly_revenue = []
         for month_key in sorted(monthly_data.keys()):
             data = monthly_data[month_key]
             monthly_revenue.append({
@@ -682,10 +765,12 @@ class FarmerAnalyticsService:
                 'eggs': data['eggs'],
                 'birds': data['birds'],
                 'marketplace': data['marketplace'],
-                'procurement': data.get('procurement', 0),
-                'total': data['eggs'] + data['birds'] + data['marketplace'] + data.get('procurement', 0),
+                'procurement': data['procurement'],
+                'total': data['eggs'] + data['birds'] + data['marketplace'] + data['procurement'],
             })
         
+        current_bird_count = self._get_farm_summary().get('current_bird_count', 0)
+        
         return {
             'summary': {
                 'total_revenue': float(total_revenue),
@@ -722,11 +807,34 @@ class FarmerAnalyticsService:
             'metrics': {
                 'avg_daily_revenue': round(float(total_revenue) / days, 2) if days > 0 else 0,
                 'revenue_per_bird': round(
-                    float(total_revenue) / self._get_farm_summary().get('current_bird_count', 1), 2
-                ) if self._get_farm_summary().get('current_bird_count', 0) > 0 else 0,
+                    float(total_revenue) / current_bird_count, 2
+                ) if current_bird_count > 0 else 0,
             },
         }
     
+    @staticmethod
+    def _monthly_totals(queryset, date_field: str, **aggregates) -> tuple:
+        """
+        Group ``queryset`` by month and sum the groups into period totals.
+        
+        Returns:
+            (totals, {'YYYY-MM': row}) where totals has one entry per aggregate
+        """
+        rows = list(queryset.annotate(
+            month=TruncMonth(date_field)
+        ).values('month').annotate(**aggregates).order_by('month'))
+        
+        totals = {}
+        for name in aggregates:
+            values = [row[name] for row in rows if row[name] is not None]
+            totals[name] = sum(values[1:], values[0]) if values else 0
+        
+        monthly = {
+            row['month'].strftime('%Y-%m'): row
+            for row in rows if row['month']
+        }
+        return totals, monthly
+    
     # =========================================================================
     # 4. FEED ANALYTICS
     # =========================================================================
@@ -875,16 +983,25 @@ class FarmerAnalyticsService:
             created_at__date__lte=end_date
         )
         
-        order_stats = orders.aggregate(
-            total_orders=Count('id'),
-            completed_orders=Count('id', filter=Q(status='completed')),
-            cancelled_orders=Count('id', filter=Q(status='cancelled')),
-            pending_orders=Count('id', filter=Q(status__in=['pending', 'confirmed', 'processing'])),
-            total_revenue=Coalesce(
-                Sum('total_amount', filter=Q(status='completed')),
+        # Orders by status - the summary counts are derived from this breakdown
+        by_status = list(orders.values('status').annotate(
+            count=Count('id'),
+            value=Sum('total_amount'),
+        ).order_by())
+        
+        def status_count(statuses):
+            return sum(row['count'] for row in by_status if row['status'] in statuses)
+        
+        order_stats = {
+            'total_orders': sum(row['count'] for row in by_status),
+            'completed_orders': status_count({'completed'}),
+            'cancelled_orders': status_count({'cancelled'}),
+            'pending_orders': status_count({'pending', 'confirmed', 'processing'}),
+            'total_revenue': sum(
+                (row['value'] or Decimal('0') for row in by_status if row['status'] == 'completed'),
                 Decimal('0')
             ),
-        )
+        }
         
         # Average order value
         avg_order_value = 0
@@ -893,53 +1010,42 @@ class FarmerAnalyticsService:
                 float(order_stats['total_revenue']) / order_stats['completed_orders'], 2
             )
         
-        # Unique customers
-        unique_customers = orders.filter(
-            status='completed'
-        ).values('customer').distinct().count()
-        
-        # Repeat customers (customers with > 1 order)
-        repeat_customers = orders.filter(
+        # Unique and repeat customers (customers with > 1 order) in one query
+        customer_orders = list(orders.filter(
             status='completed'
         ).values('customer').annotate(
             order_count=Count('id')
-        ).filter(order_count__gt=1).count()
+        ).order_by().values_list('order_count', flat=True))
+        unique_customers = len(customer_orders)
+        repeat_customers = sum(1 for order_count in customer_orders if order_count > 1)
         
-        # Products performance
+        # Products performance - one grouped query over all active products
         products = Product.objects.filter(farm=self.farm, status='active')
         
-        product_stats = []
-        for product in products[:10]:  # Top 10
-            product_orders = OrderItem.objects.filter(
-                product=product,
-                order__status='completed',
-                order__created_at__date__gte=start_date,
-            )
-            
-            stats = product_orders.aggregate(
-                quantity_sold=Coalesce(Sum('quantity'), Decimal('0'), output_field=DecimalField()),
-                revenue=Coalesce(Sum('line_total'), Decimal('0'), output_field=DecimalField()),
-                orders=Count('id'),
-            )
-            
-            if stats['orders'] > 0:
-                product_stats.append({
-                    'product_id': str(product.id),
-                    'name': product.name,
-                    'category': product.category.name if product.category else None,
-                    'quantity_sold': float(stats['quantity_sold']),
-                    'revenue': float(stats['revenue']),
-                    'orders': stats['orders'],
-                })
-        
-        # Sort by revenue
-        product_stats.sort(key=lambda x: x['revenue'], reverse=True)
+        top_sellers = OrderItem.objects.filter(
+            product__farm=self.farm,
+            product__status='active',
+            order__status='completed',
+            order__created_at__date__gte=start_date,
+        ).values(
+            'product_id', 'product__name', 'product__category__name'
+        ).annotate(
+            quantity_sold=Coalesce(Sum('quantity'), Decimal('0'), output_field=DecimalField()),
+            revenue=Coalesce(Sum('line_total'), Decimal('0'), output_field=DecimalField()),
+            orders=Count('id'),
+        ).order_by('-revenue')[:5]
         
-        # Orders by status
-        by_status = list(orders.values('status').annotate(
-            count=Count('id'),
-            value=Sum('total_amount'),
-        ))
+        product_stats = [
+            {
+                'product_id': str(row['product_id']),
+                'name': row['product__name'],
+                'category': row['product__category__name'],
+                'quantity_sold': float(row['quantity_sold']),
+                'revenue': float(row['revenue']),
+                'orders': row['orders'],
+            }
+            for row in top_sellers
+        ]
         
         # Daily orders trend
         daily_orders = list(orders.filter(
@@ -973,7 +1079,7 @@ class FarmerAnalyticsService:
             },
             'products': {
                 'active_listings': products.count(),
-                'top_sellers': product_stats[:5],
+                'top_sellers': product_stats,
             },
             'by_status': by_status,
             'daily_trend': daily_orders,
@@ -1005,11 +1111,20 @@ class FarmerAnalyticsService:
         items_data = []
         total_value = Decimal('0')
         low_stock_items = []
+        category_summary = {}
         
+        # Single pass over the items builds the item list and category summary
         for item in inventory_items:
             item_value = item.quantity_available * item.unit_cost
             total_value += item_value
             
+            category = category_summary.setdefault(
+                item.category, {'items': 0, 'quantity': 0.0, 'value': 0.0}
+            )
+            category['items'] += 1
+            category['quantity'] += float(item.quantity_available or 0)
+            category['value'] += float(item_value or 0)
+            
             item_data = {
                 'id': str(item.id),
                 'category': item.category,
@@ -1030,22 +1145,6 @@ class FarmerAnalyticsService:
                     'threshold': float(item.low_stock_threshold),
                 })
         
-        # Category summary
-        by_category = inventory_items.values('category').annotate(
-            items=Count('id'),
-            total_quantity=Sum('quantity_available'),
-            total_value=Sum(F('quantity_available') * F('unit_cost')),
-        )
-        
-        category_summary = {
-            item['category']: {
-                'items': item['items'],
-                'quantity': float(item['total_quantity'] or 0),
-                'value': float(item['total_value'] or 0),
-            }
-            for item in by_category
-        }
-        
         # Recent stock movements (last 30 days)
         thirty_days_ago = timezone.now().date() - timedelta(days=30)
         
@@ -1064,7 +1163,7 @@ class FarmerAnalyticsService:
         
         return {
             'summary': {
-                'total_items': inventory_items.count(),
+                'total_items': len(items_data),
                 'total_value': float(total_value),
                 'low_stock_count': len(low_stock_items),
             },
@@ -1093,27 +1192,31 @@ class FarmerAnalyticsService:
         prev_start = start_date - timedelta(days=days)
         prev_end = start_date - timedelta(days=1)
         
-        # Current period production
-        current_production = DailyProduction.objects.filter(
-            farm=self.farm,
-            production_date__gte=start_date,
-            production_date__lte=end_date
-        ).aggregate(
-            eggs=Coalesce(Sum('eggs_collected'), 0),
-            mortality=Coalesce(Sum('birds_died'), 0),
-            feed_kg=Coalesce(Sum('feed_consumed_kg'), Decimal('0')),
-        )
-        
-        # Previous period production
-        previous_production = DailyProduction.objects.filter(
+        # Current and previous period production in one pass
+        current = Q(production_date__gte=start_date, production_date__lte=end_date)
+        previous = Q(production_date__gte=prev_start, production_date__lte=prev_end)
+        periods = DailyProduction.objects.filter(
             farm=self.farm,
             production_date__gte=prev_start,
-            production_date__lte=prev_end
+            production_date__lte=end_date
         ).aggregate(
-            eggs=Coalesce(Sum('eggs_collected'), 0),
-            mortality=Coalesce(Sum('birds_died'), 0),
-            feed_kg=Coalesce(Sum('feed_consumed_kg'), Decimal('0')),
+            current_eggs=Coalesce(Sum('eggs_collected', filter=current), 0),
+            current_mortality=Coalesce(Sum('birds_died', filter=current), 0),
+            current_feed_kg=Coalesce(Sum('feed_consumed_kg', filter=current), Decimal('0')),
+            previous_eggs=Coalesce(Sum('eggs_collected', filter=previous), 0),
+            previous_mortality=Coalesce(Sum('birds_died', filter=previous), 0),
+            previous_feed_kg=Coalesce(Sum('feed_consumed_kg', filter=previous), Decimal('0')),
         )
+        current_production = {
+            'eggs': periods['current_eggs'],
+            'mortality': periods['current_mortality'],
+            'feed_kg': periods['current_feed_kg'],
+        }
+        previous_production = {
+            'eggs': periods['previous_eggs'],
+            'mortality': periods['previous_mortality'],
+            'feed_kg': periods['previous_feed_kg'],
+        }
         
         # Calculate changes
         def calc_change(current, previous):
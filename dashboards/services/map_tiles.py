@@ -0,0 +1,124 @@
+"""
+Map Tile Helpers
+
+Slippy-map (XYZ, Web Mercator) tile arithmetic and geohash cell sizing
+for the clustered farm map (YEAAnalyticsService.get_map_tile and
+get_farm_map_clusters).
+
+A map request for a bounding box and zoom is answered from the tiles
+covering it. Each tile is aggregated once into geohash cells (PostGIS
+ST_GeoHash) and cached like any other report, so panning re-reads cached
+tiles instead of re-aggregating the farms under the viewport. Geohash
+cells do not follow tile edges, so a cell can be split across two tiles;
+merge_cells() recombines them by geohash.
+"""
+
+import math
+
+MIN_ZOOM = 0
+MAX_ZOOM = 18
+# Web Mercator latitude limit
+MAX_LATITUDE = 85.0511287798
+# Tiles aggregated for one map request (a 1080p viewport covers ~40)
+MAX_TILES_PER_REQUEST = 64
+# Longest geohash used for cells (~5 m)
+MAX_GEOHASH_PRECISION = 9
+# Production period of map requests; tiles are cached per period
+DEFAULT_PERIOD_DAYS = 30
+MAX_PERIOD_DAYS = 365
+
+
+def _clamp(value, low, high):
+    return max(low, min(high, value))
+
+
+def parse_period_days(value):
+    """
+    The ``days`` query parameter of a map request, clamped to
+    1..MAX_PERIOD_DAYS so the tile cache holds a bounded set of periods.
+
+    Raises:
+        ValueError: Not an integer
+    """
+    if value is None:
+        return DEFAULT_PERIOD_DAYS
+    return _clamp(int(value), 1, MAX_PERIOD_DAYS)
+
+
+def lonlat_to_tile(lon, lat, zoom):
+    """(x, y) of the tile containing a point at ``zoom``."""
+    n = 2 ** zoom
+    lat = _clamp(lat, -MAX_LATITUDE, MAX_LATITUDE)
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return _clamp(x, 0, n - 1), _clamp(y, 0, n - 1)
+
+
+def tile_bounds(zoom, x, y):
+    """(west, south, east, north) of a tile in degrees."""
+    n = 2 ** zoom
+
+    def latitude(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return x / n * 360.0 - 180.0, latitude(y + 1), (x + 1) / n * 360.0 - 180.0, latitude(y)
+
+
+def tiles_for_bbox(west, south, east, north, zoom):
+    """
+    Tiles covering a bounding box at ``zoom``.
+
+    Raises:
+        ValueError: invalid box, or more than MAX_TILES_PER_REQUEST tiles
+    """
+    if not (MIN_ZOOM <= zoom <= MAX_ZOOM):
+        raise ValueError(f'zoom must be between {MIN_ZOOM} and {MAX_ZOOM}')
+    if west >= east or south >= north:
+        raise ValueError('bbox must be west,south,east,north with west < east and south < north')
+
+    min_x, min_y = lonlat_to_tile(west, north, zoom)
+    max_x, max_y = lonlat_to_tile(east, south, zoom)
+    count = (max_x - min_x + 1) * (max_y - min_y + 1)
+    if count > MAX_TILES_PER_REQUEST:
+        raise ValueError(
+            f'bbox covers {count} tiles at zoom {zoom} (max {MAX_TILES_PER_REQUEST}); zoom in'
+        )
+    return [(x, y) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)]
+
+
+def geohash_precision(zoom):
+    """
+    Geohash length giving roughly 8x8 cells per tile at ``zoom``.
+
+    A geohash of length p spans 360 / 2^ceil(5p/2) degrees of longitude and
+    a tile 360 / 2^zoom, so eight cells across a tile need 5p/2 ~ zoom + 3.
+    """
+    return _clamp(round(2 * (zoom + 3) / 5), 1, MAX_GEOHASH_PRECISION)
+
+
+def merge_cells(cells):
+    """
+    Combine cells sharing a geohash (split across tiles) into one.
+
+    Counts and sums add up; the position is the farm-weighted mean.
+    """
+    merged = {}
+    for cell in cells:
+        current = merged.get(cell['key'])
+        if current is None:
+            merged[cell['key']] = dict(cell)
+            continue
+        farms = current['farms'] + cell['farms']
+        for coordinate in ('lat', 'lng'):
+            current[coordinate] = round(
+                (current[coordinate] * current['farms'] + cell[coordinate] * cell['farms']) / farms, 6
+            )
+        for field in ('farms', 'total_birds', 'eggs_produced', 'good_eggs', 'mortality_count'):
+            current[field] += cell[field]
+    for cell in merged.values():
+        cell['mortality_rate'] = mortality_rate(cell['mortality_count'], cell['total_birds'])
+    return sorted(merged.values(), key=lambda cell: cell['key'])
+
+
+def mortality_rate(mortality, birds):
+    return round(mortality / birds * 100, 2) if birds else 0
@@ -13,8 +13,9 @@ Access Control:
 - CONSTITUENCY_OFFICIAL: Constituency-filtered access
 
 Performance Optimization:
-- Redis caching with configurable TTL
-- Pre-aggregated metrics via Celery tasks
+- Stampede-protected stale-while-revalidate caching; keys and TTLs come
+  from dashboards.cache_registry
+- Pre-aggregated metrics via Celery tasks (written to the same keys)
 - Query optimization with select_related/prefetch_related
 """
 
@@ -27,21 +28,14 @@ from django.db.models.functions import (
     ExtractYear, ExtractMonth
 )
 from django.utils import timezone
-from django.core.cache import cache
 from datetime import timedelta, date
 from decimal import Decimal
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Dict, Any, List
 
-logger = logging.getLogger(__name__)
+from dashboards.cache_registry import cached_report
 
-# Cache TTL settings (seconds)
-CACHE_TTL = {
-    'short': 300,        # 5 minutes - for frequently changing data
-    'medium': 1800,      # 30 minutes - for moderately dynamic data
-    'long': 3600,        # 1 hour - for stable aggregate data
-    'daily': 86400,      # 24 hours - for historical/computed data
-}
+logger = logging.getLogger(__name__)
 
 
 class NationalAdminAnalyticsService:
@@ -50,6 +44,9 @@ class NationalAdminAnalyticsService:
     
     Provides comprehensive program metrics with geographic drill-down capability.
     All methods support caching and can be pre-computed via Celery tasks.
+    
+    Report methods are wrapped with @cached_report: stale-while-revalidate
+    caching under the canonical keys from dashboards.cache_registry.
     """
     
     def __init__(self, user=None, use_cache: bool = True):
@@ -58,28 +55,15 @@ class NationalAdminAnalyticsService:
         
         Args:
             user: The requesting user (for role-based filtering)
-            use_cache: Whether to use cached data when available
+            use_cache: Whether to use cached data when available. When
+                False every report is recomputed and its cache entry
+                rewritten (used by the warm-up tasks).
         """
         self.user = user
         self.use_cache = use_cache
         self.now = timezone.now()
         self.today = self.now.date()
         
-    def _get_cache_key(self, prefix: str, *args) -> str:
-        """Generate consistent cache key."""
-        parts = [prefix] + [str(a) for a in args if a]
-        return f"national_admin:{':'.join(parts)}"
-    
-    def _get_from_cache(self, key: str) -> Optional[Any]:
-        """Retrieve data from cache if enabled."""
-        if self.use_cache:
-            return cache.get(key)
-        return None
-    
-    def _set_cache(self, key: str, data: Any, ttl: int = CACHE_TTL['medium']):
-        """Store data in cache."""
-        cache.set(key, data, timeout=ttl)
-        
     # =========================================================================
     # GEOGRAPHIC SCOPING
     # =========================================================================
@@ -123,15 +107,11 @@ class NationalAdminAnalyticsService:
         
         return DailyProduction.objects.filter(farm_id__in=farm_ids)
     
+    @cached_report('regions')
     def _get_available_regions(self) -> List[str]:
         """Get list of all regions with farms."""
         from farms.models import FarmLocation
         
-        cache_key = self._get_cache_key('regions')
-        cached = self._get_from_cache(cache_key)
-        if cached:
-            return cached
-            
         regions = list(
             FarmLocation.objects.filter(is_primary_location=True)
             .values_list('region', flat=True)
@@ -139,18 +119,13 @@ class NationalAdminAnalyticsService:
             .order_by('region')
         )
         
-        self._set_cache(cache_key, regions, CACHE_TTL['daily'])
         return regions
     
+    @cached_report('constituencies')
     def _get_constituencies_in_region(self, region: str) -> List[str]:
         """Get list of constituencies in a region."""
         from farms.models import FarmLocation
         
-        cache_key = self._get_cache_key('constituencies', region)
-        cached = self._get_from_cache(cache_key)
-        if cached:
-            return cached
-            
         constituencies = list(
             FarmLocation.objects.filter(
                 is_primary_location=True,
@@ -161,13 +136,13 @@ class NationalAdminAnalyticsService:
             .order_by('constituency')
         )
         
-        self._set_cache(cache_key, constituencies, CACHE_TTL['daily'])
         return constituencies
     
     # =========================================================================
     # 1. PROGRAM PERFORMANCE REPORTS
     # =========================================================================
     
+    @cached_report('program_performance')
     def get_program_performance_overview(
         self, 
         region: str = None, 
@@ -186,11 +161,6 @@ class NationalAdminAnalyticsService:
             region: Optional region filter
             constituency: Optional constituency filter
         """
-        cache_key = self._get_cache_key('program_performance', region, constituency)
-        cached = self._get_from_cache(cache_key)
-        if cached:
-            return cached
-            
         from farms.models import Farm
         from farms.batch_enrollment_models import Batch, BatchEnrollmentApplication
         from accounts.models import User
@@ -286,9 +256,9 @@ class NationalAdminAnalyticsService:
             'as_of': self.now.isoformat(),
         }
         
-        self._set_cache(cache_key, result, CACHE_TTL['medium'])
         return result
     
+    @cached_report('enrollment_trend')
     def get_enrollment_trend(
         self, 
         months: int = 12,
@@ -296,11 +266,6 @@ class NationalAdminAnalyticsService:
         constituency: str = None
     ) -> Dict[str, Any]:
         """Get farmer enrollment trend over time."""
-        cache_key = self._get_cache_key('enrollment_trend', months, region, constituency)
-        cached = self._get_from_cache(cache_key)
-        if cached:
-            return cached
-            
         farms = self._get_farm_queryset(region, constituency)
         start_date = self.now - timedelta(days=months * 30)
         
@@ -332,13 +297,13 @@ class NationalAdminAnalyticsService:
             'as_of': self.now.isoformat(),
         }
         
-        self._set_cache(cache_key, result, CACHE_TTL['long'])
         return result
     
     # =========================================================================
     # 2. PRODUCTION REPORTS
     # =========================================================================
     
+    @cached_report('production_overview')
     def get_production_overview(
         self, 
         region: str = None, 
@@ -354,11 +319,6 @@ class NationalAdminAnalyticsService:
         - Production trends
         - Regional comparison (if national view)
         """
-        cache_key = self._get_cache_key('production_overview', region, constituency, days)
-        cached = self._get_from_cache(cache_key)
-        if cached:
-            return cached
-            
         from flock_management.models import DailyProduction, Flock
         
         production = self._get_production_queryset(region, constituency)
@@ -457,19 +417,14 @@ class NationalAdminAnalyticsService:
             'as_of': self.now.isoformat(),
         }
         
-        self._set_cache(cache_key, result, CACHE_TTL['medium'])
         return result
     
+    @cached_report('regional_production_comparison')
     def get_regional_production_comparison(self) -> Dict[str, Any]:
         """
         Compare production metrics across all regions.
         National-level view only.
         """
-        cache_key = self._get_cache_key('regional_production_comparison')
-        cached = self._get_from_cache(cache_key)
-        if cached:
-            return cached
-            
         from farms.models import Farm, FarmLocation
         from flock_management.models import DailyProduction
         
@@ -524,13 +479,13 @@ class NationalAdminAnalyticsService:
             'as_of': self.now.isoformat(),
         }
         
-        self._set_cache(cache_key, result, CACHE_TTL['long'])
         return result
     
     # =========================================================================
     # 3. FINANCIAL & ECONOMIC IMPACT REPORTS
     # =========================================================================
     
+    @cached_report('financial_overview')
     def get_financial_overview(
         self, 
         region: str = None, 
@@ -546,11 +501,6 @@ class NationalAdminAnalyticsService:
         - Estimated farmer income
         - Economic impact estimates
         """
-        cache_key = self._get_cache_key('financial_overview', region, constituency, days)
-        cached = self._get_from_cache(cache_key)
-        if cached:
-            return cached
-            
         from sales_revenue.marketplace_models import MarketplaceOrder
         from sales_revenue.models import PlatformSettings
         
@@ -628,13 +578,13 @@ class NationalAdminAnalyticsService:
             'as_of': self.now.isoformat(),
         }
         
-        self._set_cache(cache_key, result, CACHE_TTL['medium'])
         return result
     
     # =========================================================================
     # 4. FLOCK HEALTH & BIOSECURITY REPORTS
     # =========================================================================
     
+    @cached_report('flock_health')
     def get_flock_health_overview(
         self, 
         region: str = None, 
@@ -650,11 +600,6 @@ class NationalAdminAnalyticsService:
         - Vaccination coverage
         - Health alerts
         """
-        cache_key = self._get_cache_key('flock_health', region, constituency, days)
-        cached = self._get_from_cache(cache_key)
-        if cached:
-            return cached
-            
         from flock_management.models import DailyProduction, Flock
         
         production = self._get_production_queryset(region, constituency)
@@ -751,13 +696,13 @@ class NationalAdminAnalyticsService:
             'as_of': self.now.isoformat(),
         }
         
-        self._set_cache(cache_key, result, CACHE_TTL['medium'])
         return result
     
     # =========================================================================
     # 5. FOOD SECURITY & MARKET REPORTS
     # =========================================================================
     
+    @cached_report('food_security')
     def get_food_security_metrics(
         self, 
         region: str = None, 
@@ -772,11 +717,6 @@ class NationalAdminAnalyticsService:
         - Stock levels
         - Supply forecasts
         """
-        cache_key = self._get_cache_key('food_security', region, constituency)
-        cached = self._get_from_cache(cache_key)
-        if cached:
-            return cached
-            
         from sales_revenue.inventory_models import FarmInventory
         from sales_revenue.marketplace_models import MarketplaceOrder
         from flock_management.models import DailyProduction
@@ -852,13 +792,13 @@ class NationalAdminAnalyticsService:
             'as_of': self.now.isoformat(),
         }
         
-        self._set_cache(cache_key, result, CACHE_TTL['medium'])
         return result
     
     # =========================================================================
     # 6. PROCUREMENT & INSTITUTIONAL SUPPLY REPORTS
     # =========================================================================
     
+    @cached_report('procurement')
     def get_procurement_overview(
         self, 
         region: str = None, 
@@ -873,11 +813,6 @@ class NationalAdminAnalyticsService:
         - School feeding program supply
         - Institutional buyer data
         """
-        cache_key = self._get_cache_key('procurement', region, constituency, days)
-        cached = self._get_from_cache(cache_key)
-        if cached:
-            return cached
-            
         from procurement.models import ProcurementOrder
         
         start_date = self.now - timedelta(days=days)
@@ -939,13 +874,13 @@ class NationalAdminAnalyticsService:
             'as_of': self.now.isoformat(),
         }
         
-        self._set_cache(cache_key, result, CACHE_TTL['medium'])
         return result
     
     # =========================================================================
     # 7. FARMER WELFARE & IMPACT REPORTS
     # =========================================================================
     
+    @cached_report('farmer_welfare')
     def get_farmer_welfare_metrics(
         self, 
         region: str = None, 
@@ -960,11 +895,6 @@ class NationalAdminAnalyticsService:
         - Gender distribution
         - Training/support participation
         """
-        cache_key = self._get_cache_key('farmer_welfare', region, constituency)
-        cached = self._get_from_cache(cache_key)
-        if cached:
-            return cached
-            
         from accounts.models import User
         
         farms = self._get_farm_queryset(region, constituency)
@@ -1043,13 +973,13 @@ class NationalAdminAnalyticsService:
             'as_of': self.now.isoformat(),
         }
         
-        self._set_cache(cache_key, result, CACHE_TTL['long'])
         return result
     
     # =========================================================================
     # 8. OPERATIONAL REPORTS
     # =========================================================================
     
+    @cached_report('operational')
     def get_operational_metrics(
         self, 
         region: str = None, 
@@ -1063,11 +993,6 @@ class NationalAdminAnalyticsService:
         - Application processing times
         - Support ticket stats
         """
-        cache_key = self._get_cache_key('operational', region, constituency)
-        cached = self._get_from_cache(cache_key)
-        if cached:
-            return cached
-            
         from accounts.models import User
         from farms.application_models import FarmApplication
         from farms.batch_enrollment_models import BatchEnrollmentApplication
@@ -1164,13 +1089,13 @@ class NationalAdminAnalyticsService:
             'as_of': self.now.isoformat(),
         }
         
-        self._set_cache(cache_key, result, CACHE_TTL['medium'])
         return result
     
     # =========================================================================
     # COMBINED EXECUTIVE DASHBOARD
     # =========================================================================
     
+    @cached_report('executive_dashboard')
     def get_executive_dashboard(
         self, 
         region: str = None, 
@@ -1180,11 +1105,6 @@ class NationalAdminAnalyticsService:
         Get combined executive dashboard with all key metrics.
         Optimized for the Minister/National Admin landing page.
         """
-        cache_key = self._get_cache_key('executive_dashboard', region, constituency)
-        cached = self._get_from_cache(cache_key)
-        if cached:
-            return cached
-        
         # Gather all summaries in parallel-friendly structure
         result = {
             'program_performance': self.get_program_performance_overview(
@@ -1213,23 +1133,18 @@ class NationalAdminAnalyticsService:
             'as_of': self.now.isoformat(),
         }
         
-        self._set_cache(cache_key, result, CACHE_TTL['short'])
         return result
     
     # =========================================================================
     # DRILL-DOWN HELPERS
     # =========================================================================
     
+    @cached_report('drill_down_options')
     def get_drill_down_options(
         self, 
         region: str = None
     ) -> Dict[str, Any]:
         """Get available drill-down options for navigation."""
-        cache_key = self._get_cache_key('drill_down_options', region)
-        cached = self._get_from_cache(cache_key)
-        if cached:
-            return cached
-            
         result = {
             'current_scope': 'regional' if region else 'national',
         }
@@ -1242,9 +1157,9 @@ class NationalAdminAnalyticsService:
             # Show all regions
             result['regions'] = self._get_available_regions()
         
-        self._set_cache(cache_key, result, CACHE_TTL['daily'])
         return result
     
+    @cached_report('farms_list')
     def get_farms_in_scope(
         self,
         region: str = None,
@@ -1255,13 +1170,6 @@ class NationalAdminAnalyticsService:
         """
         Get list of farms for the deepest drill-down level.
         """
-        cache_key = self._get_cache_key(
-            'farms_list', region, constituency, page, page_size
-        )
-        cached = self._get_from_cache(cache_key)
-        if cached:
-            return cached
-            
         farms = self._get_farm_queryset(region, constituency)
         
         total = farms.count()
@@ -1293,5 +1201,4 @@ class NationalAdminAnalyticsService:
             },
         }
         
-        self._set_cache(cache_key, result, CACHE_TTL['short'])
         return result
@@ -8,11 +8,12 @@ Provides officer-specific metrics and workflow management:
 - Delivery monitoring
 """
 
-from django.db.models import Sum, Count, Q, F
+from django.db.models import Count, Q, F
 from django.utils import timezone
 from datetime import timedelta
 from decimal import Decimal
 
+from core.kpi import aggregate_kpis, avg_days_between, count_if, percentage, sum_if
 from procurement.models import ProcurementOrder, OrderAssignment, DeliveryConfirmation, ProcurementInvoice
 
 
@@ -36,18 +37,28 @@ class OfficerDashboardService:
             Q(created_by=self.user) | Q(assigned_procurement_officer=self.user)
         )
         
-        total_orders = my_orders.count()
-        active_orders = my_orders.filter(
-            status__in=['published', 'assigning', 'assigned', 'in_progress']
-        ).count()
-        draft_orders = my_orders.filter(status='draft').count()
-        completed_orders = my_orders.filter(status='completed').count()
+        orders = aggregate_kpis(
+            my_orders,
+            total=count_if(),
+            active=count_if(status__in=['published', 'assigning', 'assigned', 'in_progress']),
+            draft=count_if(status='draft'),
+            completed=count_if(status='completed'),
+            overdue=count_if(
+                delivery_deadline__lt=now.date(),
+                status__in=['published', 'assigned', 'in_progress']
+            ),
+            total_budget=sum_if('total_budget', default=Decimal('0.00')),
+        )
         
-        # Pending actions
-        pending_deliveries = OrderAssignment.objects.filter(
-            order__in=my_orders,
-            status='ready'
-        ).count()
+        # Pending actions and SLA compliance
+        assignments = aggregate_kpis(
+            OrderAssignment.objects.filter(order__in=my_orders),
+            total=count_if(),
+            ready=count_if(status='ready'),
+            accepted=count_if(
+                status__in=['accepted', 'preparing', 'ready', 'delivered', 'verified', 'paid']
+            ),
+        )
         
         pending_verifications = DeliveryConfirmation.objects.filter(
             assignment__order__in=my_orders,
@@ -55,37 +66,21 @@ class OfficerDashboardService:
         ).count()
         
         # Budget tracking
-        total_budget = my_orders.aggregate(
-            total=Sum('total_budget')
-        )['total'] or Decimal('0.00')
+        spent = aggregate_kpis(
+            ProcurementInvoice.objects.filter(order__in=my_orders),
+            total=sum_if('total_amount', payment_status='paid', default=Decimal('0.00')),
+        )['total']
         
-        spent = ProcurementInvoice.objects.filter(
-            order__in=my_orders,
-            payment_status='paid'
-        ).aggregate(
-            total=Sum('total_amount')
-        )['total'] or Decimal('0.00')
-        
-        # Overdue items
-        overdue_orders = my_orders.filter(
-            delivery_deadline__lt=now.date(),
-            status__in=['published', 'assigned', 'in_progress']
-        ).count()
-        
-        # SLA compliance
-        total_assignments = OrderAssignment.objects.filter(order__in=my_orders).count()
-        accepted_assignments = OrderAssignment.objects.filter(
-            order__in=my_orders,
-            status__in=['accepted', 'preparing', 'ready', 'delivered', 'verified', 'paid']
-        ).count()
+        total_budget = orders['total_budget']
+        pending_deliveries = assignments['ready']
         
         return {
             'orders': {
-                'total': total_orders,
-                'active': active_orders,
-                'draft': draft_orders,
-                'completed': completed_orders,
-                'overdue': overdue_orders,
+                'total': orders['total'],
+                'active': orders['active'],
+                'draft': orders['draft'],
+                'completed': orders['completed'],
+                'overdue': orders['overdue'],
             },
             'pending_actions': {
                 'deliveries': pending_deliveries,
@@ -96,12 +91,11 @@ class OfficerDashboardService:
                 'allocated': float(total_budget),
                 'spent': float(spent),
                 'remaining': float(total_budget - spent),
-                'utilization': round((spent / total_budget * 100), 2) if total_budget > 0 else 0,
+                'utilization': percentage(spent, total_budget),
             },
             'performance': {
-                'total_assignments': total_assignments,
-                'accepted_rate': round((accepted_assignments / total_assignments * 100), 2) 
-                                if total_assignments > 0 else 0,
+                'total_assignments': assignments['total'],
+                'accepted_rate': percentage(assignments['accepted'], assignments['total']),
             }
         }
     
@@ -349,36 +343,30 @@ class OfficerDashboardService:
             created_at__gte=cutoff_date
         )
         
-        total_orders = my_orders.count()
-        completed_orders = my_orders.filter(status='completed').count()
-        
-        # Average fulfillment time
-        completed = my_orders.filter(
-            status='completed',
-            completed_at__isnull=False
+        stats = aggregate_kpis(
+            my_orders,
+            total=count_if(),
+            completed=count_if(status='completed'),
+            # Average fulfillment time
+            avg_fulfillment_days=avg_days_between(
+                'created_at', 'completed_at', status='completed'
+            ),
+            # On-time delivery
+            on_time=count_if(
+                completed_at__isnull=False,
+                completed_at__date__lte=F('delivery_deadline')
+            ),
         )
-        
-        avg_fulfillment_days = 0
-        if completed.exists():
-            total_days = sum([
-                (order.completed_at.date() - order.created_at.date()).days
-                for order in completed
-            ])
-            avg_fulfillment_days = total_days / completed.count()
-        
-        # On-time delivery rate
-        on_time_orders = my_orders.filter(
-            completed_at__isnull=False,
-            completed_at__date__lte=F('delivery_deadline')
-        ).count()
-        
-        on_time_rate = round((on_time_orders / completed_orders * 100), 2) if completed_orders > 0 else 0
+        total_orders = stats['total']
+        completed_orders = stats['completed']
+        avg_fulfillment_days = stats['avg_fulfillment_days'] or 0
+        on_time_rate = percentage(stats['on_time'], completed_orders)
         
         return {
             'period_days': days,
             'total_orders': total_orders,
             'completed_orders': completed_orders,
-            'completion_rate': round((completed_orders / total_orders * 100), 2) if total_orders > 0 else 0,
-            'avg_fulfillment_days': round(avg_fulfillment_days, 1),
+            'completion_rate': percentage(completed_orders, total_orders),
+            'avg_fulfillment_days': avg_fulfillment_days,
             'on_time_delivery_rate': on_time_rate,
         }
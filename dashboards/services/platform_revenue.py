@@ -16,6 +16,8 @@ from datetime import timedelta
 from decimal import Decimal
 import logging
 
+from dashboards.cache_registry import cached_report
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,10 +27,12 @@ class PlatformRevenueService:
     This data is NOT visible to YEA administrators.
     """
     
-    def __init__(self):
+    def __init__(self, use_cache: bool = True):
+        self.use_cache = use_cache
         self.now = timezone.now()
         self.today = self.now.date()
     
+    @cached_report('platform_revenue_overview')
     def get_revenue_overview(self):
         """
         Get platform revenue overview.
@@ -129,6 +133,7 @@ class PlatformRevenueService:
             'as_of': self.now.isoformat()
         }
     
+    @cached_report('platform_revenue_trend')
     def get_revenue_trend(self, months=6):
         """
         Get monthly revenue trend.
@@ -190,6 +195,7 @@ class PlatformRevenueService:
             for month, data in sorted(monthly_data.items())
         ]
     
+    @cached_report('platform_advertising_performance')
     def get_advertising_performance(self):
         """
         Get advertising performance metrics.
@@ -259,6 +265,7 @@ class PlatformRevenueService:
             ]
         }
     
+    @cached_report('platform_partner_payments')
     def get_partner_payments(self, status=None):
         """
         Get partner payment tracking.
@@ -290,6 +297,7 @@ class PlatformRevenueService:
             for p in payments
         ]
     
+    @cached_report('platform_marketplace_activation_stats')
     def get_marketplace_activation_stats(self):
         """
         Get marketplace activation (subscription) statistics.
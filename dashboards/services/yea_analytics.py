@@ -19,6 +19,8 @@ from datetime import timedelta
 from decimal import Decimal
 import logging
 
+from dashboards.cache_registry import cached_report
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,17 +30,30 @@ class YEAAnalyticsService:
     Provides program metrics, production data, and marketplace activity.
     """
     
-    def __init__(self, user=None):
+    def __init__(self, user=None, use_cache: bool = True):
         """
         Initialize with optional user for geographic scoping.
         
         Args:
             user: The requesting user (for role-based filtering)
+            use_cache: Serve registered reports from the analytics cache
+                (False recomputes and refreshes the cached entry)
         """
         self.user = user
+        self.use_cache = use_cache
         self.now = timezone.now()
         self.today = self.now.date()
     
+    @property
+    def cache_scope(self):
+        """Cache key segment matching the role-based filtering below."""
+        if self.user:
+            if self.user.role == 'REGIONAL_COORDINATOR' and self.user.region:
+                return f'region={self.user.region}'
+            if self.user.role == 'CONSTITUENCY_OFFICIAL' and self.user.constituency:
+                return f'constituency={self.user.constituency}'
+        return 'national'
+    
     def _get_farm_queryset(self):
         """Get farm queryset with geographic filtering based on user role."""
         from farms.models import Farm
@@ -80,6 +95,7 @@ class YEAAnalyticsService:
     # EXECUTIVE OVERVIEW
     # =========================================================================
     
+    @cached_report('yea_executive_overview')
     def get_executive_overview(self):
         """
         Get high-level executive metrics for dashboard cards.
@@ -187,6 +203,7 @@ class YEAAnalyticsService:
     # PROGRAM METRICS
     # =========================================================================
     
+    @cached_report('yea_application_pipeline')
     def get_application_pipeline(self):
         """
         Get application pipeline breakdown.
@@ -232,6 +249,7 @@ class YEAAnalyticsService:
             }
         }
     
+    @cached_report('yea_registration_trend')
     def get_registration_trend(self, months=6):
         """
         Get farmer registration trend over time.
@@ -264,6 +282,7 @@ class YEAAnalyticsService:
             for item in registrations
         ]
     
+    @cached_report('yea_farms_by_region')
     def get_farms_by_region(self):
         """
         Get farm distribution by region.
@@ -291,6 +310,7 @@ class YEAAnalyticsService:
             for item in distribution
         ]
     
+    @cached_report('yea_batch_enrollment_stats')
     def get_batch_enrollment_stats(self):
         """
         Get batch/program enrollment statistics.
@@ -326,6 +346,7 @@ class YEAAnalyticsService:
     # PRODUCTION MONITORING
     # =========================================================================
     
+    @cached_report('yea_production_overview')
     def get_production_overview(self):
         """
         Get production overview metrics.
@@ -390,6 +411,7 @@ class YEAAnalyticsService:
             }
         }
     
+    @cached_report('yea_production_trend')
     def get_production_trend(self, days=30):
         """
         Get daily production trend.
@@ -426,6 +448,7 @@ class YEAAnalyticsService:
             for item in trend
         ]
     
+    @cached_report('yea_production_by_region')
     def get_production_by_region(self):
         """
         Get production aggregated by region.
@@ -468,6 +491,7 @@ class YEAAnalyticsService:
             for region, eggs in sorted(region_data.items(), key=lambda x: -x[1])
         ]
     
+    @cached_report('yea_top_performing_farms')
     def get_top_performing_farms(self, limit=10):
         """
         Get top performing farms by egg production.
@@ -503,6 +527,7 @@ class YEAAnalyticsService:
             for item in top_farms
         ]
     
+    @cached_report('yea_underperforming_farms')
     def get_underperforming_farms(self, limit=10):
         """
         Get farms needing attention (low production or high mortality).
@@ -549,6 +574,7 @@ class YEAAnalyticsService:
     # MARKETPLACE ACTIVITY (NOT Platform Revenue)
     # =========================================================================
     
+    @cached_report('yea_marketplace_activity')
     def get_marketplace_activity(self):
         """
         Get marketplace transaction activity (farmer sales, not platform revenue).
@@ -622,6 +648,7 @@ class YEAAnalyticsService:
             }
         }
     
+    @cached_report('yea_sales_by_region')
     def get_sales_by_region(self):
         """
         Get marketplace sales volume by region.
@@ -671,6 +698,7 @@ class YEAAnalyticsService:
             for region, data in sorted(region_data.items(), key=lambda x: -float(x[1]['volume']))
         ]
     
+    @cached_report('yea_top_selling_farmers')
     def get_top_selling_farmers(self, limit=10):
         """
         Get farmers with highest sales volume.
@@ -712,6 +740,7 @@ class YEAAnalyticsService:
     # ALERTS & WATCHLIST
     # =========================================================================
     
+    @cached_report('yea_alerts')
     def get_alerts(self):
         """
         Get system alerts for admin attention.
@@ -719,7 +748,8 @@ class YEAAnalyticsService:
         Returns:
             dict: Categorized alerts
         """
-        from flock_management.models import DailyProduction
+        from flock_management.anomaly_detection import METRIC_MORTALITY
+        from flock_management.models import AnomalyAlert, DailyProduction
         from farms.application_models import FarmApplication
         
         farms = self._get_farm_queryset()
@@ -750,6 +780,28 @@ class YEAAnalyticsService:
                     'farm_id': farm['farm_id']
                 })
         
+        # Mortality outbreaks: spikes flagged by streaming anomaly detection
+        outbreaks = AnomalyAlert.objects.filter(
+            farm__in=farms,
+            metric=METRIC_MORTALITY,
+            observed_on__gte=last_7_days,
+            status='open',
+        ).values('farm_id', 'farm__farm_name').annotate(
+            spike_days=Count('id'),
+            critical_days=Count('id', filter=Q(severity='critical')),
+            deaths=Sum('value'),
+        ).order_by('-critical_days', '-deaths')[:20]
+        
+        for outbreak in outbreaks:
+            alerts['critical' if outbreak['critical_days'] else 'warning'].append({
+                'type': 'mortality_outbreak',
+                'message': (
+                    f"{outbreak['farm__farm_name']} had abnormal mortality on "
+                    f"{outbreak['spike_days']} of the last 7 days ({int(outbreak['deaths'])} birds)"
+                ),
+                'farm_id': str(outbreak['farm_id']),
+            })
+        
         # Aging applications (> 14 days in review)
         old_date = self.now - timedelta(days=14)
         aging_apps = applications.filter(
@@ -790,6 +842,7 @@ class YEAAnalyticsService:
         
         return alerts
     
+    @cached_report('yea_watchlist')
     def get_watchlist(self, limit=20):
         """
         Get farms on watchlist (needing attention).
@@ -1287,6 +1340,7 @@ class YEAAnalyticsService:
             'data': result[:limit]
         }
     
+    @cached_report('yea_geographic_hierarchy')
     def get_geographic_hierarchy(self):
         """
         Get available geographic hierarchy for drill-down navigation.
@@ -1360,10 +1414,142 @@ class YEAAnalyticsService:
             )
         }
 
+    # =========================================================================
+    # FARM MAP CLUSTERS
+    # =========================================================================
+    
+    @cached_report('yea_map_tile')
+    def get_map_tile(self, zoom, x, y, period_days=30):
+        """
+        Farms of one XYZ map tile, clustered into geohash cells.
+        
+        Primary farm locations inside the tile (GiST index on the location)
+        are grouped by ST_GeoHash at the zoom's precision (see
+        map_tiles.geohash_precision), with production and mortality over
+        the period aggregated per cell in a second grouped query.
+        
+        Args:
+            zoom, x, y: Tile coordinates
+            period_days: Number of days for production data
+            
+        Returns:
+            dict: Tile bounds and cells (key, lat, lng, farms, total_birds,
+            eggs_produced, good_eggs, mortality_count, mortality_rate)
+        """
+        from django.contrib.gis.db.models.functions import GeoHash
+        from django.contrib.gis.geos import Polygon
+        from farms.models import FarmLocation
+        from .map_tiles import geohash_precision, mortality_rate, tile_bounds
+        
+        west, south, east, north = tile_bounds(zoom, x, y)
+        envelope = Polygon.from_bbox((west, south, east, north))
+        envelope.srid = 4326
+        precision = geohash_precision(zoom)
+        start_date = self.today - timedelta(days=period_days)
+        
+        # Tiles are half-open (west/south edges inclusive) so a farm on a
+        # shared edge is counted once
+        locations = FarmLocation.objects.filter(
+            farm_id__in=self._get_farm_queryset().values('id'),
+            is_primary_location=True,
+            location__intersects=envelope,
+            longitude__lt=east,
+            latitude__lt=north,
+        ).annotate(cell=GeoHash('location', precision=precision))
+        
+        cells = {}
+        for row in locations.values('cell').annotate(
+            farms=Count('farm_id', distinct=True),
+            total_birds=Coalesce(Sum('farm__current_bird_count'), 0),
+            lat=Avg('latitude'),
+            lng=Avg('longitude'),
+        ).order_by('cell'):
+            cells[row['cell']] = {
+                'key': row['cell'],
+                'lat': round(float(row['lat']), 6),
+                'lng': round(float(row['lng']), 6),
+                'farms': row['farms'],
+                'total_birds': row['total_birds'],
+                'eggs_produced': 0,
+                'good_eggs': 0,
+                'mortality_count': 0,
+            }
+        
+        # Aggregates over the production join are restricted by its filter
+        production = locations.filter(
+            farm__daily_productions__production_date__gte=start_date
+        ).values('cell').annotate(
+            eggs=Coalesce(Sum('farm__daily_productions__eggs_collected'), 0),
+            good=Coalesce(Sum('farm__daily_productions__good_eggs'), 0),
+            mortality=Coalesce(Sum('farm__daily_productions__birds_died'), 0),
+        ).order_by('cell')
+        for row in production:
+            cell = cells.get(row['cell'])
+            if cell:
+                cell['eggs_produced'] = row['eggs']
+                cell['good_eggs'] = row['good']
+                cell['mortality_count'] = row['mortality']
+        
+        for cell in cells.values():
+            cell['mortality_rate'] = mortality_rate(cell['mortality_count'], cell['total_birds'])
+        
+        return {
+            'z': zoom,
+            'x': x,
+            'y': y,
+            'bounds': [west, south, east, north],
+            'precision': precision,
+            'period_days': period_days,
+            'cells': list(cells.values()),
+        }
+    
+    def get_farm_map_clusters(self, bbox, zoom, period_days=30):
+        """
+        Clustered farm points for a map viewport.
+        
+        Built from the cached tiles covering the bounding box, so a pan or
+        a repeat view only aggregates tiles not seen before.
+        
+        Args:
+            bbox: (west, south, east, north) in degrees
+            zoom: Map zoom level
+            period_days: Number of days for production data
+            
+        Returns:
+            dict: Merged cells with a summary
+            
+        Raises:
+            ValueError: Invalid bbox/zoom, or too many tiles for the zoom
+        """
+        from .map_tiles import merge_cells, tiles_for_bbox
+        
+        tiles = tiles_for_bbox(*bbox, zoom)
+        cells = merge_cells(
+            cell
+            for x, y in tiles
+            for cell in self.get_map_tile(zoom, x, y, period_days)['cells']
+        )
+        
+        return {
+            'zoom': zoom,
+            'bbox': list(bbox),
+            'period_days': period_days,
+            'tiles': len(tiles),
+            'cells': cells,
+            'summary': {
+                'total_cells': len(cells),
+                'total_farms': sum(c['farms'] for c in cells),
+                'total_birds': sum(c['total_birds'] for c in cells),
+                'total_eggs': sum(c['eggs_produced'] for c in cells),
+                'total_mortality': sum(c['mortality_count'] for c in cells),
+            }
+        }
+    
     # =========================================================================
     # EGG PRODUCTION ANALYTICS
     # =========================================================================
     
+    @cached_report('yea_egg_production_overview')
     def get_egg_production_overview(self, period_days=30):
         """
         Get comprehensive egg production overview with quality breakdown.
@@ -1802,6 +1988,7 @@ class YEAAnalyticsService:
             'data': result[:limit]
         }
     
+    @cached_report('yea_egg_production_efficiency')
     def get_egg_production_efficiency(self, period_days=30):
         """
         Get egg production efficiency metrics.
@@ -1926,6 +2113,7 @@ class YEAAnalyticsService:
             'days_analyzed': production['days']
         }
     
+    @cached_report('yea_egg_defect_analysis')
     def get_egg_defect_analysis(self, period_days=30):
         """
         Get detailed egg defect analysis with trends.
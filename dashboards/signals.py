@@ -0,0 +1,156 @@
+"""
+Dashboards Signals
+
+Cache invalidation for farmer and admin analytics.
+
+FarmerAnalyticsService caches each analytics section per farm under the
+farm's cache tag (see farm_analytics_cache_tag). A save or delete of any
+record that feeds those sections bumps the tag once the write commits, so
+the farm's next dashboard load recomputes its sections (serving the old
+values while one worker recomputes).
+
+Admin reports (dashboards.cache_registry) depend on kinds of data rather
+than on one farm. A write to production, mortality, sales, order,
+subscription or farm records bumps that kind's national tag, the tag of
+the farm's region and the tag of the month the record falls in.
+"""
+
+import logging
+from operator import attrgetter
+
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from core.cache_utils import bump_cache_tags
+
+from .cache_registry import (
+    DATA_FARMS,
+    DATA_MORTALITY,
+    DATA_ORDERS,
+    DATA_PRODUCTION,
+    DATA_SALES,
+    DATA_SUBSCRIPTIONS,
+    analytics_cache_tags,
+)
+from .services.farmer_analytics import farm_analytics_cache_tag
+
+logger = logging.getLogger(__name__)
+
+# sender -> attribute path to the owning farm's id
+FARMER_ANALYTICS_CACHE_SENDERS = {
+    'farms.Farm': 'pk',
+    'flock_management.Flock': 'farm_id',
+    'flock_management.DailyProduction': 'farm_id',
+    'flock_management.MortalityRecord': 'farm_id',
+    'flock_management.AnomalyAlert': 'farm_id',
+    'feed_inventory.FeedPurchase': 'farm_id',
+    'feed_inventory.FeedInventory': 'farm_id',
+    'sales_revenue.EggSale': 'farm_id',
+    'sales_revenue.BirdSale': 'farm_id',
+    'sales_revenue.MarketplaceOrder': 'farm_id',
+    'sales_revenue.OrderItem': 'order.farm_id',
+    'sales_revenue.Product': 'farm_id',
+    'sales_revenue.FarmInventory': 'farm_id',
+    'sales_revenue.StockMovement': 'farm_id',
+    'procurement.ProcurementInvoice': 'farm_id',
+    'expenses.Expense': 'farm_id',
+    'medication_management.MedicationRecord': 'farm_id',
+    'medication_management.VaccinationRecord': 'farm_id',
+    'medication_management.VetVisit': 'farm_id',
+}
+
+
+def invalidate_farmer_analytics_cache(sender, instance, **kwargs):
+    """Mark the owning farm's cached analytics sections stale after commit."""
+    label = sender._meta.label
+    try:
+        farm_id = attrgetter(FARMER_ANALYTICS_CACHE_SENDERS[label])(instance)
+    except Exception as e:
+        # Cache invalidation must never block the write; entries expire by TTL
+        logger.warning(f"Could not resolve farm for {label} {instance.pk}: {str(e)}")
+        return
+    if farm_id:
+        tag = farm_analytics_cache_tag(farm_id)
+        transaction.on_commit(lambda: bump_cache_tags(tag))
+
+
+for _sender in FARMER_ANALYTICS_CACHE_SENDERS:
+    post_save.connect(
+        invalidate_farmer_analytics_cache, sender=_sender,
+        dispatch_uid=f'farmer_analytics_cache_save:{_sender}'
+    )
+    post_delete.connect(
+        invalidate_farmer_analytics_cache, sender=_sender,
+        dispatch_uid=f'farmer_analytics_cache_delete:{_sender}'
+    )
+
+
+# =============================================================================
+# ADMIN ANALYTICS CACHE INVALIDATION
+# =============================================================================
+
+# sender -> (data kind, path to the farm id, path to the record's date)
+ANALYTICS_CACHE_SENDERS = {
+    'farms.Farm': (DATA_FARMS, 'pk', None),
+    'farms.FarmLocation': (DATA_FARMS, 'farm_id', None),
+    'farms.FarmApplication': (DATA_FARMS, None, 'submitted_at'),
+    'flock_management.DailyProduction': (DATA_PRODUCTION, 'farm_id', 'production_date'),
+    'flock_management.MortalityRecord': (DATA_MORTALITY, 'farm_id', 'date_discovered'),
+    'flock_management.AnomalyAlert': (DATA_MORTALITY, 'farm_id', 'observed_on'),
+    'sales_revenue.EggSale': (DATA_SALES, 'farm_id', 'sale_date'),
+    'sales_revenue.BirdSale': (DATA_SALES, 'farm_id', 'sale_date'),
+    'sales_revenue.MarketplaceOrder': (DATA_ORDERS, 'farm_id', 'created_at'),
+    'sales_revenue.OrderItem': (DATA_ORDERS, 'order.farm_id', 'order.created_at'),
+    'subscriptions.Subscription': (DATA_SUBSCRIPTIONS, 'farm_id', None),
+    'subscriptions.SubscriptionPayment': (DATA_SUBSCRIPTIONS, 'subscription.farm_id', 'period_start'),
+}
+
+
+def _farm_region(farm_id):
+    from farms.models import FarmLocation
+
+    return FarmLocation.objects.filter(
+        farm_id=farm_id, is_primary_location=True
+    ).values_list('region', flat=True).first()
+
+
+def bump_analytics_cache_tags(kind, farm_id=None, day=None):
+    """Bump the admin analytics tags for one written record of ``kind``."""
+    region = _farm_region(farm_id) if farm_id else None
+    bump_cache_tags(*analytics_cache_tags(kind, region=region, day=day))
+
+
+def invalidate_analytics_cache(sender, instance, **kwargs):
+    """Mark admin reports depending on the record's data kind stale after commit."""
+    label = sender._meta.label
+    kind, farm_path, date_path = ANALYTICS_CACHE_SENDERS[label]
+    try:
+        farm_id = attrgetter(farm_path)(instance) if farm_path else None
+        day = attrgetter(date_path)(instance) if date_path else None
+    except Exception as e:
+        logger.warning(f"Could not resolve analytics tags for {label} {instance.pk}: {str(e)}")
+        farm_id = day = None
+    if isinstance(day, datetime):
+        day = day.date()
+
+    def bump():
+        try:
+            bump_analytics_cache_tags(kind, farm_id, day)
+        except Exception as e:
+            # Runs after commit: never fail the request, entries expire by TTL
+            logger.warning(f"Analytics cache invalidation failed for {label}: {str(e)}")
+
+    transaction.on_commit(bump)
+
+
+for _sender in ANALYTICS_CACHE_SENDERS:
+    post_save.connect(
+        invalidate_analytics_cache, sender=_sender,
+        dispatch_uid=f'analytics_cache_save:{_sender}'
+    )
+    post_delete.connect(
+        invalidate_analytics_cache, sender=_sender,
+        dispatch_uid=f'analytics_cache_delete:{_sender}'
+    )
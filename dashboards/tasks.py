@@ -9,6 +9,7 @@ from django.utils import timezone
 from django.core.cache import cache
 from datetime import timedelta
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -21,49 +22,26 @@ def aggregate_daily_metrics():
     Scheduled via Celery Beat to run at 1 AM daily.
     This pre-computes expensive queries for fast dashboard loading.
     """
+    from dashboards.cache_registry import SCOPE_NATIONAL, reports_for_scope, warm_report
     from dashboards.services import YEAAnalyticsService
     
     logger.info("Starting daily metrics aggregation...")
     
     try:
-        service = YEAAnalyticsService()
-        
-        # Cache executive overview (most requested)
-        overview = service.get_executive_overview()
-        cache.set('dashboard:executive_overview', overview, timeout=86400)  # 24 hours
-        
-        # Cache application pipeline
-        pipeline = service.get_application_pipeline()
-        cache.set('dashboard:application_pipeline', pipeline, timeout=86400)
-        
-        # Cache production overview
-        production = service.get_production_overview()
-        cache.set('dashboard:production_overview', production, timeout=86400)
-        
-        # Cache production trend (last 30 days)
-        trend = service.get_production_trend(days=30)
-        cache.set('dashboard:production_trend_30d', trend, timeout=86400)
-        
-        # Cache marketplace activity
-        marketplace = service.get_marketplace_activity()
-        cache.set('dashboard:marketplace_activity', marketplace, timeout=86400)
+        service = YEAAnalyticsService(use_cache=False)
         
-        # Cache alerts
-        alerts = service.get_alerts()
-        cache.set('dashboard:alerts', alerts, timeout=3600)  # 1 hour - alerts need fresher data
+        # Executive overview, pipeline, production, 30-day trend, marketplace
+        # activity, alerts and watchlist - declared in dashboards.cache_registry
+        cached_keys = []
+        for report in reports_for_scope(SCOPE_NATIONAL, namespace='dashboard'):
+            cache_key, _ = warm_report(report.name, service)
+            cached_keys.append(cache_key)
         
         logger.info("Daily metrics aggregation completed successfully")
         return {
             'status': 'success',
             'timestamp': timezone.now().isoformat(),
-            'cached_keys': [
-                'dashboard:executive_overview',
-                'dashboard:application_pipeline', 
-                'dashboard:production_overview',
-                'dashboard:production_trend_30d',
-                'dashboard:marketplace_activity',
-                'dashboard:alerts'
-            ]
+            'cached_keys': cached_keys,
         }
     except Exception as exc:
         logger.error(f"Daily metrics aggregation failed: {exc}")
@@ -71,34 +49,48 @@ def aggregate_daily_metrics():
 
 
 @shared_task
-def aggregate_regional_metrics():
+def aggregate_regional_metrics(run_async: bool = True):
     """
-    Aggregate metrics per region for regional dashboards.
+    Pre-compute regional dashboards for regional coordinators.
     
-    Can be called manually or scheduled as needed.
+    Scheduled via Celery Beat to run at 1:30 AM daily. YEA dashboard
+    reports are filtered by the requesting user's role, so each region is
+    warmed as one of its coordinators: entries land under the same
+    ``region=...`` scoped keys the coordinators' requests read. One task per
+    (report, region) pair runs in a chord (see _dispatch_warmup).
+    
+    Args:
+        run_async: Dispatch the chord to workers (False runs it inline and
+            returns the timing summary)
     """
-    from dashboards.services import YEAAnalyticsService
+    from dashboards.cache_registry import SCOPE_REGION, WARMUP_REGIONAL_DASHBOARD, reports_for_scope
     from accounts.models import User
     
-    logger.info("Starting regional metrics aggregation...")
+    # One coordinator per region (regions differing only in case share a key)
+    coordinators = {}
+    rows = User.objects.filter(
+        role='REGIONAL_COORDINATOR', is_active=True
+    ).exclude(region__isnull=True).exclude(region='').order_by('date_joined').values_list('id', 'region')
+    for user_id, region in rows:
+        coordinators.setdefault(region.strip().lower(), user_id)
+    
+    jobs = [
+        warm_dashboard_report.si(report.name, str(user_id))
+        for report in reports_for_scope(SCOPE_REGION, namespace='dashboard')
+        for user_id in coordinators.values()
+    ]
+    return _dispatch_warmup(WARMUP_REGIONAL_DASHBOARD, jobs, run_async=run_async, regions=len(coordinators))
+
+
+@shared_task
+def warm_dashboard_report(name: str, user_id: str = None) -> dict:
+    """Warm one YEA dashboard report as seen by ``user_id`` (national if None)."""
+    from dashboards.services import YEAAnalyticsService
+    from accounts.models import User
     
-    try:
-        # Get unique regions from regional coordinators
-        regions = User.objects.filter(
-            role='REGIONAL_COORDINATOR'
-        ).values_list('region', flat=True).distinct()
-        
-        for region in regions:
-            if region:
-                service = YEAAnalyticsService(region=region)
-                overview = service.get_executive_overview()
-                cache.set(f'dashboard:region:{region}:overview', overview, timeout=86400)
-        
-        logger.info(f"Regional metrics aggregation completed for {len(regions)} regions")
-        return {'status': 'success', 'regions_processed': len(list(regions))}
-    except Exception as exc:
-        logger.error(f"Regional metrics aggregation failed: {exc}")
-        return {'status': 'error', 'error': str(exc)}
+    user = User.objects.filter(pk=user_id).first() if user_id else None
+    service = YEAAnalyticsService(user=user, use_cache=False)
+    return _timed_warm(name, service, scope=service.cache_scope)
 
 
 @shared_task
@@ -193,32 +185,28 @@ def refresh_dashboard_cache(cache_keys: list = None):
         from dashboards.tasks import refresh_dashboard_cache
         refresh_dashboard_cache.delay(['executive_overview', 'alerts'])
     """
+    from dashboards.cache_registry import SCOPE_NATIONAL, get_report, reports_for_scope, warm_report
     from dashboards.services import YEAAnalyticsService
     
-    service = YEAAnalyticsService()
-    
-    all_keys = {
-        'executive_overview': lambda: service.get_executive_overview(),
-        'application_pipeline': lambda: service.get_application_pipeline(),
-        'production_overview': lambda: service.get_production_overview(),
-        'production_trend': lambda: service.get_production_trend(days=30),
-        'marketplace_activity': lambda: service.get_marketplace_activity(),
-        'alerts': lambda: service.get_alerts(),
-        'watchlist': lambda: service.get_watchlist(),
-    }
+    service = YEAAnalyticsService(use_cache=False)
     
-    keys_to_refresh = cache_keys or list(all_keys.keys())
+    keys_to_refresh = cache_keys or [
+        report.name.replace('yea_', '', 1)
+        for report in reports_for_scope(SCOPE_NATIONAL, namespace='dashboard')
+    ]
     refreshed = []
     
     for key in keys_to_refresh:
-        if key in all_keys:
-            try:
-                data = all_keys[key]()
-                timeout = 3600 if key == 'alerts' else 86400
-                cache.set(f'dashboard:{key}', data, timeout=timeout)
-                refreshed.append(key)
-            except Exception as exc:
-                logger.error(f"Failed to refresh {key}: {exc}")
+        try:
+            report = get_report(f'yea_{key}')
+        except KeyError:
+            logger.warning(f"Skipping unknown dashboard cache key: {key}")
+            continue
+        try:
+            warm_report(report.name, service)
+            refreshed.append(key)
+        except Exception as exc:
+            logger.error(f"Failed to refresh {key}: {exc}")
     
     return {'refreshed': refreshed, 'requested': keys_to_refresh}
 
@@ -301,75 +289,164 @@ Report generated on {timezone.now().strftime('%Y-%m-%d %H:%M')}
 # =============================================================================
 
 @shared_task
-def precompute_national_admin_reports():
+def precompute_national_admin_reports(run_async: bool = True):
     """
     Pre-compute all National Admin reports for fast access.
     
     Scheduled via Celery Beat to run at 2 AM daily.
     This ensures the Minister/National Admin dashboard loads instantly.
+    
+    Which reports are warmed at which scope is declared in
+    dashboards.cache_registry; entries are written under the same canonical
+    keys the service and views read.
+    
+    Every (report, region) pair is warmed by its own task in a chord, so a
+    slow or failing region does not hold up or abort the others. Composite
+    reports (the executive dashboard) are built by the chord callback once
+    the reports they consist of are warm, reading them from the cache
+    instead of recomputing them.
+    
+    Args:
+        run_async: Dispatch the chord to workers (False runs it inline and
+            returns the timing summary)
     """
-    from dashboards.services.national_admin_analytics import NationalAdminAnalyticsService
+    from dashboards.cache_registry import (
+        SCOPE_NATIONAL,
+        SCOPE_REGION,
+        WARMUP_NATIONAL_ADMIN,
+        reports_for_scope,
+    )
     from farms.models import FarmLocation
     
-    logger.info("Starting National Admin reports pre-computation...")
+    regions = sorted({
+        region.strip() for region in
+        FarmLocation.objects.filter(is_primary_location=True)
+        .exclude(region__isnull=True)
+        .values_list('region', flat=True)
+        .distinct()
+        if region and region.strip()
+    })
+    
+    pairs = [(report, None) for report in reports_for_scope(SCOPE_NATIONAL)]
+    pairs += [(report, region) for report in reports_for_scope(SCOPE_REGION) for region in regions]
+    
+    jobs = [warm_admin_report.si(report.name, region) for report, region in pairs if not report.composite]
+    composites = [[report.name, region] for report, region in pairs if report.composite]
+    return _dispatch_warmup(
+        WARMUP_NATIONAL_ADMIN, jobs, composites=composites, run_async=run_async, regions=len(regions)
+    )
+
+
+@shared_task
+def warm_admin_report(name: str, region: str = None, reuse_cached: bool = False) -> dict:
+    """
+    Warm one National Admin report for one region (national if None).
     
+    With ``reuse_cached`` the reports it is built from are read from the
+    cache rather than recomputed.
+    """
+    from dashboards.services.national_admin_analytics import NationalAdminAnalyticsService
+    
+    service = NationalAdminAnalyticsService(use_cache=reuse_cached)
+    params = {'region': region} if region else {}
+    return _timed_warm(name, service, scope=region or 'national', **params)
+
+
+@shared_task
+def finish_report_warmup(results: list, pipeline: str, started_at: float,
+                         composites: list = (), regions: int = 0) -> dict:
+    """
+    Chord callback: warm composite reports, then record per-report timings.
+    
+    Args:
+        results: Return values of the chord's warm tasks
+        pipeline: WARMUP_* name the timings are recorded under
+        started_at: time.time() when the pipeline was dispatched
+        composites: [report, region] pairs built from the warmed reports
+        regions: Number of regions covered (for the summary)
+    """
+    from dashboards.cache_registry import record_warmup_run
+    
+    results = list(results or [])
+    for name, region in composites:
+        results.append(warm_admin_report(name, region, reuse_cached=True))
+    
+    summary = _summarize_warmup(pipeline, results, started_at, regions)
+    record_warmup_run(pipeline, summary)
+    
+    slowest = max(results, key=lambda r: r['seconds'], default=None)
+    logger.info(
+        f"{pipeline} warm-up: {len(results) - len(summary['failed'])}/{len(results)} reports "
+        f"in {summary['wall_seconds']}s"
+        + (f", slowest {slowest['report']} ({slowest['scope']}) {slowest['seconds']}s" if slowest else '')
+    )
+    return summary
+
+
+def _timed_warm(name, service, scope, **params) -> dict:
+    """Warm one report, never raising: the outcome and duration are returned."""
+    from dashboards.cache_registry import warm_report
+    
+    started = time.monotonic()
+    result = {'report': name, 'scope': scope, 'status': 'success'}
     try:
-        service = NationalAdminAnalyticsService(use_cache=False)
-        
-        # Pre-compute national-level reports
-        reports = {
-            'executive_dashboard': service.get_executive_dashboard(),
-            'program_performance': service.get_program_performance_overview(),
-            'production_overview': service.get_production_overview(days=30),
-            'regional_comparison': service.get_regional_production_comparison(),
-            'financial_overview': service.get_financial_overview(days=30),
-            'flock_health': service.get_flock_health_overview(days=30),
-            'food_security': service.get_food_security_metrics(),
-            'farmer_welfare': service.get_farmer_welfare_metrics(),
-            'operational': service.get_operational_metrics(),
-            'enrollment_trend': service.get_enrollment_trend(months=12),
-        }
-        
-        # Cache each report with appropriate TTL
-        for key, data in reports.items():
-            cache.set(f'national_admin:{key}', data, timeout=86400)
-        
-        logger.info("National-level reports pre-computed successfully")
-        
-        # Pre-compute regional reports for each region
-        regions = list(
-            FarmLocation.objects.filter(is_primary_location=True)
-            .values_list('region', flat=True)
-            .distinct()
-        )
-        
-        for region in regions:
-            if not region:
-                continue
-            try:
-                regional_service = NationalAdminAnalyticsService(use_cache=False)
-                regional_data = {
-                    'executive_dashboard': regional_service.get_executive_dashboard(region=region),
-                    'production_overview': regional_service.get_production_overview(region=region, days=30),
-                    'financial_overview': regional_service.get_financial_overview(region=region, days=30),
-                }
-                for key, data in regional_data.items():
-                    cache.set(f'national_admin:{key}:{region}', data, timeout=86400)
-            except Exception as region_exc:
-                logger.warning(f"Failed to pre-compute for region {region}: {region_exc}")
-        
-        logger.info(f"Regional reports pre-computed for {len(regions)} regions")
-        
-        return {
-            'status': 'success',
-            'national_reports': list(reports.keys()),
-            'regions_processed': len([r for r in regions if r]),
-            'timestamp': timezone.now().isoformat(),
-        }
-        
+        result['cache_key'], _ = warm_report(name, service, **params)
     except Exception as exc:
-        logger.error(f"National Admin reports pre-computation failed: {exc}")
-        return {'status': 'error', 'error': str(exc)}
+        logger.warning(f"Failed to warm {name} ({scope}): {exc}")
+        result.update(status='error', error=str(exc))
+    result['seconds'] = round(time.monotonic() - started, 3)
+    return result
+
+
+def _dispatch_warmup(pipeline, jobs, composites=(), run_async=True, regions=0):
+    """Run warm tasks as a chord whose callback warms composites and records timings."""
+    from celery import chord, group
+    
+    started_at = time.time()
+    if not jobs or not run_async:
+        results = group(jobs).apply().get() if jobs else []
+        return finish_report_warmup(results, pipeline, started_at, list(composites), regions)
+    
+    result = chord(jobs)(finish_report_warmup.s(pipeline, started_at, list(composites), regions))
+    logger.info(f"{pipeline} warm-up dispatched: {len(jobs)} report tasks across {regions} regions")
+    return {
+        'status': 'dispatched',
+        'pipeline': pipeline,
+        'tasks': len(jobs),
+        'composites': len(composites),
+        'regions': regions,
+        'chord_id': result.id,
+    }
+
+
+def _summarize_warmup(pipeline, results, started_at, regions) -> dict:
+    """Per-report timings (count, total, max, slowest scope) and failures."""
+    reports = {}
+    for result in results:
+        timing = reports.setdefault(result['report'], {
+            'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0, 'slowest_scope': None,
+        })
+        timing['count'] += 1
+        timing['total_seconds'] = round(timing['total_seconds'] + result['seconds'], 3)
+        if result['seconds'] >= timing['max_seconds']:
+            timing['max_seconds'] = result['seconds']
+            timing['slowest_scope'] = result['scope']
+    
+    failed = [r for r in results if r['status'] != 'success']
+    return {
+        'status': 'success' if not failed else 'partial',
+        'pipeline': pipeline,
+        'national_reports': sorted({
+            r['report'] for r in results if r['scope'] == 'national' and r['status'] == 'success'
+        }),
+        'regions_processed': regions,
+        'reports': reports,
+        'failed': [
+            {'report': r['report'], 'scope': r['scope'], 'error': r.get('error')} for r in failed
+        ],
+        'wall_seconds': round(time.time() - started_at, 3),
+        'timestamp': timezone.now().isoformat(),
+    }
 
 
 @shared_task
@@ -391,6 +468,7 @@ def generate_minister_report(
     Returns:
         dict: Report data or cache key
     """
+    from dashboards.cache_registry import get_report, warm_report
     from dashboards.services.national_admin_analytics import NationalAdminAnalyticsService
     
     logger.info(f"Generating {report_type} report (region={region}, constituency={constituency})")
@@ -398,28 +476,22 @@ def generate_minister_report(
     try:
         service = NationalAdminAnalyticsService(use_cache=False)
         
-        report_methods = {
-            'executive_dashboard': lambda: service.get_executive_dashboard(region, constituency),
-            'program_performance': lambda: service.get_program_performance_overview(region, constituency),
-            'production': lambda: service.get_production_overview(region, constituency),
-            'financial': lambda: service.get_financial_overview(region, constituency),
-            'flock_health': lambda: service.get_flock_health_overview(region, constituency),
-            'food_security': lambda: service.get_food_security_metrics(region, constituency),
-            'procurement': lambda: service.get_procurement_overview(region, constituency),
-            'farmer_welfare': lambda: service.get_farmer_welfare_metrics(region, constituency),
-            'operational': lambda: service.get_operational_metrics(region, constituency),
-            'regional_comparison': lambda: service.get_regional_production_comparison(),
-            'enrollment_trend': lambda: service.get_enrollment_trend(12, region, constituency),
-        }
-        
-        if report_type not in report_methods:
+        try:
+            report = get_report(report_type)
+        except KeyError:
+            report = None
+        if report is None or not report.method:
             return {'status': 'error', 'error': f'Unknown report type: {report_type}'}
         
-        data = report_methods[report_type]()
+        # Geographic parameters only apply to reports that accept them
+        scope = {
+            param: value
+            for param, value in (('region', region), ('constituency', constituency))
+            if param in report.params
+        }
         
-        # Cache the result
-        cache_key = f"national_admin:ondemand:{report_type}:{region or 'national'}:{constituency or 'all'}"
-        cache.set(cache_key, data, timeout=1800)  # 30 minutes
+        # Cache the result under the key the report endpoints read
+        cache_key, data = warm_report(report.name, service, **scope)
         
         logger.info(f"Report {report_type} generated and cached")
         return {
@@ -443,34 +515,27 @@ def refresh_national_admin_cache(report_types: list = None, region: str = None):
         refresh_national_admin_cache.delay(['executive_dashboard', 'production'])
         refresh_national_admin_cache.delay(region='Greater Accra')
     """
+    from dashboards.cache_registry import SCOPE_NATIONAL, get_report, reports_for_scope, warm_report
     from dashboards.services.national_admin_analytics import NationalAdminAnalyticsService
     
     service = NationalAdminAnalyticsService(use_cache=False)
     
-    all_reports = {
-        'executive_dashboard': lambda: service.get_executive_dashboard(region),
-        'program_performance': lambda: service.get_program_performance_overview(region),
-        'production_overview': lambda: service.get_production_overview(region=region),
-        'financial_overview': lambda: service.get_financial_overview(region=region),
-        'flock_health': lambda: service.get_flock_health_overview(region=region),
-        'food_security': lambda: service.get_food_security_metrics(region),
-        'farmer_welfare': lambda: service.get_farmer_welfare_metrics(region),
-        'operational': lambda: service.get_operational_metrics(region),
-    }
-    
-    types_to_refresh = report_types or list(all_reports.keys())
+    types_to_refresh = report_types or [r.name for r in reports_for_scope(SCOPE_NATIONAL)]
     refreshed = []
     
     for report_type in types_to_refresh:
-        if report_type in all_reports:
-            try:
-                data = all_reports[report_type]()
-                cache_key = f'national_admin:{report_type}'
-                if region:
-                    cache_key += f':{region}'
-                cache.set(cache_key, data, timeout=86400)
-                refreshed.append(report_type)
-            except Exception as exc:
-                logger.error(f"Failed to refresh {report_type}: {exc}")
+        try:
+            report = get_report(report_type)
+        except KeyError:
+            logger.warning(f"Skipping unknown report type: {report_type}")
+            continue
+        if not report.method:
+            continue
+        try:
+            params = {'region': region} if region and 'region' in report.params else {}
+            warm_report(report.name, service, **params)
+            refreshed.append(report_type)
+        except Exception as exc:
+            logger.error(f"Failed to refresh {report_type}: {exc}")
     
     return {'refreshed': refreshed, 'requested': types_to_refresh}
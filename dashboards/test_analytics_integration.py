@@ -470,6 +470,20 @@ class TestPerformance:
         assert 'farms' in data
         assert 'pagination' in data
         assert data['pagination']['page'] == 1
+    
+    def test_executive_overview_single_pass_kpis(self, complete_ecosystem, django_assert_num_queries):
+        """Executive KPI widgets cost one aggregate query per source table."""
+        from dashboards.services.executive import ExecutiveDashboardService
+        
+        with django_assert_num_queries(5):
+            stats = ExecutiveDashboardService().get_overview_stats()
+        
+        assert stats['farms']['total'] == Farm.objects.count()
+        assert stats['farms']['approved'] == Farm.objects.filter(
+            application_status='Approved - Farm ID Assigned'
+        ).count()
+        assert stats['procurement']['total_orders'] == 0
+        assert stats['financials']['budget_utilization'] == 0
 
 
 class TestErrorRecovery:
@@ -674,3 +674,73 @@ class TestDataAccuracy:
         
         # Mortality rate should be reasonable
         assert 0 <= mortality['mortality_rate_period'] <= 100
+
+
+class TestAnalyticsSectionCache:
+    """Test per-farm section caching, invalidation and grouped queries."""
+    
+    def test_section_served_from_cache(self, farmer_with_farm, django_assert_num_queries):
+        """A cached section is returned without touching the database."""
+        from dashboards.services.farmer_analytics import FarmerAnalyticsService
+        
+        service = FarmerAnalyticsService(farmer_with_farm['user'])
+        first = service.get_section('production', 30)
+        
+        with django_assert_num_queries(0):
+            second = service.get_section('production', 30)
+        
+        assert second == first
+    
+    def test_write_invalidates_farm_sections(
+        self, farmer_with_farm, django_capture_on_commit_callbacks
+    ):
+        """Recording production marks the farm's cached sections stale."""
+        from dashboards.services.farmer_analytics import FarmerAnalyticsService
+        
+        service = FarmerAnalyticsService(farmer_with_farm['user'])
+        before = service.get_section('production', 30)['summary']['total_eggs']
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            DailyProduction.objects.create(
+                farm=farmer_with_farm['farm'],
+                flock=farmer_with_farm['flocks'][0],
+                production_date=timezone.now().date() - timedelta(days=30),
+                eggs_collected=100,
+                good_eggs=100,
+            )
+        
+        after = service.get_section('production', 30)['summary']['total_eggs']
+        assert after == before + 100
+    
+    def test_full_analytics_matches_sections(self, farmer_with_farm):
+        """get_full_analytics returns the same data as the individual sections."""
+        from dashboards.services.farmer_analytics import FarmerAnalyticsService
+        
+        service = FarmerAnalyticsService(farmer_with_farm['user'])
+        full = service.get_full_analytics(days=30)
+        
+        for name in FarmerAnalyticsService.SECTIONS:
+            assert full[name] == service.get_section(name, 30)
+    
+    def test_marketplace_top_sellers_single_query(self, farmer_with_farm):
+        """Product performance comes from one grouped OrderItem query."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from dashboards.services.farmer_analytics import FarmerAnalyticsService
+        
+        service = FarmerAnalyticsService(farmer_with_farm['user'])
+        with CaptureQueriesContext(connection) as queries:
+            result = service.get_marketplace_analytics(days=30)
+        
+        order_item_queries = [
+            q['sql'] for q in queries.captured_queries
+            if 'marketplace_order_items' in q['sql']
+        ]
+        assert len(order_item_queries) == 1
+        top_sellers = result['products']['top_sellers']
+        assert len(top_sellers) == 1
+        assert top_sellers[0]['name'] == 'Fresh Layer Eggs'
+        assert top_sellers[0]['orders'] == 5
+        assert top_sellers[0]['quantity_sold'] == 50.0
+        assert result['customers']['unique_customers'] == 1
+        assert result['customers']['repeat_customers'] == 1
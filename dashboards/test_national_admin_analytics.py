@@ -764,3 +764,218 @@ class TestDrillDownNavigation:
         assert 'id' in farm
         assert 'farm_name' in farm
         assert 'constituency' in farm
+
+
+class TestAnalyticsCacheRegistry:
+    """Test canonical report keys shared by services, views and warm-up tasks."""
+    
+    def test_cache_key_is_canonical(self):
+        """Positional, keyword, default and differently cased params map to one key."""
+        from dashboards.cache_registry import get_report
+        
+        report = get_report('production_overview')
+        
+        assert report.cache_key('Greater Accra', None, 30) == report.cache_key(region='greater  accra')
+        assert report.cache_key() == 'national_admin:production_overview:_:_:30'
+        assert report.cache_key(days=7) != report.cache_key()
+    
+    def test_legacy_alias_resolves(self):
+        """Old on-demand report type names resolve to registered reports."""
+        from dashboards.cache_registry import get_report
+        
+        assert get_report('production').name == 'production_overview'
+        with pytest.raises(KeyError):
+            get_report('does_not_exist')
+    
+    def test_precomputed_reports_are_served(self, api_client, super_admin, sample_farm):
+        """The nightly warm-up writes the keys the executive endpoint reads."""
+        from dashboards.cache_registry import get_cache_stats, reset_cache_stats
+        from dashboards.tasks import precompute_national_admin_reports
+        
+        result = precompute_national_admin_reports(run_async=False)
+        assert result['status'] == 'success'
+        assert 'executive_dashboard' in result['national_reports']
+        assert result['reports']['executive_dashboard']['count'] >= 1
+        
+        reset_cache_stats()
+        api_client.force_authenticate(user=super_admin)
+        response = api_client.get('/api/admin/reports/executive/')
+        
+        assert response.status_code == status.HTTP_200_OK
+        stats = get_cache_stats(['executive_dashboard'])['executive_dashboard']
+        assert stats['hits'] == 1
+        assert stats['misses'] == 0
+    
+    def test_failed_report_does_not_abort_warmup(self, multiple_farms, monkeypatch):
+        """One failing (report, region) task is reported; the rest still warm."""
+        from dashboards.services.national_admin_analytics import NationalAdminAnalyticsService
+        from dashboards.tasks import precompute_national_admin_reports
+        
+        def fail(self, region=None, constituency=None, days=30):
+            raise RuntimeError('boom')
+        
+        monkeypatch.setattr(NationalAdminAnalyticsService, 'get_financial_overview', fail)
+        
+        result = precompute_national_admin_reports(run_async=False)
+        
+        assert result['status'] == 'partial'
+        assert {f['report'] for f in result['failed']} >= {'financial_overview'}
+        assert 'production_overview' in result['national_reports']
+        assert result['regions_processed'] >= 1
+    
+    def test_regional_dashboards_warmed_as_coordinator(self, regional_coordinator, multiple_farms):
+        """Regional warm-up writes the scoped keys coordinators read."""
+        from django.core.cache import cache
+        from dashboards.cache_registry import get_report
+        from dashboards.tasks import aggregate_regional_metrics
+        
+        result = aggregate_regional_metrics(run_async=False)
+        
+        assert result['status'] == 'success'
+        assert result['regions_processed'] == 1
+        key = get_report('yea_executive_overview').cache_key(scope='region=Greater Accra')
+        assert cache.get(key) is not None
+    
+    def test_cache_stats_endpoint(self, api_client, super_admin):
+        """Admins can read per-report hit/miss counters."""
+        api_client.force_authenticate(user=super_admin)
+        response = api_client.get('/api/admin/reports/refresh-cache/')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert 'executive_dashboard' in response.json()['reports']
+
+
+class TestStaleWhileRevalidate:
+    """Test stampede-protected report caching."""
+    
+    def test_falsy_results_are_cached(self):
+        """Empty reports are served from the cache instead of recomputed."""
+        from core.cache_utils import cached_with_stale
+        
+        calls = []
+        
+        def compute():
+            calls.append(1)
+            return []
+        
+        assert cached_with_stale('test:empty_report', compute, ttl=60) == []
+        assert cached_with_stale('test:empty_report', compute, ttl=60) == []
+        assert len(calls) == 1
+    
+    def test_stale_value_served_while_refreshing(self):
+        """Only the lock holder recomputes; other readers get the stale value."""
+        from django.core.cache import cache
+        from core.cache_utils import cached_with_stale, set_cached
+        
+        set_cached('test:report', 'old', ttl=0, stale_ttl=60)
+        cache.add('test:report:compute_lock', 'other-worker', 60)
+        
+        def compute():
+            raise AssertionError('should not recompute while another worker holds the lock')
+        
+        assert cached_with_stale('test:report', compute, ttl=60) == 'old'
+
+    def test_cold_miss_waits_for_holder_release(self):
+        """A cold-miss reader is woken by the holder's release and reads its result."""
+        import threading
+        import time
+        from core.cache_utils import _acquire_compute_lock, cached_with_stale, set_cached
+
+        holder = _acquire_compute_lock('test:cold_report', 60)
+
+        def finish():
+            time.sleep(0.2)
+            set_cached('test:cold_report', 'computed', ttl=60)
+            holder.release()
+
+        def compute():
+            raise AssertionError('should wait for the lock holder instead of recomputing')
+
+        worker = threading.Thread(target=finish)
+        worker.start()
+        started = time.monotonic()
+        assert cached_with_stale('test:cold_report', compute, ttl=60, wait_seconds=5) == 'computed'
+        worker.join()
+        assert time.monotonic() - started < 2
+
+    def test_cold_miss_ignores_result_stale_for_its_tags(self):
+        """A result computed before a tag bump is not served to a waiter that saw the bump."""
+        import threading
+        import time
+        from core.cache_utils import (
+            _acquire_compute_lock, _store, bump_cache_tags, cached_with_stale,
+            get_cache_tag_versions,
+        )
+
+        holder = _acquire_compute_lock('test:tagged_report', 60)
+        before_bump = get_cache_tag_versions(['test:tag'])
+        bump_cache_tags('test:tag')
+
+        def finish():
+            time.sleep(0.2)
+            _store('test:tagged_report', 'before-bump', 60, 60, before_bump)
+            holder.release()
+
+        worker = threading.Thread(target=finish)
+        worker.start()
+        value = cached_with_stale(
+            'test:tagged_report', lambda: 'after-bump', ttl=60, tags=['test:tag'], wait_seconds=5,
+        )
+        worker.join()
+
+        assert value == 'after-bump'
+
+    def test_yea_reports_keyed_by_role_scope(self, regional_coordinator):
+        """Region-filtered YEA reports never share a cache entry with national ones."""
+        from dashboards.cache_registry import get_report
+        from dashboards.services import YEAAnalyticsService
+        
+        report = get_report('yea_executive_overview')
+        national = report.cache_key(scope=YEAAnalyticsService().cache_scope)
+        regional = report.cache_key(scope=YEAAnalyticsService(user=regional_coordinator).cache_scope)
+        
+        assert national == 'dashboard:yea_executive_overview:national'
+        assert regional == 'dashboard:yea_executive_overview:region=greater_accra'
+
+
+class TestAnalyticsCacheInvalidation:
+    """Test tag-based invalidation of cached admin reports."""
+    
+    def test_report_tags_follow_scope(self):
+        """Regional entries use region tags, national windowed entries month tags."""
+        from dashboards.cache_registry import get_report
+        
+        report = get_report('production_overview')
+        current_month = f"analytics:production:month={timezone.localdate():%Y-%m}"
+        
+        assert report.cache_tags(region='Greater Accra') == ['analytics:production:region=greater_accra']
+        assert current_month in report.cache_tags(days=30)
+        assert report.cache_tags(constituency='Ayawaso West') == ['analytics:production']
+    
+    def test_production_write_invalidates_report(
+        self, sample_farm, django_capture_on_commit_callbacks
+    ):
+        """A saved production record makes the next read recompute the report."""
+        from dashboards.cache_registry import get_cache_stats, reset_cache_stats
+        from dashboards.services.national_admin_analytics import NationalAdminAnalyticsService
+        
+        service = NationalAdminAnalyticsService()
+        reset_cache_stats()
+        service.get_production_overview()
+        service.get_production_overview()
+        
+        record = DailyProduction.objects.filter(farm=sample_farm).first()
+        record.eggs_collected += 10
+        with django_capture_on_commit_callbacks(execute=True):
+            record.save()
+        service.get_production_overview()
+        
+        stats = get_cache_stats(['production_overview'])['production_overview']
+        assert stats['hits'] == 1
+        assert stats['misses'] == 2
+    
+    def test_purge_skipped_without_key_scans(self):
+        """The purge task is a no-op on cache backends that cannot SCAN."""
+        from core.tasks import purge_stale_cache
+        
+        assert purge_stale_cache()['status'] == 'skipped'
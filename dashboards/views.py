@@ -11,6 +11,8 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 
+from core.idempotency import IdempotencyInProgress
+
 from .permissions import IsExecutive, IsProcurementOfficer, IsFarmer
 from .services import ExecutiveDashboardService, OfficerDashboardService, FarmerDashboardService
 
@@ -222,6 +224,8 @@ class OfficerOrdersView(APIView):
             'unit': data.get('unit', 'birds'),
             'price_per_unit': price_per_unit,
             'delivery_location': data.get('delivery_location', ''),
+            'delivery_location_gps': data.get('delivery_location_gps', ''),
+            'delivery_radius_km': data.get('delivery_radius_km'),
             'delivery_deadline': data.get('delivery_deadline'),
             'preferred_region': data.get('preferred_region'),
             'max_farms': data.get('max_farms', 10),
@@ -286,6 +290,11 @@ class OfficerOrdersView(APIView):
                     }
                 }, status=status.HTTP_201_CREATED)
                 
+        except IdempotencyInProgress:
+            return Response(
+                {'error': 'This order is already being created', 'code': 'IN_PROGRESS'},
+                status=status.HTTP_409_CONFLICT
+            )
         except ValueError as e:
             return Response(
                 {'error': str(e), 'code': 'VALIDATION_ERROR'},
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.10 on 2026-10-18 09:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("farms", "0017_remove_farm_government_subsidy_active_and_more"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="farm",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="farm",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="farms_search_vector_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="farm",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["farm_name"],
+                name="farms_farm_name_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE farms SET search_vector =
+                    setweight(to_tsvector('english', coalesce(farm_name, '')), 'A') ||
+                    setweight(to_tsvector('english', coalesce(primary_constituency, '')), 'B');
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
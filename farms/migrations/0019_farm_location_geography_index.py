@@ -0,0 +1,26 @@
+# Generated by Django 5.2.10 on 2026-10-18 15:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    GiST index on farm_locations.location cast to geography, for the
+    metre-radius ST_DWithin and KNN (<->) queries of procurement proximity
+    matching. The geometry index Django creates for the PointField cannot
+    serve geography predicates.
+    """
+
+    dependencies = [
+        ("farms", "0018_farm_search_vector"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE INDEX IF NOT EXISTS farm_locations_geog_gist
+                ON farm_locations USING GIST ((location::geography));
+            """,
+            reverse_sql="DROP INDEX IF EXISTS farm_locations_geog_gist;",
+        ),
+    ]
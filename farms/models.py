@@ -19,6 +19,8 @@ from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator, RegexValidator
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.gis.db import models as gis_models
 from django.contrib.gis.geos import Point
 from django.utils import timezone
@@ -713,6 +715,9 @@ class Farm(models.Model):
         help_text="Days oldest inventory has been sitting unsold"
     )
     
+    # Full-text search for the public marketplace (see sales_revenue.marketplace_search)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     # Timestamps
     application_date = models.DateTimeField(auto_now_add=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -741,6 +746,9 @@ class Farm(models.Model):
             models.Index(fields=['distress_score']),
             models.Index(fields=['distress_level']),
             models.Index(fields=['-distress_score', 'farm_status']),
+            # Public marketplace search
+            GinIndex(fields=['search_vector'], name='farms_search_vector_gin'),
+            GinIndex(fields=['farm_name'], name='farms_farm_name_trgm', opclasses=['gin_trgm_ops']),
         ]
     
     def __str__(self):
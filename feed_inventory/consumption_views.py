@@ -16,6 +16,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from accounts.request_context import get_request_farm
 from farms.models import Farm
 from flock_management.models import Flock, DailyProduction
 
@@ -65,7 +66,7 @@ class AvailableFeedStockView(APIView):
     
     def _get_farm(self, request):
         try:
-            return Farm.objects.get(user=request.user)
+            return get_request_farm(request)
         except Farm.DoesNotExist:
             return None
 
@@ -257,7 +258,7 @@ class FeedConsumptionView(APIView):
     
     def _get_farm(self, request):
         try:
-            return Farm.objects.get(user=request.user)
+            return get_request_farm(request)
         except Farm.DoesNotExist:
             return None
     
@@ -17,6 +17,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from accounts.request_context import get_request_farm
 from farms.models import Farm
 from flock_management.models import Flock, DailyProduction
 
@@ -219,7 +220,7 @@ class FeedPurchaseView(APIView):
     
     def _get_farm(self, request):
         try:
-            return Farm.objects.get(user=request.user)
+            return get_request_farm(request)
         except Farm.DoesNotExist:
             return None
     
@@ -415,7 +416,7 @@ class FeedStockView(APIView):
 
     def _get_farm(self, request):
         try:
-            return Farm.objects.get(user=request.user)
+            return get_request_farm(request)
         except Farm.DoesNotExist:
             return None
 
@@ -4,7 +4,7 @@ Admin interface for flock management and production tracking.
 
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Flock, DailyProduction, MortalityRecord
+from .models import AnomalyAlert, Flock, DailyProduction, MortalityRecord
 
 
 # =============================================================================
@@ -472,3 +472,45 @@ class MortalityRecordAdmin(admin.ModelAdmin):
         count = queryset.update(compensation_status='Rejected')
         self.message_user(request, f'Rejected {count} compensation claim(s).')
     reject_compensation.short_description = 'Reject compensation'
+
+
+# =============================================================================
+# ANOMALY ALERT ADMIN
+# =============================================================================
+
+@admin.register(AnomalyAlert)
+class AnomalyAlertAdmin(admin.ModelAdmin):
+    """
+    Admin interface for mortality spikes and production drops flagged by
+    streaming anomaly detection.
+    """
+    
+    list_display = [
+        'observed_on', 'flock', 'farm', 'metric', 'value',
+        'expected', 'z_score', 'severity', 'status'
+    ]
+    
+    list_filter = ['metric', 'severity', 'status', 'observed_on']
+    
+    search_fields = ['flock__flock_number', 'farm__farm_name']
+    
+    readonly_fields = [
+        'id', 'farm', 'flock', 'metric', 'observed_on', 'value',
+        'expected', 'std_dev', 'z_score', 'severity', 'created_at', 'updated_at'
+    ]
+    
+    list_select_related = ['flock', 'farm']
+    
+    actions = ['acknowledge', 'resolve']
+    
+    def acknowledge(self, request, queryset):
+        """Mark alerts as acknowledged"""
+        count = queryset.update(status='acknowledged')
+        self.message_user(request, f'Acknowledged {count} alert(s).')
+    acknowledge.short_description = 'Acknowledge selected alerts'
+    
+    def resolve(self, request, queryset):
+        """Mark alerts as resolved"""
+        count = queryset.update(status='resolved')
+        self.message_user(request, f'Resolved {count} alert(s).')
+    resolve.short_description = 'Resolve selected alerts'
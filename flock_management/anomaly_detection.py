@@ -0,0 +1,281 @@
+"""
+Streaming Anomaly Detection
+
+Flags abnormal daily mortality and egg production per flock as records
+arrive, instead of re-scanning history on every dashboard load.
+
+ROLLING STATISTICS:
+Each (flock, metric) pair keeps an exponentially weighted mean and
+variance in FlockMetricStats. A new daily value is first scored against
+the statistics as they stood before it:
+
+    z = (value - mean) / max(sqrt(variance), MIN_STD[metric])
+
+and then folded in (alpha = EWMA_ALPHA, roughly a three-week memory):
+
+    diff = value - mean
+    mean += alpha * diff
+    variance = (1 - alpha) * (variance + alpha * diff²)
+
+Only one direction is an anomaly: mortality spikes (z >= threshold) and
+egg production drops (z <= -threshold). A flock needs WARMUP_OBSERVATIONS
+days of history before anything is flagged, and the MIN_STD floor keeps a
+flock that never lost a bird from raising a critical alert over one death.
+
+ALERTS:
+Outliers are written to AnomalyAlert, one row per flock, metric and day
+(a later, stronger deviation on the same day replaces the earlier one).
+FarmerAnalyticsService, YEAAnalyticsService.get_alerts and the fraud
+engine read these rows.
+
+Back-dated records are scored but not folded into the statistics, which
+only move forward in time; rebuild_flock_stats() replays a flock's full
+history (e.g. after importing old records). An edited DailyProduction
+replaces its day's alert (or clears it); if the day was already folded,
+the old value cannot be taken back out of the EWMA, so the flock is
+rebuilt instead.
+"""
+
+import logging
+import math
+
+from django.db import transaction
+
+from .models import AnomalyAlert, DailyProduction, FlockMetricStats
+
+logger = logging.getLogger(__name__)
+
+METRIC_MORTALITY = 'mortality'
+METRIC_EGG_PRODUCTION = 'egg_production'
+
+EWMA_ALPHA = 0.1
+WARMUP_OBSERVATIONS = 7
+WARNING_Z = 3.0
+CRITICAL_Z = 5.0
+
+# Standard deviation floor per metric (birds / production rate points)
+MIN_STD = {
+    METRIC_MORTALITY: 1.0,
+    METRIC_EGG_PRODUCTION: 3.0,
+}
+
+# +1: only high values are anomalous, -1: only low values
+DIRECTION = {
+    METRIC_MORTALITY: 1,
+    METRIC_EGG_PRODUCTION: -1,
+}
+
+# Fewer deaths than this in a day are never reported as a spike
+MIN_MORTALITY_SPIKE = 3
+
+
+# =============================================================================
+# STATISTICS
+# =============================================================================
+
+def ewma_update(mean, variance, value, alpha=EWMA_ALPHA):
+    """Fold one observation into an exponentially weighted mean and variance."""
+    diff = value - mean
+    increment = alpha * diff
+    return mean + increment, (1 - alpha) * (variance + diff * increment)
+
+
+def score(stats, metric, value):
+    """
+    Score ``value`` against rolling statistics.
+
+    Returns:
+        (z_score, std_dev, severity) - severity is None when the value is
+        not an anomaly (or the statistics are still warming up)
+    """
+    std_dev = max(math.sqrt(max(stats.variance, 0)), MIN_STD[metric])
+    z_score = (value - stats.mean) / std_dev
+
+    if stats.observations < WARMUP_OBSERVATIONS:
+        return z_score, std_dev, None
+    if metric == METRIC_MORTALITY and value < MIN_MORTALITY_SPIKE:
+        return z_score, std_dev, None
+
+    directed = z_score * DIRECTION[metric]
+    if directed >= CRITICAL_Z:
+        return z_score, std_dev, 'critical'
+    if directed >= WARNING_Z:
+        return z_score, std_dev, 'warning'
+    return z_score, std_dev, None
+
+
+def _fold(stats, day, value):
+    stats.mean, stats.variance = ewma_update(stats.mean, stats.variance, value)
+    stats.observations += 1
+    stats.last_date = day
+    stats.last_value = value
+
+
+def _alert(stats, day, value, z_score, std_dev, severity):
+    return AnomalyAlert(
+        farm_id=stats.farm_id,
+        flock_id=stats.flock_id,
+        metric=stats.metric,
+        observed_on=day,
+        value=value,
+        expected=round(stats.mean, 3),
+        std_dev=round(std_dev, 3),
+        z_score=round(z_score, 2),
+        severity=severity,
+    )
+
+
+def _save_alert(alert, replace=False):
+    """
+    Store an alert unless the day already has an equal or stronger one
+    (or, with ``replace``, whatever the day already has).
+    """
+    existing = AnomalyAlert.objects.filter(
+        flock_id=alert.flock_id, metric=alert.metric, observed_on=alert.observed_on
+    ).first()
+    if existing is None:
+        alert.save()
+        return alert
+    if not replace and abs(alert.z_score) <= abs(existing.z_score):
+        return existing
+
+    for field in ('value', 'expected', 'std_dev', 'z_score', 'severity'):
+        setattr(existing, field, getattr(alert, field))
+    existing.save()
+    return existing
+
+
+# =============================================================================
+# STREAMING
+# =============================================================================
+
+def observe(farm_id, flock_id, metric, day, value, fold=True, replace=False):
+    """
+    Score one daily value of a flock and update its rolling statistics.
+
+    Args:
+        farm_id, flock_id: Owner of the observation
+        metric: METRIC_MORTALITY or METRIC_EGG_PRODUCTION
+        day: Date the value belongs to
+        value: Observed value
+        fold: Fold the value into the statistics. Values dated on or
+            before the latest folded day are only scored.
+        replace: The value corrects an earlier one for the same day: its
+            score replaces the day's alert, or removes it if no longer
+            anomalous.
+
+    Returns:
+        AnomalyAlert or None
+    """
+    value = float(value)
+    with transaction.atomic():
+        stats, _ = FlockMetricStats.objects.select_for_update().get_or_create(
+            flock_id=flock_id, metric=metric, defaults={'farm_id': farm_id}
+        )
+        z_score, std_dev, severity = score(stats, metric, value)
+
+        alert = None
+        if severity:
+            alert = _save_alert(_alert(stats, day, value, z_score, std_dev, severity), replace)
+        elif replace:
+            AnomalyAlert.objects.filter(flock_id=flock_id, metric=metric, observed_on=day).delete()
+
+        if fold and (stats.last_date is None or day > stats.last_date):
+            _fold(stats, day, value)
+            stats.save()
+
+    if alert:
+        logger.info(
+            f"{metric} anomaly on flock {flock_id} ({day}): value {value:g}, "
+            f"expected {stats.mean:.2f}, z={z_score:.1f} [{severity}]"
+        )
+    return alert
+
+
+def observe_daily_production(record, corrected=False):
+    """
+    Score the mortality and (for producing flocks) egg rate of a DailyProduction.
+
+    ``corrected`` marks an edit of an existing record: its day's alerts are
+    replaced, and if the day is already folded into the statistics the
+    flock is rebuilt from its history.
+    """
+    try:
+        if corrected and FlockMetricStats.objects.filter(
+            flock_id=record.flock_id, last_date__gte=record.production_date
+        ).exists():
+            rebuild_flock_stats(record.flock)
+            return
+        observe(record.farm_id, record.flock_id, METRIC_MORTALITY,
+                record.production_date, record.birds_died, replace=corrected)
+        if record.eggs_collected or record.flock.is_currently_producing:
+            observe(record.farm_id, record.flock_id, METRIC_EGG_PRODUCTION,
+                    record.production_date, record.production_rate_percent, replace=corrected)
+    except Exception as e:
+        # Anomaly detection must never fail the write that triggered it
+        logger.warning(f"Anomaly detection failed for production record {record.pk}: {str(e)}")
+
+
+def observe_mortality_record(record):
+    """
+    Score a MortalityRecord incident as soon as it is reported.
+
+    Incidents are checked against the flock's daily mortality statistics
+    but not folded in: the day's total arrives with its DailyProduction.
+    Incidents linked to a production record are covered by that record.
+    """
+    if record.daily_production_id:
+        return
+    try:
+        observe(record.farm_id, record.flock_id, METRIC_MORTALITY,
+                record.date_discovered, record.number_of_birds, fold=False)
+    except Exception as e:
+        logger.warning(f"Anomaly detection failed for mortality record {record.pk}: {str(e)}")
+
+
+# =============================================================================
+# REBUILD
+# =============================================================================
+
+def rebuild_flock_stats(flock):
+    """
+    Recompute a flock's statistics and alerts from its full history.
+
+    Existing alerts of the flock are replaced; an alert re-derived for the
+    same metric and day keeps its status (e.g. acknowledged).
+
+    Returns:
+        int: Number of alerts written
+    """
+    records = DailyProduction.objects.filter(flock=flock).order_by('production_date').values_list(
+        'production_date', 'birds_died', 'eggs_collected', 'production_rate_percent'
+    )
+
+    stats = {
+        metric: FlockMetricStats(farm_id=flock.farm_id, flock_id=flock.id, metric=metric)
+        for metric in (METRIC_MORTALITY, METRIC_EGG_PRODUCTION)
+    }
+    alerts = []
+    for day, deaths, eggs, rate in records:
+        values = {METRIC_MORTALITY: deaths}
+        if eggs or flock.is_currently_producing:
+            values[METRIC_EGG_PRODUCTION] = float(rate)
+        for metric, value in values.items():
+            z_score, std_dev, severity = score(stats[metric], metric, value)
+            if severity:
+                alerts.append(_alert(stats[metric], day, value, z_score, std_dev, severity))
+            _fold(stats[metric], day, value)
+
+    with transaction.atomic():
+        statuses = {
+            (metric, day): status
+            for metric, day, status in AnomalyAlert.objects.filter(flock=flock)
+            .select_for_update().values_list('metric', 'observed_on', 'status')
+        }
+        for alert in alerts:
+            alert.status = statuses.get((alert.metric, alert.observed_on), alert.status)
+        FlockMetricStats.objects.filter(flock=flock).delete()
+        AnomalyAlert.objects.filter(flock=flock).delete()
+        FlockMetricStats.objects.bulk_create(s for s in stats.values() if s.observations)
+        AnomalyAlert.objects.bulk_create(alerts)
+    return len(alerts)
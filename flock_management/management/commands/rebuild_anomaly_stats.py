@@ -0,0 +1,44 @@
+"""
+Rebuild Anomaly Detection Statistics
+
+Replays DailyProduction history into FlockMetricStats and AnomalyAlert.
+Needed once after deployment (records entered before streaming detection
+existed) and after bulk imports, which bypass the save signals.
+"""
+
+from django.core.management.base import BaseCommand
+
+from flock_management.anomaly_detection import rebuild_flock_stats
+from flock_management.models import Flock
+
+
+class Command(BaseCommand):
+    help = 'Recompute rolling mortality/production statistics and anomaly alerts from history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--farm-id',
+            type=str,
+            help='Only rebuild flocks of this farm',
+        )
+        parser.add_argument(
+            '--all-flocks',
+            action='store_true',
+            help='Include sold, culled and depleted flocks (default: active flocks only)',
+        )
+
+    def handle(self, *args, **options):
+        flocks = Flock.objects.all()
+        if options.get('farm_id'):
+            flocks = flocks.filter(farm_id=options['farm_id'])
+        if not options['all_flocks']:
+            flocks = flocks.filter(status='Active')
+
+        flock_count = alert_count = 0
+        for flock in flocks.iterator():
+            alert_count += rebuild_flock_stats(flock)
+            flock_count += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Rebuilt statistics for {flock_count} flock(s), {alert_count} anomaly alert(s) recorded'
+        ))
@@ -0,0 +1,167 @@
+# Generated by Django 5.2.10 on 2026-10-18 10:00
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+METRIC_CHOICES = [
+    ("mortality", "Daily Mortality"),
+    ("egg_production", "Egg Production Rate"),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("farms", "0018_farm_search_vector"),
+        ("flock_management", "0017_add_health_record_detail_links"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FlockMetricStats",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "metric",
+                    models.CharField(choices=METRIC_CHOICES, max_length=30),
+                ),
+                (
+                    "mean",
+                    models.FloatField(
+                        default=0, help_text="Exponentially weighted mean"
+                    ),
+                ),
+                (
+                    "variance",
+                    models.FloatField(
+                        default=0, help_text="Exponentially weighted variance"
+                    ),
+                ),
+                ("observations", models.PositiveIntegerField(default=0)),
+                (
+                    "last_date",
+                    models.DateField(
+                        blank=True,
+                        help_text="Date of the latest observation folded into the statistics",
+                        null=True,
+                    ),
+                ),
+                ("last_value", models.FloatField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "farm",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="metric_stats",
+                        to="farms.farm",
+                    ),
+                ),
+                (
+                    "flock",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="metric_stats",
+                        to="flock_management.flock",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Flock metric stats",
+                "db_table": "flock_metric_stats",
+                "unique_together": {("flock", "metric")},
+            },
+        ),
+        migrations.CreateModel(
+            name="AnomalyAlert",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "metric",
+                    models.CharField(choices=METRIC_CHOICES, max_length=30),
+                ),
+                ("observed_on", models.DateField(db_index=True)),
+                ("value", models.FloatField(help_text="Observed value")),
+                (
+                    "expected",
+                    models.FloatField(help_text="Rolling mean before this observation"),
+                ),
+                (
+                    "std_dev",
+                    models.FloatField(
+                        help_text="Rolling standard deviation before this observation"
+                    ),
+                ),
+                ("z_score", models.FloatField()),
+                (
+                    "severity",
+                    models.CharField(
+                        choices=[("warning", "Warning"), ("critical", "Critical")],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("open", "Open"),
+                            ("acknowledged", "Acknowledged"),
+                            ("resolved", "Resolved"),
+                        ],
+                        default="open",
+                        max_length=15,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "farm",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="anomaly_alerts",
+                        to="farms.farm",
+                    ),
+                ),
+                (
+                    "flock",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="anomaly_alerts",
+                        to="flock_management.flock",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "anomaly_alerts",
+                "ordering": ["-observed_on"],
+                "indexes": [
+                    models.Index(
+                        fields=["farm", "metric", "observed_on"],
+                        name="anomaly_farm_metric_day_idx",
+                    ),
+                    models.Index(
+                        fields=["metric", "observed_on"],
+                        name="anomaly_metric_day_idx",
+                    ),
+                ],
+                "unique_together": {("flock", "metric", "observed_on")},
+            },
+        ),
+    ]
@@ -14,8 +14,11 @@ from django.utils import timezone
 from decimal import Decimal
 from farms.models import Farm, Infrastructure
 from accounts.models import User
+import logging
 import uuid
 
+logger = logging.getLogger(__name__)
+
 
 # =============================================================================
 # FLOCK MODEL - Track Bird Batches
@@ -866,7 +869,7 @@ class DailyProduction(models.Model):
         - On update, adjusts for difference between old and new values
         """
         from sales_revenue.inventory_models import (
-            FarmInventory, InventoryCategory, StockMovementType, InventoryBatch
+            FarmInventory, InventoryCategory, StockMovementType
         )
         
         # Calculate net change in good eggs
@@ -895,31 +898,31 @@ class DailyProduction(models.Model):
                 source_record=self,
                 notes=f"From {self.flock.flock_number} on {self.production_date}",
                 recorded_by=self.recorded_by,
-                stock_date=self.production_date
-            )
-            
-            # Create batch for FIFO tracking
-            InventoryBatch.objects.create(
-                inventory=inventory,
-                source_flock=self.flock,
-                source_production=self,
-                initial_quantity=eggs_to_add,
-                current_quantity=eggs_to_add,
-                production_date=self.production_date
+                stock_date=self.production_date,
+                # Batch for FIFO depletion and expiry tracking
+                create_batch=True,
+                source_flock=self.flock
             )
         elif eggs_to_add < 0:
-            # Handle reduction (correction) - remove from inventory
-            try:
+            # Handle reduction (correction) - take it out of this record's batch.
+            # Eggs that were already sold cannot be removed again, so the
+            # correction is capped at the stock on hand.
+            correction = min(abs(eggs_to_add), max(inventory.quantity_available, 0))
+            if correction < abs(eggs_to_add):
+                logger.warning(
+                    f"Production correction for {self.flock.flock_number} on {self.production_date} "
+                    f"removes {abs(eggs_to_add)} eggs but only {inventory.quantity_available} "
+                    f"are in stock; removing {correction}"
+                )
+            if correction > 0:
                 inventory.remove_stock(
-                    quantity=abs(eggs_to_add),
+                    quantity=correction,
                     movement_type=StockMovementType.ADJUSTMENT_REMOVE,
                     reference_record=self,
                     notes=f"Correction for {self.flock.flock_number} on {self.production_date}",
-                    recorded_by=self.recorded_by
+                    recorded_by=self.recorded_by,
+                    source_production=self
                 )
-            except ValueError:
-                # If not enough stock, just log and continue
-                pass
     
     def clean(self):
         """Validate business logic"""
@@ -1411,3 +1414,99 @@ class HealthRecord(models.Model):
         if errors:
             raise ValidationError(errors)
 
+
+
+# =============================================================================
+# ANOMALY DETECTION - Rolling statistics and outlier alerts
+# =============================================================================
+
+ANOMALY_METRIC_CHOICES = [
+    ('mortality', 'Daily Mortality'),
+    ('egg_production', 'Egg Production Rate'),
+]
+
+
+class FlockMetricStats(models.Model):
+    """
+    Rolling statistics of one daily metric of a flock.
+    
+    Holds an exponentially weighted mean and variance that
+    flock_management.anomaly_detection updates as each daily record
+    arrives, so a new observation is scored against the flock's own
+    history without re-reading it.
+    """
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    
+    farm = models.ForeignKey(Farm, on_delete=models.CASCADE, related_name='metric_stats')
+    flock = models.ForeignKey(Flock, on_delete=models.CASCADE, related_name='metric_stats')
+    metric = models.CharField(max_length=30, choices=ANOMALY_METRIC_CHOICES)
+    
+    mean = models.FloatField(default=0, help_text="Exponentially weighted mean")
+    variance = models.FloatField(default=0, help_text="Exponentially weighted variance")
+    observations = models.PositiveIntegerField(default=0)
+    last_date = models.DateField(
+        null=True,
+        blank=True,
+        help_text="Date of the latest observation folded into the statistics"
+    )
+    last_value = models.FloatField(null=True, blank=True)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'flock_metric_stats'
+        unique_together = [('flock', 'metric')]
+        verbose_name_plural = 'Flock metric stats'
+    
+    def __str__(self):
+        return f"{self.flock.flock_number} - {self.metric} (n={self.observations})"
+
+
+class AnomalyAlert(models.Model):
+    """
+    A daily observation that deviated from its flock's rolling statistics.
+    
+    Written by flock_management.anomaly_detection at most once per flock,
+    metric and day; dashboards read these instead of re-scanning history.
+    """
+    
+    SEVERITY_CHOICES = [
+        ('warning', 'Warning'),
+        ('critical', 'Critical'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('acknowledged', 'Acknowledged'),
+        ('resolved', 'Resolved'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    
+    farm = models.ForeignKey(Farm, on_delete=models.CASCADE, related_name='anomaly_alerts')
+    flock = models.ForeignKey(Flock, on_delete=models.CASCADE, related_name='anomaly_alerts')
+    metric = models.CharField(max_length=30, choices=ANOMALY_METRIC_CHOICES)
+    observed_on = models.DateField(db_index=True)
+    
+    value = models.FloatField(help_text="Observed value")
+    expected = models.FloatField(help_text="Rolling mean before this observation")
+    std_dev = models.FloatField(help_text="Rolling standard deviation before this observation")
+    z_score = models.FloatField()
+    severity = models.CharField(max_length=10, choices=SEVERITY_CHOICES)
+    status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='open')
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'anomaly_alerts'
+        ordering = ['-observed_on']
+        unique_together = [('flock', 'metric', 'observed_on')]
+        indexes = [
+            models.Index(fields=['farm', 'metric', 'observed_on'], name='anomaly_farm_metric_day_idx'),
+            models.Index(fields=['metric', 'observed_on'], name='anomaly_metric_day_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.flock.flock_number} - {self.metric} on {self.observed_on} (z={self.z_score:.1f})"
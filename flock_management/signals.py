@@ -7,6 +7,10 @@ UNIFIED DATA ENTRY SIGNALS:
 1. MortalityRecord → auto-creates MortalityLossRecord (Expense)
 2. HealthRecord → auto-creates MedicationRecord, VaccinationRecord, or VetVisit
 
+ANOMALY DETECTION SIGNALS:
+3. DailyProduction / MortalityRecord → scored by flock_management.anomaly_detection
+   after commit (rolling statistics + AnomalyAlert)
+
 This UNIFIES the user experience:
 - User records data in ONE place (Flock Management)
 - Detailed tracking records are AUTOMATICALLY created
@@ -351,4 +355,27 @@ def _get_or_create_medication_type(name: str, category: str, dosage: str):
         )
         logger.info(f"Created new MedicationType: {name} ({category})")
     
-    return medication_type
\ No newline at end of file
+    return medication_type
+
+
+# =============================================================================
+# ANOMALY DETECTION
+# =============================================================================
+
+@receiver(post_save, sender='flock_management.DailyProduction')
+def detect_production_anomalies(sender, instance, created, **kwargs):
+    """Score the day's mortality and egg rate once the record is committed."""
+    from .anomaly_detection import observe_daily_production
+    
+    transaction.on_commit(lambda: observe_daily_production(instance, corrected=not created))
+
+
+@receiver(post_save, sender='flock_management.MortalityRecord')
+def detect_mortality_incident_anomalies(sender, instance, created, **kwargs):
+    """Check a newly reported mortality incident against the flock's statistics."""
+    if not created:
+        return
+    
+    from .anomaly_detection import observe_mortality_record
+    
+    transaction.on_commit(lambda: observe_mortality_record(instance))
@@ -16,6 +16,7 @@ from django.db import IntegrityError, transaction
 from datetime import datetime
 from decimal import Decimal
 
+from accounts.request_context import get_request_farm
 from farms.models import Farm, PoultryHouse
 from .models import DailyProduction, Flock, MortalityRecord, HealthRecord
 
@@ -55,7 +56,7 @@ class FlockView(APIView):
     def get(self, request, flock_id=None, active_only=False):
         """Get all flocks or specific flock by ID"""
         try:
-            farm = Farm.objects.get(user=request.user)
+            farm = get_request_farm(request)
         except Farm.DoesNotExist:
             return Response(
                 {'error': 'No farm found for this user'},
@@ -109,7 +110,7 @@ class FlockView(APIView):
     def post(self, request):
         """Create new flock"""
         try:
-            farm = Farm.objects.get(user=request.user)
+            farm = get_request_farm(request)
         except Farm.DoesNotExist:
             return Response(
                 {'error': 'No farm found for this user'},
@@ -209,7 +210,7 @@ class FlockView(APIView):
     def put(self, request, flock_id):
         """Update existing flock (supports partial updates)"""
         try:
-            farm = Farm.objects.get(user=request.user)
+            farm = get_request_farm(request)
         except Farm.DoesNotExist:
             return Response(
                 {'error': 'No farm found for this user'},
@@ -301,7 +302,7 @@ class FlockView(APIView):
     def delete(self, request, flock_id):
         """Delete flock"""
         try:
-            farm = Farm.objects.get(user=request.user)
+            farm = get_request_farm(request)
         except Farm.DoesNotExist:
             return Response(
                 {'error': 'No farm found for this user'},
@@ -385,7 +386,7 @@ class FlockStatisticsView(APIView):
     def get(self, request):
         """Get flock statistics"""
         try:
-            farm = Farm.objects.get(user=request.user)
+            farm = get_request_farm(request)
         except Farm.DoesNotExist:
             return Response(
                 {'error': 'No farm found for this user'},
@@ -478,7 +479,7 @@ class DailyProductionView(APIView):
 
     def get(self, request):
         try:
-            farm = Farm.objects.get(user=request.user)
+            farm = get_request_farm(request)
         except Farm.DoesNotExist:
             return Response({'error': 'No farm found for this user'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -501,7 +502,7 @@ class DailyProductionView(APIView):
 
     def post(self, request):
         try:
-            farm = Farm.objects.get(user=request.user)
+            farm = get_request_farm(request)
         except Farm.DoesNotExist:
             return Response({'error': 'No farm found for this user'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -634,7 +635,7 @@ class MortalityBaseView(APIView):
 
     def _get_farm(self, request):
         try:
-            return Farm.objects.get(user=request.user)
+            return get_request_farm(request)
         except Farm.DoesNotExist:
             return None
 
@@ -39,6 +39,7 @@ class ProcurementOrderAdmin(admin.ModelAdmin):
         ('Delivery', {
             'fields': (
                 'delivery_location', 'delivery_location_gps',
+                ('delivery_point', 'delivery_radius_km'),
                 'delivery_deadline', 'delivery_instructions'
             )
         }),
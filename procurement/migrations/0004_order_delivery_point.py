@@ -0,0 +1,53 @@
+# Generated by Django 5.2.10 on 2026-10-18 15:00
+
+import django.contrib.gis.db.models.fields
+import django.core.validators
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("farms", "0019_farm_location_geography_index"),
+        ("procurement", "0003_distress_tracking_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="procurementorder",
+            name="delivery_point",
+            field=django.contrib.gis.db.models.fields.PointField(
+                blank=True,
+                help_text="Delivery GPS point (parsed from delivery_location_gps when left blank)",
+                null=True,
+                spatial_index=False,
+                srid=4326,
+            ),
+        ),
+        migrations.AddField(
+            model_name="procurementorder",
+            name="delivery_radius_km",
+            field=models.DecimalField(
+                blank=True,
+                decimal_places=1,
+                help_text="Only recommend farms within this distance of the delivery point (default 150 km)",
+                max_digits=6,
+                null=True,
+                validators=[django.core.validators.MinValueValidator(Decimal("0.1"))],
+            ),
+        ),
+        # Existing "lat,lng" delivery GPS strings
+        migrations.RunSQL(
+            sql=r"""
+                UPDATE procurement_procurementorder
+                SET delivery_point = ST_SetSRID(ST_MakePoint(
+                    split_part(regexp_replace(delivery_location_gps, '\s', '', 'g'), ',', 2)::double precision,
+                    split_part(regexp_replace(delivery_location_gps, '\s', '', 'g'), ',', 1)::double precision
+                ), 4326)
+                WHERE delivery_point IS NULL
+                  AND delivery_location_gps ~ '^\s*-?\d+(\.\d+)?\s*,\s*-?\d+(\.\d+)?\s*$';
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -17,6 +17,7 @@ Example Flow:
 """
 
 from django.db import models
+from django.contrib.gis.db import models as gis_models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from decimal import Decimal
@@ -135,6 +136,20 @@ class ProcurementOrder(models.Model):
     # Delivery
     delivery_location = models.TextField(help_text="Where products should be delivered")
     delivery_location_gps = models.CharField(max_length=100, blank=True)
+    delivery_point = gis_models.PointField(
+        null=True,
+        blank=True,
+        spatial_index=False,
+        help_text="Delivery GPS point (parsed from delivery_location_gps when left blank)"
+    )
+    delivery_radius_km = models.DecimalField(
+        max_digits=6,
+        decimal_places=1,
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(Decimal('0.1'))],
+        help_text="Only recommend farms within this distance of the delivery point (default 150 km)"
+    )
     delivery_deadline = models.DateField(
         help_text="Farms must deliver by this date"
     )
@@ -214,6 +229,13 @@ class ProcurementOrder(models.Model):
     def __str__(self):
         return f"{self.order_number} - {self.title}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Stored GPS string, to notice when delivery_point must be re-derived
+        instance._stored_delivery_location_gps = instance.__dict__.get('delivery_location_gps')
+        return instance
+    
     def save(self, *args, **kwargs):
         # Calculate total budget if not set
         if self.total_budget is None or self.total_budget == 0:
@@ -235,7 +257,19 @@ class ProcurementOrder(models.Model):
             
             self.order_number = f'{prefix}{new_num:05d}'
         
+        # Parse the delivery point when it is missing, and again whenever
+        # the GPS string changes so it never points at an old location
+        stored_gps = getattr(self, '_stored_delivery_location_gps', None)
+        gps_changed = stored_gps is not None and stored_gps != self.delivery_location_gps
+        if gps_changed or (self.delivery_point is None and self.delivery_location_gps):
+            from procurement.services.proximity import parse_gps_point
+            self.delivery_point = parse_gps_point(self.delivery_location_gps)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'delivery_location_gps' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'delivery_point'}
+        
         super().save(*args, **kwargs)
+        self._stored_delivery_location_gps = self.delivery_location_gps
     
     @property
     def fulfillment_percentage(self):
@@ -733,8 +767,11 @@ class IdempotencyKey(models.Model):
         - If key exists, return cached response
         - If not, process request and store response
         
+    Durable fallback of the shared idempotency store (core.idempotency),
+    which reads and writes these rows; keys are "<operation>:<key>".
+        
     Cleanup:
-        - Run IdempotencyKey.cleanup_expired() periodically via Celery
+        - core.tasks.purge_expired_idempotency_keys runs hourly via Celery
     """
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     key = models.CharField(max_length=255, unique=True, db_index=True)
@@ -818,9 +855,9 @@ class IdempotencyKey(models.Model):
     
     @classmethod
     def cleanup_expired(cls):
-        """Remove expired idempotency keys. Run periodically via Celery."""
-        deleted, _ = cls.objects.filter(expires_at__lt=timezone.now()).delete()
-        return deleted
+        """Remove expired idempotency keys (chunked, see core.idempotency)."""
+        from core.idempotency import purge_expired_keys
+        return purge_expired_keys()
 
 
 class ProcurementAuditLog(models.Model):
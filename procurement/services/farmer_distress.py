@@ -30,6 +30,7 @@ from decimal import Decimal
 import logging
 
 from farms.models import Farm
+from procurement.services.proximity import farm_distances, order_radius_km, rank_by_proximity
 
 logger = logging.getLogger(__name__)
 
@@ -482,6 +483,13 @@ class FarmerDistressService:
         ).values_list('farm_id', flat=True)
         farms = farms.exclude(id__in=assigned_farm_ids)
         
+        # Delivery point: only farms within the delivery radius
+        distances = None
+        if order.delivery_point:
+            radius_km = order_radius_km(order)
+            distances = farm_distances(order.delivery_point, radius_km, farms=farms)
+            farms = farms.filter(id__in=list(distances))
+        
         # Preferred region gets a boost but doesn't exclude others
         if order.preferred_region:
             farms = farms.annotate(
@@ -514,8 +522,12 @@ class FarmerDistressService:
                 'recommendations': assessment['recommendations'],
             })
         
-        # Sort by distress score (highest first), then by region match
-        results.sort(key=lambda x: (x['distress_score'], x.get('region_match', False)), reverse=True)
+        # Sort by distress score (highest first), then by region match; with
+        # a delivery point, by distress blended with distance and stock
+        if distances is not None:
+            rank_by_proximity(results, distances, radius_km, remaining_needed)
+        else:
+            results.sort(key=lambda x: (x['distress_score'], x.get('region_match', False)), reverse=True)
         
         return results[:limit]
 
@@ -30,6 +30,7 @@ from decimal import Decimal
 import logging
 
 from farms.models import Farm
+from procurement.services.proximity import farm_distances, order_radius_km, rank_by_proximity
 
 logger = logging.getLogger(__name__)
 
@@ -333,6 +334,7 @@ class FarmerDistressService:
         """
         try:
             from sales_revenue.inventory_models import FarmInventory
+            from sales_revenue.services.inventory_expiry import recent_expiry_summary
             
             inventory = FarmInventory.objects.filter(farm=farm)
             
@@ -358,6 +360,15 @@ class FarmerDistressService:
                     elif days_old > 7:
                         total_score += 15
             
+            # Stock that expired unsold (written off by the nightly expiry sweep)
+            expired = recent_expiry_summary(farm.id)
+            if expired and expired['quantity'] > 0:
+                total_score += 25
+                details.append(
+                    f"{int(expired['quantity'])} units expired unsold "
+                    f"({expired['batches']} batches, GHS {expired['value']:,.2f})"
+                )
+            
             # Check for overstocked birds ready for market
             bird_inventory = inventory.filter(category__in=['live_birds', 'broilers', 'layers'])
             total_birds = bird_inventory.aggregate(
@@ -811,8 +822,8 @@ class FarmerDistressService:
             from farms.models import FarmLocation
             
             location = FarmLocation.objects.filter(farm=farm).first()
-            if location and location.coordinates:
-                return [location.coordinates.y, location.coordinates.x]  # [lat, lng]
+            if location and location.location:
+                return [location.location.y, location.location.x]  # [lat, lng]
             return None
         except Exception:
             return None
@@ -948,6 +959,13 @@ class FarmerDistressService:
         ).values_list('farm_id', flat=True)
         farms = farms.exclude(id__in=assigned_farm_ids)
         
+        # Delivery point: only farms within the delivery radius, nearest first
+        distances = None
+        if order.delivery_point:
+            radius_km = order_radius_km(order)
+            distances = farm_distances(order.delivery_point, radius_km, farms=farms)
+            farms = farms.filter(id__in=list(distances))
+        
         # Preferred region filter (optional)
         if order.preferred_region:
             # Prefer farms in region but don't exclude others
@@ -999,8 +1017,12 @@ class FarmerDistressService:
                 'procurement_history': assessment['procurement_history'],
             })
         
-        # Sort by distress score (highest first)
-        recommendations.sort(key=lambda x: x['distress_score'], reverse=True)
+        # Sort by distress score (highest first), or blended with distance
+        # and stock when the order has a delivery point
+        if distances is not None:
+            rank_by_proximity(recommendations, distances, radius_km, remaining_needed)
+        else:
+            recommendations.sort(key=lambda x: x['distress_score'], reverse=True)
         recommendations = recommendations[:limit]
         
         # Calculate summary
@@ -1017,6 +1039,10 @@ class FarmerDistressService:
                 'quantity_assigned': order.quantity_assigned,
                 'remaining_needed': remaining_needed,
                 'production_type': order.production_type,
+                'delivery_point': (
+                    [order.delivery_point.y, order.delivery_point.x] if order.delivery_point else None
+                ),
+                'delivery_radius_km': radius_km if distances is not None else None,
             },
             'recommendations': recommendations,
             'summary': {
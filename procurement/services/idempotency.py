@@ -5,9 +5,12 @@ This module provides utilities for:
 1. State machine validation for status transitions
 2. Idempotent operation decorators
 3. Retry logic with exponential backoff
-4. Distributed locking via cache
+4. Distributed locking (core.locks)
 5. Row-level locking helpers
 
+Idempotency keys are claimed and stored through the shared store in
+core.idempotency.
+
 Key Principles:
 - Every mutating operation should be idempotent (safe to retry)
 - Use database locks to prevent race conditions
@@ -17,13 +20,12 @@ Key Principles:
 Models (IdempotencyKey, ProcurementAuditLog) are defined in procurement/models.py
 """
 
-from django.core.cache import cache
-from django.utils import timezone
 from functools import wraps
-import uuid
 import logging
 import time
-from typing import Callable, Any, Dict, List
+from typing import Callable, Dict, List
+
+from core import idempotency, locks
 
 logger = logging.getLogger(__name__)
 
@@ -203,92 +205,20 @@ def with_row_lock(model_class, pk, nowait: bool = False):
     return RowLockContext(model_class, pk, nowait)
 
 
-def acquire_distributed_lock(lock_name: str, ttl_seconds: int = 30) -> bool:
-    """
-    Acquire a distributed lock using cache.
-    
-    Args:
-        lock_name: Unique name for the lock
-        ttl_seconds: Lock timeout
-    
-    Returns:
-        True if lock acquired, False otherwise
-    """
-    lock_key = f"lock:{lock_name}"
-    lock_value = str(uuid.uuid4())
-    
-    # Use cache.add() which is atomic
-    acquired = cache.add(lock_key, lock_value, ttl_seconds)
-    
-    if acquired:
-        logger.debug(f"Acquired lock: {lock_name}")
-    else:
-        logger.debug(f"Failed to acquire lock: {lock_name}")
-    
-    return acquired
-
-
-def release_distributed_lock(lock_name: str) -> bool:
-    """
-    Release a distributed lock.
-    
-    Args:
-        lock_name: Unique name for the lock
-    
-    Returns:
-        True if released, False if not held
-    """
-    lock_key = f"lock:{lock_name}"
-    result = cache.delete(lock_key)
-    
-    if result:
-        logger.debug(f"Released lock: {lock_name}")
-    
-    return result
-
-
-class DistributedLock:
+class DistributedLock(locks.DistributedLock):
     """
     Context manager for distributed locks.
     
+    Contended callers block until the holder releases (no polling), and
+    only the holder's token can release the lock; see core.locks.
+    
     Usage:
         with DistributedLock(f"order:{order_id}:assign"):
             # Only one process can execute this at a time
             assign_to_farm(order, farm, quantity)
     """
     
-    def __init__(self, lock_name: str, ttl_seconds: int = 30, 
-                 wait: bool = True, max_wait: float = 10.0):
-        self.lock_name = lock_name
-        self.ttl_seconds = ttl_seconds
-        self.wait = wait
-        self.max_wait = max_wait
-        self.acquired = False
-    
-    def __enter__(self):
-        start_time = time.time()
-        
-        while True:
-            self.acquired = acquire_distributed_lock(self.lock_name, self.ttl_seconds)
-            
-            if self.acquired:
-                return self
-            
-            if not self.wait:
-                raise Exception(f"Could not acquire lock: {self.lock_name}")
-            
-            elapsed = time.time() - start_time
-            if elapsed > self.max_wait:
-                raise Exception(
-                    f"Timeout waiting for lock: {self.lock_name} after {elapsed:.2f}s"
-                )
-            
-            time.sleep(0.1)
-    
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.acquired:
-            release_distributed_lock(self.lock_name)
-        return False
+    key_prefix = 'lock'
 
 
 # ==============================================================================
@@ -315,14 +245,14 @@ def idempotent_operation(
         operation_name: Name of the operation for logging
         resource_type: Type of resource being modified
         get_resource_id: Callable to extract resource ID from args/kwargs
-        ttl_seconds: How long to cache the idempotency key
-        use_cache: Whether to use cache for fast lookups
+        ttl_seconds: How long the result is replayed
+        use_cache: Unused; results are always cached (kept for compatibility)
     """
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
             # Import here to avoid circular imports
-            from procurement.models import IdempotencyKey, ProcurementAuditLog
+            from procurement.models import IdempotencyKey
             
             # Extract idempotency key from kwargs
             idempotency_key = kwargs.pop('idempotency_key', None)
@@ -355,84 +285,22 @@ def idempotent_operation(
                 user_id = str(user.id) if user and hasattr(user, 'id') else 'anonymous'
                 idempotency_key = IdempotencyKey.generate_key(user_id, operation_name, **key_params)
             
-            # Check cache first (faster)
-            cache_key = f"idem:{idempotency_key}"
-            if use_cache:
-                cached = cache.get(cache_key)
-                if cached:
-                    logger.info(f"Idempotent cache hit for {operation_name}: {idempotency_key[:16]}...")
-                    return cached
+            # Claim the key (cache SET NX, DB fallback) - see core.idempotency
+            op = idempotency.claim(operation_name, idempotency_key, ttl=ttl_seconds)
+            if op.replayed:
+                logger.info(f"Idempotent hit for {operation_name}: {idempotency_key[:16]}...")
+                return op.response
             
-            # Check database
-            try:
-                existing = IdempotencyKey.objects.get(
-                    key=idempotency_key,
-                    expires_at__gt=timezone.now()
-                )
-                
-                if existing.status == 'completed':
-                    logger.info(f"Idempotent DB hit for {operation_name}: {idempotency_key[:16]}...")
-                    return existing.response_data
-                elif existing.status == 'processing':
-                    # Another request is processing - wait briefly and check again
-                    time.sleep(0.5)
-                    existing.refresh_from_db()
-                    if existing.status == 'completed':
-                        return existing.response_data
-                    raise Exception(f"Operation {operation_name} is already in progress")
-            except IdempotencyKey.DoesNotExist:
-                pass
-            
-            # Create idempotency record
-            from datetime import timedelta
-            expires_at = timezone.now() + timedelta(seconds=ttl_seconds)
-            idem_record = IdempotencyKey.objects.create(
-                key=idempotency_key,
-                user_id=user.id if user and hasattr(user, 'id') else None,
-                operation=operation_name,
-                resource_type=resource_type,
-                resource_id=str(get_resource_id(args, kwargs)) if get_resource_id else None,
-                status='processing',
-                expires_at=expires_at,
-            )
-            
-            start_time = time.time()
-            try:
-                # Execute the operation
+            with op:
                 result = func(*args, **kwargs)
-                
-                # Mark as completed
-                duration_ms = int((time.time() - start_time) * 1000)
-                idem_record.status = 'completed'
-                idem_record.completed_at = timezone.now()
-                idem_record.response_data = _serialize_result(result)
-                idem_record.save()
-                
-                # Cache the result
-                if use_cache:
-                    cache.set(cache_key, idem_record.response_data, ttl_seconds)
-                
+                op.complete(
+                    result,
+                    resource_type=resource_type,
+                    resource_id=get_resource_id(args, kwargs) if get_resource_id else None,
+                    user_id=user.id if user and hasattr(user, 'id') else None,
+                )
                 return result
-                
-            except Exception as e:
-                # Mark as failed
-                idem_record.status = 'failed'
-                idem_record.completed_at = timezone.now()
-                idem_record.response_data = {'error': str(e)}
-                idem_record.save()
-                
-                raise
         
         return wrapper
     return decorator
 
-
-def _serialize_result(result) -> Any:
-    """Serialize a result for storage."""
-    if result is None:
-        return None
-    if isinstance(result, (str, int, float, bool, list, dict)):
-        return result
-    if hasattr(result, 'id'):
-        return {'id': str(result.id), 'type': result.__class__.__name__}
-    return str(result)
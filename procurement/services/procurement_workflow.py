@@ -27,8 +27,10 @@ from procurement.models import (
     ProcurementOrder, OrderAssignment, DeliveryConfirmation, ProcurementInvoice,
     IdempotencyKey, ProcurementAuditLog
 )
+from core import idempotency
 from farms.models import Farm
 from procurement.services.notification_service import get_notification_service
+from procurement.services.proximity import farm_distances, order_radius_km
 from procurement.services.idempotency import (
     idempotent_operation,
     validate_status_transition,
@@ -44,6 +46,10 @@ from procurement.services.idempotency import (
 logger = logging.getLogger(__name__)
 notification_service = get_notification_service()
 
+# How long create_and_assign_order / create_delivery results are replayed
+CREATE_AND_ASSIGN_IDEMPOTENCY_TTL = 24 * 3600
+DELIVERY_IDEMPOTENCY_TTL = 24 * 3600
+
 
 class ProcurementWorkflowService:
     """Service for managing procurement workflow with atomicity and idempotency guarantees."""
@@ -143,45 +149,29 @@ class ProcurementWorkflowService:
             }
             idempotency_key = IdempotencyKey.generate_key(**key_data)
         
-        # Check for existing completed operation (idempotency)
-        try:
-            existing = IdempotencyKey.objects.get(
-                key=idempotency_key,
-                operation='create_and_assign_order',
-                status='completed',
-                expires_at__gt=timezone.now()
-            )
-            if existing.response_data:
-                logger.info(f"Idempotent return for create_and_assign_order: {idempotency_key[:16]}...")
-                # Return cached result - need to fetch actual objects
-                cached = existing.response_data
-                order = ProcurementOrder.objects.get(id=cached.get('order_id'))
-                assignments = list(OrderAssignment.objects.filter(order=order))
-                return {
-                    'order': order,
-                    'assignments': assignments,
-                    'assignment_count': len(assignments),
-                    'total_assigned': order.quantity_assigned,
-                    'remaining': order.quantity_needed - order.quantity_assigned,
-                    'idempotent': True,
-                }
-        except IdempotencyKey.DoesNotExist:
-            pass
-        
-        # Create idempotency record to mark operation as in-progress
-        idem_record = IdempotencyKey.objects.create(
-            key=idempotency_key,
-            user_id=created_by.id if created_by else None,
-            operation='create_and_assign_order',
-            resource_type='ProcurementOrder',
-            status='processing',
-            expires_at=timezone.now() + timedelta(hours=24),
+        # Claim the key before any DB work; a retry gets the stored result,
+        # a concurrent duplicate is refused (IdempotencyInProgress)
+        op = idempotency.claim(
+            'create_and_assign_order', idempotency_key, ttl=CREATE_AND_ASSIGN_IDEMPOTENCY_TTL
         )
+        if op.replayed:
+            logger.info(f"Idempotent return for create_and_assign_order: {idempotency_key[:16]}...")
+            # Return cached result - need to fetch actual objects
+            order = ProcurementOrder.objects.get(id=op.response.get('order_id'))
+            assignments = list(OrderAssignment.objects.filter(order=order))
+            return {
+                'order': order,
+                'assignments': assignments,
+                'assignment_count': len(assignments),
+                'total_assigned': order.quantity_assigned,
+                'remaining': order.quantity_needed - order.quantity_assigned,
+                'idempotent': True,
+            }
         
         # Collect assignments for deferred notifications
         pending_notifications = []
         
-        try:
+        with op:
             # Create the order
             result = self.create_order(created_by, selected_farm_ids=selected_farm_ids, **order_data)
             order = result['order']
@@ -275,16 +265,17 @@ class ProcurementWorkflowService:
             # Refresh order to get updated quantities
             order.refresh_from_db()
             
-            # Mark idempotency record as completed
-            idem_record.status = 'completed'
-            idem_record.resource_id = str(order.id)
-            idem_record.response_data = {
-                'order_id': str(order.id),
-                'assignment_count': len(assignments),
-                'total_assigned': order.quantity_assigned,
-            }
-            idem_record.completed_at = timezone.now()
-            idem_record.save()
+            # Store the result for retries (written only if the transaction commits)
+            op.complete(
+                {
+                    'order_id': order.id,
+                    'assignment_count': len(assignments),
+                    'total_assigned': order.quantity_assigned,
+                },
+                resource_type='ProcurementOrder',
+                resource_id=order.id,
+                user_id=created_by.id if created_by else None,
+            )
             
             result = {
                 'order': order,
@@ -300,14 +291,6 @@ class ProcurementWorkflowService:
             connection.on_commit(lambda: self._send_deferred_notifications(pending_notifications))
             
             return result
-            
-        except Exception as e:
-            # Mark idempotency record as failed
-            idem_record.status = 'failed'
-            idem_record.response_data = {'error': str(e)}
-            idem_record.completed_at = timezone.now()
-            idem_record.save()
-            raise
     
     def _assign_to_farm_no_notify(self, order, farm, quantity, price_per_unit=None, user=None):
         """
@@ -456,6 +439,9 @@ class ProcurementWorkflowService:
         """
         Legacy farm recommendation based on business metrics.
         Used when prioritize_distress=False.
+        
+        With a delivery point, only farms within the delivery radius are
+        recommended, nearest first among farms with the same priority score.
         """
         # Base filter: Active approved farms with matching production type
         base_filter = Q(
@@ -490,7 +476,6 @@ class ProcurementWorkflowService:
                 default=Value(0),
                 output_field=IntegerField()
             )
-            # TODO: Add distance calculation when GPS fields are populated
             # TODO: Add quality score from past deliveries
             # TODO: Add on-time delivery percentage
         )
@@ -498,10 +483,18 @@ class ProcurementWorkflowService:
         # Filter farms with available inventory (using current_bird_count)
         farms = farms.filter(current_bird_count__gt=0)
         
+        # Delivery point: only farms within the delivery radius
+        distances = None
+        if order.delivery_point:
+            distances = farm_distances(order.delivery_point, order_radius_km(order), farms=farms)
+            farms = farms.filter(id__in=list(distances))
+        
         # Order by priority score, then inventory (using current_bird_count)
         farms = farms.order_by('-priority_score', '-current_bird_count')
         
         # Limit results
+        if distances is not None:
+            farms = sorted(farms, key=lambda f: (-f.priority_score, distances[f.id]))
         farms = farms[:limit]
         
         # Calculate recommended quantity per farm
@@ -531,6 +524,7 @@ class ProcurementWorkflowService:
                 'priority_score': farm.priority_score if hasattr(farm, 'priority_score') else 0,
                 'distress_score': None,  # Not calculated in legacy mode
                 'distress_level': 'unknown',
+                'distance_km': distances.get(farm.id) if distances is not None else None,
             })
             remaining_needed -= recommended_qty
         
@@ -650,7 +644,8 @@ class ProcurementWorkflowService:
             List of OrderAssignment instances
         """
         # Use distributed lock to prevent concurrent auto-assignments
-        with DistributedLock(f"order:{order.id}:auto_assign", ttl_seconds=120):
+        # (renewed while scoring runs instead of a long fixed TTL)
+        with DistributedLock(f"order:{order.id}:auto_assign", ttl_seconds=30, auto_renew=True):
             # Refresh and lock order
             order = ProcurementOrder.objects.select_for_update().get(pk=order.pk)
             
@@ -882,7 +877,7 @@ class ProcurementWorkflowService:
         with DistributedLock(f"assignment:{assignment.id}:delivery", ttl_seconds=30):
             # Check idempotency
             if idempotency_key:
-                existing = IdempotencyKey.get_if_exists(idempotency_key)
+                existing = idempotency.get_response('create_delivery', idempotency_key)
                 if existing:
                     logger.info(f"Duplicate delivery request (idempotency_key={idempotency_key})")
                     return DeliveryConfirmation.objects.get(pk=existing.get('delivery_id'))
@@ -934,10 +929,14 @@ class ProcurementWorkflowService:
             
             # Store idempotency key
             if idempotency_key:
-                IdempotencyKey.store(
-                    idempotency_key, 
-                    {'delivery_id': str(delivery.id)}, 
-                    ttl_hours=24
+                idempotency.store_response(
+                    'create_delivery',
+                    idempotency_key,
+                    {'delivery_id': delivery.id},
+                    ttl=DELIVERY_IDEMPOTENCY_TTL,
+                    resource_type='DeliveryConfirmation',
+                    resource_id=delivery.id,
+                    user_id=received_by.id if received_by else None,
                 )
             
             # Audit log
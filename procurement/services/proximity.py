@@ -0,0 +1,151 @@
+"""
+Proximity Matching for Procurement Orders
+
+Orders with a delivery point only consider farms whose location lies
+within the order's delivery radius, and rank them by a blend of distress,
+distance and available stock instead of distress alone:
+
+1. farm_distances() finds candidate farm locations with ST_DWithin on
+   ``location::geography`` (metres, served by the farm_locations_geog_gist
+   index) and orders them nearest-first with the KNN ``<->`` operator on
+   the same index, so only the nearest PROXIMITY_CANDIDATE_LIMIT rows are
+   read.
+2. The distress services restrict their farm queryset to those candidates
+   before scoring (scoring is the expensive part, one farm at a time).
+3. rank_by_proximity() attaches distance_km and match_score to each
+   recommendation and sorts by match_score.
+
+Orders without a delivery point keep the distress-only ranking.
+"""
+
+import re
+
+from django.contrib.gis.geos import Point
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+# Farms further than this from the delivery point are not recommended
+DEFAULT_DELIVERY_RADIUS_KM = 150
+# Nearest farm locations read per order (KNN scan limit)
+PROXIMITY_CANDIDATE_LIMIT = 500
+
+# match_score = weighted sum of 0-100 components
+MATCH_WEIGHTS = {
+    'distress': 0.5,
+    'distance': 0.3,
+    'stock': 0.2,
+}
+
+_GPS_PAIR = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*[,;\s]\s*(-?\d+(?:\.\d+)?)\s*$')
+_DELIVERY_GEOGRAPHY = 'ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography'
+
+
+def parse_gps_point(value):
+    """
+    Point from a "lat,lng" string (e.g. "5.6037,-0.1870"), or None.
+
+    Ghana GPS addresses (AK-0123-4567) are not coordinates and give None.
+    """
+    match = _GPS_PAIR.match(value or '')
+    if not match:
+        return None
+    latitude, longitude = float(match.group(1)), float(match.group(2))
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    return Point(longitude, latitude, srid=4326)
+
+
+def order_radius_km(order):
+    return float(order.delivery_radius_km or DEFAULT_DELIVERY_RADIUS_KM)
+
+
+def farm_distances(point, radius_km, farms=None, limit=PROXIMITY_CANDIDATE_LIMIT):
+    """
+    Farms with a location within ``radius_km`` of ``point``, nearest first.
+
+    Args:
+        point: Delivery Point (SRID 4326)
+        radius_km: Search radius in kilometres
+        farms: Optional Farm queryset to restrict the candidates to
+        limit: Maximum locations read
+
+    Returns:
+        {farm_id: distance_km} ordered by distance; a farm with several
+        locations gets its nearest one
+    """
+    from farms.models import FarmLocation
+
+    delivery = (point.x, point.y)
+    within = RawSQL(
+        f'ST_DWithin(farm_locations.location::geography, {_DELIVERY_GEOGRAPHY}, %s)',
+        (*delivery, float(radius_km) * 1000),
+        output_field=BooleanField(),
+    )
+    distance = RawSQL(
+        f'ST_Distance(farm_locations.location::geography, {_DELIVERY_GEOGRAPHY})',
+        delivery,
+        output_field=FloatField(),
+    )
+    nearest = RawSQL(
+        f'farm_locations.location::geography <-> {_DELIVERY_GEOGRAPHY}',
+        delivery,
+        output_field=FloatField(),
+    )
+
+    locations = FarmLocation.objects.filter(within)
+    if farms is not None:
+        locations = locations.filter(farm__in=farms.values('id'))
+    rows = (
+        locations.annotate(distance_m=distance)
+        .order_by(nearest.asc())
+        .values_list('farm_id', 'distance_m')[:limit]
+    )
+
+    distances = {}
+    for farm_id, distance_m in rows:
+        distances.setdefault(farm_id, round(distance_m / 1000, 2))
+    return distances
+
+
+def match_score(distress_score, distance_km, radius_km, available, remaining_needed):
+    """
+    0-100 blend of distress, closeness to the delivery point and how much
+    of the remaining quantity the farm can cover.
+    """
+    closeness = max(0.0, 1 - distance_km / radius_km) * 100 if radius_km else 0.0
+    coverage = min(1.0, available / remaining_needed) * 100 if remaining_needed > 0 else 0.0
+    return round(
+        MATCH_WEIGHTS['distress'] * float(distress_score)
+        + MATCH_WEIGHTS['distance'] * closeness
+        + MATCH_WEIGHTS['stock'] * coverage,
+        1,
+    )
+
+
+def rank_by_proximity(recommendations, distances, radius_km, remaining_needed, farm_id_key='farm_id'):
+    """
+    Attach distance_km and match_score to recommendation dicts and sort
+    them by match_score (best first), in place.
+
+    Args:
+        recommendations: Dicts with distress_score, available_quantity and
+            the farm id under ``farm_id_key`` (a Farm under 'farm' also works)
+        distances: farm_distances() result
+        radius_km: Radius the distances were searched with
+        remaining_needed: Quantity the order still needs
+    """
+    # Recommendations may carry the id as a string (API payloads)
+    by_id = {str(farm_id): km for farm_id, km in distances.items()}
+    for recommendation in recommendations:
+        farm_id = recommendation.get(farm_id_key) or recommendation['farm'].id
+        distance_km = by_id.get(str(farm_id))
+        recommendation['distance_km'] = distance_km
+        recommendation['match_score'] = match_score(
+            recommendation['distress_score'],
+            distance_km if distance_km is not None else radius_km,
+            radius_km,
+            recommendation.get('available_quantity') or 0,
+            remaining_needed,
+        )
+    recommendations.sort(key=lambda r: r['match_score'], reverse=True)
+    return recommendations
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SalesRevenueConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "sales_revenue"
+    
+    def ready(self):
+        """Import signals to keep marketplace search vectors up to date."""
+        import sales_revenue.signals  # noqa: F401
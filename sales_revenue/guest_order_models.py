@@ -197,6 +197,11 @@ class GuestOrderOTP(models.Model):
             return False, "Invalid OTP code."
 
 
+# An order with the same content in one of these states is a duplicate
+# submission (GuestOrder.find_duplicate)
+DUPLICATE_ORDER_STATUSES = ['pending_verification', 'pending_confirmation', 'confirmed']
+
+
 class GuestOrder(models.Model):
     """
     Guest order - placed through public marketplace without login.
@@ -233,6 +238,9 @@ class GuestOrder(models.Model):
         ('third_party', 'Third-Party Delivery'),
     ]
     
+    DUPLICATE_STATUSES = DUPLICATE_ORDER_STATUSES
+    DUPLICATE_WINDOW_MINUTES = 10
+    
     CANCELLATION_REASON_CHOICES = [
         ('customer_request', 'Customer Requested'),
         ('farmer_unavailable', 'Product Unavailable'),
@@ -250,7 +258,6 @@ class GuestOrder(models.Model):
         max_length=64,
         null=True,
         blank=True,
-        db_index=True,
         help_text='SHA-256 hash of order content for duplicate detection'
     )
     
@@ -354,6 +361,12 @@ class GuestOrder(models.Model):
             models.Index(fields=['guest_customer', '-created_at']),
             models.Index(fields=['order_number']),
             models.Index(fields=['status', 'expires_at']),
+            # Duplicate detection (find_duplicate): only orders that can be duplicates
+            models.Index(
+                fields=['content_hash', '-created_at'],
+                name='guest_order_dedup_idx',
+                condition=models.Q(status__in=DUPLICATE_ORDER_STATUSES),
+            ),
         ]
         constraints = [
             # Ensure idempotency_key is unique per farm (prevents duplicate submissions)
@@ -423,10 +436,12 @@ class GuestOrder(models.Model):
         return hashlib.sha256(hash_input.encode()).hexdigest()
     
     @classmethod
-    def find_duplicate(cls, content_hash: str, minutes: int = 10):
+    def find_duplicate(cls, content_hash: str, minutes: int = DUPLICATE_WINDOW_MINUTES):
         """
         Find a duplicate order with the same content hash within a time window.
         
+        Served by the partial guest_order_dedup_idx index (one range read).
+        
         Args:
             content_hash: The content hash to search for
             minutes: Time window in minutes (default 10)
@@ -439,8 +454,8 @@ class GuestOrder(models.Model):
         return cls.objects.filter(
             content_hash=content_hash,
             created_at__gte=cutoff,
-            status__in=['pending_verification', 'pending_confirmation', 'confirmed']
-        ).first()
+            status__in=cls.DUPLICATE_STATUSES
+        ).order_by('-created_at').first()
     
     def calculate_totals(self):
         """Recalculate order totals from items."""
@@ -457,6 +472,19 @@ class GuestOrder(models.Model):
         self.payment_confirmed_by = user
         self.save()
     
+    def stock_lines(self, notes=''):
+        """Stock reservation lines for the items (see services.stock_reservation)."""
+        return [
+            {
+                'product_id': item.product_id,
+                'quantity': item.quantity,
+                'unit_price': item.unit_price,
+                'reference': item,
+                'notes': notes,
+            }
+            for item in self.items.all()
+        ]
+    
     def cancel(self, reason, notes='', restore_stock=True):
         """
         Cancel the order.
@@ -477,10 +505,9 @@ class GuestOrder(models.Model):
         self.save()
         
         if restore_stock:
-            # Restore stock for all items (simple case without locking)
-            # WARNING: This can have race conditions if called without transaction
-            for item in self.items.all():
-                item.product.restore_stock(item.quantity)
+            # Release held stock, or restore taken stock (products locked together)
+            from .services.stock_holds import release_order_stock
+            release_order_stock(self, f"Guest order {self.order_number} cancelled")
         
         # Update guest customer stats (simple case)
         # For atomic operations, use F() expressions in calling code
@@ -534,6 +561,66 @@ class GuestOrderItem(models.Model):
         super().save(*args, **kwargs)
 
 
+class StockHold(models.Model):
+    """
+    Stock held for a pending guest order line.
+    
+    While an order awaits phone verification and farmer confirmation its
+    quantities are held, not sold: they count in Product.held_quantity and
+    leave stock_quantity untouched. A hold ends when the farmer confirms the
+    order (converted into a sale), the order is cancelled, or it expires and
+    the sweeper releases it (see services.stock_holds).
+    """
+    RELEASE_REASON_CHOICES = [
+        ('converted', 'Converted to Sale'),
+        ('cancelled', 'Order Cancelled'),
+        ('expired', 'Expired'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    
+    order = models.ForeignKey(
+        GuestOrder,
+        on_delete=models.CASCADE,
+        related_name='stock_holds'
+    )
+    order_item = models.OneToOneField(
+        GuestOrderItem,
+        on_delete=models.CASCADE,
+        related_name='stock_hold'
+    )
+    product = models.ForeignKey(
+        'sales_revenue.Product',
+        on_delete=models.PROTECT,
+        related_name='stock_holds'
+    )
+    quantity = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    
+    expires_at = models.DateTimeField(help_text='Hold is released by the sweeper after this time')
+    released_at = models.DateTimeField(null=True, blank=True)
+    release_reason = models.CharField(max_length=20, choices=RELEASE_REASON_CHOICES, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'guest_order_stock_holds'
+        indexes = [
+            # Sweeper: active holds by expiry
+            models.Index(
+                fields=['expires_at'],
+                name='stock_hold_active_expiry_idx',
+                condition=models.Q(released_at__isnull=True)
+            ),
+        ]
+    
+    def __str__(self):
+        return f"Hold {self.quantity} x {self.product_id} for {self.order_id}"
+    
+    @property
+    def is_active(self):
+        return self.released_at is None
+
+
 # =============================================================================
 # ORDER RATE LIMITING (Anti-Abuse)
 # =============================================================================
@@ -618,7 +705,7 @@ class POSSale(models.Model):
     
     ATOMICITY & IDEMPOTENCY:
     - idempotency_key prevents duplicate submissions from retries
-    - Stock is deducted atomically via FarmInventory.remove_stock()
+    - Stock is deducted atomically for the whole basket (services.stock_reservation)
     - Unique constraint on (farm, idempotency_key) ensures no duplicates
     """
     
@@ -811,8 +898,8 @@ class POSSaleItem(models.Model):
         super().save(*args, **kwargs)
         
         # NOTE: Stock is now managed through FarmInventory.
-        # The serializer calls inventory.remove_stock() which:
+        # The serializer bulk-creates the items and calls reserve_stock() which:
         # 1. Deducts from FarmInventory.quantity_available
-        # 2. Syncs to Product.stock_quantity via sync_marketplace_product()
+        # 2. Syncs to Product.stock_quantity via sync_marketplace_products()
         # 3. Updates Product.status if needed
         # Do NOT call self.product.reduce_stock() here to avoid double deduction.
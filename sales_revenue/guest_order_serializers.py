@@ -17,6 +17,8 @@ from .guest_order_models import (
     POSSaleItem,
 )
 from .marketplace_models import Product
+from .services.stock_holds import place_holds
+from .services.stock_reservation import InsufficientStock, lock_stock, reserve_stock
 
 
 # =============================================================================
@@ -117,10 +119,10 @@ class GuestOrderItemCreateSerializer(serializers.Serializer):
         product = data['product_id']
         quantity = data['quantity']
         
-        # Check stock
-        if product.track_inventory and product.stock_quantity < quantity:
+        # Check stock not held by other pending orders
+        if product.track_inventory and product.available_quantity < quantity:
             raise serializers.ValidationError({
-                'quantity': f"Only {product.stock_quantity} available in stock."
+                'quantity': f"Only {max(0, product.available_quantity)} available in stock."
             })
         
         # Check min/max order quantity
@@ -292,9 +294,10 @@ class GuestOrderCreateSerializer(serializers.Serializer):
         4. Content-based duplicate detection (backend-generated)
         5. Optional client idempotency_key for additional protection
         4. Optional idempotency_key prevents duplicate submissions
-        """
-        from .marketplace_models import Product
         
+        Stock is held, not deducted, until the farmer confirms the order or
+        the hold expires (services.stock_holds).
+        """
         items_data = validated_data.pop('items')
         phone = validated_data.pop('phone_number')
         name = validated_data.pop('name')
@@ -306,32 +309,22 @@ class GuestOrderCreateSerializer(serializers.Serializer):
         # Get farm from first product
         farm = items_data[0]['product_id'].farm
         
-        # STEP 1: Collect all product IDs and lock them FIRST (prevents race conditions)
-        product_ids = [item['product_id'].id for item in items_data]
-        
-        # Lock all product rows in a consistent order (by ID) to prevent deadlocks
-        locked_products = {
-            p.id: p for p in Product.objects.filter(
-                id__in=sorted(set(product_ids))
-            ).select_for_update(nowait=False).order_by('id')
-        }
+        # STEP 1: Lock all products (and their inventories) in one query each,
+        # in a consistent order (by ID) to prevent deadlocks
+        try:
+            locked = lock_stock(item['product_id'].id for item in items_data)
+        except Product.DoesNotExist:
+            raise serializers.ValidationError({'items': "Could not lock all products in the order."})
         
-        # STEP 2: Re-validate stock levels with locks held (prevents TOCTOU race condition)
-        for item_data in items_data:
-            original_product = item_data['product_id']
-            quantity = item_data['quantity']
-            locked_product = locked_products.get(original_product.id)
-            
-            if not locked_product:
-                raise serializers.ValidationError({
-                    'items': f"Could not lock product '{original_product.name}'."
-                })
-            
-            if locked_product.track_inventory and locked_product.stock_quantity < quantity:
-                raise serializers.ValidationError({
-                    'items': f"Insufficient stock for '{locked_product.name}'. "
-                             f"Available: {locked_product.stock_quantity}, Requested: {quantity}."
-                })
+        # STEP 2: Re-validate the whole basket with locks held (prevents TOCTOU race condition)
+        lines = [
+            {'product_id': item['product_id'].id, 'quantity': item['quantity']}
+            for item in items_data
+        ]
+        try:
+            locked.check(lines)
+        except InsufficientStock as e:
+            raise serializers.ValidationError({'items': str(e)})
         
         # STEP 3: Create order with content hash and optional idempotency key
         idempotency_key = validated_data.pop('idempotency_key', None)
@@ -351,16 +344,13 @@ class GuestOrderCreateSerializer(serializers.Serializer):
             customer_notes=validated_data.get('customer_notes', ''),
         )
         
-        # STEP 4: Create order items and reduce stock from locked products with audit trail
-        subtotal = 0
-        for item_data in items_data:
-            original_product = item_data['product_id']
-            quantity = item_data['quantity']
-            locked_product = locked_products[original_product.id]
-            line_total = locked_product.price * quantity
-            subtotal += line_total
-            
-            order_item = GuestOrderItem.objects.create(
+        # STEP 4: Create order items and hold their stock until the order is
+        # confirmed or the hold expires (services.stock_holds)
+        order_items = []
+        for line in lines:
+            locked_product = locked.products[line['product_id']]
+            quantity = line['quantity']
+            order_items.append(GuestOrderItem(
                 order=order,
                 product=locked_product,
                 product_name=locked_product.name,
@@ -368,17 +358,11 @@ class GuestOrderCreateSerializer(serializers.Serializer):
                 unit=locked_product.unit,
                 unit_price=locked_product.price,
                 quantity=quantity,
-                line_total=line_total
-            )
-            
-            # Reserve stock from locked product with full audit trail
-            locked_product.reduce_stock(
-                quantity=quantity,
-                reference_record=order_item,
-                unit_price=locked_product.price,
-                notes=f"Guest order {order.order_number} - {locked_product.name}",
-                recorded_by=None  # Guest order - no authenticated user
-            )
+                line_total=locked_product.price * quantity
+            ))
+        GuestOrderItem.objects.bulk_create(order_items)
+        subtotal = sum((item.line_total for item in order_items), 0)
+        place_holds(order, order_items, locked)
         
         # Update totals
         order.subtotal = subtotal
@@ -665,49 +649,41 @@ class POSSaleCreateSerializer(serializers.Serializer):
         3. Stock validation happens INSIDE the transaction with locks held
         4. Optional idempotency_key prevents duplicate submissions
         """
-        from sales_revenue.inventory_models import FarmInventory, StockMovementType
-        from django.db import IntegrityError
-        
         request = self.context['request']
         items_data = validated_data.pop('items')
         idempotency_key = validated_data.pop('idempotency_key', None)
         
-        # STEP 1: Collect all inventory IDs and lock them FIRST (prevents deadlocks by consistent ordering)
-        inventory_ids = []
-        for item_data in items_data:
-            product = item_data['product_id']
-            if hasattr(product, 'inventory_record') and product.inventory_record:
-                inventory_ids.append(product.inventory_record_id)
-        
-        # Lock all inventory rows in a consistent order (by ID) to prevent deadlocks
-        inventory_ids = sorted(set(inventory_ids))
-        locked_inventories = {
-            inv.id: inv for inv in FarmInventory.objects.filter(
-                id__in=inventory_ids
-            ).select_for_update(nowait=False).order_by('id')
-        }
-        
-        # STEP 2: Re-validate stock levels with locks held (prevents TOCTOU race condition)
         for item_data in items_data:
             product = item_data['product_id']
-            quantity = item_data['quantity']
-            
             if not hasattr(product, 'inventory_record') or product.inventory_record is None:
                 raise serializers.ValidationError({
                     'items': f"Product '{product.name}' is not linked to inventory."
                 })
-            
-            inventory = locked_inventories.get(product.inventory_record_id)
-            if not inventory:
-                raise serializers.ValidationError({
-                    'items': f"Could not lock inventory for product '{product.name}'."
-                })
-            
-            if inventory.quantity_available < quantity:
+        
+        # STEP 1: Lock all products and their inventories, one ordered query each (prevents deadlocks)
+        try:
+            locked = lock_stock(item['product_id'].id for item in items_data)
+        except Product.DoesNotExist:
+            raise serializers.ValidationError({'items': "Could not lock all products in the sale."})
+        
+        # STEP 2: Re-validate the whole basket with locks held (prevents TOCTOU race condition)
+        lines = [
+            {
+                'product_id': item['product_id'].id,
+                'quantity': item['quantity'],
+                'unit_price': item.get('unit_price', item['product_id'].price),
+            }
+            for item in items_data
+        ]
+        for line in lines:
+            if line['product_id'] not in locked.inventories:
                 raise serializers.ValidationError({
-                    'items': f"Insufficient stock for '{product.name}'. "
-                             f"Available: {inventory.quantity_available}, Requested: {quantity}."
+                    'items': f"Could not lock inventory for product '{locked.products[line['product_id']].name}'."
                 })
+        try:
+            locked.check(lines, tracked_only=False)
+        except InsufficientStock as e:
+            raise serializers.ValidationError({'items': str(e)})
         
         # STEP 3: Create sale with idempotency key
         sale = POSSale.objects.create(
@@ -724,35 +700,25 @@ class POSSaleCreateSerializer(serializers.Serializer):
             notes=validated_data.get('notes', ''),
         )
         
-        # STEP 4: Create items and deduct from locked inventory
-        subtotal = 0
-        for item_data in items_data:
-            product = item_data['product_id']
-            quantity = item_data['quantity']
-            unit_price = item_data.get('unit_price', product.price)
-            line_total = unit_price * quantity
-            subtotal += line_total
-            
-            # Create sale item
-            POSSaleItem.objects.create(
+        # STEP 4: Create items, then deduct the whole basket from locked inventory
+        # (the single source of truth)
+        sale_items = []
+        for line in lines:
+            product = locked.products[line['product_id']]
+            sale_items.append(POSSaleItem(
                 sale=sale,
                 product=product,
                 product_name=product.name,
                 unit=product.unit,
-                unit_price=unit_price,
-                quantity=quantity,
-                line_total=line_total
-            )
-            
-            # Deduct from locked inventory (the single source of truth)
-            inventory = locked_inventories[product.inventory_record_id]
-            inventory.remove_stock(
-                quantity=quantity,
-                movement_type=StockMovementType.SALE,
-                unit_price=unit_price,
-                notes=f"POS Sale {sale.sale_number}",
-                recorded_by=request.user
-            )
+                unit_price=line['unit_price'],
+                quantity=line['quantity'],
+                line_total=line['unit_price'] * line['quantity']
+            ))
+            line['notes'] = f"POS Sale {sale.sale_number}"
+        POSSaleItem.objects.bulk_create(sale_items)
+        subtotal = sum((item.line_total for item in sale_items), 0)
+        
+        reserve_stock(lines, recorded_by=request.user, tracked_only=False, locked=locked)
         
         # STEP 5: Update totals
         sale.subtotal = subtotal
@@ -17,6 +17,8 @@ from django.utils import timezone
 from django.db import models
 from django.db.models import Q
 
+from core import idempotency
+from core.idempotency import IdempotencyInProgress
 from core.sms_service import HubtelSMSService
 from core.turnstile_service import turnstile_service
 from .guest_order_models import (
@@ -39,6 +41,11 @@ from .guest_order_serializers import (
     POSSaleSerializer,
     POSSaleListSerializer,
 )
+from .services.stock_holds import extend_holds
+
+GUEST_ORDER_CREATE_OPERATION = 'guest_order.create'
+# Longest a crashed order creation keeps blocking its basket
+GUEST_ORDER_CLAIM_TTL = 30
 
 
 # =============================================================================
@@ -256,17 +263,29 @@ class CreateGuestOrderView(APIView):
         # This makes the API truly idempotent - same input = same output (not an error)
         duplicate_order = serializer.context.get('duplicate_order')
         if duplicate_order:
-            return Response({
-                'message': 'Order already exists. Returning existing order.',
-                'order_number': duplicate_order.order_number,
-                'verification_required': duplicate_order.status == 'pending_verification',
-                'total_amount': str(duplicate_order.total_amount),
-                'status': duplicate_order.status,
-                'is_duplicate': True,  # Flag so frontend knows this was a duplicate
-            }, status=status.HTTP_200_OK)  # 200 OK, not 201 Created
+            return self._duplicate_response(duplicate_order)
         
         # SECURITY LAYER 3: Create order (already validated)
-        order = serializer.save()
+        # The basket's content hash is claimed first, so a concurrent double
+        # submit is refused before it locks any stock. The duplicate check is
+        # repeated under the claim: a request that validated while another
+        # one was still saving the same basket finds that order here
+        content_hash = serializer.context['content_hash']
+        try:
+            with idempotency.guard(
+                GUEST_ORDER_CREATE_OPERATION, content_hash, claim_ttl=GUEST_ORDER_CLAIM_TTL
+            ):
+                duplicate_order = GuestOrder.find_duplicate(content_hash)
+                if duplicate_order is None:
+                    order = serializer.save()
+        except IdempotencyInProgress:
+            return Response({
+                'error': 'This order is already being placed. Please wait a moment.',
+                'code': 'ORDER_IN_PROGRESS',
+            }, status=status.HTTP_409_CONFLICT)
+        
+        if duplicate_order:
+            return self._duplicate_response(duplicate_order)
         
         # Send OTP for verification
         phone = order.guest_customer.phone_number
@@ -288,6 +307,16 @@ class CreateGuestOrderView(APIView):
             'total_amount': str(order.total_amount),
             'is_duplicate': False,
         }, status=status.HTTP_201_CREATED)
+    
+    def _duplicate_response(self, duplicate_order):
+        return Response({
+            'message': 'Order already exists. Returning existing order.',
+            'order_number': duplicate_order.order_number,
+            'verification_required': duplicate_order.status == 'pending_verification',
+            'total_amount': str(duplicate_order.total_amount),
+            'status': duplicate_order.status,
+            'is_duplicate': True,  # Flag so frontend knows this was a duplicate
+        }, status=status.HTTP_200_OK)  # 200 OK, not 201 Created
 
 
 class VerifyGuestOrderView(APIView):
@@ -335,10 +364,11 @@ class VerifyGuestOrderView(APIView):
                 'error': 'Order not found or already verified.'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        # Update order status
+        # Update order status and keep its stock held while the farmer confirms
         order.status = 'pending_confirmation'
         order.verified_at = timezone.now()
         order.save()
+        extend_holds(order)
         
         # Update customer verification status
         order.guest_customer.phone_verified = True
@@ -415,7 +445,7 @@ class CancelGuestOrderView(APIView):
     
     def post(self, request):
         from django.db import transaction
-        from .marketplace_models import Product
+        from .services.stock_holds import release_order_stock
         
         order_number = request.data.get('order_number')
         phone = request.data.get('phone_number')
@@ -445,14 +475,6 @@ class CancelGuestOrderView(APIView):
                     'error': 'Cannot cancel this order. Payment may have been confirmed already.'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Lock products before restoring stock
-            product_ids = list(order.items.values_list('product_id', flat=True))
-            locked_products = {
-                p.id: p for p in Product.objects.filter(
-                    id__in=product_ids
-                ).select_for_update()
-            }
-            
             # Update order status (don't auto-restore stock, we handle it)
             order.status = 'cancelled'
             order.cancellation_reason = 'customer_request'
@@ -460,16 +482,12 @@ class CancelGuestOrderView(APIView):
             order.cancelled_at = timezone.now()
             order.save()
             
-            # Restore stock atomically for all items with audit trail
-            for item in order.items.all():
-                product = locked_products.get(item.product_id)
-                if product:
-                    product.restore_stock(
-                        quantity=item.quantity,
-                        reference_record=item,
-                        notes=f"Guest order {order.order_number} cancelled by customer",
-                        recorded_by=None  # Guest cancellation - no user
-                    )
+            # Release held stock, or restore taken stock with audit trail (whole basket locked at once)
+            release_order_stock(
+                order,
+                f"Guest order {order.order_number} cancelled by customer",
+                recorded_by=None  # Guest cancellation - no user
+            )
             
             # Update guest customer stats atomically
             GuestCustomer.objects.filter(pk=order.guest_customer_id).update(
@@ -545,6 +563,8 @@ class FarmerGuestOrderActionView(APIView):
     def post(self, request, pk):
         from django.db import transaction
         from .marketplace_models import Product
+        from .services.stock_holds import convert_holds, release_order_stock
+        from .services.stock_reservation import InsufficientStock
         
         # Lock the order row to prevent concurrent modifications
         order = GuestOrder.objects.select_for_update().filter(
@@ -574,6 +594,14 @@ class FarmerGuestOrderActionView(APIView):
                         'error': 'Order cannot be confirmed in current state.'
                     }, status=status.HTTP_400_BAD_REQUEST)
                 
+                # Held stock becomes a sale now (nothing to take for pre-hold orders)
+                try:
+                    convert_holds(order, recorded_by=request.user)
+                except InsufficientStock as e:
+                    return Response({
+                        'error': f'Order cannot be confirmed: {e}'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                
                 order.status = 'confirmed'
                 order.confirmed_at = timezone.now()
                 if notes:
@@ -594,6 +622,13 @@ class FarmerGuestOrderActionView(APIView):
                         'error': 'Cannot confirm payment in current state.'
                     }, status=status.HTTP_400_BAD_REQUEST)
                 
+                try:
+                    convert_holds(order, recorded_by=request.user)
+                except InsufficientStock as e:
+                    return Response({
+                        'error': f'Cannot confirm payment: {e}'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                
                 payment_method = serializer.validated_data.get('payment_method', '')
                 payment_ref = serializer.validated_data.get('payment_reference', '')
                 
@@ -651,14 +686,6 @@ class FarmerGuestOrderActionView(APIView):
             elif action == 'cancel':
                 reason = serializer.validated_data.get('cancellation_reason', 'other')
                 
-                # Lock products before restoring stock
-                product_ids = list(order.items.values_list('product_id', flat=True))
-                locked_products = {
-                    p.id: p for p in Product.objects.filter(
-                        id__in=product_ids
-                    ).select_for_update()
-                }
-                
                 # Update order status
                 order.status = 'cancelled'
                 order.cancellation_reason = reason
@@ -666,16 +693,12 @@ class FarmerGuestOrderActionView(APIView):
                 order.cancelled_at = timezone.now()
                 order.save()
                 
-                # Restore stock atomically for all items with audit trail
-                for item in order.items.all():
-                    product = locked_products.get(item.product_id)
-                    if product:
-                        product.restore_stock(
-                            quantity=item.quantity,
-                            reference_record=item,
-                            notes=f"Guest order {order.order_number} cancelled by farmer",
-                            recorded_by=request.user
-                        )
+                # Release held stock, or restore taken stock with audit trail (whole basket locked at once)
+                release_order_stock(
+                    order,
+                    f"Guest order {order.order_number} cancelled by farmer",
+                    recorded_by=request.user
+                )
                 
                 # Update guest customer stats
                 from .guest_order_models import GuestCustomer
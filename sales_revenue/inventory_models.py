@@ -158,6 +158,21 @@ class FarmInventory(models.Model):
         help_text='Maximum days before stock expires (21 for eggs)'
     )
     
+    # Open batch aggregates (kept by add_stock/remove_stock, so age metrics
+    # never need a scan of all batches)
+    batched_quantity = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text='Quantity held in open (non-depleted) batches'
+    )
+    batched_date_weight = models.DecimalField(
+        max_digits=24,
+        decimal_places=2,
+        default=0,
+        help_text='Sum of open batch quantity x production date ordinal'
+    )
+    
     # Cumulative statistics
     total_added = models.DecimalField(
         max_digits=14,
@@ -264,7 +279,8 @@ class FarmInventory(models.Model):
                 )
     
     def add_stock(self, quantity, movement_type, source_record=None, 
-                  unit_cost=None, notes='', recorded_by=None, stock_date=None):
+                  unit_cost=None, notes='', recorded_by=None, stock_date=None,
+                  create_batch=False, source_flock=None):
         """
         Add stock to inventory with movement tracking.
         
@@ -276,6 +292,8 @@ class FarmInventory(models.Model):
             notes: Additional notes
             recorded_by: User who made the entry
             stock_date: Date of the stock (for age tracking)
+            create_batch: Also open an InventoryBatch for FIFO depletion
+            source_flock: Flock the batch came from
         """
         quantity = Decimal(str(quantity))
         
@@ -301,8 +319,29 @@ class FarmInventory(models.Model):
         self.quantity_available += quantity
         self.total_added += quantity
         
+        if create_batch:
+            batch_date = stock_date or timezone.now().date()
+            self.batched_quantity += quantity
+            self.batched_date_weight += quantity * batch_date.toordinal()
+            if not self.oldest_stock_date:
+                self.oldest_stock_date = batch_date
+            self._refresh_average_age()
+        
         self.save()
         
+        allocations = []
+        if create_batch:
+            is_production = self._get_source_type(source_record) == 'DailyProduction'
+            batch = InventoryBatch.objects.create(
+                inventory=self,
+                source_flock=source_flock,
+                source_production=source_record if is_production else None,
+                initial_quantity=quantity,
+                current_quantity=quantity,
+                production_date=batch_date,
+            )
+            allocations.append(batch_allocation(batch, quantity))
+        
         # Create movement record
         movement = StockMovement.objects.create(
             inventory=self,
@@ -313,6 +352,7 @@ class FarmInventory(models.Model):
             balance_after=self.quantity_available,
             source_type=self._get_source_type(source_record),
             source_id=str(source_record.id) if source_record else None,
+            batch_allocations=allocations,
             notes=notes,
             recorded_by=recorded_by,
             stock_date=stock_date or timezone.now().date()
@@ -321,10 +361,15 @@ class FarmInventory(models.Model):
         return movement
     
     def remove_stock(self, quantity, movement_type, reference_record=None,
-                     unit_price=None, notes='', recorded_by=None):
+                     unit_price=None, notes='', recorded_by=None, source_production=None):
         """
         Remove stock from inventory with movement tracking.
         
+        Open batches are consumed oldest first (see deplete_batches) and the
+        allocation is recorded on the movement. A production correction
+        passes source_production to take the quantity out of that record's
+        own batch instead (see deplete_production_batches).
+        
         ATOMICITY: This method should be called within a transaction.
         The caller is responsible for using @transaction.atomic and select_for_update()
         to prevent race conditions.
@@ -336,12 +381,11 @@ class FarmInventory(models.Model):
             unit_price: Sale price per unit (for revenue tracking)
             notes: Additional notes
             recorded_by: User who made the entry
+            source_production: DailyProduction being corrected downwards
             
         Raises:
             ValueError: If quantity is invalid or exceeds available stock
         """
-        from django.db import transaction
-        
         quantity = Decimal(str(quantity))
         
         if quantity <= 0:
@@ -353,6 +397,11 @@ class FarmInventory(models.Model):
                 f"Requested: {quantity}"
             )
         
+        if source_production is not None:
+            allocations = self.deplete_production_batches(source_production, quantity)
+        else:
+            allocations = self.deplete_batches(quantity)
+        
         # Update quantities
         self.quantity_available -= quantity
         
@@ -383,6 +432,7 @@ class FarmInventory(models.Model):
             balance_after=self.quantity_available,
             source_type=self._get_source_type(reference_record),
             source_id=str(reference_record.id) if reference_record else None,
+            batch_allocations=allocations,
             notes=notes,
             recorded_by=recorded_by,
             stock_date=timezone.now().date()
@@ -390,6 +440,162 @@ class FarmInventory(models.Model):
         
         return movement
     
+    def deplete_batches(self, quantity):
+        """
+        Consume ``quantity`` from the oldest open, unexpired batches (FIFO).
+        
+        Only the batches the quantity reaches are read: a running total
+        (window function) selects them, and they are locked and fetched in
+        one ordered query, then written back with one bulk_update. The
+        batch aggregates, oldest_stock_date and average_age_days are
+        updated in memory; the caller saves the inventory.
+        
+        Quantity not covered by open batches (stock recorded without a
+        batch, or held only in expired batches) is allocated to no batch.
+        
+        Returns:
+            List of allocations: {'batch_id', 'batch_number', 'quantity',
+            'production_date'} per consumed batch
+        """
+        from django.db import transaction
+        from django.db.models import Window
+        
+        quantity = Decimal(str(quantity))
+        if self.batched_quantity <= 0 or quantity <= 0:
+            return []
+        
+        now = timezone.now()
+        fifo_order = ['production_date', 'created_at', 'id']
+        open_batches = InventoryBatch.objects.filter(
+            inventory=self, is_depleted=False, is_expired=False
+        ).filter(Q(expiry_date__isnull=True) | Q(expiry_date__gte=now.date()))
+        in_range = open_batches.annotate(
+            preceding=Window(
+                Sum('current_quantity'),
+                order_by=[F(field).asc() for field in fifo_order],
+            ) - F('current_quantity')
+        ).filter(preceding__lt=quantity).values('id')
+        
+        with transaction.atomic():
+            batches = list(
+                InventoryBatch.objects.select_for_update()
+                .filter(id__in=in_range)
+                .order_by(*fifo_order)
+            )
+            remaining, allocations, touched = self._consume_batches(batches, quantity, now)
+        
+        if remaining > 0:
+            allocations.append({
+                'batch_id': None,
+                'batch_number': None,
+                'quantity': str(remaining),
+                'production_date': None,
+            })
+        
+        self._update_oldest_stock_date(touched)
+        self._refresh_average_age()
+        return allocations
+    
+    def deplete_production_batches(self, production, quantity):
+        """
+        Consume ``quantity`` from the batch opened by ``production``.
+        
+        Used when a DailyProduction is corrected downwards: the eggs that
+        were never collected come out of that day's batch, not the oldest
+        stock. What the batch no longer holds (already sold) is taken
+        FIFO from the other open batches, since the inventory total was
+        overstated by the full correction.
+        
+        Returns:
+            List of allocations, as deplete_batches()
+        """
+        from django.db import transaction
+        
+        quantity = Decimal(str(quantity))
+        if quantity <= 0:
+            return []
+        
+        now = timezone.now()
+        with transaction.atomic():
+            batches = list(
+                InventoryBatch.objects.select_for_update()
+                .filter(inventory=self, source_production=production, is_depleted=False)
+                .order_by('production_date', 'created_at', 'id')
+            )
+            remaining, allocations, touched = self._consume_batches(batches, quantity, now)
+        
+        if any(batch.is_depleted for batch in touched):
+            self.oldest_stock_date = self.batches.filter(
+                is_depleted=False
+            ).order_by('production_date').values_list('production_date', flat=True).first()
+        self._refresh_average_age()
+        
+        if remaining > 0:
+            allocations.extend(self.deplete_batches(remaining))
+        return allocations
+    
+    def _consume_batches(self, batches, quantity, now):
+        """
+        Take up to ``quantity`` from locked ``batches`` in order, write them
+        back with one bulk_update and reduce the batch aggregates.
+        
+        Returns:
+            (quantity not covered, allocations, touched batches)
+        """
+        remaining = quantity
+        consumed = Decimal('0')
+        consumed_weight = Decimal('0')
+        allocations = []
+        touched = []
+        for batch in batches:
+            if remaining <= 0:
+                break
+            taken = min(remaining, batch.current_quantity)
+            batch.current_quantity -= taken
+            batch.updated_at = now
+            if batch.current_quantity <= 0:
+                batch.is_depleted = True
+                batch.depleted_at = now
+            remaining -= taken
+            consumed += taken
+            consumed_weight += taken * batch.production_date.toordinal()
+            allocations.append(batch_allocation(batch, taken))
+            touched.append(batch)
+        
+        if touched:
+            InventoryBatch.objects.bulk_update(
+                touched, ['current_quantity', 'is_depleted', 'depleted_at', 'updated_at']
+            )
+        
+        self.batched_quantity = max(Decimal('0'), self.batched_quantity - consumed)
+        self.batched_date_weight = max(Decimal('0'), self.batched_date_weight - consumed_weight)
+        return remaining, allocations, touched
+    
+    def _update_oldest_stock_date(self, consumed_batches):
+        """Oldest unsold stock after consuming ``consumed_batches`` (FIFO order)."""
+        if not consumed_batches:
+            return
+        first_consumed = consumed_batches[0].production_date
+        if self.oldest_stock_date and self.oldest_stock_date < first_consumed:
+            # Older stock outside the consumed range (e.g. expired batches) remains
+            return
+        partial = next((b for b in consumed_batches if b.current_quantity > 0), None)
+        if partial:
+            self.oldest_stock_date = partial.production_date
+        else:
+            self.oldest_stock_date = self.batches.filter(
+                is_depleted=False
+            ).order_by('production_date').values_list('production_date', flat=True).first()
+    
+    def _refresh_average_age(self, today=None):
+        """average_age_days from the open batch aggregates."""
+        if self.batched_quantity <= 0:
+            self.average_age_days = 0
+            return
+        today = today or timezone.now().date()
+        mean_ordinal = self.batched_date_weight / self.batched_quantity
+        self.average_age_days = max(0, int(today.toordinal() - mean_ordinal))
+    
     def _get_source_type(self, source_record):
         """Determine the source type string from a record."""
         if not source_record:
@@ -509,6 +715,11 @@ class StockMovement(models.Model):
     stock_date = models.DateField(
         help_text='Date the stock was produced/received'
     )
+    batch_allocations = models.JSONField(
+        default=list,
+        blank=True,
+        help_text='Batches this movement added to or consumed from (FIFO), with quantities'
+    )
     
     # Metadata
     notes = models.TextField(blank=True)
@@ -618,6 +829,10 @@ class InventoryBatch(models.Model):
             models.Index(fields=['inventory', 'is_depleted']),
             models.Index(fields=['production_date']),
             models.Index(fields=['expiry_date']),
+            models.Index(
+                fields=['inventory', 'is_depleted', 'is_expired', 'production_date'],
+                name='inv_batch_fifo_idx'
+            ),
         ]
     
     def __str__(self):
@@ -670,6 +885,16 @@ class InventoryBatch(models.Model):
         return consumed
 
 
+def batch_allocation(batch, quantity):
+    """Batch allocation entry of StockMovement.batch_allocations."""
+    return {
+        'batch_id': str(batch.id),
+        'batch_number': batch.batch_number,
+        'quantity': str(quantity),
+        'production_date': batch.production_date.isoformat(),
+    }
+
+
 class BirdsReadyForMarket(models.Model):
     """
     Tracks birds that have reached market-ready weight/age.
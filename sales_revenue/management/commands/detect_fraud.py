@@ -6,14 +6,25 @@ Usage:
     python manage.py detect_fraud --farm-id 123      # Scan specific farm
     python manage.py detect_fraud --days 30          # Custom analysis period
     python manage.py detect_fraud --min-risk MEDIUM  # Only show MEDIUM+ alerts
+    python manage.py detect_fraud --incremental      # Only farms changed since last sweep
+    python manage.py detect_fraud --async            # Fan out to Celery workers
+
+Farms are analyzed in chunks: each chunk's metrics come from a handful of
+grouped queries and its alerts are bulk-inserted.
 """
 
+from django.core.cache import cache
 from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 from datetime import timedelta
 from farms.models import Farm
 from sales_revenue.models import FraudAlert
-from sales_revenue.services.fraud_detection_service import FraudDetectionService
+from sales_revenue.services.fraud_detection_service import (
+    ALERT_INSERT_BATCH_SIZE,
+    analyze_farms,
+    farms_with_activity_since,
+)
+from sales_revenue.tasks import FRAUD_CHUNK_SIZE, FRAUD_SWEEP_LAST_RUN_KEY, run_fraud_detection
 
 
 class Command(BaseCommand):
@@ -48,6 +59,23 @@ class Command(BaseCommand):
             action='store_true',
             help='Save alerts for all farms even if CLEAN',
         )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only analyze farms with records changed since the last sweep',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=FRAUD_CHUNK_SIZE,
+            help=f'Farms analyzed per batch (default: {FRAUD_CHUNK_SIZE})',
+        )
+        parser.add_argument(
+            '--async',
+            action='store_true',
+            dest='run_async',
+            help='Dispatch the sweep to Celery workers instead of running it here',
+        )
 
     def handle(self, *args, **options):
         farm_id = options.get('farm_id')
@@ -55,6 +83,13 @@ class Command(BaseCommand):
         min_risk = options.get('min_risk')
         active_only = options.get('active_only')
         save_all = options.get('save_all')
+        incremental = options.get('incremental')
+        chunk_size = options.get('chunk_size')
+
+        if options.get('run_async'):
+            result = run_fraud_detection.delay(days=days, incremental=incremental, chunk_size=chunk_size)
+            self.stdout.write(self.style.SUCCESS(f'Fraud sweep dispatched (task {result.id})'))
+            return
 
         # Risk level ordering
         risk_levels = {
@@ -78,6 +113,10 @@ class Command(BaseCommand):
             farms = Farm.objects.all()
             if active_only:
                 farms = farms.filter(is_active=True)
+            if incremental:
+                last_sweep = cache.get(FRAUD_SWEEP_LAST_RUN_KEY)
+                if last_sweep:
+                    farms = farms.filter(id__in=farms_with_activity_since(last_sweep))
 
         total_farms = farms.count()
         self.stdout.write(self.style.SUCCESS(f'\n🔍 Starting fraud detection scan...\n'))
@@ -96,44 +135,54 @@ class Command(BaseCommand):
             'analyzed': 0,
         }
 
-        # Analyze each farm
-        for farm in farms:
-            stats['analyzed'] += 1
-            
-            # Run detection
+        started_at = timezone.now()
+        farms_by_id = {farm.id: farm for farm in farms.select_related('user')}
+        farm_ids = list(farms_by_id)
+
+        # Analyze farms chunk by chunk
+        for start in range(0, len(farm_ids), chunk_size):
+            chunk = farm_ids[start:start + chunk_size]
             try:
-                detector_instance = FraudDetectionService(farm)
-                alert = detector_instance.run_full_analysis(days=days, save=True)
-                
-                if not alert:
-                    stats['clean'] += 1
-                    if save_all:
-                        # Create a CLEAN alert for record keeping
-                        FraudAlert.objects.create(
-                            farm=farm,
-                            risk_score=0,
-                            risk_level='CLEAN',
-                            alerts=[],
-                            status='false_positive',
-                            review_notes='No fraud indicators detected (auto-reviewed)',
-                            reviewed_at=timezone.now(),
-                            analysis_period_days=days,
-                        )
-                    continue
+                alerts = analyze_farms(chunk, days=days, save=True)
+            except Exception as e:
+                self.stdout.write(
+                    self.style.ERROR(f'❌ Error analyzing farms {start + 1}-{start + len(chunk)}: {str(e)}')
+                )
+                continue
+            stats['analyzed'] += len(chunk)
 
+            flagged = set()
+            for alert in alerts:
+                flagged.add(alert.farm_id)
                 # Count by risk level
                 stats['total'] += 1
                 stats[alert.risk_level.lower()] += 1
 
                 # Only display if meets minimum risk threshold
                 if risk_levels[alert.risk_level] >= min_risk_level:
-                    self._display_alert(farm, alert)
+                    self._display_alert(farms_by_id[alert.farm_id], alert)
 
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(f'❌ Error analyzing farm {farm.id} ({farm.farm_name}): {str(e)}')
-                )
-                continue
+            clean = [farm_id for farm_id in chunk if farm_id not in flagged]
+            stats['clean'] += len(clean)
+            if save_all and clean:
+                # Create CLEAN alerts for record keeping
+                FraudAlert.objects.bulk_create([
+                    FraudAlert(
+                        farm_id=farm_id,
+                        risk_score=0,
+                        risk_level='CLEAN',
+                        alerts=[],
+                        status='false_positive',
+                        review_notes='No fraud indicators detected (auto-reviewed)',
+                        reviewed_at=timezone.now(),
+                        analysis_period_days=days,
+                    )
+                    for farm_id in clean
+                ], batch_size=ALERT_INSERT_BATCH_SIZE)
+
+        # Only whole-platform sweeps move the incremental watermark
+        if not (options.get('farm_id') or active_only):
+            cache.set(FRAUD_SWEEP_LAST_RUN_KEY, started_at, None)
 
         # Display summary
         self.stdout.write('\n' + '─' * 80)
@@ -11,6 +11,8 @@ Security Model:
 """
 
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from decimal import Decimal
@@ -128,6 +130,15 @@ class Product(models.Model):
     
     # Inventory
     stock_quantity = models.PositiveIntegerField(default=0)
+    # Units held by pending guest orders (sum of active StockHolds). Only
+    # written by sales_revenue.services.stock_holds; full saves skip it.
+    held_quantity = models.PositiveIntegerField(default=0, editable=False)
+    # What buyers can order: stock not held by pending guest orders
+    available_quantity = models.GeneratedField(
+        expression=models.F('stock_quantity') - models.F('held_quantity'),
+        output_field=models.IntegerField(),
+        db_persist=True,
+    )
     low_stock_threshold = models.PositiveIntegerField(
         default=10,
         help_text='Alert when stock falls below this level'
@@ -174,6 +185,9 @@ class Product(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     published_at = models.DateTimeField(null=True, blank=True)
     
+    # Full-text search (maintained by sales_revenue.signals, see marketplace_search)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     class Meta:
         db_table = 'marketplace_products'
         ordering = ['-created_at']
@@ -182,6 +196,11 @@ class Product(models.Model):
             models.Index(fields=['category', 'status']),
             models.Index(fields=['farm', '-created_at']),
             models.Index(fields=['status', 'is_featured']),
+            # Public in-stock filter
+            models.Index(fields=['status', 'available_quantity'], name='mkt_product_available_idx'),
+            # Public marketplace search
+            GinIndex(fields=['search_vector'], name='mkt_product_search_gin'),
+            GinIndex(fields=['name'], name='mkt_product_name_trgm', opclasses=['gin_trgm_ops']),
         ]
         # Ensure SKU is unique per farm
         constraints = [
@@ -195,11 +214,28 @@ class Product(models.Model):
     def __str__(self):
         return f"{self.name} - {self.farm.farm_name}"
     
+    def save(self, *args, **kwargs):
+        # held_quantity is only written by the stock hold service (under the
+        # product row lock). A full save of an instance loaded earlier must
+        # not write back a stale count over a concurrent hold or release.
+        full_update = (
+            not self._state.adding and not args
+            and kwargs.get('update_fields') is None and not kwargs.get('force_insert')
+        )
+        if full_update:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and not field.generated
+                and field.name != 'held_quantity' and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+    
     @property
     def is_in_stock(self):
         if not self.track_inventory:
             return True
-        return self.stock_quantity > 0
+        return self.stock_quantity - self.held_quantity > 0
     
     @property
     def is_low_stock(self):
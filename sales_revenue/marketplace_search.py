@@ -0,0 +1,200 @@
+"""
+Marketplace Full-Text Search
+
+PostgreSQL full-text search backing for the public marketplace.
+
+Products and farms carry a denormalized ``search_vector`` (tsvector) column
+backed by a GIN index, so public search no longer sequentially scans the
+products table with chains of ``icontains``. Farm and product names also have
+trigram (pg_trgm) GIN indexes for typo-tolerant matching.
+
+Vector weights:
+- Product: name (A), tags + farm name (B), description (C)
+- Farm:    farm name (A), primary constituency (B)
+
+Vectors are kept up to date by signals in ``sales_revenue.signals``; use
+``rebuild_search_vectors()`` after bulk imports that bypass ``save()``.
+"""
+
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.db.models import CharField, Exists, F, OuterRef, Q, TextField, Value
+from django.db.models.functions import Cast, Greatest
+from rest_framework import filters
+
+SEARCH_CONFIG = 'english'
+
+# Minimum pg_trgm similarity for a name to count as a fuzzy match
+TRIGRAM_THRESHOLD = 0.3
+
+# Fields whose change requires a vector refresh
+PRODUCT_SEARCH_FIELDS = frozenset({'name', 'description', 'tags', 'farm'})
+FARM_SEARCH_FIELDS = frozenset({'farm_name', 'primary_constituency'})
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def product_search_vector(farm_name):
+    """
+    Build the tsvector expression for products of a farm.
+
+    The farm name is passed as a literal because joined columns are not
+    allowed in ``QuerySet.update()``.
+    """
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector(Cast('tags', output_field=TextField()), weight='B', config=SEARCH_CONFIG)
+        + SearchVector(Value(farm_name or '', output_field=CharField()), weight='B', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def farm_search_vector():
+    """Build the tsvector expression for farms."""
+    return (
+        SearchVector('farm_name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('primary_constituency', weight='B', config=SEARCH_CONFIG)
+    )
+
+
+def update_product_search_vectors(farm, product_ids=None):
+    """Refresh search vectors for a farm's products (all, or the given ids)."""
+    from .marketplace_models import Product
+
+    queryset = Product.objects.filter(farm_id=farm.pk)
+    if product_ids is not None:
+        queryset = queryset.filter(pk__in=product_ids)
+    return queryset.update(search_vector=product_search_vector(farm.farm_name))
+
+
+def update_farm_search_vector(farm):
+    """Refresh the search vector for a single farm."""
+    from farms.models import Farm
+
+    return Farm.objects.filter(pk=farm.pk).update(search_vector=farm_search_vector())
+
+
+def rebuild_search_vectors():
+    """
+    Rebuild every farm and product search vector.
+
+    Runs one UPDATE per farm for products (farm name is a per-farm literal).
+    Intended for management/maintenance use, not the request path.
+    """
+    from farms.models import Farm
+
+    Farm.objects.update(search_vector=farm_search_vector())
+    product_count = 0
+    for farm in Farm.objects.filter(marketplace_products__isnull=False).distinct().only('id', 'farm_name'):
+        product_count += update_product_search_vectors(farm)
+    return product_count
+
+
+def build_search_query(text):
+    """
+    Convert free text into a prefix-matching tsquery.
+
+    "fresh eg" -> 'fresh:* & eg:*' so partially typed words still match.
+    Returns None when the text contains no searchable terms.
+    """
+    terms = _TERM_RE.findall(text or '')
+    if not terms:
+        return None
+    raw = ' & '.join(f"{term.lower()}:*" for term in terms)
+    return SearchQuery(raw, search_type='raw', config=SEARCH_CONFIG)
+
+
+def search_products(queryset, text):
+    """
+    Filter and rank a Product queryset by full-text relevance.
+
+    Matches the weighted search vector (prefix terms) or, for typos, a
+    trigram match on the product or farm name. Annotates ``search_rank``.
+    """
+    text = (text or '').strip()
+    query = build_search_query(text)
+    if query is None:
+        return queryset
+
+    return queryset.annotate(
+        search_rank=SearchRank(F('search_vector'), query)
+        + Greatest(
+            TrigramSimilarity('name', text),
+            TrigramSimilarity('farm__farm_name', text),
+        )
+    ).filter(
+        Q(search_vector=query)
+        | Q(name__trigram_similar=text)
+        | Q(farm__farm_name__trigram_similar=text)
+    )
+
+
+def search_farms(queryset, text):
+    """Filter and rank a Farm queryset by full-text relevance on the farm name."""
+    text = (text or '').strip()
+    query = build_search_query(text)
+    if query is None:
+        return queryset
+
+    return queryset.annotate(
+        search_rank=SearchRank(F('search_vector'), query) + TrigramSimilarity('farm_name', text)
+    ).filter(Q(search_vector=query) | Q(farm_name__trigram_similar=text))
+
+
+def filter_by_location(queryset, farm_ref='farm_id', region=None, district=None, constituency=None):
+    """
+    Apply region/district/constituency filters via EXISTS subqueries.
+
+    Avoids joining farm_locations into the main query (and the DISTINCT
+    that join requires). ``farm_ref`` is the path to the farm id on the
+    queryset's model ('farm_id' for products, 'pk' for farms).
+    """
+    from farms.models import FarmLocation
+
+    if region:
+        queryset = queryset.filter(Exists(FarmLocation.objects.filter(
+            farm_id=OuterRef(farm_ref), region__icontains=region
+        )))
+    if district:
+        queryset = queryset.filter(Exists(FarmLocation.objects.filter(
+            farm_id=OuterRef(farm_ref), district__icontains=district
+        )))
+    if constituency:
+        constituency_prefix = 'farm__' if farm_ref != 'pk' else ''
+        queryset = queryset.filter(
+            Exists(FarmLocation.objects.filter(
+                farm_id=OuterRef(farm_ref), constituency__icontains=constituency
+            ))
+            | Q(**{f'{constituency_prefix}primary_constituency__icontains': constituency})
+        )
+    return queryset
+
+
+class MarketplaceSearchFilter(filters.BaseFilterBackend):
+    """
+    Full-text search backend for public product lists.
+
+    Reads ``q`` (or DRF's ``search``) and orders by relevance unless the
+    client requested an explicit ``ordering``. Place it after OrderingFilter.
+    """
+
+    search_params = ('q', 'search')
+
+    def filter_queryset(self, request, queryset, view):
+        text = next(
+            (request.query_params.get(p) for p in self.search_params if request.query_params.get(p)),
+            None,
+        )
+        if not text:
+            return queryset
+
+        queryset = search_products(queryset, text)
+        if 'search_rank' in queryset.query.annotations and not request.query_params.get('ordering'):
+            queryset = queryset.order_by('-search_rank', '-created_at')
+        return queryset
@@ -6,6 +6,8 @@ Implements farm-scoped data access to prevent data security breaches.
 """
 
 from rest_framework import serializers
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from .marketplace_models import (
     ProductCategory,
@@ -353,24 +355,40 @@ class OrderCreateSerializer(serializers.Serializer):
         """Create order with items."""
         from django.db import transaction
         from sales_revenue.marketplace_models import Product
+        from sales_revenue.services.stock_reservation import (
+            InsufficientStock,
+            lock_stock,
+            reserve_stock,
+        )
         
         farm = self.context['request'].user.farm
         user = self.context['request'].user
         items_data = validated_data.pop('items')
         
         with transaction.atomic():
+            # Lock the whole basket (ordered by id) and re-check stock with locks held
+            lines = [
+                {'product_id': item['product'].pk, 'quantity': item['quantity']}
+                for item in items_data
+            ]
+            try:
+                locked = lock_stock(line['product_id'] for line in lines)
+                locked.check(lines)
+            except (InsufficientStock, Product.DoesNotExist) as e:
+                raise serializers.ValidationError(str(e))
+            
             # Create order
             order = MarketplaceOrder.objects.create(
                 farm=farm,
                 **validated_data
             )
             
-            # Create order items and reduce stock with audit trail
-            for item_data in items_data:
-                product = item_data['product']
-                quantity = item_data['quantity']
-                
-                order_item = OrderItem.objects.create(
+            # Create order items, then reduce stock for the whole basket with audit trail
+            order_items = []
+            for line in lines:
+                product = locked.products[line['product_id']]
+                quantity = line['quantity']
+                order_item = OrderItem(
                     order=order,
                     product=product,
                     product_name=product.name,
@@ -380,16 +398,14 @@ class OrderCreateSerializer(serializers.Serializer):
                     quantity=quantity,
                     line_total=product.price * quantity
                 )
-                
-                # Lock product and reduce stock with full audit trail
-                locked_product = Product.objects.select_for_update().get(pk=product.pk)
-                locked_product.reduce_stock(
-                    quantity=quantity,
-                    reference_record=order_item,
+                order_items.append(order_item)
+                line.update(
                     unit_price=product.price,
+                    reference=order_item,
                     notes=f"Order {order.order_number} - {product.name}",
-                    recorded_by=user
                 )
+            OrderItem.objects.bulk_create(order_items)
+            reserve_stock(lines, recorded_by=user, locked=locked)
             
             # Calculate totals
             order.calculate_totals()
@@ -442,10 +458,87 @@ class MarketplaceDashboardSerializer(serializers.Serializer):
 # =============================================================================
 
 
-class PublicFarmSerializer(serializers.Serializer):
+# =============================================================================
+# PUBLIC MARKETPLACE QUERY HELPERS
+# =============================================================================
+# Public serializers read ONLY prefetched/annotated data so a page of results
+# costs a constant number of queries:
+# - farm locations come from a Prefetch into `public_locations`
+#   (FarmLocation default ordering puts the primary location first)
+# - active product counts come from a `product_count` annotation
+
+def public_locations_prefetch(lookup='locations'):
+    """Prefetch farm locations (primary first) into `public_locations`."""
+    from farms.models import FarmLocation
+    return Prefetch(
+        lookup,
+        queryset=FarmLocation.objects.only(
+            'id', 'farm_id', 'region', 'district', 'constituency',
+            'community', 'is_primary_location', 'created_at'
+        ).order_by('-is_primary_location', 'created_at'),
+        to_attr='public_locations'
+    )
+
+
+def active_product_count_subquery(farm_ref='farm_id'):
+    """Correlated COUNT of a farm's active products, for annotations."""
+    counts = Product.objects.filter(
+        farm_id=OuterRef(farm_ref), status='active'
+    ).order_by().values('farm_id').annotate(c=Count('id')).values('c')
+    return Coalesce(Subquery(counts), 0)
+
+
+def with_public_farm_data(queryset):
+    """
+    Prepare a Product queryset for PublicProductListSerializer.
+    
+    Joins category and farm, prefetches the farm's locations and
+    annotates the farm's active product count.
+    """
+    return queryset.select_related('category', 'farm').prefetch_related(
+        public_locations_prefetch('farm__locations')
+    ).annotate(farm_product_count=active_product_count_subquery())
+
+
+class PublicFarmLocationMixin:
+    """Location/region/product-count fields for public farm serializers."""
+    
+    def _primary_location(self, obj):
+        """Primary FarmLocation (or first location) without extra queries when prefetched."""
+        locations = getattr(obj, 'public_locations', None)
+        if locations is None:
+            # Not prefetched: a single query, ordered primary-first by Meta.ordering
+            locations = obj.locations.all()
+        return next(iter(locations), None)
+    
+    def get_location(self, obj):
+        """Get primary location community/district from FarmLocation."""
+        location = self._primary_location(obj)
+        if location:
+            return f"{location.community}, {location.district}"
+        return obj.primary_constituency or ""
+    
+    def get_region(self, obj):
+        """Get region from primary FarmLocation."""
+        location = self._primary_location(obj)
+        if location:
+            return location.region
+        return ""
+    
+    def get_total_products(self, obj):
+        count = getattr(obj, 'product_count', None)
+        if count is not None:
+            return count
+        return Product.objects.filter(farm=obj, status='active').count()
+
+
+class PublicFarmSerializer(PublicFarmLocationMixin, serializers.Serializer):
     """
     Public farm information for marketplace display.
     Only exposes non-sensitive farm details.
+    
+    Expects `public_locations` prefetched and `product_count` annotated
+    (see with_public_farm_data / public_locations_prefetch).
     """
     id = serializers.UUIDField()
     farm_name = serializers.CharField()
@@ -462,39 +555,19 @@ class PublicFarmSerializer(serializers.Serializer):
     )
     total_products = serializers.SerializerMethodField()
     is_verified = serializers.BooleanField(default=False)
-    
-    def get_location(self, obj):
-        """Get primary location community/district from FarmLocation."""
-        primary_location = obj.locations.filter(is_primary_location=True).first()
-        if primary_location:
-            return f"{primary_location.community}, {primary_location.district}"
-        # Fall back to first location if no primary set
-        first_location = obj.locations.first()
-        if first_location:
-            return f"{first_location.community}, {first_location.district}"
-        return obj.primary_constituency or ""
-    
-    def get_region(self, obj):
-        """Get region from primary FarmLocation."""
-        primary_location = obj.locations.filter(is_primary_location=True).first()
-        if primary_location:
-            return primary_location.region
-        first_location = obj.locations.first()
-        if first_location:
-            return first_location.region
-        return ""
-    
-    def get_total_products(self, obj):
-        return Product.objects.filter(farm=obj, status='active').count()
 
 
 class PublicProductListSerializer(serializers.ModelSerializer):
     """
     Public product listing for marketplace browsing.
     Hides sensitive pricing data like min_price.
+    
+    Querysets should be prepared with with_public_farm_data().
     """
     category_name = serializers.CharField(source='category.name', read_only=True)
     farm = PublicFarmSerializer(read_only=True)
+    # Held stock is not for sale, so buyers see what is left after holds
+    stock_quantity = serializers.SerializerMethodField()
     is_in_stock = serializers.BooleanField(read_only=True)
     negotiable = serializers.BooleanField(source='price_negotiable', read_only=True)
     price_info = serializers.CharField(source='price_notes', read_only=True)
@@ -515,6 +588,15 @@ class PublicProductListSerializer(serializers.ModelSerializer):
             'created_at'
         ]
     
+    def to_representation(self, instance):
+        # Hand the annotated count to the nested farm serializer
+        if hasattr(instance, 'farm_product_count'):
+            instance.farm.product_count = instance.farm_product_count
+        return super().to_representation(instance)
+    
+    def get_stock_quantity(self, obj):
+        return max(0, obj.available_quantity)
+    
     def get_delivery_options(self, obj):
         """Return available delivery options for this product's farm."""
         # These would normally come from farm settings
@@ -529,6 +611,8 @@ class PublicProductDetailSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     farm = PublicFarmSerializer(read_only=True)
     images = ProductImageSerializer(many=True, read_only=True)
+    # Held stock is not for sale, so buyers see what is left after holds
+    stock_quantity = serializers.SerializerMethodField()
     is_in_stock = serializers.BooleanField(read_only=True)
     negotiable = serializers.BooleanField(source='price_negotiable', read_only=True)
     price_info = serializers.CharField(source='price_notes', read_only=True)
@@ -553,17 +637,20 @@ class PublicProductDetailSerializer(serializers.ModelSerializer):
             'created_at', 'published_at'
         ]
     
+    def get_stock_quantity(self, obj):
+        return max(0, obj.available_quantity)
+    
     def get_related_products(self, obj):
         """Get related products from the same category or farm."""
-        related = Product.objects.filter(
+        related = with_public_farm_data(Product.objects.filter(
             status='active',
             category=obj.category
-        ).exclude(id=obj.id).order_by('-total_sold')[:4]
+        ).exclude(id=obj.id)).order_by('-total_sold')[:4]
         
         return PublicProductListSerializer(related, many=True, context=self.context).data
 
 
-class PublicFarmProfileSerializer(serializers.Serializer):
+class PublicFarmProfileSerializer(PublicFarmLocationMixin, serializers.Serializer):
     """
     Full public farm profile for storefront display.
     """
@@ -596,29 +683,6 @@ class PublicFarmProfileSerializer(serializers.Serializer):
     featured_products = serializers.SerializerMethodField()
     product_categories = serializers.SerializerMethodField()
     
-    def get_location(self, obj):
-        """Get primary location community/district from FarmLocation."""
-        primary_location = obj.locations.filter(is_primary_location=True).first()
-        if primary_location:
-            return f"{primary_location.community}, {primary_location.district}"
-        first_location = obj.locations.first()
-        if first_location:
-            return f"{first_location.community}, {first_location.district}"
-        return obj.primary_constituency or ""
-    
-    def get_region(self, obj):
-        """Get region from primary FarmLocation."""
-        primary_location = obj.locations.filter(is_primary_location=True).first()
-        if primary_location:
-            return primary_location.region
-        first_location = obj.locations.first()
-        if first_location:
-            return first_location.region
-        return ""
-    
-    def get_total_products(self, obj):
-        return Product.objects.filter(farm=obj, status='active').count()
-    
     def get_phone(self, obj):
         # Only show if farm has opted to display contact publicly
         return getattr(obj, 'public_phone', None)
@@ -637,18 +701,16 @@ class PublicFarmProfileSerializer(serializers.Serializer):
     
     def get_featured_products(self, obj):
         """Get featured products from this farm."""
-        featured = Product.objects.filter(
+        featured = with_public_farm_data(Product.objects.filter(
             farm=obj,
             status='active',
             is_featured=True
-        ).order_by('-total_sold')[:6]
+        )).order_by('-total_sold')[:6]
         
         return PublicProductListSerializer(featured, many=True, context=self.context).data
     
     def get_product_categories(self, obj):
         """Get categories with products in this farm."""
-        from django.db.models import Count
-        
         categories = ProductCategory.objects.filter(
             products__farm=obj,
             products__status='active'
@@ -444,7 +444,7 @@ class OrderStatusUpdateView(FarmScopedMixin, APIView):
     
     def patch(self, request, pk):
         from django.db import transaction
-        from sales_revenue.marketplace_models import Product
+        from sales_revenue.services.stock_reservation import release_stock
         
         try:
             order = MarketplaceOrder.objects.get(pk=pk, farm=self.get_farm())
@@ -492,16 +492,16 @@ class OrderStatusUpdateView(FarmScopedMixin, APIView):
             elif new_status == 'cancelled':
                 order.cancelled_at = timezone.now()
                 order.cancellation_reason = request.data.get('reason', '')
-                # Restore stock for cancelled orders with audit trail
-                for item in order.items.all():
-                    # Lock product for atomic operation
-                    locked_product = Product.objects.select_for_update().get(pk=item.product_id)
-                    locked_product.restore_stock(
-                        quantity=item.quantity,
-                        reference_record=item,
-                        notes=f"Order {order.order_number} cancelled - restoring stock",
-                        recorded_by=request.user
-                    )
+                # Restore stock for cancelled orders with audit trail (whole basket locked at once)
+                release_stock([
+                    {
+                        'product_id': item.product_id,
+                        'quantity': item.quantity,
+                        'reference': item,
+                        'notes': f"Order {order.order_number} cancelled - restoring stock",
+                    }
+                    for item in order.items.all()
+                ], recorded_by=request.user)
             
             order.save()
         
@@ -521,7 +521,7 @@ class OrderCancelView(FarmScopedMixin, APIView):
     
     def post(self, request, pk):
         from django.db import transaction
-        from sales_revenue.marketplace_models import Product
+        from sales_revenue.services.stock_reservation import release_stock
         
         try:
             order = MarketplaceOrder.objects.get(pk=pk, farm=self.get_farm())
@@ -544,16 +544,16 @@ class OrderCancelView(FarmScopedMixin, APIView):
             order.cancellation_reason = request.data.get('reason', 'Cancelled by farmer')
             order.save()
             
-            # Restore stock with audit trail
-            for item in order.items.all():
-                # Lock product for atomic operation
-                locked_product = Product.objects.select_for_update().get(pk=item.product_id)
-                locked_product.restore_stock(
-                    quantity=item.quantity,
-                    reference_record=item,
-                    notes=f"Order {order.order_number} cancelled by farmer",
-                    recorded_by=request.user
-                )
+            # Restore stock with audit trail (whole basket locked at once)
+            release_stock([
+                {
+                    'product_id': item.product_id,
+                    'quantity': item.quantity,
+                    'reference': item,
+                    'notes': f"Order {order.order_number} cancelled by farmer",
+                }
+                for item in order.items.all()
+            ], recorded_by=request.user)
         
         return Response({
             'message': 'Order cancelled successfully',
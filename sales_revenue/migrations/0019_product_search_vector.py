@@ -0,0 +1,49 @@
+# Generated by Django 5.2.10 on 2026-10-18 09:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("farms", "0018_farm_search_vector"),
+        ("sales_revenue", "0018_remove_platformsettings_enable_government_subsidy_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="mkt_product_search_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"],
+                name="mkt_product_name_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE marketplace_products p SET search_vector =
+                    setweight(to_tsvector('english', coalesce(p.name, '')), 'A') ||
+                    setweight(to_tsvector('english', coalesce(p.tags::text, '')), 'B') ||
+                    setweight(to_tsvector('english', coalesce(f.farm_name, '')), 'B') ||
+                    setweight(to_tsvector('english', coalesce(p.description, '')), 'C')
+                FROM farms f
+                WHERE f.id = p.farm_id;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.2.10 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sales_revenue", "0019_product_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="farminventory",
+            name="batched_quantity",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                help_text="Quantity held in open (non-depleted) batches",
+                max_digits=14,
+            ),
+        ),
+        migrations.AddField(
+            model_name="farminventory",
+            name="batched_date_weight",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                help_text="Sum of open batch quantity x production date ordinal",
+                max_digits=24,
+            ),
+        ),
+        migrations.AddField(
+            model_name="stockmovement",
+            name="batch_allocations",
+            field=models.JSONField(
+                blank=True,
+                default=list,
+                help_text="Batches this movement added to or consumed from (FIFO), with quantities",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="inventorybatch",
+            index=models.Index(
+                fields=["inventory", "is_depleted", "is_expired", "production_date"],
+                name="inv_batch_fifo_idx",
+            ),
+        ),
+        # Sales before FIFO depletion never consumed batches, so the open
+        # batches of a live inventory add up to far more than it holds.
+        # Keep the newest batches that cover quantity_available, trim the
+        # one where the running total crosses it, and deplete everything
+        # older.
+        migrations.RunSQL(
+            sql="""
+                WITH ranked AS (
+                    SELECT b.id,
+                           b.current_quantity,
+                           GREATEST(fi.quantity_available, 0) AS on_hand,
+                           COALESCE(SUM(b.current_quantity) OVER (
+                               PARTITION BY b.inventory_id
+                               ORDER BY b.production_date DESC, b.created_at DESC, b.id DESC
+                               ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+                           ), 0) AS newer
+                    FROM inventory_batches b
+                    JOIN farm_inventory fi ON fi.id = b.inventory_id
+                    WHERE NOT b.is_depleted
+                )
+                UPDATE inventory_batches b
+                SET current_quantity = GREATEST(r.on_hand - r.newer, 0),
+                    is_depleted = r.on_hand - r.newer <= 0,
+                    depleted_at = CASE
+                        WHEN r.on_hand - r.newer <= 0 THEN NOW() ELSE b.depleted_at
+                    END,
+                    updated_at = NOW()
+                FROM ranked r
+                WHERE b.id = r.id
+                  AND r.newer + r.current_quantity > r.on_hand
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        # Aggregates, oldest stock date and average age of the batches that
+        # remain open. The ordinal matches Python's date.toordinal()
+        # (0001-01-01 is day 1).
+        migrations.RunSQL(
+            sql="""
+                UPDATE farm_inventory fi
+                SET batched_quantity = agg.quantity,
+                    batched_date_weight = agg.weight,
+                    oldest_stock_date = agg.oldest,
+                    average_age_days = GREATEST(
+                        0, FLOOR((CURRENT_DATE - DATE '0001-01-01' + 1) - agg.weight / agg.quantity)
+                    )::integer
+                FROM (
+                    SELECT inventory_id,
+                           SUM(current_quantity) AS quantity,
+                           SUM(current_quantity * (production_date - DATE '0001-01-01' + 1)) AS weight,
+                           MIN(production_date) AS oldest
+                    FROM inventory_batches
+                    WHERE NOT is_depleted AND current_quantity > 0
+                    GROUP BY inventory_id
+                ) agg
+                WHERE fi.id = agg.inventory_id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
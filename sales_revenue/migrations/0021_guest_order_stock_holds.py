@@ -0,0 +1,108 @@
+# Generated by Django 5.2.10 on 2026-10-18 15:00
+
+import uuid
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sales_revenue", "0020_fifo_batch_depletion"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="held_quantity",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="available_quantity",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.F("stock_quantity") - models.F("held_quantity"),
+                output_field=models.IntegerField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["status", "available_quantity"], name="mkt_product_available_idx"
+            ),
+        ),
+        migrations.CreateModel(
+            name="StockHold",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "quantity",
+                    models.PositiveIntegerField(
+                        validators=[django.core.validators.MinValueValidator(1)]
+                    ),
+                ),
+                (
+                    "expires_at",
+                    models.DateTimeField(
+                        help_text="Hold is released by the sweeper after this time"
+                    ),
+                ),
+                ("released_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "release_reason",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("converted", "Converted to Sale"),
+                            ("cancelled", "Order Cancelled"),
+                            ("expired", "Expired"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_holds",
+                        to="sales_revenue.guestorder",
+                    ),
+                ),
+                (
+                    "order_item",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_hold",
+                        to="sales_revenue.guestorderitem",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="stock_holds",
+                        to="sales_revenue.product",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "guest_order_stock_holds",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("released_at__isnull", True)),
+                        fields=["expires_at"],
+                        name="stock_hold_active_expiry_idx",
+                    )
+                ],
+            },
+        ),
+    ]
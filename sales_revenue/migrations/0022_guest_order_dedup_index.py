@@ -0,0 +1,36 @@
+# Generated by Django 5.2.10 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sales_revenue", "0021_guest_order_stock_holds"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="guestorder",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                help_text="SHA-256 hash of order content for duplicate detection",
+                max_length=64,
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="guestorder",
+            index=models.Index(
+                condition=models.Q(
+                    (
+                        "status__in",
+                        ["pending_verification", "pending_confirmation", "confirmed"],
+                    )
+                ),
+                fields=["content_hash", "-created_at"],
+                name="guest_order_dedup_idx",
+            ),
+        ),
+    ]
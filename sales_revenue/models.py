@@ -900,11 +900,21 @@ class FarmerPayout(models.Model):
     def save(self, *args, **kwargs):
         # Calculate hash for audit trail
         if not self.current_hash:
-            # Get the previous payout's hash
-            last_payout = FarmerPayout.objects.filter(farm=self.farm).order_by('-created_at').first()
-            if last_payout:
-                self.previous_hash = last_payout.current_hash
-            self.current_hash = self.calculate_hash()
+            # One payout per farm at a time, so two payouts never chain to
+            # the same previous hash. The farm row lock is held until the
+            # caller's transaction commits (the admin saves inside one), so
+            # the next payout reads this one as its predecessor.
+            from django.db import transaction
+            from farms.models import Farm
+            with transaction.atomic():
+                list(Farm.objects.select_for_update().filter(pk=self.farm_id).values_list('pk', flat=True))
+                # Get the previous payout's hash
+                last_payout = FarmerPayout.objects.filter(farm=self.farm).order_by('-created_at').first()
+                if last_payout:
+                    self.previous_hash = last_payout.current_hash
+                self.current_hash = self.calculate_hash()
+                super().save(*args, **kwargs)
+            return
         
         super().save(*args, **kwargs)
 
@@ -358,7 +358,6 @@ class ProcessingBatch(models.Model):
         
         return True
     
-    @transaction.atomic
     def complete_and_update_inventory(self, user=None):
         """
         Complete the processing batch and add outputs to inventory.
@@ -369,91 +368,14 @@ class ProcessingBatch(models.Model):
         - Sales: Customer buys 200 kg → inventory remaining: 200 kg
         
         This is the critical function that creates the link between 
-        processed products and the inventory system.
+        processed products and the inventory system. Each output adds its
+        weight to the farm's PROCESSED inventory for the product type and
+        gets a marketplace product if it has none; all outputs are written
+        in bulk (see sales_revenue.services.processing_completion).
         """
-        from .inventory_models import FarmInventory, InventoryCategory, StockMovementType
-        
-        if self.status == ProcessingBatchStatus.COMPLETED:
-            raise ValidationError("Batch is already completed")
-        
-        if not self.outputs.exists():
-            raise ValidationError("Cannot complete batch without any outputs defined")
-        
-        # Update each output to inventory (using WEIGHT in kg)
-        for output in self.outputs.all():
-            # Get or create inventory for this product type (UNIT = kg)
-            inventory, created = FarmInventory.objects.get_or_create(
-                farm=self.farm,
-                category=InventoryCategory.PROCESSED,
-                product_name=output.get_product_category_display(),
-                defaults={
-                    'unit': 'kg',  # WEIGHT-BASED: Always kg for processed products
-                    'quantity_available': Decimal('0'),
-                    'unit_cost': output.cost_per_kg or Decimal('0'),
-                }
-            )
-            
-            # Add stock using weight in kg (not piece count)
-            inventory.add_stock(
-                quantity=output.weight_kg,  # WEIGHT in kg
-                movement_type=StockMovementType.PROCESSING,
-                source_record=self,
-                unit_cost=output.cost_per_kg,  # Cost per kg
-                notes=f'From processing batch {self.batch_number} ({output.get_product_category_display()}) - {output.weight_kg} kg',
-                recorded_by=user or self.processed_by
-            )
-            
-            # AUTO-CREATE Marketplace Product if not already linked
-            if not output.marketplace_product:
-                from .marketplace_models import Product as MarketplaceProduct, ProductCategory as MPCategory
-                
-                # Try to find or create appropriate category
-                try:
-                    mp_category, _ = MPCategory.objects.get_or_create(
-                        slug='processed-poultry',
-                        defaults={
-                            'name': 'Processed Poultry',
-                            'description': 'Processed poultry products from farm processing'
-                        }
-                    )
-                except:
-                    mp_category = MPCategory.objects.first()  # Fallback to first category
-                
-                if mp_category:
-                    # Create marketplace product automatically with sensible defaults
-                    marketplace_product = MarketplaceProduct.objects.create(
-                        farm=self.farm,
-                        category=mp_category,
-                        name=f"{output.get_product_category_display()} (Grade {output.grade})",
-                        description=f"Fresh {output.get_product_category_display().lower()} from batch {self.batch_number}",
-                        unit='kg',
-                        price=output.cost_per_kg * Decimal('1.3') if output.cost_per_kg else Decimal('50.00'),  # 30% markup or default
-                        status='active',
-                        track_inventory=True,
-                    )
-                    output.marketplace_product = marketplace_product
-                    output.save(update_fields=['marketplace_product'])
-            
-            # Link inventory to marketplace product
-            if output.marketplace_product and inventory.marketplace_product is None:
-                inventory.marketplace_product = output.marketplace_product
-                inventory.save(update_fields=['marketplace_product'])
-            
-            # Mark output as inventory-updated
-            output.inventory_updated = True
-            output.inventory_updated_at = timezone.now()
-            output.save(update_fields=['inventory_updated', 'inventory_updated_at'])
+        from .services.processing_completion import complete_processing_batch
         
-        # Update actual yield weight on batch
-        self.actual_yield_weight_kg = self.total_output_weight_kg
-        
-        # Mark batch as completed
-        self.status = ProcessingBatchStatus.COMPLETED
-        self.completed_at = timezone.now()
-        self.inventory_updated = True
-        self.save(update_fields=['status', 'completed_at', 'inventory_updated', 'actual_yield_weight_kg', 'updated_at'])
-        
-        return True
+        return complete_processing_batch(self, user=user)
     
     @transaction.atomic
     def cancel(self, reason=None, restore_flock=True):
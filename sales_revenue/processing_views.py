@@ -17,6 +17,7 @@ from django.db.models import Count, Sum, Avg, F, Q
 from django.utils import timezone
 from datetime import timedelta
 
+from accounts.request_context import get_request_farm
 from farms.models import Farm
 from .processing_models import (
     ProcessingBatch,
@@ -512,7 +513,7 @@ class StaleStockReportView(APIView):
         if is_farmer:
             # Farmers only see their own farm's stale stock
             try:
-                farm = Farm.objects.get(user=request.user)
+                farm = get_request_farm(request)
                 stale_outputs = stale_outputs.filter(processing_batch__farm=farm)
             except Farm.DoesNotExist:
                 return Response({
@@ -25,6 +25,13 @@ PUBLIC (No Authentication Required):
 - Search and filter by location (region, district, constituency)
 - Submit order inquiries (price negotiation)
 
+CACHING:
+The home page and location filter facets are anonymous and non-personalized,
+so they are served from the shared cache (core.cache_utils.cached_with_stale)
+with single-recompute locking and stale-while-revalidate. Entries carry the
+PUBLIC_MARKETPLACE_CACHE_TAG, bumped by sales_revenue.signals whenever
+products, subscriptions, farms or farm locations change.
+
 NOTE: Actual order creation and payment are handled separately.
 """
 
@@ -36,8 +43,15 @@ from django.db.models import Q, Count, Avg
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 
+from core.cache_utils import cached_with_stale
 from farms.models import Farm, FarmLocation
 from .marketplace_models import Product, ProductCategory, MarketplaceOrder
+from .marketplace_search import (
+    MarketplaceSearchFilter,
+    filter_by_location,
+    search_farms,
+    search_products,
+)
 from .marketplace_serializers import (
     ProductCategorySerializer,
     PublicProductListSerializer,
@@ -46,8 +60,18 @@ from .marketplace_serializers import (
     PublicFarmProfileSerializer,
     PublicOrderInquirySerializer,
     PublicSearchSerializer,
+    active_product_count_subquery,
+    public_locations_prefetch,
+    with_public_farm_data,
 )
 
+# Cache tag bumped on any write that changes public marketplace visibility
+PUBLIC_MARKETPLACE_CACHE_TAG = 'public_marketplace'
+
+# Fresh for 5 minutes; stale copies served up to 1 hour while one worker refreshes
+PUBLIC_CACHE_TTL = 300
+PUBLIC_CACHE_STALE_TTL = 3600
+
 
 class PublicProductListView(generics.ListAPIView):
     """
@@ -75,12 +99,12 @@ class PublicProductListView(generics.ListAPIView):
     - -created_at (newest, default)
     
     Supports search by:
-    - q: Search in product name, description, tags, farm name
+    - q: Full-text search in product name, description, tags, farm name
+      (prefix and typo tolerant, ranked by relevance unless ordering is given)
     """
     permission_classes = [AllowAny]
     serializer_class = PublicProductListSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['name', 'description', 'tags', 'farm__farm_name']
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, MarketplaceSearchFilter]
     ordering_fields = ['price', 'total_sold', 'average_rating', 'created_at']
     ordering = ['-created_at']
     
@@ -96,14 +120,14 @@ class PublicProductListView(generics.ListAPIView):
         Farms without active subscriptions can still list products (for statistics),
         but those products won't appear in public searches.
         """
-        queryset = Product.objects.filter(
+        queryset = with_public_farm_data(Product.objects.filter(
             status='active',
             farm__farm_status='Active',  # Only from active farms
             # SUBSCRIPTION VISIBILITY FILTER:
             # Only show products from farms with active marketplace subscriptions
             farm__marketplace_enabled=True,
             farm__subscription__status__in=['trial', 'active']
-        ).select_related('category', 'farm').prefetch_related('images', 'farm__locations')
+        ))
         
         # Apply filters from query params
         params = self.request.query_params
@@ -118,19 +142,13 @@ class PublicProductListView(generics.ListAPIView):
         if max_price := params.get('max_price'):
             queryset = queryset.filter(price__lte=max_price)
         
-        # Location filters (from FarmLocation model)
-        if region := params.get('region'):
-            queryset = queryset.filter(farm__locations__region__icontains=region).distinct()
-        
-        if district := params.get('district'):
-            queryset = queryset.filter(farm__locations__district__icontains=district).distinct()
-        
-        if constituency := params.get('constituency'):
-            # Check both FarmLocation constituency and Farm primary_constituency
-            queryset = queryset.filter(
-                Q(farm__locations__constituency__icontains=constituency) |
-                Q(farm__primary_constituency__icontains=constituency)
-            ).distinct()
+        # Location filters (from FarmLocation model, also checks Farm primary_constituency)
+        queryset = filter_by_location(
+            queryset,
+            region=params.get('region'),
+            district=params.get('district'),
+            constituency=params.get('constituency'),
+        )
         
         # Farm name search
         if farm_name := params.get('farm_name'):
@@ -142,7 +160,7 @@ class PublicProductListView(generics.ListAPIView):
         
         # In stock filter (default true)
         if params.get('in_stock', 'true').lower() != 'false':
-            queryset = queryset.filter(stock_quantity__gt=0)
+            queryset = queryset.filter(available_quantity__gt=0)
         
         # Farm filter (by UUID)
         if farm := params.get('farm'):
@@ -173,13 +191,13 @@ class PublicProductDetailView(generics.RetrieveAPIView):
     
     def get_queryset(self):
         """Only return products from farms with active marketplace subscriptions."""
-        return Product.objects.filter(
+        return with_public_farm_data(Product.objects.filter(
             status='active',
             farm__farm_status='Active',
             # SUBSCRIPTION VISIBILITY FILTER:
             farm__marketplace_enabled=True,
             farm__subscription__status__in=['trial', 'active']
-        ).select_related('category', 'farm').prefetch_related('images', 'farm__locations')
+        )).prefetch_related('images')
 
 
 class PublicCategoryListView(generics.ListAPIView):
@@ -215,10 +233,27 @@ class PublicLocationFiltersView(APIView):
     GET /api/public/marketplace/locations/
     GET /api/public/marketplace/locations/?region=Greater Accra  (get districts for region)
     GET /api/public/marketplace/locations/?district=Accra Metropolitan  (get constituencies)
+    
+    Responses are cached per (region, district) in the shared cache.
     """
     permission_classes = [AllowAny]
     
     def get(self, request):
+        region = request.query_params.get('region') or ''
+        district = request.query_params.get('district') or ''
+        cache_key = (
+            f"public_marketplace:locations:{region.strip().lower()}:{district.strip().lower()}"
+        )
+        data = cached_with_stale(
+            cache_key,
+            compute=lambda: self._build_filters(region, district),
+            ttl=PUBLIC_CACHE_TTL,
+            stale_ttl=PUBLIC_CACHE_STALE_TTL,
+            tags=[PUBLIC_MARKETPLACE_CACHE_TAG],
+        )
+        return Response(data)
+    
+    def _build_filters(self, region, district):
         # Get locations only from farms with active subscriptions and active products
         active_farm_ids = Farm.objects.filter(
             farm_status='Active',
@@ -232,31 +267,29 @@ class PublicLocationFiltersView(APIView):
             farm_id__in=active_farm_ids
         )
         
-        params = request.query_params
-        
         # If region is specified, filter districts and constituencies
-        if region := params.get('region'):
+        if region:
             locations = locations.filter(region__iexact=region)
             
             districts = locations.values_list('district', flat=True).distinct().order_by('district')
             constituencies = locations.values_list('constituency', flat=True).distinct().order_by('constituency')
             
-            return Response({
+            return {
                 'region': region,
                 'districts': list(districts),
                 'constituencies': list(constituencies),
-            })
+            }
         
         # If district is specified, filter constituencies
-        if district := params.get('district'):
+        if district:
             locations = locations.filter(district__iexact=district)
             
             constituencies = locations.values_list('constituency', flat=True).distinct().order_by('constituency')
             
-            return Response({
+            return {
                 'district': district,
                 'constituencies': list(constituencies),
-            })
+            }
         
         # Return all available regions, districts, constituencies
         regions = locations.values_list('region', flat=True).distinct().order_by('region')
@@ -270,11 +303,11 @@ class PublicLocationFiltersView(APIView):
         
         all_constituencies = set(list(constituencies) + list(primary_constituencies))
         
-        return Response({
+        return {
             'regions': list(regions),
             'districts': list(districts),
             'constituencies': sorted([c for c in all_constituencies if c]),
-        })
+        }
 
 
 class PublicFarmListView(generics.ListAPIView):
@@ -288,7 +321,7 @@ class PublicFarmListView(generics.ListAPIView):
     - region: Farm region
     - district: Farm district
     - constituency: Farm constituency
-    - q: Search farm by name
+    - q: Search farm by name (full-text, typo tolerant, ranked by relevance)
     """
     permission_classes = [AllowAny]
     serializer_class = PublicFarmSerializer
@@ -301,31 +334,27 @@ class PublicFarmListView(generics.ListAPIView):
             # SUBSCRIPTION VISIBILITY FILTER:
             marketplace_enabled=True,
             subscription__status__in=['trial', 'active']
-        ).distinct().prefetch_related('locations').annotate(
+        ).distinct().prefetch_related(public_locations_prefetch()).annotate(
             average_rating=Avg('marketplace_products__average_rating'),
             product_count=Count('marketplace_products', filter=Q(marketplace_products__status='active'))
         )
         
         params = self.request.query_params
         
+        # Location filters (from FarmLocation, also checks primary_constituency)
+        queryset = filter_by_location(
+            queryset,
+            farm_ref='pk',
+            region=params.get('region'),
+            district=params.get('district'),
+            constituency=params.get('constituency'),
+        )
+        
         # Farm name search
         if q := params.get('q'):
-            queryset = queryset.filter(farm_name__icontains=q)
-        
-        # Region filter (from FarmLocation)
-        if region := params.get('region'):
-            queryset = queryset.filter(locations__region__icontains=region).distinct()
-        
-        # District filter
-        if district := params.get('district'):
-            queryset = queryset.filter(locations__district__icontains=district).distinct()
-        
-        # Constituency filter
-        if constituency := params.get('constituency'):
-            queryset = queryset.filter(
-                Q(locations__constituency__icontains=constituency) |
-                Q(primary_constituency__icontains=constituency)
-            ).distinct()
+            queryset = search_farms(queryset, q)
+            if 'search_rank' in queryset.query.annotations:
+                return queryset.order_by('-search_rank', '-product_count')
         
         return queryset.order_by('-product_count')
 
@@ -353,8 +382,9 @@ class PublicFarmProfileView(APIView):
                 subscription__status__in=['trial', 'active']
             ).annotate(
                 average_rating=Avg('marketplace_products__average_rating'),
-                review_count=Count('marketplace_products__review_count')
-            ),
+                review_count=Count('marketplace_products__review_count'),
+                product_count=active_product_count_subquery('pk')
+            ).prefetch_related(public_locations_prefetch()),
             id=farm_id,
             farm_status='Active'
         )
@@ -376,14 +406,14 @@ class PublicFarmProductsView(generics.ListAPIView):
     def get_queryset(self):
         farm_id = self.kwargs['farm_id']
         
-        queryset = Product.objects.filter(
+        queryset = with_public_farm_data(Product.objects.filter(
             farm_id=farm_id,
             status='active',
             farm__farm_status='Active',
             # SUBSCRIPTION VISIBILITY FILTER:
             farm__marketplace_enabled=True,
             farm__subscription__status__in=['trial', 'active']
-        ).select_related('category', 'farm').prefetch_related('images', 'farm__locations')
+        ))
         
         params = self.request.query_params
         
@@ -399,7 +429,7 @@ class PublicFarmProductsView(generics.ListAPIView):
         
         # In stock filter (default true)
         if params.get('in_stock', 'true').lower() != 'false':
-            queryset = queryset.filter(stock_quantity__gt=0)
+            queryset = queryset.filter(available_quantity__gt=0)
         
         return queryset.order_by('-is_featured', '-total_sold')
 
@@ -411,7 +441,9 @@ class PublicProductSearchView(generics.ListAPIView):
     Only shows products from farms with active marketplace subscriptions.
     
     Supports:
-    - q: Text search (product name, description, tags, farm name)
+    - q: Full-text search (product name, description, tags, farm name),
+      prefix and typo tolerant; results are ranked by relevance unless
+      an explicit ordering is requested
     - category: Category UUID
     - min_price / max_price: Price range
     - region: Farm region
@@ -425,24 +457,19 @@ class PublicProductSearchView(generics.ListAPIView):
     serializer_class = PublicProductListSerializer
     
     def get_queryset(self):
-        queryset = Product.objects.filter(
+        queryset = with_public_farm_data(Product.objects.filter(
             status='active',
             farm__farm_status='Active',
             # SUBSCRIPTION VISIBILITY FILTER:
             farm__marketplace_enabled=True,
             farm__subscription__status__in=['trial', 'active']
-        ).select_related('category', 'farm').prefetch_related('farm__locations')
+        ))
         
         params = self.request.query_params
         
-        # Text search
+        # Text search (GIN-indexed full-text + trigram fuzzy matching)
         if q := params.get('q'):
-            queryset = queryset.filter(
-                Q(name__icontains=q) |
-                Q(description__icontains=q) |
-                Q(tags__icontains=q) |
-                Q(farm__farm_name__icontains=q)
-            )
+            queryset = search_products(queryset, q)
         
         # Apply other filters
         if category := params.get('category'):
@@ -455,17 +482,12 @@ class PublicProductSearchView(generics.ListAPIView):
             queryset = queryset.filter(price__lte=max_price)
         
         # Location filters (from FarmLocation)
-        if region := params.get('region'):
-            queryset = queryset.filter(farm__locations__region__icontains=region).distinct()
-        
-        if district := params.get('district'):
-            queryset = queryset.filter(farm__locations__district__icontains=district).distinct()
-        
-        if constituency := params.get('constituency'):
-            queryset = queryset.filter(
-                Q(farm__locations__constituency__icontains=constituency) |
-                Q(farm__primary_constituency__icontains=constituency)
-            ).distinct()
+        queryset = filter_by_location(
+            queryset,
+            region=params.get('region'),
+            district=params.get('district'),
+            constituency=params.get('constituency'),
+        )
         
         # Farm name search
         if farm_name := params.get('farm_name'):
@@ -475,12 +497,16 @@ class PublicProductSearchView(generics.ListAPIView):
             queryset = queryset.filter(price_negotiable=True)
         
         if params.get('in_stock', 'true').lower() != 'false':
-            queryset = queryset.filter(stock_quantity__gt=0)
+            queryset = queryset.filter(available_quantity__gt=0)
         
-        # Ordering
-        ordering = params.get('ordering', '-created_at')
+        # Ordering (relevance first when searching without an explicit ordering)
+        ordering = params.get('ordering')
         if ordering in ['price', '-price', '-total_sold', '-average_rating', '-created_at']:
             queryset = queryset.order_by(ordering)
+        elif 'search_rank' in queryset.query.annotations:
+            queryset = queryset.order_by('-search_rank', '-created_at')
+        else:
+            queryset = queryset.order_by('-created_at')
         
         return queryset
 
@@ -538,8 +564,13 @@ class PublicMarketplaceHomeView(APIView):
     - Top categories
     - Top farms
     - Latest products
+    
+    The payload is identical for every visitor, so it is served from the
+    shared cache with stampede protection (see module docstring).
     """
     permission_classes = [AllowAny]
+    CACHE_KEY = 'public_marketplace:home'
+
     
     # Base filter for products from subscribed farms
     SUBSCRIPTION_FILTER = {
@@ -548,27 +579,37 @@ class PublicMarketplaceHomeView(APIView):
     }
     
     def get(self, request):
+        data = cached_with_stale(
+            self.CACHE_KEY,
+            compute=lambda: self._build_home(request),
+            ttl=PUBLIC_CACHE_TTL,
+            stale_ttl=PUBLIC_CACHE_STALE_TTL,
+            tags=[PUBLIC_MARKETPLACE_CACHE_TAG],
+        )
+        return Response(data)
+    
+    def _build_home(self, request):
         # Featured products (from subscribed farms only)
-        featured_products = Product.objects.filter(
+        featured_products = with_public_farm_data(Product.objects.filter(
             status='active',
             is_featured=True,
             farm__farm_status='Active',
             **self.SUBSCRIPTION_FILTER
-        ).select_related('category', 'farm').order_by('-total_sold')[:8]
+        )).order_by('-total_sold')[:8]
         
         # Latest products (from subscribed farms only)
-        latest_products = Product.objects.filter(
+        latest_products = with_public_farm_data(Product.objects.filter(
             status='active',
             farm__farm_status='Active',
             **self.SUBSCRIPTION_FILTER
-        ).select_related('category', 'farm').order_by('-created_at')[:8]
+        )).order_by('-created_at')[:8]
         
         # Best selling products (from subscribed farms only)
-        best_selling = Product.objects.filter(
+        best_selling = with_public_farm_data(Product.objects.filter(
             status='active',
             farm__farm_status='Active',
             **self.SUBSCRIPTION_FILTER
-        ).select_related('category', 'farm').order_by('-total_sold')[:8]
+        )).order_by('-total_sold')[:8]
         
         # Categories with product counts (counting only products from subscribed farms)
         categories = ProductCategory.objects.filter(
@@ -594,7 +635,7 @@ class PublicMarketplaceHomeView(APIView):
         ).distinct().annotate(
             product_count=Count('marketplace_products', filter=Q(marketplace_products__status='active')),
             avg_rating=Avg('marketplace_products__average_rating')
-        ).order_by('-product_count')[:6]
+        ).prefetch_related(public_locations_prefetch()).order_by('-product_count')[:6]
         
         # Stats (only counting subscribed farms for public display)
         subscribed_products_count = Product.objects.filter(
@@ -610,7 +651,7 @@ class PublicMarketplaceHomeView(APIView):
             subscription__status__in=['trial', 'active']
         ).distinct().count()
         
-        return Response({
+        return {
             'featured_products': PublicProductListSerializer(
                 featured_products, many=True, context={'request': request}
             ).data,
@@ -627,4 +668,4 @@ class PublicMarketplaceHomeView(APIView):
                 'total_farms': subscribed_farms_count,
                 'total_categories': ProductCategory.objects.filter(is_active=True).count(),
             }
-        })
+        }
@@ -13,11 +13,12 @@ to the returns/refunds workflow.
 from django.core.cache import cache
 from django.utils import timezone
 from functools import wraps
-import uuid
 import logging
-import time
 from typing import Callable, Dict, List
 
+from core import idempotency
+from core.locks import DistributedLock
+
 logger = logging.getLogger(__name__)
 
 
@@ -101,94 +102,60 @@ def validate_refund_status_transition(current_status: str, new_status: str) -> b
 # DISTRIBUTED LOCKING
 # ==============================================================================
 
-def acquire_return_lock(lock_name: str, ttl_seconds: int = 30) -> bool:
-    """Acquire a distributed lock for return operations."""
-    lock_key = f"return_lock:{lock_name}"
-    lock_value = str(uuid.uuid4())
-    acquired = cache.add(lock_key, lock_value, ttl_seconds)
-    if acquired:
-        logger.debug(f"Acquired return lock: {lock_name}")
-    return acquired
-
-
-def release_return_lock(lock_name: str) -> bool:
-    """Release a distributed lock."""
-    lock_key = f"return_lock:{lock_name}"
-    result = cache.delete(lock_key)
-    if result:
-        logger.debug(f"Released return lock: {lock_name}")
-    return result
-
-
-class ReturnLock:
+class ReturnLock(DistributedLock):
     """
     Context manager for distributed locks on return operations.
     
+    Contended callers block until the holder releases (no polling); see
+    core.locks.DistributedLock.
+    
     Usage:
         with ReturnLock(f"return:{return_id}:refund"):
             # Only one process can issue refund at a time
             issue_refund(return_request)
     """
     
-    def __init__(self, lock_name: str, ttl_seconds: int = 30, 
-                 wait: bool = True, max_wait: float = 10.0):
-        self.lock_name = lock_name
-        self.ttl_seconds = ttl_seconds
-        self.wait = wait
-        self.max_wait = max_wait
-        self.acquired = False
-    
-    def __enter__(self):
-        start_time = time.time()
-        
-        while True:
-            self.acquired = acquire_return_lock(self.lock_name, self.ttl_seconds)
-            
-            if self.acquired:
-                return self
-            
-            if not self.wait:
-                raise Exception(f"Could not acquire return lock: {self.lock_name}")
-            
-            elapsed = time.time() - start_time
-            if elapsed > self.max_wait:
-                raise Exception(
-                    f"Timeout waiting for return lock: {self.lock_name} after {elapsed:.2f}s"
-                )
-            
-            time.sleep(0.1)
-    
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.acquired:
-            release_return_lock(self.lock_name)
-        return False
+    key_prefix = 'return_lock'
 
 
 # ==============================================================================
 # IDEMPOTENCY HELPERS
 # ==============================================================================
 
+REFUND_OPERATION = 'issue_refund'
+REFUND_IDEMPOTENCY_TTL = 86400 * 7  # 7 days
+
 def check_refund_idempotency(return_request_id: str) -> dict:
     """
     Check if a refund has already been issued for this return request.
     
+    Reads the shared idempotency store (cache first, database fallback),
+    so an evicted cache entry does not allow a second refund.
+    
     Returns:
         Dict with existing refund info if found, None otherwise
     """
-    cache_key = f"refund_issued:{return_request_id}"
-    return cache.get(cache_key)
+    return idempotency.get_response(REFUND_OPERATION, return_request_id)
 
 
 def mark_refund_issued(return_request_id: str, refund_transaction_id: str, amount: str):
     """
     Mark that a refund has been issued (for idempotency).
+    
+    Stored with the refund's transaction: a rolled-back refund is not marked.
     """
-    cache_key = f"refund_issued:{return_request_id}"
-    cache.set(cache_key, {
-        'refund_transaction_id': refund_transaction_id,
-        'amount': amount,
-        'issued_at': timezone.now().isoformat()
-    }, timeout=86400 * 7)  # 7 days TTL
+    idempotency.store_response(
+        REFUND_OPERATION,
+        return_request_id,
+        {
+            'refund_transaction_id': refund_transaction_id,
+            'amount': amount,
+            'issued_at': timezone.now().isoformat()
+        },
+        ttl=REFUND_IDEMPOTENCY_TTL,
+        resource_type='RefundTransaction',
+        resource_id=refund_transaction_id,
+    )
 
 
 def check_stock_restoration_idempotency(return_item_id: str) -> bool:
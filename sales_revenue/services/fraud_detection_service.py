@@ -7,22 +7,203 @@ Detects potential off-platform sales by analyzing:
 - Inventory anomalies
 - Customer behavior changes
 - Historical trends
+
+BATCH ANALYSIS:
+The numbers every check needs are collected for many farms at once by
+collect_fraud_metrics() - a few grouped queries over DailyProduction,
+EggSale, Flock and AnomalyAlert, whatever the number of farms.
+FraudDetectionService scores one farm from those metrics; analyze_farms()
+scores a chunk of farms and bulk-inserts their FraudAlert rows. sales_revenue.tasks fans chunks of
+the farm set out to Celery workers (nightly, or incrementally for farms
+whose records changed since the last sweep).
 """
 
 from decimal import Decimal
 from datetime import timedelta
 from django.utils import timezone
-from django.db.models import Sum, Avg, Q, F, Count
+from django.db.models import Avg, Q, F, Count
 from django.core.cache import cache
 import logging
 
-from flock_management.models import DailyProduction, Flock
+from core.kpi import avg_if, count_if, grouped_kpis, sum_if
+from flock_management.anomaly_detection import METRIC_MORTALITY
+from flock_management.models import AnomalyAlert, DailyProduction, Flock, MortalityRecord
 from sales_revenue.models import EggSale, BirdSale, FraudAlert
 from farms.models import Farm
 
 
 logger = logging.getLogger(__name__)
 
+PAID_SALE_STATUSES = ['paid', 'completed']
+EGGS_PER_CRATE = 30
+# Days of production the inventory hoarding check looks at
+HOARDING_WINDOW_DAYS = 7
+# Analysis results are cached per farm for a day
+ANALYSIS_CACHE_TTL = 86400
+# FraudAlert rows inserted per INSERT statement
+ALERT_INSERT_BATCH_SIZE = 500
+
+
+def _analysis_cache_key(farm_id):
+    return f'fraud_analysis_{farm_id}'
+
+
+# =============================================================================
+# METRICS (grouped queries, any number of farms)
+# =============================================================================
+
+def collect_fraud_metrics(farm_ids, days=30):
+    """
+    Collect the inputs of every fraud check for a set of farms.
+
+    Five queries in total: production, egg sales, active flocks and
+    mortality anomaly alerts grouped by farm, plus the market-wide average
+    crate price.
+
+    Args:
+        farm_ids: Farms to analyze
+        days: Analysis period in days
+
+    Returns:
+        dict: {farm_id: metrics dict}; farms without records get zeros
+    """
+    farm_ids = list(farm_ids)
+    today = timezone.now().date()
+    cutoff_date = today - timedelta(days=days)
+    historical_cutoff = cutoff_date - timedelta(days=days)
+    week_cutoff = today - timedelta(days=HOARDING_WINDOW_DAYS)
+    earliest = min(historical_cutoff, week_cutoff)
+
+    recent = Q(production_date__gte=cutoff_date)
+    production = grouped_kpis(
+        DailyProduction.objects.filter(farm_id__in=farm_ids, production_date__gte=earliest),
+        'farm_id',
+        eggs=sum_if('eggs_collected', recent),
+        eggs_previous=sum_if(
+            'eggs_collected',
+            production_date__gte=historical_cutoff, production_date__lt=cutoff_date
+        ),
+        eggs_last_week=sum_if('eggs_collected', production_date__gte=week_cutoff),
+        deaths=sum_if('birds_died', recent),
+        avg_daily_deaths=avg_if('birds_died', recent),
+        reported_days=Count('production_date', filter=recent, distinct=True),
+    )
+
+    paid = Q(status__in=PAID_SALE_STATUSES)
+    recent_sale = Q(sale_date__gte=cutoff_date)
+    week_sale = Q(sale_date__gte=week_cutoff)
+    sales = grouped_kpis(
+        EggSale.objects.filter(farm_id__in=farm_ids, sale_date__gte=earliest),
+        'farm_id',
+        crates_sold=sum_if('quantity', paid, recent_sale, unit='crate'),
+        pieces_sold=sum_if('quantity', paid, recent_sale, unit='piece'),
+        crates_sold_last_week=sum_if('quantity', paid, week_sale, unit='crate'),
+        pieces_sold_last_week=sum_if('quantity', paid, week_sale, unit='piece'),
+        revenue=sum_if('total_amount', paid, recent_sale),
+        revenue_previous=sum_if(
+            'total_amount', paid, sale_date__gte=historical_cutoff, sale_date__lt=cutoff_date
+        ),
+        avg_price=avg_if('price_per_unit', recent_sale),
+    )
+
+    flocks = grouped_kpis(
+        Flock.objects.filter(farm_id__in=farm_ids, status='Active'),
+        'farm_id',
+        birds=sum_if('current_count', default=None),
+    )
+
+    # Spikes already flagged by streaming anomaly detection
+    spikes = grouped_kpis(
+        AnomalyAlert.objects.filter(
+            farm_id__in=farm_ids, metric=METRIC_MORTALITY, observed_on__gte=cutoff_date
+        ),
+        'farm_id',
+        days=count_if(),
+    )
+
+    market_avg_price = EggSale.objects.filter(
+        sale_date__gte=cutoff_date,
+        unit='crate'
+    ).aggregate(avg_price=Avg('price_per_unit'))['avg_price']
+
+    metrics = {}
+    for farm_id in farm_ids:
+        prod = production.get(farm_id, {})
+        sale = sales.get(farm_id, {})
+        metrics[farm_id] = {
+            'days': days,
+            'eggs_produced': prod.get('eggs', 0),
+            'eggs_produced_previous': prod.get('eggs_previous', 0),
+            'eggs_produced_last_week': prod.get('eggs_last_week', 0),
+            'eggs_sold': sale.get('crates_sold', 0) * EGGS_PER_CRATE + sale.get('pieces_sold', 0),
+            'eggs_sold_last_week': (
+                sale.get('crates_sold_last_week', 0) * EGGS_PER_CRATE
+                + sale.get('pieces_sold_last_week', 0)
+            ),
+            'revenue': sale.get('revenue', 0),
+            'revenue_previous': sale.get('revenue_previous', 0),
+            'avg_price': sale.get('avg_price'),
+            'market_avg_price': market_avg_price,
+            'deaths': prod.get('deaths', 0),
+            'avg_daily_deaths': prod.get('avg_daily_deaths') or 0,
+            'reported_days': prod.get('reported_days', 0),
+            'mortality_spike_days': spikes.get(farm_id, {}).get('days', 0),
+            # Avoid dividing by zero for farms without active flocks
+            'active_birds': flocks.get(farm_id, {}).get('birds') or 1,
+        }
+    return metrics
+
+
+def farms_with_activity_since(since):
+    """
+    Farms with production, sales, mortality or flock records changed since ``since``.
+
+    Used by the incremental sweep: other farms' inputs are unchanged.
+    """
+    farm_ids = set()
+    for model in (DailyProduction, EggSale, MortalityRecord, Flock):
+        farm_ids.update(
+            model.objects.filter(updated_at__gte=since)
+            .order_by().values_list('farm_id', flat=True).distinct()
+        )
+    return farm_ids
+
+
+def analyze_farms(farm_ids, days=30, save=True):
+    """
+    Score a chunk of farms and bulk-insert their FraudAlert rows.
+
+    Args:
+        farm_ids: Farms to analyze
+        days: Analysis period in days
+        save: Whether to insert the alerts
+
+    Returns:
+        list: FraudAlert objects for farms scoring LOW or higher
+    """
+    farms = list(Farm.objects.filter(id__in=farm_ids).only('id', 'farm_name'))
+    metrics = collect_fraud_metrics([farm.id for farm in farms], days)
+
+    alerts = []
+    summaries = {}
+    for farm in farms:
+        detector = FraudDetectionService(farm, metrics=metrics[farm.id])
+        alert = detector.evaluate(days)
+        summaries[_analysis_cache_key(farm.id)] = detector.summary(days)
+        if alert is not None:
+            alerts.append(alert)
+
+    if save and alerts:
+        FraudAlert.objects.bulk_create(alerts, batch_size=ALERT_INSERT_BATCH_SIZE)
+    cache.set_many(summaries, ANALYSIS_CACHE_TTL)
+
+    logger.info(f"Fraud analysis: {len(farms)} farms analyzed, {len(alerts)} alerts")
+    return alerts
+
+
+# =============================================================================
+# SCORING (one farm)
+# =============================================================================
 
 class FraudDetectionService:
     """
@@ -36,8 +217,15 @@ class FraudDetectionService:
     5. Large inventory but no sales
     """
     
-    def __init__(self, farm):
+    def __init__(self, farm, metrics=None):
+        """
+        Args:
+            farm: Farm to analyze
+            metrics: Pre-collected collect_fraud_metrics() entry for the
+                farm (batch analysis); collected on demand when omitted
+        """
         self.farm = farm
+        self.metrics = metrics
         self.alerts = []
         self.risk_score = 0
     
@@ -54,6 +242,34 @@ class FraudDetectionService:
         """
         logger.info(f"Running fraud analysis for farm: {self.farm.farm_name}")
         
+        alert = self.evaluate(days)
+        
+        if alert is None:
+            logger.info(f"Farm {self.farm.farm_name} is CLEAN (score: {self.risk_score})")
+            return None
+        
+        if save:
+            alert.save()
+            logger.warning(
+                f"Fraud alert created for farm {self.farm.farm_name}: "
+                f"{alert.risk_level} risk (score: {self.risk_score})"
+            )
+        
+        # Cache result for 24 hours
+        cache.set(_analysis_cache_key(self.farm.id), self.summary(days), ANALYSIS_CACHE_TTL)
+        
+        return alert
+    
+    def evaluate(self, days=30):
+        """
+        Run all detection checks without touching the database.
+        
+        Returns:
+            Unsaved FraudAlert if risk score >= 10 (LOW or higher), None otherwise
+        """
+        if self.metrics is None:
+            self.metrics = collect_fraud_metrics([self.farm.id], days)[self.farm.id]
+        
         # Run all detection checks
         self._check_production_sales_mismatch(days)
         self._check_mortality_anomalies(days)
@@ -63,43 +279,29 @@ class FraudDetectionService:
         self._check_reporting_gaps(days)
         self._check_price_manipulation(days)
         
-        # Calculate final risk score
-        risk_level = self._calculate_risk_level()
-        
         # Only create alert if risk score > 10 (LOW or higher)
         if self.risk_score < 10:
-            logger.info(f"Farm {self.farm.farm_name} is CLEAN (score: {self.risk_score})")
             return None
         
-        # Create FraudAlert
-        alert = FraudAlert(
+        return FraudAlert(
             farm=self.farm,
             risk_score=self.risk_score,
-            risk_level=risk_level,
+            risk_level=self._calculate_risk_level(),
             alerts=self.alerts,
             analysis_period_days=days,
             status='new',
         )
-        
-        if save:
-            alert.save()
-            logger.warning(
-                f"Fraud alert created for farm {self.farm.farm_name}: "
-                f"{risk_level} risk (score: {self.risk_score})"
-            )
-        
-        # Cache result for 24 hours
-        cache_key = f'fraud_analysis_{self.farm.id}'
-        cache.set(cache_key, {
+    
+    def summary(self, days):
+        """Cacheable summary of the last evaluation."""
+        return {
             'farm': self.farm.farm_name,
             'risk_score': self.risk_score,
-            'risk_level': risk_level,
+            'risk_level': self._calculate_risk_level(),
             'alerts': self.alerts,
             'analysis_period_days': days,
             'analyzed_at': timezone.now().isoformat()
-        }, 86400)
-        
-        return alert
+        }
     
     def _check_production_sales_mismatch(self, days):
         """
@@ -107,29 +309,8 @@ class FraudDetectionService:
         
         Red flag: Eggs produced but not sold on platform
         """
-        cutoff_date = timezone.now().date() - timedelta(days=days)
-        
-        # Get total egg production
-        total_production = DailyProduction.objects.filter(
-            flock__farm=self.farm,
-            production_date__gte=cutoff_date
-        ).aggregate(
-            total_eggs=Sum('eggs_collected')
-        )['total_eggs'] or 0
-        
-        # Get total egg sales (convert to pieces if needed)
-        egg_sales = EggSale.objects.filter(
-            farm=self.farm,
-            sale_date__gte=cutoff_date,
-            status__in=['paid', 'completed']
-        ).aggregate(
-            total_crates=Sum('quantity', filter=Q(unit='crate')),
-            total_pieces=Sum('quantity', filter=Q(unit='piece'))
-        )
-        
-        total_sold_crates = egg_sales['total_crates'] or 0
-        total_sold_pieces = egg_sales['total_pieces'] or 0
-        total_sold = (total_sold_crates * 30) + total_sold_pieces
+        total_production = self.metrics['eggs_produced']
+        total_sold = self.metrics['eggs_sold']
         
         # Calculate discrepancy
         if total_production > 0:
@@ -171,27 +352,15 @@ class FraudDetectionService:
         Check for suspiciously high mortality rates.
         
         Red flag: Reporting birds as dead to hide off-platform sales
-        """
-        cutoff_date = timezone.now().date() - timedelta(days=days)
-        
-        # Get mortality data
-        mortality_data = DailyProduction.objects.filter(
-            flock__farm=self.farm,
-            production_date__gte=cutoff_date
-        ).aggregate(
-            total_mortality=Sum('birds_died'),
-            avg_mortality=Avg('birds_died'),
-            days_reported=Count('id')
-        )
-        
-        total_mortality = mortality_data['total_mortality'] or 0
-        avg_daily_mortality = mortality_data['avg_mortality'] or 0
         
-        # Get current flock size
-        current_birds = Flock.objects.filter(
-            farm=self.farm,
-            status='active'
-        ).aggregate(total=Sum('current_count'))['total'] or 1
+        Days flagged by streaming anomaly detection (sudden spikes, typical
+        of a disease outbreak) are reported alongside so reviewers can tell
+        an outbreak from steady over-reporting.
+        """
+        total_mortality = self.metrics['deaths']
+        avg_daily_mortality = self.metrics['avg_daily_deaths']
+        current_birds = self.metrics['active_birds']
+        spike_days = self.metrics['mortality_spike_days']
         
         # Calculate mortality rate
         mortality_rate = (total_mortality / (current_birds * days)) * 100
@@ -209,6 +378,7 @@ class FraudDetectionService:
                     'total_deaths': int(total_mortality),
                     'avg_daily_deaths': round(avg_daily_mortality, 2),
                     'mortality_rate_daily': f'{mortality_rate:.3f}%',
+                    'outbreak_spike_days': spike_days,
                     'suspicion': 'Birds may be sold off-platform and reported as dead'
                 }
             })
@@ -220,6 +390,7 @@ class FraudDetectionService:
                 'message': f'Mortality rate slightly elevated at {mortality_rate:.3f}% per day',
                 'details': {
                     'total_deaths': int(total_mortality),
+                    'outbreak_spike_days': spike_days,
                     'industry_avg': '0.033% per day'
                 }
             })
@@ -230,48 +401,16 @@ class FraudDetectionService:
         
         Red flag: Farmer switches to off-platform sales
         """
-        # Compare recent sales to historical average
-        cutoff_date = timezone.now().date() - timedelta(days=days)
-        historical_cutoff = cutoff_date - timedelta(days=days)  # Previous period
-        
-        # Recent sales
-        recent_sales = EggSale.objects.filter(
-            farm=self.farm,
-            sale_date__gte=cutoff_date,
-            status__in=['paid', 'completed']
-        ).aggregate(
-            total=Sum('total_amount'),
-            count=Count('id')
-        )
-        
-        # Historical sales (previous period)
-        historical_sales = EggSale.objects.filter(
-            farm=self.farm,
-            sale_date__gte=historical_cutoff,
-            sale_date__lt=cutoff_date,
-            status__in=['paid', 'completed']
-        ).aggregate(
-            total=Sum('total_amount'),
-            count=Count('id')
-        )
-        
-        recent_total = recent_sales['total'] or 0
-        historical_total = historical_sales['total'] or 0
+        # Compare recent sales to the previous period
+        recent_total = self.metrics['revenue']
+        historical_total = self.metrics['revenue_previous']
         
         if historical_total > 0:
             drop_percentage = ((historical_total - recent_total) / historical_total) * 100
             
             # Check if production is still normal
-            recent_production = DailyProduction.objects.filter(
-                flock__farm=self.farm,
-                production_date__gte=cutoff_date
-            ).aggregate(total=Sum('eggs_collected'))['total'] or 0
-            
-            historical_production = DailyProduction.objects.filter(
-                flock__farm=self.farm,
-                production_date__gte=historical_cutoff,
-                production_date__lt=cutoff_date
-            ).aggregate(total=Sum('eggs_collected'))['total'] or 0
+            recent_production = self.metrics['eggs_produced']
+            historical_production = self.metrics['eggs_produced_previous']
             
             # If sales dropped but production stable = red flag
             if drop_percentage > 30 and recent_production >= historical_production * 0.9:
@@ -296,25 +435,9 @@ class FraudDetectionService:
         Red flag: Farmer stockpiling for off-platform bulk sale
         """
         # This would integrate with inventory management if implemented
-        # For now, check production accumulation
-        
-        cutoff_date = timezone.now().date() - timedelta(days=7)  # Last week
-        
-        recent_production = DailyProduction.objects.filter(
-            flock__farm=self.farm,
-            production_date__gte=cutoff_date
-        ).aggregate(total=Sum('eggs_collected'))['total'] or 0
-        
-        recent_sales = EggSale.objects.filter(
-            farm=self.farm,
-            sale_date__gte=cutoff_date,
-            status__in=['paid', 'completed']
-        ).aggregate(
-            total_crates=Sum('quantity', filter=Q(unit='crate')),
-            total_pieces=Sum('quantity', filter=Q(unit='piece'))
-        )
-        
-        total_sold = ((recent_sales['total_crates'] or 0) * 30) + (recent_sales['total_pieces'] or 0)
+        # For now, check production accumulation over the last week
+        recent_production = self.metrics['eggs_produced_last_week']
+        total_sold = self.metrics['eggs_sold_last_week']
         
         if recent_production > 0:
             unsold_percentage = ((recent_production - total_sold) / recent_production) * 100
@@ -350,16 +473,8 @@ class FraudDetectionService:
         
         Red flag: Farmer skips reporting on days with off-platform sales
         """
-        cutoff_date = timezone.now().date() - timedelta(days=days)
-        
-        # Get reporting days
-        reporting_days = DailyProduction.objects.filter(
-            flock__farm=self.farm,
-            production_date__gte=cutoff_date
-        ).values_list('production_date', flat=True).distinct()
-        
         expected_days = days
-        actual_days = len(reporting_days)
+        actual_days = self.metrics['reported_days']
         gap_percentage = ((expected_days - actual_days) / expected_days) * 100
         
         if gap_percentage > 20:  # Missing >20% of days
@@ -382,19 +497,8 @@ class FraudDetectionService:
         
         Red flag: Farmer overprices on platform to push customers off-platform
         """
-        cutoff_date = timezone.now().date() - timedelta(days=days)
-        
-        # Get farmer's average price
-        farmer_avg_price = EggSale.objects.filter(
-            farm=self.farm,
-            sale_date__gte=cutoff_date
-        ).aggregate(avg_price=Avg('price_per_unit'))['avg_price']
-        
-        # Get market average price (all farms)
-        market_avg_price = EggSale.objects.filter(
-            sale_date__gte=cutoff_date,
-            unit='crate'
-        ).aggregate(avg_price=Avg('price_per_unit'))['avg_price']
+        farmer_avg_price = self.metrics['avg_price']
+        market_avg_price = self.metrics['market_avg_price']
         
         if farmer_avg_price and market_avg_price:
             price_difference = ((farmer_avg_price - market_avg_price) / market_avg_price) * 100
@@ -0,0 +1,298 @@
+"""
+Inventory Expiry Sweep
+
+InventoryBatch.is_expired is only recomputed in save(), so a batch past
+its expiry_date stays sellable stock until something touches it. The
+sweep writes expired stock off in bulk:
+
+1. Expired open batches are found through the expiry_date index, in
+   chunks; each chunk is one transaction.
+2. The chunk's linked marketplace Product rows are locked first, then
+   their inventories, then the batches (each ordered by id). That is the
+   order checkout takes them in (lock_stock()), so the sweep and a sale
+   of the same product queue behind each other instead of deadlocking.
+   The batches are marked expired and depleted with one UPDATE.
+3. One SPOILAGE StockMovement per inventory is bulk-inserted, with the
+   written-off batches as its allocations, and the inventories' quantity,
+   value, low-stock flag and batch aggregates are written with one
+   bulk_update.
+4. Linked marketplace Product rows are synced in one UPDATE.
+5. A per-farm summary of what expired is cached for the distress
+   service's inventory stagnation factor (see recent_expiry_summary()).
+
+Stock on hand is held by the newest batches, so an inventory only writes
+off the share of quantity_available its other open batches do not cover.
+Batches left open by sales before FIFO depletion (older than the stock
+actually on hand) are closed without a SPOILAGE movement.
+
+Batches that expired after being depleted are only flagged is_expired.
+"""
+
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Exists, F, IntegerField, Min, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Floor
+from django.utils import timezone
+
+from sales_revenue.inventory_models import (
+    FarmInventory,
+    InventoryBatch,
+    StockMovement,
+    StockMovementType,
+    batch_allocation,
+)
+
+logger = logging.getLogger(__name__)
+
+# Expired batches written off per transaction
+EXPIRY_SWEEP_CHUNK_SIZE = 2000
+# Per-farm summaries stay readable for the distress service this long
+EXPIRY_SUMMARY_TTL = 7 * 86400
+SYNCED_PRODUCT_STATUSES = ['active', 'out_of_stock']
+
+
+def expiry_summary_cache_key(farm_id):
+    return f'inventory_expiry:summary:{farm_id}'
+
+
+def recent_expiry_summary(farm_id):
+    """
+    What the latest sweeps wrote off for a farm (None if nothing recently).
+
+    Returns:
+        {'swept_on', 'batches', 'quantity', 'value'} accumulated over the
+        sweeps of the last EXPIRY_SUMMARY_TTL seconds
+    """
+    return cache.get(expiry_summary_cache_key(farm_id))
+
+
+def sweep_expired_inventory(today=None, chunk_size=EXPIRY_SWEEP_CHUNK_SIZE):
+    """
+    Write off every open batch whose expiry date has passed.
+
+    Args:
+        today: Sweep date (batches with expiry_date before it expire)
+        chunk_size: Batches per transaction
+
+    Returns:
+        {'batches', 'inventories', 'products', 'quantity', 'farms':
+        {farm_id: {'batches', 'quantity', 'value'}}}
+    """
+    today = today or timezone.now().date()
+    totals = {'batches': 0, 'inventories': 0, 'products': 0, 'quantity': Decimal('0')}
+    farms = defaultdict(lambda: {'batches': 0, 'quantity': Decimal('0'), 'value': Decimal('0')})
+
+    while True:
+        batch_ids = list(
+            InventoryBatch.objects.filter(expiry_date__lt=today, is_depleted=False)
+            .order_by('expiry_date', 'id')
+            .values_list('id', flat=True)[:chunk_size]
+        )
+        if not batch_ids:
+            break
+        chunk = _write_off_chunk(batch_ids, today)
+        for key in ('batches', 'inventories', 'products', 'quantity'):
+            totals[key] += chunk[key]
+        for farm_id, summary in chunk['farms'].items():
+            for key, value in summary.items():
+                farms[farm_id][key] += value
+        if len(batch_ids) < chunk_size:
+            break
+
+    # Depleted before they expired: only the flag is stale
+    InventoryBatch.objects.filter(
+        expiry_date__lt=today, is_depleted=True, is_expired=False
+    ).update(is_expired=True, updated_at=timezone.now())
+
+    _publish_farm_summaries(farms, today)
+    totals['farms'] = dict(farms)
+    return totals
+
+
+def _write_off_chunk(batch_ids, today):
+    from sales_revenue.marketplace_models import Product
+
+    now = timezone.now()
+    result = {'batches': 0, 'inventories': 0, 'products': 0, 'quantity': Decimal('0'), 'farms': {}}
+
+    with transaction.atomic():
+        inventory_ids = list(
+            InventoryBatch.objects.filter(id__in=batch_ids)
+            .values_list('inventory_id', flat=True).distinct()
+        )
+        # Products before inventories, like lock_stock(): the write-off
+        # updates both, and a checkout locks the product first
+        list(
+            Product.objects.select_for_update(of=('self',))
+            .filter(inventory_record__id__in=inventory_ids)
+            .order_by('id').values_list('id', flat=True)
+        )
+        inventories = {
+            inventory.id: inventory
+            for inventory in FarmInventory.objects.select_for_update()
+            .filter(id__in=inventory_ids).order_by('id')
+        }
+        # Re-check under the locks: a sale may have depleted some meanwhile
+        batches = list(
+            InventoryBatch.objects.select_for_update()
+            .filter(id__in=batch_ids, is_depleted=False, expiry_date__lt=today)
+            .order_by('production_date', 'created_at', 'id')
+        )
+        if not batches:
+            return result
+
+        InventoryBatch.objects.filter(id__in=[batch.id for batch in batches]).update(
+            current_quantity=0,
+            is_depleted=True,
+            is_expired=True,
+            depleted_at=now,
+            updated_at=now,
+        )
+
+        by_inventory = defaultdict(list)
+        for batch in batches:
+            by_inventory[batch.inventory_id].append(batch)
+
+        # Open batches left after the write-off: how much stock they hold
+        # and the oldest of them, in one grouped query
+        remaining = {
+            row['inventory_id']: row
+            for row in InventoryBatch.objects.filter(
+                inventory_id__in=list(by_inventory), is_depleted=False
+            ).values('inventory_id').annotate(
+                quantity=Sum('current_quantity'), oldest=Min('production_date')
+            )
+        }
+
+        movements = []
+        for inventory_id, expired in by_inventory.items():
+            inventory = inventories[inventory_id]
+            quantity = sum((batch.current_quantity for batch in expired), Decimal('0'))
+            weight = sum(
+                (batch.current_quantity * batch.production_date.toordinal() for batch in expired),
+                Decimal('0'),
+            )
+            # Only stock the remaining batches do not account for was in
+            # these batches; the rest was sold (or never batched)
+            covered = remaining.get(inventory_id, {}).get('quantity') or Decimal('0')
+            written_off = min(quantity, max(Decimal('0'), inventory.quantity_available - covered))
+
+            inventory.batched_quantity = max(Decimal('0'), inventory.batched_quantity - quantity)
+            inventory.batched_date_weight = max(Decimal('0'), inventory.batched_date_weight - weight)
+            inventory._refresh_average_age(today)
+            inventory.updated_at = now
+            if written_off <= 0:
+                continue
+
+            inventory.quantity_available -= written_off
+            inventory.total_lost += written_off
+            inventory.total_value = inventory.quantity_available * inventory.unit_cost
+            inventory.is_low_stock = inventory.quantity_available <= inventory.low_stock_threshold
+            inventory.last_stock_update = now
+
+            movements.append(StockMovement(
+                inventory=inventory,
+                farm_id=inventory.farm_id,
+                movement_type=StockMovementType.SPOILAGE,
+                quantity=-written_off,
+                unit_cost=inventory.unit_cost,
+                balance_after=inventory.quantity_available,
+                source_type='InventoryBatch',
+                batch_allocations=_written_off_allocations(expired, written_off),
+                notes=f'Expired: {len(expired)} batch(es) past their expiry date',
+                stock_date=today,
+            ))
+
+            farm = result['farms'].setdefault(
+                inventory.farm_id, {'batches': 0, 'quantity': Decimal('0'), 'value': Decimal('0')}
+            )
+            farm['batches'] += len(expired)
+            farm['quantity'] += written_off
+            farm['value'] += written_off * inventory.unit_cost
+
+        for inventory_id in by_inventory:
+            inventory = inventories[inventory_id]
+            inventory.oldest_stock_date = (
+                remaining.get(inventory_id, {}).get('oldest') if inventory.quantity_available else None
+            )
+
+        StockMovement.objects.bulk_create(movements)
+        FarmInventory.objects.bulk_update(
+            [inventories[inventory_id] for inventory_id in by_inventory],
+            [
+                'quantity_available', 'total_lost', 'batched_quantity', 'batched_date_weight',
+                'total_value', 'is_low_stock', 'oldest_stock_date', 'average_age_days',
+                'last_stock_update', 'updated_at',
+            ],
+        )
+        result['products'] = sync_marketplace_products(list(by_inventory))
+
+    result['batches'] = len(batches)
+    result['inventories'] = len(by_inventory)
+    result['quantity'] = sum((farm['quantity'] for farm in result['farms'].values()), Decimal('0'))
+    return result
+
+
+def _written_off_allocations(expired, written_off):
+    """
+    Allocate ``written_off`` to the newest of the expired batches first
+    (older ones had been sold), listed oldest first like FIFO allocations.
+    """
+    allocations = []
+    left = written_off
+    for batch in reversed(expired):
+        if left <= 0:
+            break
+        taken = min(left, batch.current_quantity)
+        allocations.append(batch_allocation(batch, taken))
+        left -= taken
+    return allocations[::-1]
+
+
+def sync_marketplace_products(inventory_ids):
+    """
+    Bring linked Product rows in line with their inventories in one UPDATE.
+
+    Same rules as FarmInventory.sync_marketplace_product(): stock_quantity
+    always follows the inventory; status switches between active and
+    out_of_stock, never overriding draft or discontinued.
+
+    Returns:
+        Number of products updated
+    """
+    from sales_revenue.marketplace_models import Product
+
+    linked = FarmInventory.objects.filter(marketplace_product=OuterRef('pk'))
+    in_stock = linked.filter(quantity_available__gt=0)
+    return Product.objects.filter(inventory_record__id__in=inventory_ids).update(
+        stock_quantity=Cast(Floor(Subquery(linked.values('quantity_available')[:1])), IntegerField()),
+        status=Case(
+            When(Exists(in_stock), status__in=SYNCED_PRODUCT_STATUSES, then=Value('active')),
+            When(status__in=SYNCED_PRODUCT_STATUSES, then=Value('out_of_stock')),
+            default=F('status'),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def _publish_farm_summaries(farms, today):
+    """Accumulate each farm's write-off into its cached expiry summary."""
+    if not farms:
+        return
+    keys = {farm_id: expiry_summary_cache_key(farm_id) for farm_id in farms}
+    existing = cache.get_many(list(keys.values()))
+    summaries = {}
+    for farm_id, swept in farms.items():
+        previous = existing.get(keys[farm_id]) or {'batches': 0, 'quantity': 0.0, 'value': 0.0}
+        summaries[keys[farm_id]] = {
+            'swept_on': today.isoformat(),
+            'batches': previous['batches'] + swept['batches'],
+            'quantity': previous['quantity'] + float(swept['quantity']),
+            'value': previous['value'] + float(swept['value']),
+        }
+    cache.set_many(summaries, timeout=EXPIRY_SUMMARY_TTL)
+    logger.info(f"Expiry sweep: {len(summaries)} farms wrote off expired stock on {today}")
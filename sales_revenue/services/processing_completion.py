@@ -0,0 +1,235 @@
+"""
+Processing Batch Completion
+
+Moves a processing batch's outputs into inventory with a fixed number of
+queries, however many product cuts the batch has:
+
+1. The batch row is locked and its status re-checked, so two concurrent
+   completions cannot both add the outputs.
+2. The outputs are read once; the farm's PROCESSED inventories for their
+   product names are read and locked in one query, and missing ones are
+   built in memory.
+3. Stock is added in memory in output order, with the same weighted
+   average cost, balances and notes as FarmInventory.add_stock().
+4. Marketplace products for unlinked outputs, the new inventories and one
+   PROCESSING StockMovement per output are bulk-inserted; existing
+   inventories and the outputs are written with one bulk_update each.
+5. Linked Product rows are synced in one UPDATE, and the search vectors
+   and caches that per-row save() signals used to refresh are refreshed
+   once (bulk operations do not send signals).
+"""
+
+import logging
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.cache_utils import bump_cache_tags
+from sales_revenue.inventory_models import (
+    FarmInventory,
+    InventoryCategory,
+    StockMovement,
+    StockMovementType,
+)
+from sales_revenue.services.inventory_expiry import sync_marketplace_products
+
+logger = logging.getLogger(__name__)
+
+PROCESSED_CATEGORY_SLUG = 'processed-poultry'
+PROCESSED_CATEGORY_NAME = 'Processed Poultry'
+# Default listing price: cost plus 30%, or a flat price when cost is unknown
+LISTING_MARKUP = Decimal('1.3')
+DEFAULT_LISTING_PRICE = Decimal('50.00')
+
+INVENTORY_UPDATE_FIELDS = [
+    'quantity_available', 'total_added', 'unit_cost', 'total_value', 'is_low_stock',
+    'marketplace_product', 'last_stock_update', 'updated_at',
+]
+
+
+def complete_processing_batch(batch, user=None):
+    """
+    Complete a processing batch and add its outputs to inventory.
+
+    Args:
+        batch: ProcessingBatch to complete
+        user: User recorded on the stock movements (defaults to the
+            batch's processed_by)
+
+    Raises:
+        ValidationError: Batch already completed, or has no outputs
+    """
+    from sales_revenue.processing_models import ProcessingBatch, ProcessingBatchStatus, ProcessingOutput
+
+    now = timezone.now()
+    with transaction.atomic():
+        status = ProcessingBatch.objects.select_for_update().values_list(
+            'status', flat=True
+        ).get(pk=batch.pk)
+        if status == ProcessingBatchStatus.COMPLETED:
+            raise ValidationError("Batch is already completed")
+
+        outputs = list(batch.outputs.select_related('marketplace_product'))
+        if not outputs:
+            raise ValidationError("Cannot complete batch without any outputs defined")
+
+        inventories = _lock_inventories(batch.farm, outputs)
+        new_inventories, existing_inventories = [], []
+        for inventory in inventories.values():
+            (new_inventories if inventory._state.adding else existing_inventories).append(inventory)
+        products = _create_marketplace_products(batch, outputs)
+
+        recorded_by = user or batch.processed_by
+        movements = []
+        for output in outputs:
+            inventory = inventories[output.get_product_category_display()]
+            movements.append(_add_output(inventory, output, batch, recorded_by, now))
+            if output.marketplace_product_id and inventory.marketplace_product_id is None:
+                inventory.marketplace_product = output.marketplace_product
+            output.inventory_updated = True
+            output.inventory_updated_at = now
+            output.updated_at = now
+
+        for inventory in inventories.values():
+            inventory.total_value = inventory.quantity_available * inventory.unit_cost
+            inventory.is_low_stock = inventory.quantity_available <= inventory.low_stock_threshold
+            inventory.last_stock_update = now
+            inventory.updated_at = now
+
+        FarmInventory.objects.bulk_create(new_inventories)
+        FarmInventory.objects.bulk_update(existing_inventories, INVENTORY_UPDATE_FIELDS)
+        StockMovement.objects.bulk_create(movements)
+        ProcessingOutput.objects.bulk_update(
+            outputs,
+            ['marketplace_product', 'inventory_updated', 'inventory_updated_at', 'updated_at'],
+        )
+        sync_marketplace_products([inventory.id for inventory in inventories.values()])
+
+        batch.actual_yield_weight_kg = sum(
+            (output.weight_kg or Decimal('0') for output in outputs), Decimal('0')
+        )
+        batch.status = ProcessingBatchStatus.COMPLETED
+        batch.completed_at = now
+        batch.inventory_updated = True
+        batch.save(update_fields=[
+            'status', 'completed_at', 'inventory_updated', 'actual_yield_weight_kg', 'updated_at',
+        ])
+
+        _after_bulk_writes(batch.farm, products)
+
+    logger.info(
+        f"Processing batch {batch.batch_number} completed: {len(outputs)} outputs into "
+        f"{len(inventories)} inventories ({len(new_inventories)} new, {len(products)} products created)"
+    )
+    return True
+
+
+def _lock_inventories(farm, outputs):
+    """
+    {product name: FarmInventory} for the outputs, existing rows locked.
+
+    Missing inventories are returned unsaved, seeded like the former
+    get_or_create() defaults (kg, unit cost of the first output).
+    """
+    names = {output.get_product_category_display() for output in outputs}
+    inventories = {}
+    for inventory in (
+        FarmInventory.objects.select_for_update()
+        .filter(farm=farm, category=InventoryCategory.PROCESSED, product_name__in=names)
+        .order_by('created_at', 'id')
+    ):
+        inventories.setdefault(inventory.product_name, inventory)
+
+    for output in outputs:
+        name = output.get_product_category_display()
+        if name not in inventories:
+            inventories[name] = FarmInventory(
+                farm=farm,
+                category=InventoryCategory.PROCESSED,
+                product_name=name,
+                unit='kg',
+                quantity_available=Decimal('0'),
+                unit_cost=output.cost_per_kg or Decimal('0'),
+            )
+    return inventories
+
+
+def _create_marketplace_products(batch, outputs):
+    """Bulk-create and link a marketplace Product for each unlinked output."""
+    from sales_revenue.marketplace_models import Product, ProductCategory
+
+    unlinked = [output for output in outputs if output.marketplace_product_id is None]
+    if not unlinked:
+        return []
+
+    category = (
+        ProductCategory.objects.filter(
+            Q(slug=PROCESSED_CATEGORY_SLUG) | Q(name=PROCESSED_CATEGORY_NAME)
+        ).order_by('slug').first()
+        or ProductCategory.objects.create(
+            slug=PROCESSED_CATEGORY_SLUG,
+            name=PROCESSED_CATEGORY_NAME,
+            description='Processed poultry products from farm processing',
+        )
+    )
+
+    products = []
+    for output in unlinked:
+        display = output.get_product_category_display()
+        cost = output.cost_per_kg
+        output.marketplace_product = Product(
+            farm=batch.farm,
+            category=category,
+            name=f"{display} (Grade {output.grade})",
+            description=f"Fresh {display.lower()} from batch {batch.batch_number}",
+            unit='kg',
+            price=cost * LISTING_MARKUP if cost else DEFAULT_LISTING_PRICE,
+            status='active',
+            track_inventory=True,
+        )
+        products.append(output.marketplace_product)
+    return Product.objects.bulk_create(products)
+
+
+def _add_output(inventory, output, batch, recorded_by, now):
+    """FarmInventory.add_stock() for one output, in memory; returns its movement."""
+    quantity = output.weight_kg
+    unit_cost = output.cost_per_kg
+    if unit_cost is not None:
+        new_total = inventory.quantity_available + quantity
+        if new_total > 0:
+            inventory.unit_cost = (
+                inventory.quantity_available * inventory.unit_cost + quantity * unit_cost
+            ) / new_total
+    inventory.quantity_available += quantity
+    inventory.total_added += quantity
+
+    display = output.get_product_category_display()
+    return StockMovement(
+        inventory=inventory,
+        farm_id=inventory.farm_id,
+        movement_type=StockMovementType.PROCESSING,
+        quantity=quantity,
+        unit_cost=unit_cost or inventory.unit_cost,
+        balance_after=inventory.quantity_available,
+        source_type='ProcessingBatch',
+        source_id=str(batch.id),
+        notes=f'From processing batch {batch.batch_number} ({display}) - {quantity} kg',
+        recorded_by=recorded_by,
+        stock_date=now.date(),
+    )
+
+
+def _after_bulk_writes(farm, products):
+    """Refresh what the skipped save() signals would have refreshed."""
+    from dashboards.services.farmer_analytics import farm_analytics_cache_tag
+    from sales_revenue.marketplace_search import update_product_search_vectors
+    from sales_revenue.public_marketplace_views import PUBLIC_MARKETPLACE_CACHE_TAG
+
+    if products:
+        update_product_search_vectors(farm, product_ids=[product.pk for product in products])
+    tags = [farm_analytics_cache_tag(farm.pk), PUBLIC_MARKETPLACE_CACHE_TAG]
+    transaction.on_commit(lambda: bump_cache_tags(*tags))
@@ -0,0 +1,245 @@
+"""
+Guest Order Stock Holds
+
+A guest order does not take stock when it is placed: its lines are held
+for a short time while the customer verifies the order and the farmer
+confirms it.
+
+1. place_holds() records one StockHold per line and adds its quantity to
+   Product.held_quantity. Stock is untouched; the public marketplace
+   reads Product.available_quantity (stock minus held, a stored generated
+   column), and every checkout validates against it (see
+   services.stock_reservation), so held units cannot be sold twice.
+2. Phone verification extends the holds for the farmer's confirmation
+   window (extend_holds).
+3. Farmer confirmation converts the holds into a sale: they are released
+   and the basket is reserved from stock with SALE movements, under the
+   same product locks (convert_holds).
+4. Cancellation releases the holds, or gives the stock back if the order
+   had already taken it (release_order_stock).
+5. Holds nobody converted or cancelled expire: the sweeper finds them
+   through the partial index on active holds' expiry, releases them in
+   bulk and marks their orders expired (sweep_expired_holds), so no
+   per-order cleanup is needed.
+
+Locks are taken order first, then products (by id), then holds, in every
+path.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.cache_utils import bump_cache_tags
+from sales_revenue.guest_order_models import GuestOrder, StockHold
+from sales_revenue.services.stock_reservation import lock_stock, release_stock, reserve_stock
+
+logger = logging.getLogger(__name__)
+
+# Customer has this long to verify the order by OTP
+VERIFICATION_HOLD_MINUTES = 15
+# Farmer has this long after verification to confirm the order
+CONFIRMATION_HOLD_MINUTES = 6 * 60
+# Orders whose holds the sweeper releases per transaction
+HOLD_SWEEP_CHUNK_SIZE = 500
+
+PENDING_STATUSES = ['pending_verification', 'pending_confirmation']
+
+
+def place_holds(order, order_items, locked, minutes=VERIFICATION_HOLD_MINUTES):
+    """
+    Hold stock for a new order's items.
+
+    Sets order.expires_at to the holds' expiry; the caller saves the order.
+
+    Args:
+        order: GuestOrder being placed
+        order_items: Its saved GuestOrderItems
+        locked: StockLock for the items' products, already checked
+
+    Returns:
+        The created StockHolds
+    """
+    now = timezone.now()
+    expires_at = now + timedelta(minutes=minutes)
+    holds = []
+    held = {}
+    for item in order_items:
+        product = locked.products[item.product_id]
+        if not product.track_inventory:
+            continue
+        holds.append(StockHold(
+            order=order,
+            order_item=item,
+            product_id=product.id,
+            quantity=item.quantity,
+            expires_at=expires_at,
+        ))
+        product.held_quantity += item.quantity
+        product.updated_at = now
+        held[product.id] = product
+
+    StockHold.objects.bulk_create(holds)
+    _save_held(held.values())
+    order.expires_at = expires_at
+    return holds
+
+
+def extend_holds(order, minutes=CONFIRMATION_HOLD_MINUTES):
+    """Move the expiry of an order's active holds to ``minutes`` from now."""
+    expires_at = timezone.now() + timedelta(minutes=minutes)
+    StockHold.objects.filter(order=order, released_at__isnull=True).update(expires_at=expires_at)
+    order.expires_at = expires_at
+    order.save(update_fields=['expires_at', 'updated_at'])
+
+
+def convert_holds(order, recorded_by=None):
+    """
+    Turn an order's holds into a sale of its items.
+
+    Orders placed before holds existed took their stock when they were
+    created; they have no holds and nothing is taken again.
+
+    Returns:
+        The SALE StockMovements (empty if the order had no active holds)
+
+    Raises:
+        InsufficientStock: Stock fell below the held quantity (e.g. written
+            off as expired); nothing is written
+    """
+    with transaction.atomic():
+        lines = order.stock_lines(f"Guest order {order.order_number} confirmed")
+        locked = lock_stock(line['product_id'] for line in lines)
+        holds = _release(order, locked, 'converted')
+        if not holds:
+            return []
+        held_ids = {hold.order_item_id for hold in holds}
+        return reserve_stock(
+            [line for line in lines if line['reference'].id in held_ids],
+            recorded_by=recorded_by,
+            locked=locked,
+        )
+
+
+def release_order_stock(order, notes, recorded_by=None):
+    """
+    Undo whatever stock a cancelled order has: release its active holds,
+    or give back the stock it took (confirmed or pre-hold orders).
+    """
+    with transaction.atomic():
+        lines = order.stock_lines(notes)
+        locked = lock_stock(line['product_id'] for line in lines)
+        if _release(order, locked, 'cancelled'):
+            return []
+        return release_stock(lines, recorded_by=recorded_by, locked=locked)
+
+
+def sweep_expired_holds(now=None, chunk_size=HOLD_SWEEP_CHUNK_SIZE):
+    """
+    Release every active hold past its expiry and expire its order.
+
+    Orders locked by a concurrent request (e.g. the farmer confirming) are
+    skipped and picked up by the next sweep.
+
+    Returns:
+        {'holds', 'orders', 'products'} released/expired/updated
+    """
+    now = now or timezone.now()
+    totals = {'holds': 0, 'orders': 0, 'products': 0}
+    while True:
+        rows = list(
+            StockHold.objects.filter(released_at__isnull=True, expires_at__lt=now)
+            .order_by('expires_at')
+            .values_list('order_id', flat=True)[:chunk_size]
+        )
+        if not rows:
+            break
+        chunk = _expire_chunk(list(dict.fromkeys(rows)), now)
+        for key in totals:
+            totals[key] += chunk[key]
+        if not chunk['holds'] or len(rows) < chunk_size:
+            break
+    if totals['holds']:
+        logger.info(
+            f"Hold sweep: released {totals['holds']} expired holds on {totals['products']} products, "
+            f"{totals['orders']} orders expired"
+        )
+    return totals
+
+
+def _expire_chunk(order_ids, now):
+    from sales_revenue.marketplace_models import Product
+
+    result = {'holds': 0, 'orders': 0, 'products': 0}
+    with transaction.atomic():
+        order_ids = list(
+            GuestOrder.objects.select_for_update(skip_locked=True)
+            .filter(id__in=order_ids).order_by('id').values_list('id', flat=True)
+        )
+        expired = StockHold.objects.filter(
+            order_id__in=order_ids, released_at__isnull=True, expires_at__lt=now
+        )
+        products = {
+            product.id: product
+            for product in Product.objects.select_for_update()
+            .filter(id__in=expired.values('product_id')).order_by('id')
+        }
+        holds = list(expired.select_for_update().order_by('id'))
+        if not holds:
+            return result
+
+        _subtract_held(holds, products, now)
+        StockHold.objects.filter(id__in=[hold.id for hold in holds]).update(
+            released_at=now, release_reason='expired'
+        )
+        result['orders'] = GuestOrder.objects.filter(
+            id__in={hold.order_id for hold in holds}, status__in=PENDING_STATUSES
+        ).update(status='expired', updated_at=now)
+        _save_held(products.values())
+
+    result['holds'] = len(holds)
+    result['products'] = len(products)
+    return result
+
+
+def _release(order, locked, reason):
+    """Release an order's active holds (products already locked)."""
+    now = timezone.now()
+    holds = list(
+        StockHold.objects.select_for_update()
+        .filter(order=order, released_at__isnull=True).order_by('id')
+    )
+    if not holds:
+        return []
+    _subtract_held(holds, locked.products, now)
+    StockHold.objects.filter(id__in=[hold.id for hold in holds]).update(
+        released_at=now, release_reason=reason
+    )
+    _save_held([locked.products[hold.product_id] for hold in holds])
+    return holds
+
+
+def _subtract_held(holds, products, now):
+    quantities = defaultdict(int)
+    for hold in holds:
+        quantities[hold.product_id] += hold.quantity
+    for product_id, quantity in quantities.items():
+        product = products[product_id]
+        product.held_quantity = max(0, product.held_quantity - quantity)
+        product.updated_at = now
+
+
+def _save_held(products):
+    """Write held quantities in one UPDATE and refresh the public marketplace."""
+    from sales_revenue.marketplace_models import Product
+    from sales_revenue.public_marketplace_views import PUBLIC_MARKETPLACE_CACHE_TAG
+
+    products = list({product.id: product for product in products}.values())
+    if not products:
+        return
+    Product.objects.bulk_update(products, ['held_quantity', 'updated_at'])
+    # bulk_update sends no post_save, so bump the tag its signal would have
+    transaction.on_commit(lambda: bump_cache_tags(PUBLIC_MARKETPLACE_CACHE_TAG))
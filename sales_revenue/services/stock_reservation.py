@@ -0,0 +1,503 @@
+"""
+Stock Reservation
+
+Takes and gives back the stock of a whole basket (guest orders, marketplace
+orders, POS sales) with a fixed number of queries, however many lines it
+has, instead of a lock, inventory save, product sync and movement insert
+per line:
+
+1. lock_stock() locks the basket's products in one SELECT ... FOR UPDATE
+   ordered by id (so two baskets sharing products cannot deadlock), then
+   their inventories in a second ordered one.
+2. The whole basket is validated before anything is written: quantities
+   are summed per product, so a product listed twice is checked against
+   its stock once, and stock held by pending guest orders is not sold.
+3. reserve_stock() depletes the open batches of every inventory (FIFO)
+   from one locked window query, and builds one SALE StockMovement per
+   line in memory, with the same balances, revenue and allocations as
+   FarmInventory.remove_stock(). Tracked products without an inventory
+   get one, seeded like Product._get_or_create_inventory().
+   release_stock() does the same with RETURN movements, like
+   FarmInventory.add_stock(); products without an inventory are restored
+   directly, like Product._restore_stock_direct().
+4. Batches, inventories and products are written with one bulk_update
+   each, movements with one bulk_create, and linked Product rows are
+   synced in one UPDATE. The caches the per-row save() signals used to
+   refresh are refreshed once (bulk operations do not send signals).
+
+A line is a dict: {'product_id', 'quantity', 'unit_price' (optional,
+defaults to the product price), 'reference' (record the movement points
+to, optional), 'notes' (optional)}.
+"""
+
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Min, Q, Sum, Value, When, Window
+from django.utils import timezone
+
+from core.cache_utils import bump_cache_tags
+from sales_revenue.inventory_models import (
+    FarmInventory,
+    InventoryBatch,
+    StockMovement,
+    StockMovementType,
+    batch_allocation,
+)
+from sales_revenue.services.inventory_expiry import sync_marketplace_products
+
+logger = logging.getLogger(__name__)
+
+FIFO_ORDER = ['production_date', 'created_at', 'id']
+
+RESERVE_UPDATE_FIELDS = [
+    'quantity_available', 'total_sold', 'total_revenue', 'last_sale_date',
+    'batched_quantity', 'batched_date_weight', 'oldest_stock_date', 'average_age_days',
+    'total_value', 'is_low_stock', 'last_stock_update', 'updated_at',
+]
+RELEASE_UPDATE_FIELDS = [
+    'quantity_available', 'total_added', 'total_value', 'is_low_stock',
+    'last_stock_update', 'updated_at',
+]
+
+
+class InsufficientStock(ValueError):
+    """A basket line asks for more than its product has in stock."""
+
+    def __init__(self, product, available, requested):
+        self.product = product
+        self.available = available
+        self.requested = requested
+        super().__init__(
+            f"Insufficient stock for '{product.name}'. "
+            f"Available: {_display(available)}, Requested: {_display(requested)}."
+        )
+
+
+class StockLock:
+    """
+    A basket's products and their inventories, locked until the
+    transaction ends (see lock_stock).
+
+    Attributes:
+        products: {product_id: Product}
+        inventories: {product_id: FarmInventory} for linked products
+    """
+
+    def __init__(self, products, inventories):
+        self.products = products
+        self.inventories = inventories
+
+    def available(self, product_id):
+        """
+        Inventory quantity (or the product's own stock when unlinked),
+        less what pending guest orders hold (see services.stock_holds).
+        """
+        product = self.products[product_id]
+        inventory = self.inventories.get(product_id)
+        stock = inventory.quantity_available if inventory is not None else Decimal(product.stock_quantity)
+        return max(Decimal('0'), stock - product.held_quantity)
+
+    def check(self, lines, tracked_only=True):
+        """
+        Validate the whole basket against the locked stock.
+
+        Raises:
+            InsufficientStock: A product cannot cover its lines
+            ValueError: A line quantity is not positive
+        """
+        for product_id, quantity in _requested(lines).items():
+            product = self.products[product_id]
+            if tracked_only and not product.track_inventory:
+                continue
+            if quantity <= 0:
+                raise ValueError("Quantity must be positive")
+            available = self.available(product_id)
+            if quantity > available:
+                raise InsufficientStock(product, available, quantity)
+
+
+def lock_stock(product_ids):
+    """
+    Lock products and their inventories, each in one query ordered by id.
+
+    Must be called inside a transaction. Inventories are locked after
+    their products, the order the checkout has always taken them in.
+
+    Raises:
+        Product.DoesNotExist: A product no longer exists
+    """
+    from sales_revenue.marketplace_models import Product
+
+    product_ids = sorted(set(product_ids))
+    products = {
+        product.id: product
+        for product in Product.objects.select_for_update(of=('self',))
+        .select_related('category')
+        .filter(id__in=product_ids)
+        .order_by('id')
+    }
+    missing = set(product_ids) - set(products)
+    if missing:
+        raise Product.DoesNotExist(f"Products not found: {', '.join(sorted(map(str, missing)))}")
+
+    inventories = {}
+    for inventory in (
+        FarmInventory.objects.select_for_update()
+        .filter(marketplace_product_id__in=product_ids)
+        .order_by('id')
+    ):
+        inventory.marketplace_product = products[inventory.marketplace_product_id]
+        inventories[inventory.marketplace_product_id] = inventory
+    return StockLock(products, inventories)
+
+
+def reserve_stock(lines, recorded_by=None, tracked_only=True, locked=None):
+    """
+    Take a basket's stock: one SALE movement per line, batches FIFO.
+
+    Args:
+        lines: Basket lines (see module docstring)
+        recorded_by: User recorded on the movements (None for guests)
+        tracked_only: Skip products with track_inventory off (POS sales
+            deduct linked inventory regardless)
+        locked: StockLock already taken for these products
+
+    Returns:
+        The created StockMovements, in line order
+
+    Raises:
+        InsufficientStock: Nothing is written if any product falls short
+    """
+    lines = list(lines)
+    if not lines:
+        return []
+    now = timezone.now()
+    with transaction.atomic():
+        locked = locked or lock_stock(line['product_id'] for line in lines)
+        locked.check(lines, tracked_only=tracked_only)
+        lines = _tracked(lines, locked, tracked_only)
+        if not lines:
+            return []
+
+        new_inventories = _create_missing_inventories(lines, locked)
+        inventories = {
+            product_id: locked.inventories[product_id] for product_id in _requested(lines)
+        }
+        batches = _lock_fifo_batches(inventories.values(), _requested(lines))
+
+        movements = []
+        consumed = defaultdict(list)
+        for line in lines:
+            product = locked.products[line['product_id']]
+            inventory = inventories[product.id]
+            quantity = Decimal(str(line['quantity']))
+            unit_price = Decimal(str(line.get('unit_price') or product.price))
+            allocations = _take_from_batches(
+                inventory, batches[inventory.id], quantity, consumed[inventory.id]
+            )
+
+            inventory.quantity_available -= quantity
+            inventory.total_sold += quantity
+            inventory.total_revenue += quantity * unit_price
+            inventory.last_sale_date = now
+            movements.append(_movement(
+                inventory, StockMovementType.SALE, -quantity, unit_price, line,
+                notes=line.get('notes') or f"Sale of {product.name}",
+                allocations=allocations, recorded_by=recorded_by, now=now,
+            ))
+
+        touched = [batch for used in consumed.values() for batch in used]
+        if touched:
+            InventoryBatch.objects.bulk_update(
+                touched, ['current_quantity', 'is_depleted', 'depleted_at', 'updated_at']
+            )
+        _refresh_stock_dates(inventories.values(), consumed)
+        for inventory in inventories.values():
+            if inventory.quantity_available == 0:
+                inventory.oldest_stock_date = None
+                inventory.average_age_days = 0
+            _touch(inventory, now)
+
+        _write(inventories.values(), new_inventories, RESERVE_UPDATE_FIELDS, movements)
+        _after_bulk_writes(locked.products.values())
+
+    logger.info(
+        f"Reserved stock for {len(lines)} lines across {len(inventories)} inventories "
+        f"({len(new_inventories)} created)"
+    )
+    return movements
+
+
+def release_stock(lines, recorded_by=None, locked=None):
+    """
+    Give a basket's stock back: one RETURN movement per line.
+
+    Products without an inventory are restored directly on the product;
+    products with track_inventory off are skipped.
+
+    Returns:
+        The created StockMovements (lines restored on the product directly
+        have none)
+    """
+    from sales_revenue.marketplace_models import Product
+
+    lines = list(lines)
+    if not lines:
+        return []
+    now = timezone.now()
+    with transaction.atomic():
+        locked = locked or lock_stock(line['product_id'] for line in lines)
+        lines = _tracked(lines, locked, tracked_only=True)
+        for quantity in _requested(lines).values():
+            if quantity <= 0:
+                raise ValueError("Quantity must be positive")
+
+        movements = []
+        inventories = {}
+        direct = {}
+        for line in lines:
+            product = locked.products[line['product_id']]
+            quantity = Decimal(str(line['quantity']))
+            inventory = locked.inventories.get(product.id)
+            if inventory is None:
+                product.stock_quantity += int(quantity)
+                if product.status == 'out_of_stock' and product.stock_quantity > 0:
+                    product.status = 'active'
+                product.updated_at = now
+                direct[product.id] = product
+                continue
+
+            inventory.quantity_available += quantity
+            inventory.total_added += quantity
+            inventories[product.id] = inventory
+            movements.append(_movement(
+                inventory, StockMovementType.RETURN, quantity, inventory.unit_cost, line,
+                notes=line.get('notes') or f"Stock restored for {product.name}",
+                allocations=[], recorded_by=recorded_by, now=now,
+            ))
+
+        for inventory in inventories.values():
+            _touch(inventory, now)
+        _write(inventories.values(), [], RELEASE_UPDATE_FIELDS, movements)
+        if direct:
+            Product.objects.bulk_update(
+                list(direct.values()), ['stock_quantity', 'status', 'updated_at']
+            )
+        _after_bulk_writes(locked.products.values())
+
+    return movements
+
+
+def _requested(lines):
+    """{product_id: total quantity} over the lines."""
+    requested = defaultdict(Decimal)
+    for line in lines:
+        requested[line['product_id']] += Decimal(str(line['quantity']))
+    return requested
+
+
+def _tracked(lines, locked, tracked_only):
+    if not tracked_only:
+        return list(lines)
+    return [line for line in lines if locked.products[line['product_id']].track_inventory]
+
+
+def _display(quantity):
+    """Quantity without trailing zeros (100.00 -> 100, 2.50 -> 2.5)."""
+    quantity = Decimal(quantity)
+    return f"{quantity.normalize():f}" if quantity else '0'
+
+
+def _create_missing_inventories(lines, locked):
+    """Unsaved inventories for unlinked products, seeded from the product."""
+    created = []
+    for product_id in _requested(lines):
+        if product_id in locked.inventories:
+            continue
+        product = locked.products[product_id]
+        inventory = FarmInventory(
+            farm_id=product.farm_id,
+            marketplace_product=product,
+            category=product._determine_inventory_category(),
+            product_name=product.name,
+            sku=product.sku or '',
+            unit=product.unit,
+            quantity_available=Decimal(product.stock_quantity),
+            unit_cost=product.price,
+            low_stock_threshold=product.low_stock_threshold,
+        )
+        locked.inventories[product_id] = inventory
+        created.append(inventory)
+        logger.info(
+            f"Auto-created FarmInventory for Product {product.id} ({product.name}) "
+            f"on farm {product.farm_id} with initial stock {product.stock_quantity}"
+        )
+    return created
+
+
+def _lock_fifo_batches(inventories, requested):
+    """
+    {inventory_id: open batches the request reaches, oldest first}, locked.
+
+    deplete_batches() for every inventory at once: a running total per
+    inventory selects only the batches each requested quantity reaches.
+    """
+    wanted = {
+        inventory.id: requested[inventory.marketplace_product_id]
+        for inventory in inventories
+        if not inventory._state.adding and inventory.batched_quantity > 0
+    }
+    batches = defaultdict(list)
+    if not wanted:
+        return batches
+
+    today = timezone.now().date()
+    in_range = InventoryBatch.objects.filter(
+        inventory_id__in=list(wanted), is_depleted=False, is_expired=False
+    ).filter(Q(expiry_date__isnull=True) | Q(expiry_date__gte=today)).annotate(
+        preceding=Window(
+            Sum('current_quantity'),
+            partition_by=[F('inventory_id')],
+            order_by=[F(field).asc() for field in FIFO_ORDER],
+        ) - F('current_quantity'),
+        requested=Case(
+            *[When(inventory_id=inventory_id, then=Value(quantity))
+              for inventory_id, quantity in wanted.items()],
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+    ).filter(preceding__lt=F('requested')).values('id')
+
+    for batch in (
+        InventoryBatch.objects.select_for_update()
+        .filter(id__in=in_range)
+        .order_by('inventory_id', *FIFO_ORDER)
+    ):
+        batches[batch.inventory_id].append(batch)
+    return batches
+
+
+def _take_from_batches(inventory, batches, quantity, consumed):
+    """
+    Consume ``quantity`` from the front of ``batches`` (in place).
+
+    Updates the inventory's batch aggregates like deplete_batches() and
+    records consumed batches (in FIFO order) in ``consumed``.
+    """
+    if inventory.batched_quantity <= 0:
+        return []
+
+    now = timezone.now()
+    remaining = quantity
+    used = Decimal('0')
+    used_weight = Decimal('0')
+    allocations = []
+    while remaining > 0 and batches:
+        batch = batches[0]
+        taken = min(remaining, batch.current_quantity)
+        batch.current_quantity -= taken
+        batch.updated_at = now
+        if batch.current_quantity <= 0:
+            batch.is_depleted = True
+            batch.depleted_at = now
+            batches.pop(0)
+        remaining -= taken
+        used += taken
+        used_weight += taken * batch.production_date.toordinal()
+        allocations.append(batch_allocation(batch, taken))
+        if batch not in consumed:
+            consumed.append(batch)
+
+    if remaining > 0:
+        allocations.append({
+            'batch_id': None,
+            'batch_number': None,
+            'quantity': str(remaining),
+            'production_date': None,
+        })
+
+    inventory.batched_quantity = max(Decimal('0'), inventory.batched_quantity - used)
+    inventory.batched_date_weight = max(Decimal('0'), inventory.batched_date_weight - used_weight)
+    return allocations
+
+
+def _refresh_stock_dates(inventories, consumed):
+    """
+    oldest_stock_date and average_age_days after depletion, like
+    FarmInventory._update_oldest_stock_date(); inventories whose consumed
+    batches were all used up read their oldest open batch in one grouped
+    query.
+    """
+    reread = []
+    for inventory in inventories:
+        used = consumed.get(inventory.id)
+        if used and not (inventory.oldest_stock_date and inventory.oldest_stock_date < used[0].production_date):
+            partial = next((batch for batch in used if batch.current_quantity > 0), None)
+            if partial:
+                inventory.oldest_stock_date = partial.production_date
+            else:
+                reread.append(inventory)
+        if inventory.batched_quantity > 0 or used:
+            inventory._refresh_average_age()
+
+    if reread:
+        oldest = dict(
+            InventoryBatch.objects.filter(
+                inventory_id__in=[inventory.id for inventory in reread], is_depleted=False
+            ).values('inventory_id').annotate(oldest=Min('production_date'))
+            .values_list('inventory_id', 'oldest')
+        )
+        for inventory in reread:
+            inventory.oldest_stock_date = oldest.get(inventory.id)
+
+
+def _movement(inventory, movement_type, quantity, unit_cost, line, notes, allocations, recorded_by, now):
+    reference = line.get('reference')
+    return StockMovement(
+        inventory=inventory,
+        farm_id=inventory.farm_id,
+        movement_type=movement_type,
+        quantity=quantity,
+        unit_cost=unit_cost,
+        balance_after=inventory.quantity_available,
+        source_type=inventory._get_source_type(reference),
+        source_id=str(reference.pk) if reference else None,
+        batch_allocations=allocations,
+        notes=notes,
+        recorded_by=recorded_by,
+        stock_date=now.date(),
+    )
+
+
+def _touch(inventory, now):
+    """What FarmInventory.save() derives on every write."""
+    inventory.total_value = inventory.quantity_available * inventory.unit_cost
+    inventory.is_low_stock = inventory.quantity_available <= inventory.low_stock_threshold
+    inventory.last_stock_update = now
+    inventory.updated_at = now
+
+
+def _write(inventories, new_inventories, fields, movements):
+    inventories = list(inventories)
+    existing = [inventory for inventory in inventories if not inventory._state.adding]
+    if new_inventories:
+        FarmInventory.objects.bulk_create(new_inventories)
+    if existing:
+        FarmInventory.objects.bulk_update(existing, fields)
+    if movements:
+        StockMovement.objects.bulk_create(movements)
+    if new_inventories or existing:
+        sync_marketplace_products([inventory.id for inventory in inventories])
+
+
+def _after_bulk_writes(products):
+    """Refresh what the skipped save() signals would have refreshed."""
+    from dashboards.services.farmer_analytics import farm_analytics_cache_tag
+    from sales_revenue.public_marketplace_views import PUBLIC_MARKETPLACE_CACHE_TAG
+
+    farm_ids = {product.farm_id for product in products}
+    tags = [farm_analytics_cache_tag(farm_id) for farm_id in sorted(farm_ids, key=str)]
+    tags.append(PUBLIC_MARKETPLACE_CACHE_TAG)
+    transaction.on_commit(lambda: bump_cache_tags(*tags))
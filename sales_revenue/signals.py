@@ -0,0 +1,124 @@
+"""
+Sales & Revenue Signals
+
+Automatic actions triggered by marketplace model events.
+
+SEARCH INDEX SIGNALS:
+1. Product saved → refresh its full-text search vector
+2. Farm saved (name/constituency changed) → refresh farm vector and all of
+   the farm's product vectors (farm name is part of the product vector)
+
+Saves that leave every search field unchanged skip the refresh: stock or
+status saves (update_fields without any search field) stay a single
+UPDATE, and full saves compare the indexed fields with the stored row.
+The refresh runs in a savepoint so an indexing error cannot abort the
+caller's transaction.
+
+PUBLIC CACHE SIGNALS:
+3. Product, ProductCategory, Subscription, Farm or FarmLocation saved or
+   deleted → bump the public marketplace cache tag (after commit) so the
+   cached home page and location facets are recomputed once
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.cache_utils import bump_cache_tags
+
+from .marketplace_search import (
+    FARM_SEARCH_FIELDS,
+    PRODUCT_SEARCH_FIELDS,
+    update_farm_search_vector,
+    update_product_search_vectors,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _search_fields_changed(sender, instance, update_fields, search_fields):
+    """True when a save changes any of the indexed fields."""
+    if instance._state.adding or instance.pk is None:
+        return True
+    if update_fields is not None:
+        search_fields = search_fields & set(update_fields)
+        if not search_fields:
+            return False
+    columns = [sender._meta.get_field(name).attname for name in search_fields]
+    stored = sender._default_manager.filter(pk=instance.pk).values(*columns).first()
+    if stored is None:
+        return True
+    return any(stored[column] != getattr(instance, column) for column in columns)
+
+
+@receiver(pre_save, sender='sales_revenue.Product')
+def detect_product_search_change(sender, instance, update_fields=None, **kwargs):
+    instance._search_vector_stale = _search_fields_changed(
+        sender, instance, update_fields, PRODUCT_SEARCH_FIELDS
+    )
+
+
+@receiver(pre_save, sender='farms.Farm')
+def detect_farm_search_change(sender, instance, update_fields=None, **kwargs):
+    instance._search_vector_stale = _search_fields_changed(
+        sender, instance, update_fields, FARM_SEARCH_FIELDS
+    )
+
+
+@receiver(post_save, sender='sales_revenue.Product')
+def refresh_product_search_vector(sender, instance, created, **kwargs):
+    """Keep Product.search_vector in sync with name/description/tags."""
+    if not instance.__dict__.pop('_search_vector_stale', True):
+        return
+    try:
+        with transaction.atomic():
+            update_product_search_vectors(instance.farm, product_ids=[instance.pk])
+    except Exception as e:
+        # Search indexing must never block a product save
+        logger.error(f"Failed to refresh search vector for Product {instance.pk}: {str(e)}")
+
+
+@receiver(post_save, sender='farms.Farm')
+def refresh_farm_search_vectors(sender, instance, created, **kwargs):
+    """Keep Farm.search_vector (and its products' vectors) in sync with the farm name."""
+    if not instance.__dict__.pop('_search_vector_stale', True):
+        return
+    try:
+        with transaction.atomic():
+            update_farm_search_vector(instance)
+            if not created:
+                update_product_search_vectors(instance)
+    except Exception as e:
+        logger.error(f"Failed to refresh search vectors for Farm {instance.pk}: {str(e)}")
+
+
+# =============================================================================
+# PUBLIC MARKETPLACE CACHE INVALIDATION
+# =============================================================================
+
+PUBLIC_MARKETPLACE_CACHE_SENDERS = (
+    'sales_revenue.Product',
+    'sales_revenue.ProductCategory',
+    'subscriptions.Subscription',
+    'farms.Farm',
+    'farms.FarmLocation',
+)
+
+
+def invalidate_public_marketplace_cache(sender, **kwargs):
+    """Mark cached public marketplace responses stale once the write commits."""
+    from .public_marketplace_views import PUBLIC_MARKETPLACE_CACHE_TAG
+    transaction.on_commit(lambda: bump_cache_tags(PUBLIC_MARKETPLACE_CACHE_TAG))
+
+
+for _sender in PUBLIC_MARKETPLACE_CACHE_SENDERS:
+    post_save.connect(
+        invalidate_public_marketplace_cache, sender=_sender,
+        dispatch_uid=f'public_marketplace_cache_save:{_sender}'
+    )
+    post_delete.connect(
+        invalidate_public_marketplace_cache, sender=_sender,
+        dispatch_uid=f'public_marketplace_cache_delete:{_sender}'
+    )
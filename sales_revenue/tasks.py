@@ -327,6 +327,19 @@ def generate_seller_payout_report(period: str = 'weekly'):
     Args:
         period: 'daily', 'weekly', or 'monthly'
     """
+    from core.locks import DistributedLock, LockNotAcquired
+    
+    # Overlapping runs (beat + manual trigger) would aggregate twice
+    try:
+        with DistributedLock(f"seller_payout_report:{period}", ttl_seconds=60,
+                             wait=False, auto_renew=True):
+            return _generate_seller_payout_report(period)
+    except LockNotAcquired:
+        logger.info(f"Seller payout report ({period}) already being generated, skipping")
+        return {'skipped': True, 'period': period}
+
+
+def _generate_seller_payout_report(period):
     from sales_revenue.models import Order
     from farms.models import Farm
     from django.db.models import Sum, Count
@@ -372,3 +385,102 @@ def generate_seller_payout_report(period: str = 'weekly'):
     
     logger.info(f"Seller payout report generated: {len(report['sellers'])} sellers")
     return {'sellers_count': len(report['sellers']), 'period': period}
+
+
+# =============================================================================
+# FRAUD DETECTION
+# =============================================================================
+
+FRAUD_CHUNK_SIZE = 500
+FRAUD_SWEEP_LAST_RUN_KEY = 'fraud_detection:last_sweep'
+
+
+@shared_task
+def run_fraud_detection(days: int = 30, incremental: bool = False, chunk_size: int = FRAUD_CHUNK_SIZE):
+    """
+    Fraud sweep over all farms, fanned out to workers in chunks.
+    
+    Scheduled via Celery Beat to run nightly. With ``incremental=True``
+    only farms whose production, sales, mortality or flock records changed
+    since the previous sweep are re-analyzed.
+    """
+    from celery import group
+    from django.core.cache import cache
+    from farms.models import Farm
+    from sales_revenue.services.fraud_detection_service import farms_with_activity_since
+    
+    started_at = timezone.now()
+    last_sweep = cache.get(FRAUD_SWEEP_LAST_RUN_KEY)
+    
+    farm_ids = Farm.objects.order_by('id').values_list('id', flat=True)
+    if incremental and last_sweep:
+        farm_ids = farm_ids.filter(id__in=farms_with_activity_since(last_sweep))
+    farm_ids = [str(farm_id) for farm_id in farm_ids]
+    
+    chunks = [farm_ids[i:i + chunk_size] for i in range(0, len(farm_ids), chunk_size)]
+    if chunks:
+        group(analyze_fraud_chunk.s(chunk, days) for chunk in chunks).apply_async()
+    cache.set(FRAUD_SWEEP_LAST_RUN_KEY, started_at, None)
+    
+    logger.info(
+        f"Fraud sweep dispatched: {len(farm_ids)} farms in {len(chunks)} chunks "
+        f"({'incremental' if incremental and last_sweep else 'full'})"
+    )
+    return {'farms': len(farm_ids), 'chunks': len(chunks), 'incremental': bool(incremental and last_sweep)}
+
+
+@shared_task
+def analyze_fraud_chunk(farm_ids: list, days: int = 30):
+    """Analyze one chunk of farms and bulk-insert their fraud alerts."""
+    from sales_revenue.services.fraud_detection_service import analyze_farms
+    
+    alerts = analyze_farms(farm_ids, days=days)
+    return {'farms': len(farm_ids), 'alerts': len(alerts)}
+
+
+# =============================================================================
+# INVENTORY EXPIRY
+# =============================================================================
+
+@shared_task
+def sweep_expired_inventory():
+    """
+    Write off inventory batches past their expiry date.
+    
+    Scheduled via Celery Beat to run daily. Marks expired batches, moves
+    their quantity out of available stock with SPOILAGE movements, syncs
+    linked marketplace products and caches a per-farm summary for the
+    distress service (see sales_revenue.services.inventory_expiry).
+    """
+    from sales_revenue.services.inventory_expiry import sweep_expired_inventory as sweep
+    
+    result = sweep()
+    logger.info(
+        f"Expiry sweep: {result['batches']} batches ({result['quantity']} units) written off "
+        f"across {result['inventories']} inventories, {result['products']} products synced"
+    )
+    return {
+        'batches': result['batches'],
+        'inventories': result['inventories'],
+        'products': result['products'],
+        'quantity': str(result['quantity']),
+        'farms': len(result['farms']),
+    }
+
+
+# =============================================================================
+# GUEST ORDER STOCK HOLDS
+# =============================================================================
+
+@shared_task
+def release_expired_stock_holds():
+    """
+    Release guest order stock holds past their expiry.
+    
+    Scheduled via Celery Beat to run every 5 minutes. Held quantities go
+    back on sale and the unconfirmed orders are marked expired (see
+    sales_revenue.services.stock_holds).
+    """
+    from sales_revenue.services.stock_holds import sweep_expired_holds
+    
+    return sweep_expired_holds()
@@ -10,6 +10,9 @@ Usage:
 Or:
     python scripts/generate_realistic_farm_data.py
 
+From code (e.g. test fixtures), for any farmer with a farm:
+    generate_farm_data(user=farmer, days=30, seed=42, verbose=False)
+
 Author: AI Assistant
 Date: January 2026
 """
@@ -126,41 +129,61 @@ def generate_mortality_count(bird_count, week_number, is_summer=False):
 # MAIN DATA GENERATION
 # =============================================================================
 
+def _quiet(*args, **kwargs):
+    pass
+
+
 @transaction.atomic
-def generate_farm_data():
-    """Generate comprehensive realistic farm data."""
+def generate_farm_data(user=None, days=DATA_PERIOD_DAYS, clear=CLEAR_EXISTING_DATA, seed=None, verbose=True):
+    """
+    Generate comprehensive realistic farm data.
+    
+    Args:
+        user: Farmer to generate data for (defaults to FARMER_EMAIL)
+        days: Days of production, mortality and order history
+        clear: Delete the farm's existing flocks, feed, products and orders first
+        seed: Seed for the random generator, for a reproducible dataset
+        verbose: Print progress and a summary
+    
+    Returns:
+        dict of rows created per kind, or None if the farmer or farm is missing
+    """
+    log = print if verbose else _quiet
+    if seed is not None:
+        random.seed(seed)
     
     User = get_user_model()
     
     # Get the farmer
-    try:
-        user = User.objects.get(email=FARMER_EMAIL)
-        print(f"✓ Found user: {user.first_name} {user.last_name}")
-    except User.DoesNotExist:
-        print(f"✗ User {FARMER_EMAIL} not found!")
-        return
+    if user is None:
+        try:
+            user = User.objects.get(email=FARMER_EMAIL)
+        except User.DoesNotExist:
+            log(f"✗ User {FARMER_EMAIL} not found!")
+            return None
+    log(f"✓ Found user: {user.first_name} {user.last_name}")
     
     # Get or create farm
     farm = Farm.objects.filter(user=user).first()
     if not farm:
-        print("✗ No farm found for user!")
-        return
+        log("✗ No farm found for user!")
+        return None
     
-    print(f"✓ Found farm: {farm.farm_name}")
+    log(f"✓ Found farm: {farm.farm_name}")
     
     # Update farm settings for marketplace
     farm.marketplace_enabled = True
     farm.subscription_type = 'standard'
     farm.total_bird_capacity = 2500
     farm.save()
-    print("✓ Updated farm settings (marketplace enabled)")
+    log("✓ Updated farm settings (marketplace enabled)")
     
     # ==========================================================================
     # CLEAR EXISTING DATA (if configured)
     # ==========================================================================
     
-    if CLEAR_EXISTING_DATA:
-        print("\n--- Clearing existing data ---")
+    if clear:
+        log("\n--- Clearing existing data ---")
         
         # Import processing models for cleanup
         from sales_revenue.processing_models import ProcessingBatch, ProcessingOutput
@@ -168,7 +191,7 @@ def generate_farm_data():
         # Clear processing data first (protected foreign keys)
         ProcessingOutput.objects.filter(processing_batch__farm=farm).delete()
         ProcessingBatch.objects.filter(farm=farm).delete()
-        print("  - Cleared processing batches")
+        log("  - Cleared processing batches")
         
         DailyProduction.objects.filter(flock__farm=farm).delete()
         MortalityRecord.objects.filter(flock__farm=farm).delete()
@@ -179,13 +202,13 @@ def generate_farm_data():
         MarketplaceOrder.objects.filter(farm=farm).delete()
         Product.objects.filter(farm=farm).delete()
         Customer.objects.filter(farm=farm).delete()
-        print("✓ Cleared existing data")
+        log("✓ Cleared existing data")
     
     # ==========================================================================
     # CREATE FLOCKS
     # ==========================================================================
     
-    print("\n--- Creating Flocks ---")
+    log("\n--- Creating Flocks ---")
     
     today = date.today()
     
@@ -208,7 +231,7 @@ def generate_farm_data():
         production_start_date=flock1_arrival + timedelta(weeks=18),
         is_currently_producing=True,
     )
-    print(f"  ✓ Created {flock1.flock_number}: {flock1.breed}, {flock1.initial_count} birds")
+    log(f"  ✓ Created {flock1.flock_number}: {flock1.breed}, {flock1.initial_count} birds")
     
     # Flock 2: Second batch - 45 weeks old, declining production  
     flock2_arrival = today - timedelta(weeks=45)
@@ -229,7 +252,7 @@ def generate_farm_data():
         production_start_date=flock2_arrival + timedelta(weeks=3),
         is_currently_producing=True,
     )
-    print(f"  ✓ Created {flock2.flock_number}: {flock2.breed}, {flock2.initial_count} birds")
+    log(f"  ✓ Created {flock2.flock_number}: {flock2.breed}, {flock2.initial_count} birds")
     
     # Flock 3: Young pullets - 12 weeks old, not yet laying
     flock3_arrival = today - timedelta(weeks=12)
@@ -250,7 +273,7 @@ def generate_farm_data():
         production_start_date=None,
         is_currently_producing=False,
     )
-    print(f"  ✓ Created {flock3.flock_number}: {flock3.breed} (pullets), {flock3.initial_count} birds")
+    log(f"  ✓ Created {flock3.flock_number}: {flock3.breed} (pullets), {flock3.initial_count} birds")
     
     flocks = [flock1, flock2, flock3]
     
@@ -258,7 +281,7 @@ def generate_farm_data():
     # CREATE DAILY PRODUCTION DATA
     # ==========================================================================
     
-    print("\n--- Creating Production Data ---")
+    log("\n--- Creating Production Data ---")
     
     production_records = []
     mortality_records = []
@@ -270,7 +293,7 @@ def generate_farm_data():
         flock3.id: flock3.current_count,
     }
     
-    for day_offset in range(DATA_PERIOD_DAYS, -1, -1):
+    for day_offset in range(days, -1, -1):
         current_date = today - timedelta(days=day_offset)
         is_summer = current_date.month in [2, 3, 4]  # Ghana dry season = heat stress
         
@@ -344,14 +367,14 @@ def generate_farm_data():
     # Bulk create
     DailyProduction.objects.bulk_create(production_records)
     MortalityRecord.objects.bulk_create(mortality_records)
-    print(f"  ✓ Created {len(production_records)} production records")
-    print(f"  ✓ Created {len(mortality_records)} mortality records")
+    log(f"  ✓ Created {len(production_records)} production records")
+    log(f"  ✓ Created {len(mortality_records)} mortality records")
     
     # ==========================================================================
     # CREATE FEED DATA
     # ==========================================================================
     
-    print("\n--- Creating Feed Data ---")
+    log("\n--- Creating Feed Data ---")
     
     # Get or create feed types
     layer_feed, _ = FeedType.objects.get_or_create(
@@ -441,14 +464,14 @@ def generate_farm_data():
         total_value=Decimal('760.00'),  # 200 * 3.80
     )
     
-    print(f"  ✓ Created 6 feed purchases")
-    print(f"  ✓ Created 2 feed inventory records")
+    log(f"  ✓ Created 6 feed purchases")
+    log(f"  ✓ Created 2 feed inventory records")
     
     # ==========================================================================
     # CREATE CUSTOMERS
     # ==========================================================================
     
-    print("\n--- Creating Customers ---")
+    log("\n--- Creating Customers ---")
     
     customers = []
     momo_providers = ['mtn', 'vodafone', 'airteltigo']
@@ -472,13 +495,13 @@ def generate_farm_data():
         )
         customers.append(customer)
     
-    print(f"  ✓ Created {len(customers)} customers")
+    log(f"  ✓ Created {len(customers)} customers")
     
     # ==========================================================================
     # CREATE PRODUCTS
     # ==========================================================================
     
-    print("\n--- Creating Products ---")
+    log("\n--- Creating Products ---")
     
     # Get or create product categories
     eggs_cat, _ = ProductCategory.objects.get_or_create(
@@ -546,19 +569,19 @@ def generate_farm_data():
         price_negotiable=True,
     ))
     
-    print(f"  ✓ Created {len(products)} products")
+    log(f"  ✓ Created {len(products)} products")
     
     # ==========================================================================
     # CREATE ORDERS
     # ==========================================================================
     
-    print("\n--- Creating Orders ---")
+    log("\n--- Creating Orders ---")
     
     orders_created = 0
     order_statuses = ['pending', 'confirmed', 'processing', 'ready', 'delivered', 'completed']
     
     # Generate orders over the past 90 days
-    for day_offset in range(DATA_PERIOD_DAYS, 0, -1):
+    for day_offset in range(days, 0, -1):
         order_date = today - timedelta(days=day_offset)
         
         # 1-4 orders per day
@@ -622,21 +645,21 @@ def generate_farm_data():
             order.save()
             orders_created += 1
     
-    print(f"  ✓ Created {orders_created} orders")
+    log(f"  ✓ Created {orders_created} orders")
     
     # ==========================================================================
     # SUMMARY
     # ==========================================================================
     
-    print("\n" + "=" * 60)
-    print("DATA GENERATION COMPLETE")
-    print("=" * 60)
+    log("\n" + "=" * 60)
+    log("DATA GENERATION COMPLETE")
+    log("=" * 60)
     
     total_eggs = sum(p.eggs_collected for p in production_records)
     total_deaths = sum(m.number_of_birds for m in mortality_records)
     total_birds = sum(f.current_count for f in flocks)
     
-    print(f"""
+    log(f"""
 Farm: {farm.farm_name}
 Owner: {user.first_name} {user.last_name}
 
@@ -646,9 +669,9 @@ FLOCK SUMMARY:
   - Producing flocks: 2 (Layers)
   - Pullets (future layers): 1
 
-PRODUCTION (Last {DATA_PERIOD_DAYS} days):
+PRODUCTION (Last {days} days):
   - Total eggs: {total_eggs:,}
-  - Daily average: {total_eggs // DATA_PERIOD_DAYS:,} eggs
+  - Daily average: {total_eggs // days:,} eggs
   - Production records: {len(production_records)}
 
 MORTALITY:
@@ -664,6 +687,15 @@ MARKETPLACE:
   - Customers: {len(customers)}
   - Orders: {orders_created}
 """)
+    
+    return {
+        'flocks': len(flocks),
+        'daily_production': len(production_records),
+        'mortality_records': len(mortality_records),
+        'customers': len(customers),
+        'products': len(products),
+        'orders': orders_created,
+    }
 
 
 if __name__ == '__main__':
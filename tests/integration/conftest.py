@@ -0,0 +1,83 @@
+"""
+Shared fixtures for the integration tests.
+"""
+
+import itertools
+from decimal import Decimal
+
+import pytest
+
+# Unique phone, Ghana card and TIN numbers for every farm created in a run
+_farm_numbers = itertools.count(1)
+
+
+@pytest.fixture
+def farm_factory(django_user_model):
+    """
+    Create a farmer user and an approved Farm.
+
+    Usage:
+        farm = farm_factory('fifo')
+        farm = farm_factory('map_1', location=Point(-0.19, 5.6, srid=4326), current_bird_count=800)
+
+    ``name`` makes the username, email and farm name; keyword arguments
+    override Farm fields. With ``location`` the farm also gets a primary
+    FarmLocation at that point (``location_fields`` override its fields).
+    """
+    from farms.models import Farm, FarmLocation
+
+    def _make(name, location=None, location_fields=None, **fields):
+        number = next(_farm_numbers)
+        phone = f'+23350{9000000 + number}'
+        user = django_user_model.objects.create_user(
+            username=f'{name}_farmer',
+            phone=phone,
+            password='testpass123',
+            role='FARMER',
+            email=f'{name}_farmer@test.com'
+        )
+        farm = Farm.objects.create(**{
+            'user': user,
+            'first_name': name.replace('_', ' ').title(),
+            'last_name': 'Farmer',
+            'primary_phone': phone,
+            'date_of_birth': '1990-01-01',
+            'ghana_card_number': f'GHA-{700000000 + number}-{number % 10}',
+            'residential_address': 'Test Address',
+            'primary_constituency': 'Ayawaso Central',
+            'nok_full_name': 'Test NOK',
+            'nok_relationship': 'Spouse',
+            'nok_phone': '+233501234999',
+            'years_in_poultry': 5,
+            'farm_name': f"{name.replace('_', ' ').title()} Test Farm",
+            'tin': f'C00{70000000 + number}',
+            'number_of_poultry_houses': 2,
+            'total_bird_capacity': 5000,
+            'total_infrastructure_value_ghs': Decimal('25000.00'),
+            'planned_production_start_date': '2025-01-01',
+            'initial_investment_amount': Decimal('50000.00'),
+            'funding_source': ['Personal Savings'],
+            'monthly_operating_budget': Decimal('5000.00'),
+            'expected_monthly_revenue': Decimal('8000.00'),
+            'farm_status': 'Active',
+            'application_status': 'Approved',
+            **fields,
+        })
+        if location is not None:
+            FarmLocation.objects.create(**{
+                'farm': farm,
+                'gps_address_string': f'GA-{number:04d}-0000',
+                'location': location,
+                'region': 'Greater Accra',
+                'district': 'Accra Metropolitan',
+                'constituency': 'Ayawaso Central',
+                'community': 'Community 1',
+                'road_accessibility': 'All Year',
+                'land_size_acres': Decimal('2.00'),
+                'land_ownership_status': 'Owned',
+                'is_primary_location': True,
+                **(location_fields or {}),
+            })
+        return farm
+
+    return _make
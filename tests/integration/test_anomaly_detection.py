@@ -0,0 +1,225 @@
+"""
+Tests for streaming anomaly detection on daily mortality and production.
+"""
+
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def farm(farm_factory):
+    """Create a layer farm for testing."""
+    return farm_factory(
+        'anomaly', current_bird_count=2000,
+        primary_production_type='Layers', layer_breed='Isa Brown',
+    )
+
+
+@pytest.fixture
+def flock(farm):
+    """Create an active layer flock."""
+    from flock_management.models import Flock
+    
+    return Flock.objects.create(
+        farm=farm,
+        flock_number='FLOCK-ANOM-001',
+        flock_type='Layers',
+        breed='Isa Brown',
+        source='Purchased',
+        arrival_date=date.today() - timedelta(days=120),
+        initial_count=2000,
+        current_count=2000,
+        age_at_arrival_weeks=Decimal('0'),
+        is_currently_producing=True,
+    )
+
+
+@pytest.fixture
+def mortality_history(farm, flock):
+    """Fourteen quiet days (0-1 deaths) followed by a 25-bird spike today."""
+    from flock_management.models import DailyProduction
+    
+    today = date.today()
+    for i in range(14, 0, -1):
+        DailyProduction.objects.create(
+            farm=farm,
+            flock=flock,
+            production_date=today - timedelta(days=i),
+            eggs_collected=1500,
+            good_eggs=1500,
+            birds_died=i % 2,
+        )
+    DailyProduction.objects.create(
+        farm=farm,
+        flock=flock,
+        production_date=today,
+        eggs_collected=1500,
+        good_eggs=1500,
+        birds_died=25,
+    )
+    return flock
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+class TestRollingStatistics:
+    """Test the EWMA update and scoring rules."""
+    
+    def test_ewma_converges_to_constant_series(self):
+        from flock_management.anomaly_detection import ewma_update
+        
+        mean = variance = 0.0
+        for _ in range(200):
+            mean, variance = ewma_update(mean, variance, 4.0)
+        
+        assert mean == pytest.approx(4.0)
+        assert variance == pytest.approx(0.0, abs=1e-6)
+    
+    def test_no_alerts_during_warmup(self):
+        from flock_management.anomaly_detection import METRIC_MORTALITY, score
+        from flock_management.models import FlockMetricStats
+        
+        stats = FlockMetricStats(metric=METRIC_MORTALITY, observations=3)
+        
+        assert score(stats, METRIC_MORTALITY, 50)[2] is None
+    
+    def test_production_rise_is_not_an_anomaly(self):
+        from flock_management.anomaly_detection import METRIC_EGG_PRODUCTION, score
+        from flock_management.models import FlockMetricStats
+        
+        stats = FlockMetricStats(metric=METRIC_EGG_PRODUCTION, mean=60, variance=4, observations=30)
+        
+        assert score(stats, METRIC_EGG_PRODUCTION, 95)[2] is None
+        assert score(stats, METRIC_EGG_PRODUCTION, 20)[2] == 'critical'
+
+
+class TestStreamingDetection:
+    """Test alerts raised as records arrive."""
+    
+    def test_mortality_spike_raises_alert(self, mortality_history):
+        from flock_management.anomaly_detection import METRIC_MORTALITY, observe
+        from flock_management.models import AnomalyAlert, DailyProduction, FlockMetricStats
+        
+        # Replay the committed records through the streaming path
+        records = DailyProduction.objects.filter(flock=mortality_history).order_by('production_date')
+        for record in records:
+            observe(record.farm_id, record.flock_id, METRIC_MORTALITY,
+                    record.production_date, record.birds_died)
+        
+        alert = AnomalyAlert.objects.get(flock=mortality_history, metric=METRIC_MORTALITY)
+        assert alert.observed_on == date.today()
+        assert alert.severity == 'critical'
+        assert alert.value == 25
+        
+        stats = FlockMetricStats.objects.get(flock=mortality_history, metric=METRIC_MORTALITY)
+        assert stats.observations == 15
+        assert stats.last_date == date.today()
+    
+    def test_back_dated_record_is_scored_but_not_folded(self, mortality_history):
+        from flock_management.anomaly_detection import METRIC_MORTALITY, observe, rebuild_flock_stats
+        from flock_management.models import FlockMetricStats
+        
+        rebuild_flock_stats(mortality_history)
+        before = FlockMetricStats.objects.get(flock=mortality_history, metric=METRIC_MORTALITY)
+        
+        observe(mortality_history.farm_id, mortality_history.id, METRIC_MORTALITY,
+                date.today() - timedelta(days=30), 1)
+        
+        after = FlockMetricStats.objects.get(flock=mortality_history, metric=METRIC_MORTALITY)
+        assert after.observations == before.observations
+        assert after.mean == before.mean
+    
+    def test_rebuild_matches_streaming(self, mortality_history):
+        from flock_management.anomaly_detection import METRIC_MORTALITY, rebuild_flock_stats
+        from flock_management.models import AnomalyAlert
+        
+        assert rebuild_flock_stats(mortality_history) == 1
+        assert AnomalyAlert.objects.get(
+            flock=mortality_history, metric=METRIC_MORTALITY
+        ).observed_on == date.today()
+
+
+class TestAnalyticsReadAlerts:
+    """Dashboards read precomputed alerts."""
+    
+    def test_farmer_health_analytics_reports_spike(self, mortality_history):
+        from dashboards.services.farmer_analytics import FarmerAnalyticsService
+        from flock_management.anomaly_detection import rebuild_flock_stats
+        
+        rebuild_flock_stats(mortality_history)
+        service = FarmerAnalyticsService(mortality_history.farm.user)
+        
+        health = service.get_flock_health_analytics(days=30)
+        
+        spike = next(a for a in health['alerts'] if a['type'] == 'mortality_spike')
+        assert spike['severity'] == 'critical'
+        assert spike['occurrences'][0]['date'] == date.today()
+
+
+class TestCorrections:
+    """Edited records replace their day's alert and statistics."""
+    
+    def test_corrected_spike_clears_alert_and_statistics(
+        self, mortality_history, django_capture_on_commit_callbacks
+    ):
+        from flock_management.anomaly_detection import METRIC_MORTALITY, rebuild_flock_stats
+        from flock_management.models import AnomalyAlert, DailyProduction, FlockMetricStats
+        
+        rebuild_flock_stats(mortality_history)
+        spiked = FlockMetricStats.objects.get(flock=mortality_history, metric=METRIC_MORTALITY)
+        
+        record = DailyProduction.objects.get(flock=mortality_history, production_date=date.today())
+        record.birds_died = 1
+        with django_capture_on_commit_callbacks(execute=True):
+            record.save()
+        
+        assert not AnomalyAlert.objects.filter(flock=mortality_history, metric=METRIC_MORTALITY).exists()
+        stats = FlockMetricStats.objects.get(flock=mortality_history, metric=METRIC_MORTALITY)
+        assert stats.observations == spiked.observations
+        assert stats.last_value == 1
+        assert stats.mean < spiked.mean
+    
+    def test_correction_of_unfolded_day_replaces_alert(self, mortality_history):
+        from flock_management.anomaly_detection import (
+            METRIC_MORTALITY, observe, observe_daily_production,
+        )
+        from flock_management.models import AnomalyAlert, DailyProduction, FlockMetricStats
+        
+        records = DailyProduction.objects.filter(flock=mortality_history).order_by('production_date')
+        *history, today = records
+        for record in history:
+            observe(record.farm_id, record.flock_id, METRIC_MORTALITY,
+                    record.production_date, record.birds_died)
+        # A reported incident flags the day before its DailyProduction is folded
+        observe(today.farm_id, today.flock_id, METRIC_MORTALITY, today.production_date, 25, fold=False)
+        assert AnomalyAlert.objects.filter(flock=mortality_history, metric=METRIC_MORTALITY).exists()
+        
+        today.birds_died = 1
+        observe_daily_production(today, corrected=True)
+        
+        assert not AnomalyAlert.objects.filter(flock=mortality_history, metric=METRIC_MORTALITY).exists()
+        stats = FlockMetricStats.objects.get(flock=mortality_history, metric=METRIC_MORTALITY)
+        assert stats.last_date == date.today()
+        assert stats.last_value == 1
+    
+    def test_rebuild_keeps_status_of_rederived_alert(self, mortality_history):
+        from flock_management.anomaly_detection import METRIC_MORTALITY, rebuild_flock_stats
+        from flock_management.models import AnomalyAlert
+        
+        rebuild_flock_stats(mortality_history)
+        AnomalyAlert.objects.filter(flock=mortality_history).update(status='acknowledged')
+        
+        rebuild_flock_stats(mortality_history)
+        
+        assert AnomalyAlert.objects.get(
+            flock=mortality_history, metric=METRIC_MORTALITY
+        ).status == 'acknowledged'
@@ -0,0 +1,188 @@
+"""
+Tests for the distributed lock primitive (core.locks), on the local cache
+fallback used in tests and development and on the Redis backend used in
+production (skipped when no Redis server answers at settings.REDIS_URL).
+
+Run with: pytest tests/integration/test_distributed_lock.py -v
+"""
+
+import threading
+import time
+import uuid
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+
+from core import locks
+from core.locks import DistributedLock, LockNotAcquired
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class TestDistributedLock:
+    """Only the holder runs, and only the holder can release."""
+
+    def test_held_lock_refuses_without_waiting(self):
+        with DistributedLock('test:held'):
+            with pytest.raises(LockNotAcquired):
+                DistributedLock('test:held', wait=False).acquire()
+
+        with DistributedLock('test:held', wait=False) as lock:
+            assert lock.acquired
+
+    def test_waiter_is_woken_by_release(self):
+        holder = DistributedLock('test:wake')
+        holder.acquire()
+        acquired_at = []
+
+        def wait_for_lock():
+            with DistributedLock('test:wake', max_wait=5):
+                acquired_at.append(time.monotonic())
+
+        waiter = threading.Thread(target=wait_for_lock)
+        waiter.start()
+        time.sleep(0.2)
+        released_at = time.monotonic()
+        holder.release()
+        waiter.join(timeout=5)
+
+        assert len(acquired_at) == 1
+        assert acquired_at[0] - released_at < 0.5
+
+    def test_wait_times_out(self):
+        with DistributedLock('test:timeout'):
+            started = time.monotonic()
+            with pytest.raises(LockNotAcquired):
+                DistributedLock('test:timeout', max_wait=0.3).acquire()
+
+        assert time.monotonic() - started < 2
+
+    def test_expired_holder_cannot_release_new_holder(self):
+        stale = DistributedLock('test:stale')
+        stale.acquire()
+        # Simulate expiry of the first holder's lock
+        cache.delete(stale.key)
+        current = DistributedLock('test:stale', wait=False)
+        current.acquire()
+
+        assert stale.release() is False
+        with pytest.raises(LockNotAcquired):
+            DistributedLock('test:stale', wait=False).acquire()
+        assert current.release() is True
+
+    def test_fencing_tokens_increase(self):
+        with DistributedLock('test:fence') as first:
+            pass
+        with DistributedLock('test:fence') as second:
+            pass
+
+        assert second.fencing_token > first.fencing_token
+
+    def test_auto_renew_keeps_long_operation_locked(self):
+        with DistributedLock('test:renew', ttl_seconds=1, auto_renew=True) as lock:
+            time.sleep(1.6)
+            with pytest.raises(LockNotAcquired):
+                DistributedLock('test:renew', wait=False).acquire()
+            assert not lock.lost
+
+
+@pytest.fixture
+def namespace():
+    """Unique lock name prefix, so runs never share Redis keys."""
+    return f'test-{uuid.uuid4().hex[:8]}'
+
+
+@pytest.fixture
+def redis_client(monkeypatch, namespace):
+    """Run DistributedLock on the Redis backend against settings.REDIS_URL."""
+    import redis
+
+    client = redis.Redis.from_url(settings.REDIS_URL)
+    try:
+        client.ping()
+    except redis.exceptions.ConnectionError:
+        pytest.skip(f"No Redis server at {settings.REDIS_URL}")
+    monkeypatch.setattr(locks, '_redis_client', lambda: client)
+    yield client
+    for key in client.scan_iter(match=f'*{namespace}*'):
+        client.delete(key)
+    client.close()
+
+
+class TestRedisLock:
+    """SET NX PX, Lua release/renew and BLPOP wake-ups on a real Redis."""
+
+    def test_expired_holder_cannot_release_or_renew(self, redis_client, namespace):
+        name = f'{namespace}:stale'
+        stale = DistributedLock(name)
+        stale.acquire()
+        # Simulate expiry of the first holder's lock
+        redis_client.delete(cache.make_key(stale.key))
+        current = DistributedLock(name, wait=False)
+        current.acquire()
+
+        assert stale.renew() is False
+        assert stale.release() is False
+        assert redis_client.get(cache.make_key(current.key)).decode() == current.token
+        assert current.fencing_token > stale.fencing_token
+        assert current.release() is True
+        assert redis_client.exists(cache.make_key(current.key)) == 0
+
+    def test_renew_extends_ttl(self, redis_client, namespace):
+        with DistributedLock(f'{namespace}:renew', ttl_seconds=2) as lock:
+            time.sleep(0.5)
+            assert lock.renew() is True
+            assert redis_client.pttl(cache.make_key(lock.key)) > 1800
+
+    def test_waiter_is_woken_by_release(self, redis_client, namespace):
+        name = f'{namespace}:wake'
+        holder = DistributedLock(name, ttl_seconds=30)
+        holder.acquire()
+        acquired_at = []
+
+        def wait_for_lock():
+            with DistributedLock(name, max_wait=5):
+                acquired_at.append(time.monotonic())
+
+        waiter = threading.Thread(target=wait_for_lock)
+        waiter.start()
+        time.sleep(0.3)
+        released_at = time.monotonic()
+        holder.release()
+        waiter.join(timeout=5)
+
+        assert len(acquired_at) == 1
+        assert acquired_at[0] - released_at < 0.5
+
+    def test_waiter_is_woken_when_holder_expires(self, redis_client, namespace):
+        name = f'{namespace}:expire'
+        # A holder that dies without releasing
+        DistributedLock(name, ttl_seconds=1).acquire()
+        started = time.monotonic()
+
+        with DistributedLock(name, max_wait=5) as lock:
+            waited = time.monotonic() - started
+
+        assert lock.fencing_token == 2
+        assert 0.5 < waited < 2
+
+    def test_wait_handles_missing_and_ttl_less_keys(self, redis_client, namespace):
+        backend = locks._RedisBackend(redis_client)
+        missing = f'lock:{namespace}:missing'
+        started = time.monotonic()
+        backend.wait(missing, timeout=2)  # PTTL -2: nothing to wait for
+        assert time.monotonic() - started < 0.5
+
+        # PTTL -1: a key without expiry only bounds the wait by the timeout
+        name = f'{namespace}:no-ttl'
+        redis_client.set(cache.make_key(f'lock:{name}'), 'someone-else')
+        started = time.monotonic()
+        with pytest.raises(LockNotAcquired):
+            DistributedLock(name, max_wait=0.5).acquire()
+        assert 0.4 < time.monotonic() - started < 2
@@ -0,0 +1,201 @@
+"""
+Tests for the clustered farm map (YEAAnalyticsService.get_map_tile and
+get_farm_map_clusters, dashboards.services.map_tiles).
+
+Run with: pytest tests/integration/test_farm_map_clusters.py -v
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.gis.geos import Point
+from django.utils import timezone
+
+from dashboards.services.map_tiles import (
+    MAX_PERIOD_DAYS,
+    geohash_precision,
+    lonlat_to_tile,
+    merge_cells,
+    parse_period_days,
+    tile_bounds,
+    tiles_for_bbox,
+)
+from dashboards.services.yea_analytics import YEAAnalyticsService
+
+pytestmark = pytest.mark.django_db
+
+GHANA_BBOX = (-3.3, 4.7, 1.2, 11.2)
+
+
+@pytest.fixture
+def make_farm(farm_factory):
+    from flock_management.models import DailyProduction, Flock
+
+    def _make(index, lng, lat, birds=1000, eggs_per_day=0, died_per_day=0):
+        farm = farm_factory(
+            f'map_{index}', location=Point(lng, lat, srid=4326), current_bird_count=birds,
+        )
+        if eggs_per_day or died_per_day:
+            flock = Flock.objects.create(
+                farm=farm,
+                flock_number=f'FLOCK-MAP-{index}',
+                flock_type='Layers',
+                breed='Isa Brown',
+                source='Purchased',
+                arrival_date=timezone.now().date() - timedelta(days=200),
+                initial_count=birds,
+                current_count=birds,
+                age_at_arrival_weeks=Decimal('0'),
+                status='Active',
+            )
+            today = timezone.now().date()
+            for day in range(1, 4):
+                DailyProduction.objects.create(
+                    farm=farm,
+                    flock=flock,
+                    production_date=today - timedelta(days=day),
+                    eggs_collected=eggs_per_day,
+                    good_eggs=eggs_per_day,
+                    birds_died=died_per_day,
+                )
+        return farm
+
+    return _make
+
+
+class TestTileMath:
+    """XYZ tile arithmetic and cell sizing."""
+
+    def test_point_lies_in_its_tile(self):
+        x, y = lonlat_to_tile(-0.1870, 5.6037, 8)
+        west, south, east, north = tile_bounds(8, x, y)
+        assert west <= -0.1870 < east
+        assert south <= 5.6037 < north
+
+    def test_bbox_tiles_and_limit(self):
+        assert len(tiles_for_bbox(*GHANA_BBOX, 6)) <= 9
+        with pytest.raises(ValueError):
+            tiles_for_bbox(*GHANA_BBOX, 14)
+        with pytest.raises(ValueError):
+            tiles_for_bbox(1.0, 5.0, -1.0, 6.0, 6)
+
+    def test_precision_grows_with_zoom(self):
+        precisions = [geohash_precision(zoom) for zoom in range(0, 19)]
+        assert precisions == sorted(precisions)
+        assert precisions[-1] <= 9
+
+    def test_merge_cells_split_across_tiles(self):
+        cell = {
+            'key': 's0', 'lat': 5.0, 'lng': -0.2, 'farms': 1, 'total_birds': 100,
+            'eggs_produced': 10, 'good_eggs': 10, 'mortality_count': 1, 'mortality_rate': 1.0,
+        }
+        other = dict(cell, lat=6.0, farms=3, total_birds=300, mortality_count=3)
+        [merged] = merge_cells([cell, other])
+        assert merged['farms'] == 4
+        assert merged['total_birds'] == 400
+        assert merged['lat'] == 5.75
+        assert merged['mortality_rate'] == 1.0
+
+
+class TestMapClusters:
+    """Clusters built from PostGIS geohash aggregation per tile."""
+
+    def test_nearby_farms_share_a_cell_at_low_zoom(self, make_farm):
+        make_farm(1, -0.1870, 5.6037, birds=1000, eggs_per_day=800, died_per_day=2)
+        make_farm(2, -0.1900, 5.6100, birds=500)
+        make_farm(3, -1.6244, 6.6885, birds=2000)
+
+        data = YEAAnalyticsService(use_cache=False).get_farm_map_clusters(GHANA_BBOX, zoom=6)
+
+        assert data['summary']['total_farms'] == 3
+        accra = next(c for c in data['cells'] if c['farms'] == 2)
+        assert accra['total_birds'] == 1500
+        assert accra['eggs_produced'] == 2400
+        assert accra['mortality_count'] == 6
+        assert accra['mortality_rate'] == 0.4
+        assert len(data['cells']) == 2
+
+    def test_farms_split_at_high_zoom(self, make_farm):
+        make_farm(1, -0.1870, 5.6037)
+        make_farm(2, -0.1900, 5.6100)
+
+        data = YEAAnalyticsService(use_cache=False).get_farm_map_clusters(
+            (-0.25, 5.55, -0.15, 5.65), zoom=14
+        )
+
+        assert len(data['cells']) == 2
+        assert all(c['farms'] == 1 for c in data['cells'])
+
+    def test_tile_counts_farm_once(self, make_farm):
+        make_farm(1, -0.1870, 5.6037)
+        service = YEAAnalyticsService(use_cache=False)
+        x, y = lonlat_to_tile(-0.1870, 5.6037, 10)
+
+        tile = service.get_map_tile(10, x, y)
+        neighbour = service.get_map_tile(10, x + 1, y)
+
+        assert sum(c['farms'] for c in tile['cells']) == 1
+        assert neighbour['cells'] == []
+
+
+class TestMapViews:
+    """The map endpoints validate and bound their query parameters."""
+
+    @pytest.fixture
+    def admin_client(self, django_user_model):
+        from rest_framework.test import APIClient
+
+        admin = django_user_model.objects.create_user(
+            username='map_admin',
+            phone='+233501234890',
+            password='testpass123',
+            role='NATIONAL_ADMIN',
+            email='map_admin@test.com'
+        )
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        return client
+
+    @pytest.fixture
+    def tile_periods(self, monkeypatch):
+        """Record the period_days each tile is aggregated for."""
+        periods = []
+
+        def get_map_tile(service, zoom, x, y, period_days=30):
+            periods.append(period_days)
+            return {'tile': {'z': zoom, 'x': x, 'y': y}, 'cells': []}
+
+        monkeypatch.setattr(YEAAnalyticsService, 'get_map_tile', get_map_tile)
+        return periods
+
+    def test_period_days_parsing(self):
+        assert parse_period_days(None) == 30
+        assert parse_period_days('7') == 7
+        assert parse_period_days('0') == 1
+        assert parse_period_days('100000') == MAX_PERIOD_DAYS
+        with pytest.raises(ValueError):
+            parse_period_days('month')
+
+    def test_invalid_days_is_rejected(self, admin_client, tile_periods):
+        tile = admin_client.get('/api/admin/analytics/geographic/map/tiles/6/31/30/', {'days': 'abc'})
+        clusters = admin_client.get(
+            '/api/admin/analytics/geographic/map/clusters/',
+            {'bbox': ','.join(map(str, GHANA_BBOX)), 'zoom': 6, 'days': '1.5'},
+        )
+
+        assert tile.status_code == 400
+        assert clusters.status_code == 400
+        assert tile_periods == []
+
+    def test_days_is_clamped(self, admin_client, tile_periods):
+        tile = admin_client.get('/api/admin/analytics/geographic/map/tiles/6/31/30/', {'days': 5000})
+        clusters = admin_client.get(
+            '/api/admin/analytics/geographic/map/clusters/',
+            {'bbox': ','.join(map(str, GHANA_BBOX)), 'zoom': 6, 'days': -3},
+        )
+
+        assert tile.status_code == 200
+        assert clusters.status_code == 200
+        assert tile_periods[0] == MAX_PERIOD_DAYS
+        assert set(tile_periods[1:]) == {1}
@@ -0,0 +1,107 @@
+"""
+Tests for batched fraud detection.
+
+Metrics for every fraud check are collected for many farms at once with
+grouped queries; the batch engine must score farms exactly like the
+single-farm FraudDetectionService and bulk-insert its alerts.
+"""
+
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def farm(farm_factory):
+    """Create a layer farm for testing."""
+    return farm_factory(
+        'fraud', current_bird_count=2000,
+        primary_production_type='Layers', layer_breed='Isa Brown',
+    )
+
+
+@pytest.fixture
+def flock(farm):
+    """Create an active layer flock."""
+    from flock_management.models import Flock
+    
+    return Flock.objects.create(
+        farm=farm,
+        flock_number='FLOCK-FRAUD-001',
+        flock_type='Layers',
+        breed='Isa Brown',
+        source='Purchased',
+        arrival_date=date.today() - timedelta(days=120),
+        initial_count=2000,
+        current_count=2000,
+        age_at_arrival_weeks=Decimal('0'),
+        is_currently_producing=True,
+    )
+
+
+@pytest.fixture
+def unsold_production(farm, flock):
+    """Ten days of production in the last month and no sales at all."""
+    from flock_management.models import DailyProduction
+    
+    for i in range(10):
+        DailyProduction.objects.create(
+            farm=farm,
+            flock=flock,
+            production_date=date.today() - timedelta(days=i),
+            eggs_collected=1500,
+            good_eggs=1500,
+            birds_died=0,
+        )
+    return farm
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+class TestBatchFraudDetection:
+    """Test the grouped-query fraud engine."""
+    
+    def test_metrics_cost_constant_queries(self, unsold_production, django_assert_num_queries):
+        """Metrics for any number of farms come from five queries."""
+        from sales_revenue.services.fraud_detection_service import collect_fraud_metrics
+        
+        with django_assert_num_queries(5):
+            metrics = collect_fraud_metrics([unsold_production.id], days=30)
+        
+        farm_metrics = metrics[unsold_production.id]
+        assert farm_metrics['eggs_produced'] == 15000
+        assert farm_metrics['eggs_sold'] == 0
+        assert farm_metrics['reported_days'] == 10
+        assert farm_metrics['active_birds'] == 2000
+    
+    def test_batch_matches_single_farm_analysis(self, unsold_production):
+        """Batch scoring equals the per-farm service and bulk-inserts alerts."""
+        from sales_revenue.models import FraudAlert
+        from sales_revenue.services.fraud_detection_service import (
+            FraudDetectionService, analyze_farms,
+        )
+        
+        single = FraudDetectionService(unsold_production).run_full_analysis(days=30, save=False)
+        alerts = analyze_farms([unsold_production.id], days=30)
+        
+        assert len(alerts) == 1
+        assert alerts[0].risk_score == single.risk_score
+        assert {a['type'] for a in alerts[0].alerts} == {a['type'] for a in single.alerts}
+        assert {'PRODUCTION_SALES_MISMATCH', 'REPORTING_GAPS'} <= {a['type'] for a in single.alerts}
+        assert FraudAlert.objects.filter(farm=unsold_production).count() == 1
+    
+    def test_incremental_selects_changed_farms(self, unsold_production):
+        """Only farms with records updated since the last sweep are re-analyzed."""
+        from django.utils import timezone
+        from sales_revenue.services.fraud_detection_service import farms_with_activity_since
+        
+        assert unsold_production.id in farms_with_activity_since(timezone.now() - timedelta(hours=1))
+        assert farms_with_activity_since(timezone.now() + timedelta(hours=1)) == set()
@@ -496,7 +496,50 @@ class TestIdempotentAPIResponse:
         assert response.status_code == status.HTTP_200_OK
         assert response.data['is_duplicate'] is True
         assert response.data['order_number'] == first_order.order_number
-    
+
+    @patch('core.turnstile_service.turnstile_service.verify_token')
+    @patch('core.sms_service.HubtelSMSService.send_sms')
+    def test_order_saved_after_validation_is_returned_as_duplicate(
+        self, mock_sms, mock_captcha, api_client, farm, product, guest_customer
+    ):
+        """
+        A request that validated while another one was still saving the same
+        basket finds that order under the claim instead of placing a second.
+        """
+        mock_captcha.return_value = True
+        mock_sms.return_value = {'success': True}
+
+        from sales_revenue.guest_order_models import GuestOrder
+
+        payload = {
+            'captcha_token': 'test-token',
+            'phone_number': guest_customer.phone_number,
+            'name': guest_customer.name,
+            'items': [{'product_id': str(product.id), 'quantity': 2}],
+            'delivery_method': 'pickup',
+        }
+        first = api_client.post('/api/public/marketplace/order/create/', payload, format='json')
+        assert first.status_code == status.HTTP_201_CREATED
+
+        find_duplicate = GuestOrder.find_duplicate
+        lookups = []
+
+        def lookup(content_hash, *args, **kwargs):
+            lookups.append(content_hash)
+            # Validation ran before the first order committed
+            if len(lookups) == 1:
+                return None
+            return find_duplicate(content_hash, *args, **kwargs)
+
+        with patch.object(GuestOrder, 'find_duplicate', side_effect=lookup):
+            second = api_client.post('/api/public/marketplace/order/create/', payload, format='json')
+
+        assert len(lookups) == 2
+        assert second.status_code == status.HTTP_200_OK
+        assert second.data['is_duplicate'] is True
+        assert second.data['order_number'] == first.data['order_number']
+        assert GuestOrder.objects.filter(content_hash=lookups[0]).count() == 1
+
     @patch('core.turnstile_service.turnstile_service.verify_token')
     @patch('core.sms_service.HubtelSMSService.send_sms')
     def test_new_order_returns_201_created(
@@ -572,10 +615,10 @@ class TestAtomicStockOperations:
     
     @patch('core.turnstile_service.turnstile_service.verify_token')
     @patch('core.sms_service.HubtelSMSService.send_sms')
-    def test_stock_is_reduced_atomically_on_order_creation(
+    def test_stock_is_held_atomically_on_order_creation(
         self, mock_sms, mock_captcha, api_client, farm, product
     ):
-        """Stock should be reduced atomically when order is created."""
+        """Stock should be held (not taken) atomically when order is created."""
         mock_captcha.return_value = True
         mock_sms.return_value = {'success': True}
         
@@ -594,7 +637,9 @@ class TestAtomicStockOperations:
         
         # Refresh product from DB
         product.refresh_from_db()
-        assert product.stock_quantity == initial_stock - order_quantity
+        assert product.stock_quantity == initial_stock
+        assert product.held_quantity == order_quantity
+        assert product.available_quantity == initial_stock - order_quantity
     
     @patch('core.turnstile_service.turnstile_service.verify_token')
     @patch('core.sms_service.HubtelSMSService.send_sms')
@@ -621,9 +666,10 @@ class TestAtomicStockOperations:
         
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         
-        # Stock should be unchanged
+        # Stock should be unchanged and nothing held
         product.refresh_from_db()
         assert product.stock_quantity == initial_stock
+        assert product.held_quantity == 0
         
         # No order should be created
         order_count_after = GuestOrder.objects.filter(farm=farm).count()
@@ -631,10 +677,10 @@ class TestAtomicStockOperations:
     
     @patch('core.turnstile_service.turnstile_service.verify_token')
     @patch('core.sms_service.HubtelSMSService.send_sms')
-    def test_multiple_products_stock_reduced_atomically(
+    def test_multiple_products_stock_held_atomically(
         self, mock_sms, mock_captcha, api_client, farm, product, product_2
     ):
-        """Multiple products should have stock reduced atomically together."""
+        """Multiple products should have stock held atomically together."""
         mock_captcha.return_value = True
         mock_sms.return_value = {'success': True}
         
@@ -654,11 +700,11 @@ class TestAtomicStockOperations:
         
         assert response.status_code == status.HTTP_201_CREATED
         
-        # Both products should have stock reduced
+        # Both products should have stock held
         product.refresh_from_db()
         product_2.refresh_from_db()
-        assert product.stock_quantity == initial_stock_1 - 3
-        assert product_2.stock_quantity == initial_stock_2 - 7
+        assert product.available_quantity == initial_stock_1 - 3
+        assert product_2.available_quantity == initial_stock_2 - 7
 
 
 # =============================================================================
@@ -1100,12 +1146,12 @@ class TestConcurrentOrderPrevention:
         # Or both fail if they detected the race condition
         assert len(successes) <= 1, f"More than one order succeeded: {successes}"
         
-        # Stock should not go negative
-        assert product.stock_quantity >= 0, f"Stock went negative: {product.stock_quantity}"
+        # Available stock should not go negative
+        assert product.available_quantity >= 0, f"Stock went negative: {product.available_quantity}"
         
-        # If one succeeded, stock should be 4 (10 - 6)
+        # If one succeeded, 4 should be left for sale (10 - 6 held)
         if len(successes) == 1:
-            assert product.stock_quantity == 4, f"Unexpected stock: {product.stock_quantity}"
+            assert product.available_quantity == 4, f"Unexpected stock: {product.available_quantity}"
 
 
 # =============================================================================
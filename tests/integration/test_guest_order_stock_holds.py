@@ -0,0 +1,211 @@
+"""
+Tests for guest order stock holds (sales_revenue.services.stock_holds).
+
+Run with: pytest tests/integration/test_guest_order_stock_holds.py -v
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+
+from sales_revenue.inventory_models import StockMovement, StockMovementType
+from sales_revenue.services.stock_holds import (
+    convert_holds,
+    extend_holds,
+    place_holds,
+    release_order_stock,
+    sweep_expired_holds,
+)
+from sales_revenue.services.stock_reservation import InsufficientStock, lock_stock
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def farm(farm_factory):
+    return farm_factory('hold')
+
+
+@pytest.fixture
+def products(farm):
+    """Two egg products, 10 in stock each."""
+    from sales_revenue.marketplace_models import Product, ProductCategory
+
+    category, _ = ProductCategory.objects.get_or_create(
+        name='Eggs', defaults={'slug': 'eggs', 'is_active': True}
+    )
+    return [
+        Product.objects.create(
+            farm=farm,
+            category=category,
+            name=f'Held Eggs {size}',
+            price=Decimal('35.00'),
+            unit='crate',
+            stock_quantity=10,
+            track_inventory=True,
+            status='active',
+        )
+        for size in range(2)
+    ]
+
+
+@pytest.fixture
+def place_order(farm, products):
+    """Place a pending guest order for {product index: quantity} with its stock held."""
+    from sales_revenue.guest_order_models import GuestCustomer, GuestOrder, GuestOrderItem
+
+    customer = GuestCustomer.objects.create(phone_number='+233241777666', name='Hold Customer')
+
+    def place(quantities):
+        order = GuestOrder.objects.create(
+            farm=farm,
+            guest_customer=customer,
+            status='pending_verification',
+            delivery_method='pickup',
+            subtotal=Decimal('0'),
+            total_amount=Decimal('0'),
+        )
+        items = [
+            GuestOrderItem.objects.create(
+                order=order,
+                product=products[index],
+                product_name=products[index].name,
+                unit=products[index].unit,
+                unit_price=products[index].price,
+                quantity=quantity,
+                line_total=products[index].price * quantity,
+            )
+            for index, quantity in quantities.items()
+        ]
+        locked = lock_stock(item.product_id for item in items)
+        locked.check(order.stock_lines())
+        place_holds(order, items, locked)
+        order.save()
+        return order
+
+    return place
+
+
+def _refresh(products):
+    for product in products:
+        product.refresh_from_db()
+    return products
+
+
+class TestPlaceHolds:
+    """Placing an order holds its stock without taking it."""
+
+    def test_available_quantity_excludes_held_stock(self, products, place_order):
+        order = place_order({0: 4, 1: 2})
+
+        first, second = _refresh(products)
+        assert (first.stock_quantity, first.held_quantity, first.available_quantity) == (10, 4, 6)
+        assert second.available_quantity == 8
+        assert order.stock_holds.filter(released_at__isnull=True).count() == 2
+        assert order.expires_at > timezone.now()
+        assert not StockMovement.objects.exists()
+
+    def test_held_stock_cannot_be_sold_again(self, products, place_order):
+        place_order({0: 8})
+
+        with pytest.raises(InsufficientStock) as error:
+            place_order({0: 3})
+
+        assert "Available: 2, Requested: 3" in str(error.value)
+
+    def test_extend_moves_expiry(self, place_order):
+        order = place_order({0: 1})
+
+        extend_holds(order, minutes=60)
+
+        hold = order.stock_holds.get()
+        assert hold.expires_at > timezone.now() + timedelta(minutes=55)
+        assert hold.expires_at == order.expires_at
+
+
+class TestProductSave:
+    """Ordinary product saves never write held_quantity."""
+
+    def test_stale_full_save_keeps_holds(self, products, place_order):
+        from sales_revenue.marketplace_models import Product
+
+        stale = Product.objects.get(pk=products[0].pk)
+        place_order({0: 4})
+
+        stale.price = Decimal('40.00')
+        stale.save()
+
+        product = _refresh(products)[0]
+        assert (product.price, product.held_quantity, product.available_quantity) == (Decimal('40.00'), 4, 6)
+
+
+class TestConvertAndRelease:
+    """Confirmation turns holds into a sale; cancellation gives them back."""
+
+    def test_convert_takes_stock_and_clears_holds(self, products, place_order):
+        order = place_order({0: 4, 1: 2})
+
+        movements = convert_holds(order)
+
+        assert [m.movement_type for m in movements] == [StockMovementType.SALE] * 2
+        first, second = _refresh(products)
+        assert (first.stock_quantity, first.held_quantity, first.available_quantity) == (6, 0, 6)
+        assert (second.stock_quantity, second.held_quantity) == (8, 0)
+        assert set(order.stock_holds.values_list('release_reason', flat=True)) == {'converted'}
+
+    def test_convert_without_holds_takes_nothing(self, products, place_order):
+        order = place_order({0: 4})
+        convert_holds(order)
+
+        assert convert_holds(order) == []
+        assert _refresh(products)[0].stock_quantity == 6
+
+    def test_cancel_releases_holds(self, products, place_order):
+        order = place_order({0: 4})
+
+        assert release_order_stock(order, 'Cancelled') == []
+
+        product = _refresh(products)[0]
+        assert (product.stock_quantity, product.held_quantity) == (10, 0)
+        assert order.stock_holds.get().release_reason == 'cancelled'
+
+    def test_cancel_after_confirmation_returns_stock(self, products, place_order):
+        order = place_order({0: 4})
+        convert_holds(order)
+
+        movements = release_order_stock(order, 'Cancelled')
+
+        assert [m.movement_type for m in movements] == [StockMovementType.RETURN]
+        assert _refresh(products)[0].stock_quantity == 10
+
+
+class TestSweepExpiredHolds:
+    """The sweeper releases expired holds and expires their orders."""
+
+    def test_expired_holds_are_released(self, products, place_order):
+        from sales_revenue.guest_order_models import StockHold
+
+        expired = [place_order({0: 2, 1: 1}) for _ in range(3)]
+        live = place_order({0: 1})
+        StockHold.objects.filter(order__in=expired).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        result = sweep_expired_holds(chunk_size=2)
+
+        assert (result['holds'], result['orders']) == (6, 3)
+        first, second = _refresh(products)
+        assert (first.held_quantity, first.available_quantity) == (1, 9)
+        assert second.held_quantity == 0
+        for order in expired:
+            order.refresh_from_db()
+            assert order.status == 'expired'
+        live.refresh_from_db()
+        assert live.status == 'pending_verification'
+
+    def test_nothing_to_sweep(self, place_order):
+        place_order({0: 1})
+
+        assert sweep_expired_holds() == {'holds': 0, 'orders': 0, 'products': 0}
@@ -0,0 +1,105 @@
+"""
+Tests for help article full-text search (cms.help_search.search_articles).
+
+Run with: pytest tests/integration/test_help_search.py -v
+"""
+
+import pytest
+
+from cms.help_models import HelpArticle
+from cms.help_search import search_articles
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def article():
+    """Create a published article; search_vector is filled on save."""
+    def create(title, summary='General help', content='See the guide.', keywords='', view_count=0):
+        return HelpArticle.objects.create(
+            title=title,
+            summary=summary,
+            content=content,
+            keywords=keywords,
+            view_count=view_count,
+            status=HelpArticle.Status.PUBLISHED,
+        )
+    return create
+
+
+def titles(text):
+    return [a.title for a in search_articles(HelpArticle.objects.all(), text)]
+
+
+class TestWebsearchQuery:
+    """Search text is parsed with websearch_to_tsquery syntax."""
+
+    def test_terms_are_stemmed_and_combined(self, article):
+        article('Vaccinating layers', content='Vaccinate layer flocks at eight weeks.')
+        article('Selling eggs', content='List your eggs on the marketplace.')
+
+        assert titles('vaccination layer') == ['Vaccinating layers']
+
+    def test_quoted_phrase_requires_adjacent_words(self, article):
+        article('Feed storage', content='Keep layer mash dry and off the floor.')
+        article('Mash mixing', content='Mix the mash before feeding each layer.')
+
+        assert titles('"layer mash"') == ['Feed storage']
+
+    def test_or_and_exclusion(self, article):
+        article('Egg grading', content='Grade eggs by weight.')
+        article('Broiler weighing', content='Weigh broilers weekly.')
+        article('Feed costs', content='Track the cost of feed.')
+
+        assert set(titles('egg or broiler')) == {'Egg grading', 'Broiler weighing'}
+        assert titles('weight -broiler') == ['Egg grading']
+
+    def test_malformed_input_does_not_raise(self, article):
+        article('Egg grading', content='Grade eggs by weight.')
+
+        assert titles('egg ((') == ['Egg grading']
+
+
+class TestRanking:
+    """Matches are ordered by weighted rank, then view count."""
+
+    def test_title_match_outranks_content_match(self, article):
+        article('Marketplace payouts', content='How payouts reach your account.', view_count=0)
+        article('Account settings', content='Change your password. Payouts are covered elsewhere.',
+                view_count=500)
+
+        assert titles('payouts') == ['Marketplace payouts', 'Account settings']
+
+    def test_keyword_match_outranks_content_match(self, article):
+        article('Getting paid', keywords='mobile money, payout', content='Link a wallet.')
+        article('Order history', content='Each order shows the mobile money reference.')
+
+        assert titles('mobile money') == ['Getting paid', 'Order history']
+
+    def test_view_count_breaks_ties(self, article):
+        article('Cleaning pens A', content='Disinfect the pens.', view_count=3)
+        article('Cleaning pens B', content='Disinfect the pens.', view_count=30)
+
+        assert titles('disinfect') == ['Cleaning pens B', 'Cleaning pens A']
+
+
+class TestHeadlines:
+    """Snippets and titles highlight the matched terms."""
+
+    def test_snippet_marks_matched_terms(self, article):
+        article(
+            'Biosecurity',
+            content='Visitors must wash their boots. Footbaths at every gate stop disease spreading.',
+        )
+
+        result = search_articles(HelpArticle.objects.all(), 'footbath').get()
+
+        assert '<mark>Footbaths</mark>' in result.snippet
+        assert 'gate' in result.snippet
+
+    def test_title_highlights_every_match(self, article):
+        article('Egg prices and egg sizes', content='Pricing by size.')
+
+        result = search_articles(HelpArticle.objects.all(), 'eggs').get()
+
+        assert result.highlighted_title == '<mark>Egg</mark> prices and <mark>egg</mark> sizes'
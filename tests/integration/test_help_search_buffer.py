@@ -0,0 +1,63 @@
+"""
+Tests for the buffered help search analytics (cms.help_search).
+
+Run with: pytest tests/integration/test_help_search_buffer.py -v
+"""
+
+import pytest
+from django.core.cache import cache
+
+from cms import help_search
+from cms.help_models import PopularSearch
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def at_bucket(monkeypatch):
+    """Pin the current analytics bucket."""
+    def pin(bucket):
+        monkeypatch.setattr(help_search, '_bucket', lambda now=None: bucket)
+    return pin
+
+
+class TestFlushSearchBuffer:
+    """Closed buckets are written to PopularSearch exactly once."""
+
+    def test_closed_buckets_are_flushed(self, at_bucket):
+        at_bucket(1000)
+        help_search.record_search_buffered('Egg Prices')
+        help_search.record_search_buffered('egg prices')
+        help_search.record_search_buffered('vaccines', has_results=False)
+        at_bucket(1001)
+
+        result = help_search.flush_search_buffer()
+
+        assert result['terms'] == 2
+        assert PopularSearch.objects.get(search_term='egg prices').search_count == 2
+        assert not PopularSearch.objects.get(search_term='vaccines').has_results
+        assert help_search.flush_search_buffer()['terms'] == 0
+
+    def test_failed_write_keeps_counts_for_next_run(self, at_bucket, monkeypatch):
+        at_bucket(2000)
+        help_search.record_search_buffered('feed')
+        at_bucket(2001)
+
+        def fail(term_counts):
+            raise RuntimeError('database unavailable')
+
+        with monkeypatch.context() as patched:
+            patched.setattr(PopularSearch, 'record_search_counts', fail)
+            with pytest.raises(RuntimeError):
+                help_search.flush_search_buffer()
+
+        help_search.flush_search_buffer()
+
+        assert PopularSearch.objects.get(search_term='feed').search_count == 1
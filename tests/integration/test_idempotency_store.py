@@ -0,0 +1,100 @@
+"""
+Tests for the shared idempotency store (core.idempotency).
+
+Run with: pytest tests/integration/test_idempotency_store.py -v
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from core import idempotency
+from core.idempotency import IdempotencyInProgress
+from procurement.models import IdempotencyKey
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class TestClaim:
+    """Claiming a key lets exactly one request do the work."""
+
+    def test_completed_operation_is_replayed(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            with idempotency.claim('test_op', 'key-1') as op:
+                assert not op.replayed
+                op.complete({'order_id': 7}, resource_type='Order', resource_id=7)
+
+        replay = idempotency.claim('test_op', 'key-1')
+
+        assert replay.replayed
+        assert replay.response == {'order_id': 7}
+        record = IdempotencyKey.objects.get(key='test_op:key-1')
+        assert (record.operation, record.status, record.resource_id) == ('test_op', 'completed', '7')
+
+    def test_concurrent_duplicate_is_refused(self):
+        with idempotency.claim('test_op', 'key-2'):
+            with pytest.raises(IdempotencyInProgress):
+                idempotency.claim('test_op', 'key-2')
+
+    def test_failed_operation_can_be_retried(self):
+        with pytest.raises(ValueError):
+            with idempotency.claim('test_op', 'key-3'):
+                raise ValueError('boom')
+
+        retry = idempotency.claim('test_op', 'key-3')
+
+        assert not retry.replayed
+        assert not IdempotencyKey.objects.exists()
+
+    def test_database_fallback_after_cache_loss(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            with idempotency.claim('test_op', 'key-4') as op:
+                op.complete({'amount': '10.00'})
+        cache.clear()
+
+        assert idempotency.claim('test_op', 'key-4').response == {'amount': '10.00'}
+        # The cache is warmed again from the row
+        assert idempotency.get_response('test_op', 'key-4') == {'amount': '10.00'}
+
+    def test_keys_are_namespaced_by_operation(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            with idempotency.claim('op_a', 'shared') as op:
+                op.complete({'done': True})
+
+        assert not idempotency.claim('op_b', 'shared').replayed
+
+    def test_guard_blocks_only_while_held(self):
+        with idempotency.guard('test_op', 'key-5'):
+            with pytest.raises(IdempotencyInProgress):
+                idempotency.claim('test_op', 'key-5')
+
+        with idempotency.guard('test_op', 'key-5'):
+            pass
+
+
+class TestPurgeExpiredKeys:
+    """Expired records are deleted in chunks."""
+
+    def test_deletes_only_expired_rows(self):
+        now = timezone.now()
+        for index in range(5):
+            IdempotencyKey.objects.create(
+                key=f'old:{index}', operation='old', resource_type='',
+                status='completed', expires_at=now - timedelta(hours=1),
+            )
+        IdempotencyKey.objects.create(
+            key='live', operation='live', resource_type='',
+            status='completed', expires_at=now + timedelta(hours=1),
+        )
+
+        assert idempotency.purge_expired_keys(chunk_size=2) == 5
+        assert list(IdempotencyKey.objects.values_list('key', flat=True)) == ['live']
@@ -0,0 +1,205 @@
+"""
+Tests for FIFO batch depletion in FarmInventory.remove_stock() and the
+nightly expiry sweep (sales_revenue.services.inventory_expiry).
+
+Run with: pytest tests/integration/test_inventory_fifo_depletion.py -v
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+
+from sales_revenue.inventory_models import (
+    FarmInventory,
+    InventoryBatch,
+    InventoryCategory,
+    StockMovement,
+    StockMovementType,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def farm(farm_factory):
+    return farm_factory('fifo')
+
+
+@pytest.fixture
+def egg_inventory(farm):
+    """Three egg batches: 10, 5 and 2 days old."""
+    inventory = FarmInventory.get_or_create_for_category(
+        farm=farm, category=InventoryCategory.EGGS, product_name='Fresh Eggs'
+    )
+    today = timezone.now().date()
+    for age, quantity in [(10, 100), (5, 50), (2, 30)]:
+        inventory.add_stock(
+            quantity=quantity,
+            movement_type=StockMovementType.PRODUCTION,
+            stock_date=today - timedelta(days=age),
+            create_batch=True,
+        )
+    return inventory
+
+
+def _open_batches(inventory):
+    return list(
+        InventoryBatch.objects.filter(inventory=inventory, is_depleted=False)
+        .order_by('production_date')
+        .values_list('current_quantity', flat=True)
+    )
+
+
+class TestFifoDepletion:
+    """Sales consume the oldest batches first."""
+
+    def test_sale_consumes_oldest_batches(self, egg_inventory):
+        movement = egg_inventory.remove_stock(120, StockMovementType.SALE, unit_price='1.60')
+
+        assert _open_batches(egg_inventory) == [Decimal('30'), Decimal('30')]
+        assert [Decimal(a['quantity']) for a in movement.batch_allocations] == [100, 20]
+        assert egg_inventory.oldest_stock_date == timezone.now().date() - timedelta(days=5)
+
+    def test_age_metrics_follow_remaining_batches(self, egg_inventory):
+        assert egg_inventory.average_age_days == int((100 * 10 + 50 * 5 + 30 * 2) / 180)
+
+        egg_inventory.remove_stock(150, StockMovementType.SALE)
+        egg_inventory.refresh_from_db()
+
+        assert egg_inventory.batched_quantity == Decimal('30')
+        assert egg_inventory.average_age_days == 2
+
+    def test_expired_batch_is_skipped(self, egg_inventory):
+        oldest = InventoryBatch.objects.filter(inventory=egg_inventory).order_by('production_date').first()
+        InventoryBatch.objects.filter(pk=oldest.pk).update(is_expired=True)
+
+        movement = egg_inventory.remove_stock(60, StockMovementType.SALE)
+
+        oldest.refresh_from_db()
+        assert oldest.current_quantity == Decimal('100')
+        assert [Decimal(a['quantity']) for a in movement.batch_allocations] == [50, 10]
+
+
+class TestProductionCorrection:
+    """A downward production correction comes out of that day's batch."""
+
+    def test_correction_reduces_its_own_batch(self, farm, egg_inventory):
+        from flock_management.models import DailyProduction, Flock
+
+        flock = Flock.objects.create(
+            farm=farm,
+            flock_number='FIFO-LAYERS-1',
+            flock_type='Layers',
+            breed='Isa Brown',
+            source='YEA Program',
+            arrival_date=timezone.now().date() - timedelta(weeks=30),
+            initial_count=500,
+            current_count=500,
+            age_at_arrival_weeks=0,
+            is_currently_producing=True,
+        )
+        production = DailyProduction.objects.create(
+            farm=farm,
+            flock=flock,
+            production_date=timezone.now().date() - timedelta(days=1),
+            eggs_collected=40,
+            good_eggs=40,
+        )
+
+        production.eggs_collected = 25
+        production.good_eggs = 25
+        production.save()
+
+        egg_inventory.refresh_from_db()
+        assert InventoryBatch.objects.get(source_production=production).current_quantity == Decimal('25')
+        assert _open_batches(egg_inventory) == [Decimal('100'), Decimal('50'), Decimal('30'), Decimal('25')]
+        assert egg_inventory.quantity_available == Decimal('205')
+        assert egg_inventory.batched_quantity == Decimal('205')
+
+
+class TestExpirySweep:
+    """Expired batches are written off in bulk."""
+
+    def test_sweep_writes_off_expired_batches(self, egg_inventory):
+        from sales_revenue.services.inventory_expiry import (
+            recent_expiry_summary,
+            sweep_expired_inventory,
+        )
+
+        # 10-day-old batch is past a 7-day shelf life, the others are not
+        today = timezone.now().date()
+        for batch in InventoryBatch.objects.filter(inventory=egg_inventory):
+            InventoryBatch.objects.filter(pk=batch.pk).update(
+                expiry_date=batch.production_date + timedelta(days=7)
+            )
+
+        result = sweep_expired_inventory(today=today)
+
+        egg_inventory.refresh_from_db()
+        assert result['batches'] == 1
+        assert egg_inventory.quantity_available == Decimal('80')
+        assert egg_inventory.total_lost == Decimal('100')
+        assert egg_inventory.batched_quantity == Decimal('80')
+        assert egg_inventory.oldest_stock_date == today - timedelta(days=5)
+        movement = StockMovement.objects.get(
+            inventory=egg_inventory, movement_type=StockMovementType.SPOILAGE
+        )
+        assert movement.quantity == Decimal('-100')
+        assert movement.balance_after == Decimal('80')
+        assert recent_expiry_summary(egg_inventory.farm_id)['quantity'] == 100
+
+    def test_sweep_skips_batches_older_than_stock_on_hand(self, egg_inventory):
+        from sales_revenue.services.inventory_expiry import (
+            recent_expiry_summary,
+            sweep_expired_inventory,
+        )
+
+        # Sold before FIFO depletion: the batches still add up to 180
+        FarmInventory.objects.filter(pk=egg_inventory.pk).update(quantity_available=Decimal('40'))
+        for batch in InventoryBatch.objects.filter(inventory=egg_inventory):
+            InventoryBatch.objects.filter(pk=batch.pk).update(
+                expiry_date=batch.production_date + timedelta(days=4)
+            )
+
+        result = sweep_expired_inventory(today=timezone.now().date())
+
+        egg_inventory.refresh_from_db()
+        assert result['batches'] == 2
+        # Only the 10 eggs the open 30-egg batch does not cover were expired stock
+        assert egg_inventory.quantity_available == Decimal('30')
+        assert egg_inventory.batched_quantity == Decimal('30')
+        movement = StockMovement.objects.get(
+            inventory=egg_inventory, movement_type=StockMovementType.SPOILAGE
+        )
+        assert movement.quantity == Decimal('-10')
+        assert [Decimal(a['quantity']) for a in movement.batch_allocations] == [10]
+        assert recent_expiry_summary(egg_inventory.farm_id)['quantity'] == 10
+
+    def test_sweep_without_stock_on_hand_writes_nothing_off(self, egg_inventory):
+        from sales_revenue.services.inventory_expiry import (
+            recent_expiry_summary,
+            sweep_expired_inventory,
+        )
+
+        FarmInventory.objects.filter(pk=egg_inventory.pk).update(quantity_available=Decimal('30'))
+        for batch in InventoryBatch.objects.filter(inventory=egg_inventory):
+            InventoryBatch.objects.filter(pk=batch.pk).update(
+                expiry_date=batch.production_date + timedelta(days=4)
+            )
+
+        sweep_expired_inventory(today=timezone.now().date())
+
+        egg_inventory.refresh_from_db()
+        assert egg_inventory.quantity_available == Decimal('30')
+        assert egg_inventory.total_lost == Decimal('0')
+        assert not StockMovement.objects.filter(movement_type=StockMovementType.SPOILAGE).exists()
+        assert recent_expiry_summary(egg_inventory.farm_id) is None
+
+    def test_sweep_is_idempotent(self, egg_inventory):
+        from sales_revenue.services.inventory_expiry import sweep_expired_inventory
+
+        today = timezone.now().date() + timedelta(days=30)
+        assert sweep_expired_inventory(today=today)['batches'] == 3
+        assert sweep_expired_inventory(today=today)['batches'] == 0
@@ -0,0 +1,163 @@
+"""
+Tests for set-based processing batch completion
+(ProcessingBatch.complete_and_update_inventory,
+sales_revenue.services.processing_completion).
+
+Run with: pytest tests/integration/test_processing_completion.py -v
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from sales_revenue.inventory_models import (
+    FarmInventory,
+    InventoryCategory,
+    StockMovement,
+    StockMovementType,
+)
+from sales_revenue.processing_models import (
+    ProcessingBatch,
+    ProcessingBatchStatus,
+    ProcessingOutput,
+    ProcessingType,
+    ProductCategory,
+    ProductGrade,
+)
+
+pytestmark = pytest.mark.django_db
+
+CUTS = [
+    ProductCategory.BREAST, ProductCategory.THIGH, ProductCategory.DRUMSTICK,
+    ProductCategory.WING, ProductCategory.BACK, ProductCategory.GIZZARD,
+    ProductCategory.LIVER, ProductCategory.NECK,
+]
+
+
+@pytest.fixture
+def farm(farm_factory):
+    return farm_factory('processing')
+
+
+@pytest.fixture
+def farmer(farm):
+    return farm.user
+
+
+@pytest.fixture
+def make_batch(farm, farmer):
+    from flock_management.models import Flock
+
+    flock = Flock.objects.create(
+        farm=farm,
+        flock_number='FLOCK-PROC-001',
+        flock_type='Broilers',
+        breed='Cobb 500',
+        source='YEA Program',
+        arrival_date=timezone.now().date() - timedelta(days=42),
+        initial_count=1000,
+        current_count=1000,
+        age_at_arrival_weeks=Decimal('0'),
+        status='Active',
+    )
+
+    def _make(outputs):
+        batch = ProcessingBatch.objects.create(
+            farm=farm,
+            source_flock=flock,
+            birds_processed=50,
+            average_bird_weight_kg=Decimal('2.5'),
+            processing_date=timezone.now().date(),
+            processing_type=ProcessingType.SLAUGHTER,
+            status=ProcessingBatchStatus.IN_PROGRESS,
+            processed_by=farmer,
+        )
+        for category, grade, weight, cost_per_kg in outputs:
+            ProcessingOutput.objects.create(
+                processing_batch=batch,
+                product_category=category,
+                grade=grade,
+                weight_kg=Decimal(weight),
+                allocated_cost=Decimal(weight) * Decimal(cost_per_kg),
+            )
+        return batch
+
+    return _make
+
+
+class TestBatchedCompletion:
+    """Outputs move into inventory in bulk."""
+
+    def test_outputs_added_to_inventories(self, farm, farmer, make_batch):
+        existing = FarmInventory.objects.create(
+            farm=farm,
+            category=InventoryCategory.PROCESSED,
+            product_name='Breast',
+            unit='kg',
+            quantity_available=Decimal('10.00'),
+            unit_cost=Decimal('30.00'),
+        )
+        batch = make_batch([
+            (ProductCategory.BREAST, ProductGrade.A, '20.00', '45.00'),
+            (ProductCategory.BREAST, ProductGrade.B, '10.00', '30.00'),
+            (ProductCategory.WING, ProductGrade.A, '5.00', '20.00'),
+        ])
+
+        batch.complete_and_update_inventory(user=farmer)
+
+        existing.refresh_from_db()
+        # 10 kg @ 30 + 20 kg @ 45 + 10 kg @ 30
+        assert existing.quantity_available == Decimal('40.00')
+        assert existing.unit_cost == Decimal('37.50')
+        assert existing.total_value == Decimal('1500.00')
+        wing = FarmInventory.objects.get(farm=farm, product_name='Wing')
+        assert wing.quantity_available == Decimal('5.00')
+        assert wing.unit == 'kg'
+
+        movements = StockMovement.objects.filter(
+            source_type='ProcessingBatch', source_id=str(batch.id)
+        ).order_by('balance_after')
+        assert movements.count() == 3
+        assert all(m.movement_type == StockMovementType.PROCESSING for m in movements)
+        assert [m.balance_after for m in movements.filter(inventory=existing)] == [
+            Decimal('30.00'), Decimal('40.00')
+        ]
+
+        batch.refresh_from_db()
+        assert batch.status == ProcessingBatchStatus.COMPLETED
+        assert batch.actual_yield_weight_kg == Decimal('35.00')
+        for output in batch.outputs.all():
+            assert output.inventory_updated
+            assert output.marketplace_product is not None
+            assert output.marketplace_product.unit == 'kg'
+
+        assert wing.marketplace_product.stock_quantity == 5
+
+    def test_completing_twice_is_rejected(self, farmer, make_batch):
+        batch = make_batch([(ProductCategory.WHOLE_BIRD, ProductGrade.A, '100.00', '40.00')])
+        batch.complete_and_update_inventory(user=farmer)
+
+        with pytest.raises(ValidationError):
+            ProcessingBatch.objects.get(pk=batch.pk).complete_and_update_inventory(user=farmer)
+        assert StockMovement.objects.filter(source_id=str(batch.id)).count() == 1
+
+    def test_batch_without_outputs_is_rejected(self, farmer, make_batch):
+        with pytest.raises(ValidationError):
+            make_batch([]).complete_and_update_inventory(user=farmer)
+
+    def test_query_count_independent_of_output_count(self, farmer, make_batch):
+        small = make_batch([(CUTS[0], ProductGrade.A, '5.00', '40.00')])
+        large = make_batch([(cut, ProductGrade.A, '5.00', '40.00') for cut in CUTS[1:]])
+
+        with CaptureQueriesContext(connection) as small_queries:
+            ProcessingBatch.objects.get(pk=small.pk).complete_and_update_inventory(user=farmer)
+        with CaptureQueriesContext(connection) as large_queries:
+            ProcessingBatch.objects.get(pk=large.pk).complete_and_update_inventory(user=farmer)
+
+        # The first completion also creates the marketplace category
+        assert len(large_queries) <= len(small_queries)
@@ -0,0 +1,165 @@
+"""
+Tests for proximity matching of procurement orders
+(procurement.services.proximity).
+
+Run with: pytest tests/integration/test_procurement_proximity.py -v
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.gis.geos import Point
+from django.utils import timezone
+
+from procurement.models import ProcurementOrder
+from procurement.services.farmer_distress_v2 import get_distress_service
+from procurement.services.proximity import (
+    farm_distances,
+    match_score,
+    parse_gps_point,
+)
+
+pytestmark = pytest.mark.django_db
+
+ACCRA = Point(-0.1870, 5.6037, srid=4326)
+# Roughly 25 km and 200 km from Accra
+TEMA_OUTSKIRTS = Point(0.0060, 5.7500, srid=4326)
+KUMASI = Point(-1.6244, 6.6885, srid=4326)
+
+
+@pytest.fixture
+def make_farm(farm_factory):
+    def _make(index, point, bird_count=500):
+        return farm_factory(
+            f'proximity_{index}',
+            location=point,
+            current_bird_count=bird_count,
+            primary_production_type='Broilers',
+            application_status='Approved - Farm ID Assigned',
+        )
+
+    return _make
+
+
+@pytest.fixture
+def make_order():
+    def _make(**kwargs):
+        defaults = dict(
+            title='School Feeding Broilers',
+            production_type='Broilers',
+            quantity_needed=800,
+            unit='birds',
+            price_per_unit=Decimal('75.00'),
+            total_budget=Decimal('60000.00'),
+            delivery_location='Ministry of Food HQ, Accra',
+            delivery_deadline=timezone.now().date() + timedelta(days=7),
+            status='published',
+        )
+        defaults.update(kwargs)
+        return ProcurementOrder.objects.create(**defaults)
+
+    return _make
+
+
+class TestDeliveryPoint:
+    """Orders carry a delivery point parsed from their GPS string."""
+
+    def test_parse_lat_lng_pair(self):
+        point = parse_gps_point('5.6037, -0.1870')
+        assert (point.x, point.y) == (-0.1870, 5.6037)
+
+    def test_ghana_gps_address_is_not_a_point(self):
+        assert parse_gps_point('GA-0123-4567') is None
+        assert parse_gps_point('') is None
+        assert parse_gps_point('95.0,0.0') is None
+
+    def test_order_save_fills_delivery_point(self, make_order):
+        order = make_order(delivery_location_gps='5.6037,-0.1870')
+        order.refresh_from_db()
+        assert order.delivery_point is not None
+        assert round(order.delivery_point.y, 4) == 5.6037
+
+    def test_changed_gps_string_moves_delivery_point(self, make_order):
+        make_order(delivery_location_gps='5.6037,-0.1870')
+        order = ProcurementOrder.objects.get()
+
+        order.delivery_location_gps = '6.6885,-1.6244'
+        order.save()
+
+        order.refresh_from_db()
+        assert round(order.delivery_point.y, 4) == 6.6885
+        assert round(order.delivery_point.x, 4) == -1.6244
+
+
+class TestFarmDistances:
+    """ST_DWithin candidate search with KNN ordering."""
+
+    def test_only_farms_within_radius_nearest_first(self, make_farm):
+        near = make_farm(1, TEMA_OUTSKIRTS)
+        at_delivery = make_farm(2, ACCRA)
+        far = make_farm(3, KUMASI)
+
+        distances = farm_distances(ACCRA, radius_km=100)
+
+        assert list(distances) == [at_delivery.id, near.id]
+        assert far.id not in distances
+        assert distances[at_delivery.id] == 0
+        assert 20 < distances[near.id] < 30
+
+    def test_restricted_to_given_farms(self, make_farm):
+        from farms.models import Farm
+
+        make_farm(1, TEMA_OUTSKIRTS)
+        at_delivery = make_farm(2, ACCRA)
+
+        distances = farm_distances(ACCRA, 100, farms=Farm.objects.filter(id=at_delivery.id))
+        assert list(distances) == [at_delivery.id]
+
+
+class TestProximityRecommendations:
+    """get_farms_for_order() with and without a delivery point."""
+
+    def test_match_score_prefers_closer_farm_at_equal_distress(self):
+        close = match_score(50, distance_km=5, radius_km=100, available=500, remaining_needed=800)
+        distant = match_score(50, distance_km=90, radius_km=100, available=500, remaining_needed=800)
+        assert close > distant
+
+    def test_recommendations_within_radius_carry_distance(self, make_farm, make_order):
+        make_farm(1, TEMA_OUTSKIRTS)
+        make_farm(2, ACCRA)
+        far = make_farm(3, KUMASI)
+        order = make_order(delivery_point=ACCRA, delivery_radius_km=Decimal('100'))
+
+        result = get_distress_service().get_farms_for_order(order)
+
+        farm_ids = [r['farm_id'] for r in result['recommendations']]
+        assert str(far.id) not in farm_ids
+        assert len(farm_ids) == 2
+        assert all(r['distance_km'] is not None for r in result['recommendations'])
+        scores = [r['match_score'] for r in result['recommendations']]
+        assert scores == sorted(scores, reverse=True)
+        assert result['order']['delivery_radius_km'] == 100
+
+    def test_order_without_delivery_point_keeps_all_farms(self, make_farm, make_order):
+        make_farm(1, TEMA_OUTSKIRTS)
+        make_farm(3, KUMASI)
+        order = make_order()
+
+        result = get_distress_service().get_farms_for_order(order)
+
+        assert len(result['recommendations']) == 2
+        assert 'distance_km' not in result['recommendations'][0]
+
+    def test_legacy_recommendations_respect_delivery_radius(self, make_farm, make_order):
+        from procurement.services.procurement_workflow import ProcurementWorkflowService
+
+        near = make_farm(1, TEMA_OUTSKIRTS)
+        at_delivery = make_farm(2, ACCRA)
+        make_farm(3, KUMASI)
+        order = make_order(delivery_point=ACCRA, delivery_radius_km=Decimal('100'))
+
+        result = ProcurementWorkflowService().recommend_farms(order, limit=5, prioritize_distress=False)
+
+        assert [r['farm'].id for r in result] == [at_delivery.id, near.id]
+        assert result[0]['distance_km'] == 0
@@ -0,0 +1,398 @@
+"""
+Test Suite for the Public Marketplace Endpoints
+
+Tests cover:
+1. Full-text product search (ranked, prefix and typo tolerant)
+2. Full-text farm search
+3. Search vectors kept in sync on product/farm save
+4. Query-count regression: each public page costs a constant number of
+   queries regardless of how many products/farms it renders
+5. Cached home page / location facets and their invalidation
+
+Run with: pytest tests/integration/test_public_marketplace.py -v
+"""
+
+import uuid
+from decimal import Decimal
+
+import pytest
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+BASE_URL = '/api/public/marketplace'
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Public responses are cached; keep tests isolated."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def subscription_plan(db):
+    from subscriptions.models import SubscriptionPlan
+    plan, _ = SubscriptionPlan.objects.get_or_create(
+        name='Public Marketplace Test Plan',
+        defaults={
+            'description': 'Marketplace access',
+            'price_monthly': Decimal('50.00'),
+            'trial_period_days': 14,
+        }
+    )
+    return plan
+
+
+@pytest.fixture
+def product_category(db):
+    from sales_revenue.marketplace_models import ProductCategory
+    category, _ = ProductCategory.objects.get_or_create(
+        name='Eggs',
+        defaults={'slug': 'eggs', 'is_active': True}
+    )
+    return category
+
+
+@pytest.fixture
+def make_subscribed_farm(db, subscription_plan):
+    """Factory creating an active farm with an active marketplace subscription."""
+    from farms.models import Farm, FarmLocation
+    from subscriptions.models import Subscription
+    from django.contrib.gis.geos import Point
+
+    def _make(farm_name=None, region='Greater Accra', constituency='Tema West'):
+        uid = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(
+            username=f'mkt_farmer_{uid}',
+            email=f'mkt_{uid}@example.com',
+            password='testpass123',
+            role='FARMER',
+            phone=f'+23324{uid[:7].translate(str.maketrans("abcdef", "123456"))}',
+        )
+        farm = Farm.objects.create(
+            user=user,
+            first_name='Test',
+            last_name='Farmer',
+            date_of_birth='1990-01-01',
+            gender='Male',
+            ghana_card_number=f'GHA-{uid.upper()}-1',
+            primary_phone=user.phone,
+            residential_address='Test Address, Accra',
+            primary_constituency=constituency,
+            nok_full_name='Test NOK',
+            nok_relationship='Parent',
+            nok_phone='+233241000000',
+            education_level='Tertiary',
+            literacy_level='Can Read & Write',
+            years_in_poultry=5,
+            farm_name=farm_name or f'Test Farm {uid}',
+            ownership_type='Sole Proprietorship',
+            tin=f'C00{uid[:5].upper()}0',
+            total_bird_capacity=1000,
+            number_of_poultry_houses=2,
+            housing_type='Deep Litter',
+            total_infrastructure_value_ghs=25000.00,
+            primary_production_type='Layers',
+            planned_production_start_date='2025-01-01',
+            initial_investment_amount=50000.00,
+            funding_source=['Personal Savings'],
+            monthly_operating_budget=5000.00,
+            expected_monthly_revenue=8000.00,
+            application_status='Approved',
+            farm_status='Active',
+            marketplace_enabled=True,
+        )
+        FarmLocation.objects.create(
+            farm=farm,
+            gps_address_string=f'GA-{uid[:4]}-{uid[4:8]}',
+            location=Point(-0.1870, 5.6037),
+            region=region,
+            district='Tema Metropolitan',
+            constituency=constituency,
+            community='Community 1',
+            road_accessibility='All Year',
+            land_size_acres=Decimal('2.00'),
+            land_ownership_status='Owned',
+            is_primary_location=True,
+        )
+        today = timezone.now().date()
+        Subscription.objects.create(
+            farm=farm,
+            plan=subscription_plan,
+            status='active',
+            start_date=today,
+            current_period_start=today,
+            current_period_end=today + relativedelta(months=1),
+            next_billing_date=today + relativedelta(months=1),
+        )
+        return farm
+
+    return _make
+
+
+@pytest.fixture
+def make_product(db, product_category):
+    from sales_revenue.marketplace_models import Product
+
+    def _make(farm, name, description='', tags=None, stock=50):
+        return Product.objects.create(
+            farm=farm,
+            category=product_category,
+            name=name,
+            description=description,
+            tags=tags or [],
+            price=Decimal('35.00'),
+            unit='crate',
+            stock_quantity=stock,
+            status='active',
+        )
+
+    return _make
+
+
+def _result_names(response):
+    data = response.data
+    rows = data['results'] if isinstance(data, dict) and 'results' in data else data
+    return [row.get('name') or row.get('farm_name') for row in rows]
+
+
+# =============================================================================
+# FULL-TEXT SEARCH
+# =============================================================================
+
+@pytest.mark.django_db
+class TestPublicProductSearch:
+
+    def test_search_matches_name_description_tags_and_farm(self, api_client, make_subscribed_farm, make_product):
+        farm = make_subscribed_farm(farm_name='Sunrise Poultry Farm')
+        make_product(farm, 'Fresh Brown Eggs', description='Collected daily')
+        make_product(farm, 'Broiler Meat', description='Dressed chicken', tags=['frozen'])
+        other = make_subscribed_farm(farm_name='Valley Birds')
+        make_product(other, 'Guinea Fowl', description='Live birds')
+
+        assert _result_names(api_client.get(f'{BASE_URL}/products/search/', {'q': 'eggs'})) == ['Fresh Brown Eggs']
+        assert _result_names(api_client.get(f'{BASE_URL}/products/search/', {'q': 'frozen'})) == ['Broiler Meat']
+        assert set(_result_names(api_client.get(f'{BASE_URL}/products/search/', {'q': 'sunrise'}))) == {
+            'Fresh Brown Eggs', 'Broiler Meat'
+        }
+
+    def test_search_supports_prefix_matching(self, api_client, make_subscribed_farm, make_product):
+        farm = make_subscribed_farm()
+        make_product(farm, 'Fresh Brown Eggs')
+
+        response = api_client.get(f'{BASE_URL}/products/search/', {'q': 'fre bro'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert _result_names(response) == ['Fresh Brown Eggs']
+
+    def test_search_tolerates_typos_in_farm_name(self, api_client, make_subscribed_farm, make_product):
+        farm = make_subscribed_farm(farm_name='Kwabena Poultry')
+        make_product(farm, 'Layer Eggs')
+
+        response = api_client.get(f'{BASE_URL}/products/search/', {'q': 'Kwabina Poultry'})
+
+        assert _result_names(response) == ['Layer Eggs']
+
+    def test_search_ranks_name_matches_above_description_matches(self, api_client, make_subscribed_farm, make_product):
+        farm = make_subscribed_farm()
+        make_product(farm, 'Organic Feed Bundle', description='Great with eggs')
+        make_product(farm, 'Organic Eggs')
+
+        names = _result_names(api_client.get(f'{BASE_URL}/products/search/', {'q': 'eggs'}))
+
+        assert names[0] == 'Organic Eggs'
+
+    def test_product_list_accepts_q_parameter(self, api_client, make_subscribed_farm, make_product):
+        farm = make_subscribed_farm()
+        make_product(farm, 'Fresh Brown Eggs')
+        make_product(farm, 'Guinea Fowl')
+
+        response = api_client.get(f'{BASE_URL}/products/', {'q': 'eggs'})
+
+        assert _result_names(response) == ['Fresh Brown Eggs']
+
+    def test_renamed_product_is_reindexed(self, api_client, make_subscribed_farm, make_product):
+        farm = make_subscribed_farm()
+        product = make_product(farm, 'Guinea Fowl')
+        product.name = 'Quail Eggs'
+        product.save()
+
+        assert _result_names(api_client.get(f'{BASE_URL}/products/search/', {'q': 'quail'})) == ['Quail Eggs']
+
+    def test_stock_only_save_does_not_touch_search_vector(self, make_subscribed_farm, make_product,
+                                                           django_assert_num_queries):
+        farm = make_subscribed_farm()
+        product = make_product(farm, 'Fresh Eggs')
+        product.stock_quantity = 10
+
+        with django_assert_num_queries(1):
+            product.save(update_fields=['stock_quantity'])
+
+    def test_renamed_farm_reindexes_products(self, api_client, make_subscribed_farm, make_product):
+        farm = make_subscribed_farm(farm_name='Old Name Farm')
+        make_product(farm, 'Layer Eggs')
+        farm.farm_name = 'Golden Harvest Farm'
+        farm.save()
+
+        assert _result_names(api_client.get(f'{BASE_URL}/products/search/', {'q': 'golden'})) == ['Layer Eggs']
+
+    def test_unchanged_farm_save_leaves_product_vectors(self, make_subscribed_farm, make_product):
+        from sales_revenue.marketplace_models import Product
+
+        farm = make_subscribed_farm(farm_name='Steady Farm')
+        product = make_product(farm, 'Layer Eggs')
+        Product.objects.filter(pk=product.pk).update(search_vector=None)
+
+        farm.save()
+
+        assert Product.objects.get(pk=product.pk).search_vector is None
+
+
+@pytest.mark.django_db
+class TestPublicFarmSearch:
+
+    def test_farm_search_is_typo_tolerant(self, api_client, make_subscribed_farm, make_product):
+        farm = make_subscribed_farm(farm_name='Asante Layers Farm')
+        make_product(farm, 'Layer Eggs')
+        other = make_subscribed_farm(farm_name='Volta Broilers')
+        make_product(other, 'Broiler Meat')
+
+        response = api_client.get(f'{BASE_URL}/farms/', {'q': 'Asanti Layers'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert _result_names(response) == ['Asante Layers Farm']
+
+    def test_region_filter_does_not_duplicate_farms(self, api_client, make_subscribed_farm, make_product):
+        farm = make_subscribed_farm(region='Ashanti')
+        make_product(farm, 'Layer Eggs')
+        make_product(farm, 'Broiler Meat')
+
+        response = api_client.get(f'{BASE_URL}/farms/', {'region': 'ashanti'})
+
+        assert len(_result_names(response)) == 1
+
+
+# =============================================================================
+# QUERY-COUNT REGRESSION
+# =============================================================================
+
+def _count_queries(client, url, params=None):
+    cache.clear()
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, params or {})
+    assert response.status_code == status.HTTP_200_OK, response.data
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+class TestPublicMarketplaceQueryCounts:
+    """Adding farms/products must not add queries to a public page."""
+
+    def _seed(self, make_subscribed_farm, make_product, farms, products_per_farm):
+        created = []
+        for f in range(farms):
+            farm = make_subscribed_farm()
+            for p in range(products_per_farm):
+                make_product(farm, f'Fresh Eggs {f}-{p}')
+            created.append(farm)
+        return created
+
+    @pytest.mark.parametrize('path,params', [
+        ('/products/', {}),
+        ('/products/search/', {}),
+        ('/products/search/', {'q': 'eggs'}),
+        ('/farms/', {}),
+        ('/', {}),
+    ])
+    def test_list_endpoints_are_constant_query(self, api_client, make_subscribed_farm, make_product,
+                                               path, params):
+        self._seed(make_subscribed_farm, make_product, farms=1, products_per_farm=1)
+        baseline = _count_queries(api_client, f'{BASE_URL}{path}', params)
+
+        self._seed(make_subscribed_farm, make_product, farms=4, products_per_farm=3)
+        scaled = _count_queries(api_client, f'{BASE_URL}{path}', params)
+
+        assert scaled == baseline
+
+    def test_farm_products_is_constant_query(self, api_client, make_subscribed_farm, make_product):
+        farm = make_subscribed_farm()
+        make_product(farm, 'Fresh Eggs 0')
+        url = f'{BASE_URL}/farms/{farm.id}/products/'
+        baseline = _count_queries(api_client, url)
+
+        for i in range(1, 6):
+            make_product(farm, f'Fresh Eggs {i}')
+
+        assert _count_queries(api_client, url) == baseline
+
+    def test_farm_serializer_uses_prefetched_locations(self, api_client, make_subscribed_farm, make_product):
+        farm = make_subscribed_farm(region='Ashanti')
+        make_product(farm, 'Layer Eggs')
+
+        response = api_client.get(f'{BASE_URL}/products/')
+        row = response.data['results'][0]
+
+        assert row['farm']['region'] == 'Ashanti'
+        assert row['farm']['total_products'] == 1
+
+
+# =============================================================================
+# CACHED HOME PAGE & FACETS
+# =============================================================================
+
+@pytest.mark.django_db
+class TestPublicMarketplaceCaching:
+
+    @pytest.mark.parametrize('path', ['/', '/locations/', '/locations/?region=Greater Accra'])
+    def test_repeat_requests_are_served_from_cache(self, api_client, make_subscribed_farm, make_product, path):
+        farm = make_subscribed_farm()
+        make_product(farm, 'Fresh Eggs')
+        first = api_client.get(f'{BASE_URL}{path}')
+
+        with CaptureQueriesContext(connection) as ctx:
+            second = api_client.get(f'{BASE_URL}{path}')
+
+        assert len(ctx.captured_queries) == 0
+        assert second.data == first.data
+
+    def test_product_change_invalidates_home(self, api_client, make_subscribed_farm, make_product,
+                                             django_capture_on_commit_callbacks):
+        farm = make_subscribed_farm()
+        make_product(farm, 'Fresh Eggs')
+        api_client.get(f'{BASE_URL}/')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            make_product(farm, 'Quail Eggs')
+
+        response = api_client.get(f'{BASE_URL}/')
+        assert 'Quail Eggs' in [p['name'] for p in response.data['latest_products']]
+
+    def test_new_location_invalidates_facets(self, api_client, make_subscribed_farm, make_product,
+                                             django_capture_on_commit_callbacks):
+        farm = make_subscribed_farm(region='Greater Accra')
+        make_product(farm, 'Fresh Eggs')
+        assert api_client.get(f'{BASE_URL}/locations/').data['regions'] == ['Greater Accra']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            other = make_subscribed_farm(region='Volta')
+            make_product(other, 'Guinea Fowl')
+
+        assert api_client.get(f'{BASE_URL}/locations/').data['regions'] == ['Greater Accra', 'Volta']
@@ -0,0 +1,77 @@
+"""
+Tests for the opt-in query instrumentation middleware.
+
+Run with: pytest tests/integration/test_query_instrumentation.py -v
+"""
+
+import json
+
+import pytest
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def profiled(tmp_path):
+    """Profile every request into a temporary store."""
+    from core import query_instrumentation
+    
+    store = tmp_path / 'profiles.jsonl'
+    with override_settings(
+        QUERY_INSTRUMENTATION_ENABLED=True,
+        QUERY_INSTRUMENTATION_SAMPLE_RATE=1.0,
+        QUERY_PROFILE_STORE=str(store),
+    ):
+        yield store
+    # The store handler is bound to the first path it was opened with
+    for handler in list(query_instrumentation.sample_logger.handlers):
+        query_instrumentation.sample_logger.removeHandler(handler)
+        handler.close()
+
+
+class TestRequestProfile:
+    """Test query counting and repeated-statement detection."""
+    
+    def test_repeated_statements_detected(self, django_user_model):
+        from django.db import connection
+        from core.query_instrumentation import RequestProfile
+        
+        profile = RequestProfile()
+        with connection.execute_wrapper(profile):
+            for i in range(6):
+                django_user_model.objects.filter(pk=i).exists()
+            django_user_model.objects.filter(pk=1).exists()
+        
+        assert profile.queries == 7
+        assert profile.sql_ms >= 0
+        [(sql, count)] = profile.repeated_statements(threshold=5)
+        assert count == 7
+        assert profile.identical_queries() == 1
+
+
+class TestMiddleware:
+    """Test headers and the sample store."""
+    
+    def test_disabled_by_default(self):
+        response = APIClient().get('/api/public/marketplace/products/')
+        
+        assert 'Server-Timing' not in response
+    
+    def test_sampled_request_is_profiled(self, profiled):
+        response = APIClient().get('/api/public/marketplace/products/')
+        
+        assert 'db;dur=' in response['Server-Timing']
+        [sample] = [json.loads(line) for line in profiled.read_text().splitlines()]
+        assert sample['endpoint'].startswith('GET ')
+        assert sample['queries'] >= 1
+        assert sample['status'] == response.status_code
+    
+    def test_report_command_lists_endpoints(self, profiled, capsys):
+        from django.core.management import call_command
+        
+        APIClient().get('/api/public/marketplace/products/')
+        call_command('query_profile_report', store=str(profiled))
+        
+        assert 'marketplace/products' in capsys.readouterr().out
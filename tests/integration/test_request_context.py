@@ -0,0 +1,85 @@
+"""
+Tests for cached JWT principals and the per-request context.
+
+Run with: pytest tests/integration/test_request_context.py -v
+"""
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def farmer(django_user_model):
+    return django_user_model.objects.create_user(
+        username='ctx_farmer',
+        email='ctx_farmer@example.com',
+        password='testpass123',
+        role='FARMER',
+        region='Ashanti',
+        constituency='Subin',
+    )
+
+
+def _client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    return client
+
+
+def _user_queries(captured, user_model):
+    table = user_model._meta.db_table
+    return [q['sql'] for q in captured.captured_queries if f'"{table}"' in q['sql']]
+
+
+class TestCachedJWTAuthentication:
+    """Test that the user is loaded once and reloaded after writes."""
+
+    def test_warm_request_does_not_query_user(self, farmer, django_user_model):
+        client = _client(farmer)
+        client.get('/api/flocks/')
+
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get('/api/flocks/')
+
+        # Farmer without a farm: resolved from the cached principal too
+        assert response.status_code == 404
+        assert _user_queries(captured, django_user_model) == []
+
+    def test_user_save_invalidates_principal(self, farmer, django_capture_on_commit_callbacks):
+        client = _client(farmer)
+        assert client.get('/api/flocks/').status_code == 404
+
+        with django_capture_on_commit_callbacks(execute=True):
+            farmer.is_active = False
+            farmer.save()
+
+        assert client.get('/api/flocks/').status_code == 401
+
+
+class TestRequestContext:
+    """Test the memoized request context."""
+
+    def test_context_is_built_once_per_request(self, farmer, rf):
+        from accounts.request_context import get_request_context
+
+        request = rf.get('/')
+        request.user = farmer
+        context = get_request_context(request)
+
+        assert get_request_context(request) is context
+        assert context.role == 'FARMER'
+        assert context.jurisdiction == ('Ashanti', None, 'Subin')
+        assert context.farm is None
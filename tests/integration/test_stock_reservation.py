@@ -0,0 +1,233 @@
+"""
+Tests for batched basket stock reservation
+(sales_revenue.services.stock_reservation).
+
+Run with: pytest tests/integration/test_stock_reservation.py -v
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from sales_revenue.inventory_models import (
+    FarmInventory,
+    InventoryBatch,
+    InventoryCategory,
+    StockMovement,
+    StockMovementType,
+)
+from sales_revenue.services.stock_reservation import (
+    InsufficientStock,
+    release_stock,
+    reserve_stock,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def farm(farm_factory):
+    return farm_factory('reservation')
+
+
+@pytest.fixture
+def products(farm):
+    """Ten egg products without inventories, 40 in stock each."""
+    from sales_revenue.marketplace_models import Product, ProductCategory
+
+    category, _ = ProductCategory.objects.get_or_create(
+        name='Eggs', defaults={'slug': 'eggs', 'is_active': True}
+    )
+    return [
+        Product.objects.create(
+            farm=farm,
+            category=category,
+            name=f'Fresh Eggs {size}',
+            price=Decimal('35.00'),
+            unit='crate',
+            stock_quantity=40,
+            track_inventory=True,
+            status='active',
+        )
+        for size in range(10)
+    ]
+
+
+@pytest.fixture
+def batched_product(farm, products):
+    """A product whose inventory holds two batches: 30 (6 days old) and 20 (2 days old)."""
+    product = products[0]
+    inventory = FarmInventory.objects.create(
+        farm=farm,
+        category=InventoryCategory.EGGS,
+        product_name=product.name,
+        marketplace_product=product,
+        unit_cost=Decimal('20.00'),
+    )
+    today = timezone.now().date()
+    for age, quantity in [(6, 30), (2, 20)]:
+        inventory.add_stock(
+            quantity=quantity,
+            movement_type=StockMovementType.PRODUCTION,
+            stock_date=today - timedelta(days=age),
+            create_batch=True,
+        )
+    return product
+
+
+def _lines(products, quantity, **extra):
+    return [{'product_id': product.id, 'quantity': quantity, **extra} for product in products]
+
+
+class TestReserveStock:
+    """Reserving a basket takes stock for every line at once."""
+
+    def test_creates_inventories_and_sale_movements(self, products):
+        movements = reserve_stock(_lines(products, 3, notes='Basket'))
+
+        assert len(movements) == len(products)
+        for product in products:
+            product.refresh_from_db()
+            inventory = FarmInventory.objects.get(marketplace_product=product)
+            assert inventory.quantity_available == Decimal('37')
+            assert inventory.total_sold == Decimal('3')
+            assert inventory.total_revenue == Decimal('105.00')
+            assert product.stock_quantity == 37
+        assert StockMovement.objects.filter(
+            movement_type=StockMovementType.SALE, notes='Basket'
+        ).count() == len(products)
+
+    def test_repeated_product_is_checked_against_combined_quantity(self, products):
+        with pytest.raises(InsufficientStock):
+            reserve_stock(_lines([products[0], products[0]], 25))
+
+        assert not FarmInventory.objects.filter(marketplace_product=products[0]).exists()
+
+    def test_short_line_writes_nothing(self, products):
+        lines = _lines(products[:3], 5) + _lines(products[3:4], 41)
+
+        with pytest.raises(InsufficientStock) as error:
+            reserve_stock(lines)
+
+        assert "Available: 40, Requested: 41" in str(error.value)
+        assert not StockMovement.objects.exists()
+        products[0].refresh_from_db()
+        assert products[0].stock_quantity == 40
+
+    def test_batches_are_consumed_fifo_across_lines(self, batched_product):
+        first, second = reserve_stock(_lines([batched_product, batched_product], 20))
+
+        assert [Decimal(a['quantity']) for a in first.batch_allocations] == [20]
+        assert [Decimal(a['quantity']) for a in second.batch_allocations] == [10, 10]
+        assert second.balance_after == Decimal('10')
+        remaining = InventoryBatch.objects.filter(
+            inventory__marketplace_product=batched_product, is_depleted=False
+        )
+        assert list(remaining.values_list('current_quantity', flat=True)) == [Decimal('10')]
+        inventory = FarmInventory.objects.get(marketplace_product=batched_product)
+        assert inventory.oldest_stock_date == timezone.now().date() - timedelta(days=2)
+        assert inventory.batched_quantity == Decimal('10')
+
+    def test_query_count_does_not_grow_with_basket(self, products):
+        reserve_stock(_lines(products, 1))
+
+        with CaptureQueriesContext(connection) as small:
+            reserve_stock(_lines(products[:2], 1))
+        with CaptureQueriesContext(connection) as large:
+            reserve_stock(_lines(products, 1))
+
+        assert len(large.captured_queries) == len(small.captured_queries)
+
+    def test_untracked_products_are_skipped(self, products):
+        products[0].track_inventory = False
+        products[0].save()
+
+        assert reserve_stock(_lines(products[:1], 100)) == []
+
+
+class TestReleaseStock:
+    """Releasing a basket gives its stock back."""
+
+    def test_restores_inventory_with_return_movements(self, products):
+        reserve_stock(_lines(products[:2], 10))
+
+        movements = release_stock(_lines(products[:2], 4, notes='Cancelled'))
+
+        assert [m.movement_type for m in movements] == [StockMovementType.RETURN] * 2
+        for product in products[:2]:
+            product.refresh_from_db()
+            assert product.stock_quantity == 34
+
+    def test_unlinked_product_is_restored_directly(self, products):
+        from sales_revenue.marketplace_models import Product
+
+        Product.objects.filter(pk=products[0].pk).update(stock_quantity=0, status='out_of_stock')
+
+        assert release_stock(_lines(products[:1], 5)) == []
+
+        products[0].refresh_from_db()
+        assert products[0].stock_quantity == 5
+        assert products[0].status == 'active'
+
+
+@pytest.mark.django_db(transaction=True)
+class TestExpirySweepConcurrency:
+    """The expiry sweep takes locks in checkout order."""
+
+    def test_sweep_and_reservation_of_same_product_do_not_deadlock(self, batched_product):
+        import threading
+        import time
+
+        from django.db import connections, transaction
+
+        from sales_revenue.marketplace_models import Product
+        from sales_revenue.services.inventory_expiry import sweep_expired_inventory
+
+        inventory = FarmInventory.objects.get(marketplace_product=batched_product)
+        InventoryBatch.objects.filter(inventory=inventory).update(
+            expiry_date=timezone.now().date() - timedelta(days=1)
+        )
+        product_locked = threading.Event()
+        errors = []
+        swept = {}
+
+        def reserve():
+            # Checkout order: the product first, then (in reserve_stock) its inventory
+            try:
+                with transaction.atomic():
+                    Product.objects.select_for_update().get(pk=batched_product.pk)
+                    product_locked.set()
+                    time.sleep(0.5)  # let the sweep reach its locks
+                    reserve_stock(_lines([batched_product], 5))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        def sweep():
+            try:
+                swept.update(sweep_expired_inventory())
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        reserver = threading.Thread(target=reserve)
+        reserver.start()
+        assert product_locked.wait(5)
+        sweeper = threading.Thread(target=sweep)
+        sweeper.start()
+        reserver.join(10)
+        sweeper.join(10)
+
+        assert errors == []
+        # The sweep waited for the sale, then wrote off what it left
+        assert swept['batches'] == 2
+        assert swept['quantity'] == Decimal('45')
+        inventory.refresh_from_db()
+        assert inventory.quantity_available == Decimal('0')
+        assert inventory.total_sold == Decimal('5')
@@ -0,0 +1,3 @@
+"""
+Query-count and latency budget harness for hot API endpoints.
+"""
@@ -0,0 +1,175 @@
+"""
+Per-endpoint query and latency budgets.
+
+Each hot endpoint is requested against the seeded dataset of
+test_query_budgets.py with an empty cache (the cold path, where N+1
+queries show up) and must stay within:
+
+    max_queries  database queries of one request (exact, deterministic)
+    max_ms       wall time of the fastest of LATENCY_RUNS requests
+
+Query budgets are the regression gate: a serializer or service that starts
+querying per row pushes the count past its budget. The max_queries below
+are ceilings; an endpoint whose count has been measured is held to its
+count in baseline.json plus QUERY_HEADROOM instead (query_budget()). Latency budgets are
+deliberately loose ceilings for catching order-of-magnitude regressions.
+Wall time depends on the machine, so they are only asserted when
+QUERY_BUDGET_LATENCY=1 is set (scale them on slow machines with
+QUERY_BUDGET_LATENCY_FACTOR); the default test run checks query counts.
+
+Record the baseline from a run, and again in any change that makes an
+endpoint cheaper, so the gain cannot silently regress:
+
+    QUERY_BUDGET_REPORT=perf/run.json pytest tests/performance/
+    python -m tests.performance.report perf/run.json --write-baseline
+"""
+
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+LATENCY_RUNS = 3
+
+# Measured query counts per endpoint (report.py --write-baseline)
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+# Queries allowed over the measured count
+QUERY_HEADROOM = 2
+
+# Environment: write results of a run to this JSON file
+REPORT_ENV = 'QUERY_BUDGET_REPORT'
+# Environment: set to 1 to assert max_ms (and time LATENCY_RUNS requests)
+LATENCY_ENV = 'QUERY_BUDGET_LATENCY'
+# Environment: multiply every max_ms (e.g. 2 on a slow CI runner)
+LATENCY_FACTOR_ENV = 'QUERY_BUDGET_LATENCY_FACTOR'
+
+# client: which seeded principal makes the request
+#   farmer, national_admin, procurement_officer, institutional, anonymous
+ENDPOINT_BUDGETS = {
+    # Farmer app
+    'flocks.list': {
+        'path': '/api/flocks/',
+        'client': 'farmer',
+        'max_queries': 12,
+        'max_ms': 800,
+    },
+    'flocks.daily_production': {
+        'path': '/api/flocks/production/',
+        'client': 'farmer',
+        'max_queries': 12,
+        'max_ms': 800,
+    },
+
+    # Public marketplace
+    'marketplace.home': {
+        'path': '/api/public/marketplace/',
+        'client': 'anonymous',
+        'max_queries': 15,
+        'max_ms': 800,
+    },
+    'marketplace.products': {
+        'path': '/api/public/marketplace/products/',
+        'client': 'anonymous',
+        'max_queries': 10,
+        'max_ms': 800,
+    },
+    'marketplace.farms': {
+        'path': '/api/public/marketplace/farms/',
+        'client': 'anonymous',
+        'max_queries': 10,
+        'max_ms': 800,
+    },
+
+    # National admin reports
+    'reports.executive': {
+        'path': '/api/admin/reports/executive/',
+        'client': 'national_admin',
+        'max_queries': 60,
+        'max_ms': 2500,
+    },
+    'reports.production': {
+        'path': '/api/admin/reports/production/',
+        'client': 'national_admin',
+        'max_queries': 40,
+        'max_ms': 2000,
+    },
+    'reports.flock_health': {
+        'path': '/api/admin/reports/flock-health/',
+        'client': 'national_admin',
+        'max_queries': 40,
+        'max_ms': 2000,
+    },
+
+    # Procurement distress recommendations
+    'procurement.distressed_farmers': {
+        'path': '/api/admin/procurement/distressed-farmers/',
+        'client': 'procurement_officer',
+        'max_queries': 80,
+        'max_ms': 3000,
+    },
+    'procurement.recommend_farms': {
+        'path': '/api/admin/procurement/orders/{order_id}/recommend-farms/',
+        'client': 'procurement_officer',
+        'max_queries': 80,
+        'max_ms': 3000,
+    },
+
+    # Institutional data API
+    'institutional.production_overview': {
+        'path': '/api/institutional/production/overview/',
+        'client': 'institutional',
+        'max_queries': 20,
+        'max_ms': 1500,
+    },
+    'institutional.regions': {
+        'path': '/api/institutional/production/regions/',
+        'client': 'institutional',
+        'max_queries': 20,
+        'max_ms': 1500,
+    },
+    'institutional.farms_performance': {
+        'path': '/api/institutional/farms/performance/',
+        'client': 'institutional',
+        'max_queries': 25,
+        'max_ms': 1500,
+    },
+}
+
+
+@lru_cache(maxsize=None)
+def measured_baseline():
+    """{endpoint: {'queries': n}} from baseline.json ({} until one is recorded)."""
+    if not BASELINE_PATH.exists():
+        return {}
+    return load_results(BASELINE_PATH)['endpoints']
+
+
+def query_budget(name):
+    """Measured count plus headroom if recorded, capped by the max_queries ceiling."""
+    ceiling = ENDPOINT_BUDGETS[name]['max_queries']
+    measured = measured_baseline().get(name)
+    if measured is None:
+        return ceiling
+    return min(ceiling, measured['queries'] + QUERY_HEADROOM)
+
+
+def latency_budgets_enabled():
+    return os.environ.get(LATENCY_ENV, '').lower() in ('1', 'true', 'yes')
+
+
+def latency_factor():
+    try:
+        return float(os.environ.get(LATENCY_FACTOR_ENV, 1))
+    except ValueError:
+        return 1.0
+
+
+def write_results(results, path):
+    """Write the measurements of a run (see test_query_budgets.py)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, sort_keys=True), encoding='utf-8')
+
+
+def load_results(path):
+    return json.loads(Path(path).read_text(encoding='utf-8'))
@@ -0,0 +1,162 @@
+"""
+Print query budget results, or compare two runs.
+
+Usage:
+    python -m tests.performance.report after.json
+    python -m tests.performance.report before.json after.json
+    python -m tests.performance.report after.json --suggest
+    python -m tests.performance.report after.json --write-baseline
+
+Result files are written by test_query_budgets.py when QUERY_BUDGET_REPORT
+is set. With two files every endpoint is listed with its query count and
+latency in both runs and the change; --suggest prints budgets for
+budgets.ENDPOINT_BUDGETS from the (last) run, with headroom.
+--write-baseline stores the query counts of the (last) run in
+budgets.BASELINE_PATH, which the budget test then holds endpoints to.
+"""
+
+import argparse
+import math
+import sys
+
+from .budgets import BASELINE_PATH, ENDPOINT_BUDGETS, QUERY_HEADROOM, load_results, write_results
+
+# Headroom of suggested budgets over a measured run
+SUGGEST_QUERY_HEADROOM = QUERY_HEADROOM
+SUGGEST_LATENCY_FACTOR = 3
+SUGGEST_LATENCY_MIN_MS = 200
+
+
+def _status(result):
+    if result is None:
+        return 'missing'
+    if result['status'] != 200:
+        return f"HTTP {result['status']}"
+    if result['queries'] > result['max_queries']:
+        return 'OVER QUERIES'
+    if result['ms'] > result['max_ms']:
+        return 'OVER TIME'
+    return 'ok'
+
+
+def _delta(before, after, percent=False):
+    if before is None or after is None:
+        return ''
+    change = after - before
+    if percent:
+        if not before:
+            return ''
+        return f'{change / before * 100:+.0f}%'
+    return f'{change:+g}' if change else '='
+
+
+def _table(headers, rows):
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+
+    def line(cells):
+        return '  '.join(str(cell).ljust(width) for cell, width in zip(cells, widths)).rstrip()
+
+    return '\n'.join([line(headers), line('-' * width for width in widths)] + [line(row) for row in rows])
+
+
+def single_run_table(run):
+    rows = []
+    for name, result in sorted(run['endpoints'].items()):
+        rows.append([
+            name,
+            f"{result['queries']}/{result['max_queries']}",
+            f"{result['ms']:g}/{result['max_ms']:g}",
+            f"{result['sql_ms']:g}",
+            len(result.get('repeated', [])),
+            _status(result),
+        ])
+    return _table(['endpoint', 'queries/budget', 'ms/budget', 'sql ms', 'repeated', 'status'], rows)
+
+
+def comparison_table(before, after):
+    names = sorted(set(before['endpoints']) | set(after['endpoints']))
+    rows = []
+    for name in names:
+        old = before['endpoints'].get(name)
+        new = after['endpoints'].get(name)
+        rows.append([
+            name,
+            old['queries'] if old else '-',
+            new['queries'] if new else '-',
+            _delta(old and old['queries'], new and new['queries']),
+            f"{old['ms']:g}" if old else '-',
+            f"{new['ms']:g}" if new else '-',
+            _delta(old and old['ms'], new and new['ms'], percent=True),
+            _status(new),
+        ])
+    return _table(
+        ['endpoint', 'queries before', 'after', 'change', 'ms before', 'after', 'change', 'status'],
+        rows,
+    )
+
+
+def suggest_budgets(run):
+    """Budgets with headroom over a measured run, keyed like ENDPOINT_BUDGETS."""
+    suggestions = {}
+    for name, result in sorted(run['endpoints'].items()):
+        suggestions[name] = {
+            'max_queries': result['queries'] + SUGGEST_QUERY_HEADROOM,
+            'max_ms': max(
+                SUGGEST_LATENCY_MIN_MS,
+                int(math.ceil(result['ms'] * SUGGEST_LATENCY_FACTOR / 100.0)) * 100,
+            ),
+        }
+    return suggestions
+
+
+def baseline_from_run(run):
+    """Query counts of the endpoints that answered 200, in baseline.json form."""
+    return {
+        'generated_at': run.get('generated_at'),
+        'endpoints': {
+            name: {'queries': result['queries']}
+            for name, result in sorted(run['endpoints'].items())
+            if result['status'] == 200
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('results', nargs='+', help='One result file, or a baseline and a new run')
+    parser.add_argument('--suggest', action='store_true', help='Print budgets from the (last) run')
+    parser.add_argument(
+        '--write-baseline', action='store_true',
+        help=f'Record the query counts of the (last) run in {BASELINE_PATH.name}',
+    )
+    args = parser.parse_args(argv)
+
+    if len(args.results) > 2:
+        parser.error('Give one result file, or two to compare')
+
+    runs = [load_results(path) for path in args.results]
+    if len(runs) == 1:
+        print(single_run_table(runs[0]))
+    else:
+        print(comparison_table(*runs))
+
+    if args.suggest:
+        print('\nSuggested budgets:')
+        for name, budget in suggest_budgets(runs[-1]).items():
+            current = ENDPOINT_BUDGETS.get(name, {})
+            print(
+                f"  {name}: max_queries {current.get('max_queries', '-')} -> {budget['max_queries']}, "
+                f"max_ms {current.get('max_ms', '-')} -> {budget['max_ms']}"
+            )
+
+    if args.write_baseline:
+        baseline = baseline_from_run(runs[-1])
+        write_results(baseline, BASELINE_PATH)
+        print(f"\nWrote {len(baseline['endpoints'])} measured query counts to {BASELINE_PATH}")
+
+    failing = [name for name, result in runs[-1]['endpoints'].items() if _status(result) != 'ok']
+    return 1 if failing else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
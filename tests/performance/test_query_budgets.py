@@ -0,0 +1,325 @@
+"""
+Query-count and latency budgets for hot endpoints.
+
+Seeds a realistic multi-region dataset once per module (farms filled by
+scripts/generate_realistic_farm_data.py with fixed seeds), then requests
+every endpoint of budgets.ENDPOINT_BUDGETS with an empty cache and asserts
+its query count budget (and its latency budget when opted in).
+
+Run:
+    pytest tests/performance/
+
+Also assert the latency budgets (on a quiet machine):
+    QUERY_BUDGET_LATENCY=1 pytest tests/performance/
+
+Save a run and compare it with an earlier one:
+    QUERY_BUDGET_LATENCY=1 QUERY_BUDGET_REPORT=perf/after.json pytest tests/performance/
+    python -m tests.performance.report perf/before.json perf/after.json
+
+Record its query counts as the baseline the budgets are held to:
+    python -m tests.performance.report perf/after.json --write-baseline
+"""
+
+import os
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.query_instrumentation import RequestProfile
+from farms.models import Farm, FarmLocation
+from procurement.models import ProcurementOrder
+from scripts.generate_realistic_farm_data import generate_farm_data
+from subscriptions.institutional_models import (
+    InstitutionalAPIKey,
+    InstitutionalPlan,
+    InstitutionalSubscriber,
+)
+
+from .budgets import (
+    ENDPOINT_BUDGETS,
+    LATENCY_RUNS,
+    REPORT_ENV,
+    latency_budgets_enabled,
+    latency_factor,
+    query_budget,
+    write_results,
+)
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+SEED = 20260101
+SEED_DAYS = 30
+
+# (region, district, constituency, longitude, latitude)
+SEED_REGIONS = [
+    ('Greater Accra', 'Accra Metro', 'Ayawaso West', -0.19, 5.60),
+    ('Ashanti', 'Kumasi Metro', 'Kumasi Central', -1.62, 6.69),
+    ('Northern', 'Tamale Metro', 'Tamale Central', -0.85, 9.40),
+]
+FARMS_PER_REGION = 2
+
+REPEATED_STATEMENT_THRESHOLD = 5
+
+
+# =============================================================================
+# SEED DATA
+# =============================================================================
+
+def _create_user(username, role, **extra):
+    return User.objects.create_user(
+        username=username,
+        email=f'{username}@perf.test',
+        password='testpass123',
+        role=role,
+        **extra,
+    )
+
+
+def _create_farm(index, region, district, constituency, lng, lat):
+    user = _create_user(
+        f'perf_farmer_{index}', 'FARMER',
+        first_name=f'Farmer{index}', last_name='Perf', phone=f'+23324500{index:04d}',
+    )
+    farm = Farm.objects.create(
+        user=user,
+        farm_name=f'Perf Farm {index}',
+        primary_constituency=constituency,
+        farm_status='OPERATIONAL',
+        total_bird_capacity=2500,
+        subscription_type='standard',
+        marketplace_enabled=True,
+        ghana_card_number=f'GHA-7{index:08d}-{index % 10}',
+        primary_phone=f'+23350900{index:04d}',
+        tin=f'C0007{index:06d}',
+        paystack_subaccount_code=f'SUBAC_PERF{index:04d}',
+        date_of_birth='1990-01-01',
+        years_in_poultry=3,
+        number_of_poultry_houses=3,
+        total_infrastructure_value_ghs=30000,
+        planned_production_start_date='2024-01-01',
+        initial_investment_amount=35000,
+        funding_source=['government_grant'],
+        monthly_operating_budget=4000,
+        expected_monthly_revenue=12000,
+    )
+    FarmLocation.objects.create(
+        farm=farm,
+        gps_address_string=f'PF-{index:04d}-{1000 + index}',
+        location=Point(lng + index * 0.01, lat + index * 0.01),
+        region=region,
+        district=district,
+        constituency=constituency,
+        community=f'Perf Community {index}',
+        road_accessibility='All Year',
+        land_size_acres=Decimal('3.0'),
+        land_ownership_status='Owned',
+        is_primary_location=True,
+    )
+    generate_farm_data(user=user, days=SEED_DAYS, clear=False, seed=SEED + index, verbose=False)
+    return farm
+
+
+def _create_institutional_key():
+    plan = InstitutionalPlan.objects.create(
+        name='Perf Enterprise Plan',
+        tier='enterprise',
+        description='Full data access',
+        price_monthly=Decimal('5000.00'),
+        price_annually=Decimal('50000.00'),
+        requests_per_day=10000,
+        requests_per_month=100000,
+        access_regional_aggregates=True,
+        access_constituency_data=True,
+        access_production_trends=True,
+        access_market_prices=True,
+        access_mortality_data=True,
+        access_supply_forecasts=True,
+        access_individual_farm_data=True,
+    )
+    subscriber = InstitutionalSubscriber.objects.create(
+        organization_name='Perf Research Institute',
+        organization_category='research',
+        contact_name='Perf Contact',
+        contact_email='research@perf.test',
+        contact_phone='+233240999000',
+        plan=plan,
+        billing_cycle='monthly',
+        subscription_start=timezone.now().date(),
+        current_period_start=timezone.now().date(),
+        current_period_end=(timezone.now() + timedelta(days=30)).date(),
+        status='active',
+        data_use_purpose='Query budget harness',
+    )
+    _, full_key = InstitutionalAPIKey.generate_key(subscriber=subscriber, name='Perf Key')
+    return full_key
+
+
+def seed_platform():
+    """Create the farms, staff and subscribers the budgeted endpoints need."""
+    farms = []
+    for region_index, region in enumerate(SEED_REGIONS):
+        for i in range(FARMS_PER_REGION):
+            farms.append(_create_farm(region_index * FARMS_PER_REGION + i + 1, *region))
+
+    national_admin = _create_user('perf_national_admin', 'NATIONAL_ADMIN')
+    procurement_officer = _create_user('perf_procurement', 'PROCUREMENT_OFFICER')
+
+    order = ProcurementOrder.objects.create(
+        title='Perf Procurement Order',
+        description='Layers for the query budget harness',
+        production_type='Layers',
+        quantity_needed=1000,
+        unit='birds',
+        price_per_unit=Decimal('90.00'),
+        total_budget=Decimal('90000.00'),
+        delivery_location='Accra',
+        delivery_deadline=timezone.now().date() + timedelta(days=14),
+        created_by=procurement_officer,
+        assigned_procurement_officer=procurement_officer,
+        status='published',
+        priority='high',
+    )
+
+    return {
+        'farmer': farms[0].user,
+        'national_admin': national_admin,
+        'procurement_officer': procurement_officer,
+        'institutional_key': _create_institutional_key(),
+        'order_id': str(order.id),
+    }
+
+
+@pytest.fixture(scope='module')
+def seeded(django_db_setup, django_db_blocker):
+    """Seed once for the module; rolled back when the module finishes."""
+    with django_db_blocker.unblock():
+        with transaction.atomic():
+            yield seed_platform()
+            transaction.set_rollback(True)
+
+
+@pytest.fixture(scope='module')
+def budget_results():
+    """Measurements of this run, written to $QUERY_BUDGET_REPORT if set."""
+    results = {}
+    yield results
+    path = os.environ.get(REPORT_ENV)
+    if path and results:
+        write_results({'generated_at': timezone.now().isoformat(), 'endpoints': results}, path)
+
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+def _client_for(kind, seeded):
+    client = APIClient()
+    if kind == 'institutional':
+        client.credentials(HTTP_AUTHORIZATION=f"ApiKey {seeded['institutional_key']}")
+    elif kind != 'anonymous':
+        client.force_authenticate(user=seeded[kind])
+    return client
+
+
+def _cold_request(client, path):
+    """One request with an empty cache. Returns (response, profile, elapsed ms)."""
+    cache.clear()
+    profile = RequestProfile()
+    with connections['default'].execute_wrapper(profile):
+        started = time.perf_counter()
+        response = client.get(path)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    return response, profile, elapsed_ms
+
+
+def measure_endpoint(client, path, runs=LATENCY_RUNS):
+    """
+    Request ``path`` ``runs`` times with an empty cache.
+
+    Queries are counted on the first request; latency is the fastest run,
+    which filters out scheduler and GC noise.
+    """
+    response, profile, elapsed_ms = _cold_request(client, path)
+    timings = [elapsed_ms]
+    for _ in range(runs - 1):
+        timings.append(_cold_request(client, path)[2])
+
+    return {
+        'status': response.status_code,
+        'queries': profile.queries,
+        'sql_ms': round(profile.sql_ms, 1),
+        'ms': round(min(timings), 1),
+        'identical_queries': profile.identical_queries(),
+        'repeated': [
+            {'sql': sql[:300], 'count': count}
+            for sql, count in profile.repeated_statements(REPEATED_STATEMENT_THRESHOLD)[:5]
+        ],
+    }
+
+
+def _describe_repeated(measurement):
+    return ''.join(
+        f"\n  {item['count']}x {item['sql']}" for item in measurement['repeated']
+    ) or ' none'
+
+
+# =============================================================================
+# BUDGETS
+# =============================================================================
+
+@pytest.mark.parametrize('name', sorted(ENDPOINT_BUDGETS))
+def test_endpoint_within_budget(name, seeded, budget_results):
+    budget = ENDPOINT_BUDGETS[name]
+    path = budget['path'].format(**seeded)
+    client = _client_for(budget['client'], seeded)
+
+    check_latency = latency_budgets_enabled()
+    measurement = measure_endpoint(client, path, runs=LATENCY_RUNS if check_latency else 1)
+    max_queries = query_budget(name)
+    max_ms = budget['max_ms'] * latency_factor()
+    budget_results[name] = dict(
+        measurement, path=budget['path'], max_queries=max_queries, max_ms=budget['max_ms'],
+    )
+
+    assert measurement['status'] == 200, f"{path} returned {measurement['status']}"
+    assert measurement['queries'] <= max_queries, (
+        f"{name}: {measurement['queries']} queries, budget {max_queries}. "
+        f"Repeated statements:{_describe_repeated(measurement)}"
+    )
+    if check_latency:
+        assert measurement['ms'] <= max_ms, (
+            f"{name}: {measurement['ms']}ms, budget {max_ms:g}ms "
+            f"({measurement['queries']} queries, {measurement['sql_ms']}ms SQL)"
+        )
+
+
+def test_seed_is_deterministic(seeded):
+    """The same seed generates the same dataset, so runs are comparable."""
+    from flock_management.models import DailyProduction
+
+    farm = Farm.objects.filter(user=seeded['farmer']).first()
+    eggs = list(
+        DailyProduction.objects.filter(farm=farm)
+        .order_by('flock__flock_number', 'production_date')
+        .values_list('eggs_collected', flat=True)
+    )
+    with transaction.atomic():
+        generate_farm_data(user=seeded['farmer'], days=SEED_DAYS, clear=True, seed=SEED + 1, verbose=False)
+        regenerated = list(
+            DailyProduction.objects.filter(farm=farm)
+            .order_by('flock__flock_number', 'production_date')
+            .values_list('eggs_collected', flat=True)
+        )
+        transaction.set_rollback(True)
+
+    assert eggs and regenerated == eggs